@@ -0,0 +1,8 @@
+"""
+⏱️ Benchmarks - Tech Security Basics
+====================================
+
+Mediciones de rendimiento de las herramientas del proyecto.
+Ejecútalos desde la raíz del proyecto, por ejemplo:
+    python -m benchmarks.sanitizador
+"""
@@ -0,0 +1,74 @@
+"""
+⏱️ Benchmark: AttackDetector en un proceso vs fragmentado en N
+==============================================================
+
+Genera un tráfico de logins con una parte de ataques (unas pocas IPs y
+usuarios concentran fallos) y lo pasa por un AttackDetector normal y por
+DetectorFragmentado con distinto número de fragmentos. Para cada uno mide
+eventos/segundo y comprueba que las alertas son exactamente las mismas.
+
+La escalabilidad depende de los núcleos libres: con menos núcleos que
+fragmentos los procesos compiten entre sí.
+
+Uso:
+    python -m benchmarks.detector_fragmentado --eventos 400000 --fragmentos 1 2 4 8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from modules.detector_fragmentado import AttackDetector, DetectorFragmentado
+
+Evento = Tuple[str, str, bool, float]
+
+def generar(eventos: int, semilla: int = 1) -> List[Evento]:
+    """Logins en 10 minutos: 80% éxitos de IPs variadas, el resto fallos con atacantes concentrados"""
+    aleatorio = random.Random(semilla)
+    ips = [f"{aleatorio.randrange(1, 224)}.{aleatorio.randrange(256)}.{aleatorio.randrange(256)}."
+           f"{aleatorio.randrange(1, 255)}" for _ in range(eventos // 10)]
+    atacantes = [f"203.0.113.{i}" for i in range(50)]
+    inicio = 1_700_000_000.0
+    generados = []
+    for i in range(eventos):
+        if aleatorio.random() < 0.2:
+            ip = aleatorio.choice(atacantes) if aleatorio.random() < 0.5 else aleatorio.choice(ips)
+            generados.append((f"usuario{aleatorio.randrange(2000)}", ip, False, inicio + 600 * i / eventos))
+        else:
+            generados.append((f"usuario{aleatorio.randrange(50000)}", aleatorio.choice(ips), True,
+                              inicio + 600 * i / eventos))
+    return generados
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AttackDetector en un proceso vs fragmentado")
+    parser.add_argument("--eventos", type=int, default=400000)
+    parser.add_argument("--fragmentos", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    eventos = generar(args.eventos)
+    inicio = time.perf_counter()
+    detector = AttackDetector()
+    referencia = Counter((ts, alerta) for username, ip, success, ts in eventos
+                         for alerta in detector.analyze_login_pattern(username, ip, success, ts))
+    base = len(eventos) / (time.perf_counter() - inicio)
+
+    print(f"{len(eventos):,} eventos, {sum(referencia.values()):,} alertas, {os.cpu_count()} núcleos\n")
+    print(f"{'detector':<22} {'ev/s':>10} {'aceleración':>12} {'alertas iguales':>16}")
+    print("-" * 63)
+    print(f"{'un proceso':<22} {base:>10,.0f} {1:>11.2f}x {'-':>16}")
+    for fragmentos in args.fragmentos:
+        inicio = time.perf_counter()
+        with DetectorFragmentado(fragmentos) as fragmentado:
+            alertas = fragmentado.procesar(eventos)
+            alertas.extend(fragmentado.cerrar())
+        ev_s = len(eventos) / (time.perf_counter() - inicio)
+        iguales = "sí" if Counter(alertas) == referencia else "NO"
+        print(f"{f'{fragmentos} fragmentos':<22} {ev_s:>10,.0f} {ev_s / base:>11.2f}x {iguales:>16}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
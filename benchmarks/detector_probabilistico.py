@@ -0,0 +1,122 @@
+"""
+⏱️ Benchmark: AttackDetector exacto vs probabilístico durante un flood
+======================================================================
+
+Simula un flood de una botnet: muchísimas IPs distintas con uno o dos
+fallos cada una, más unos pocos atacantes "pesados" que concentran una
+parte del tráfico. Para cada modo mide:
+
+• Memoria que ocupa el detector (tracemalloc) y eventos/segundo
+• Falsos positivos / negativos de la alerta BRUTE FORCE (fallos >= umbral)
+• Error de las cuentas de los atacantes pesados
+• Cuántos de los 20 peores atacantes reales aparecen en worst_offenders()
+
+El modo exacto es la referencia: sus cuentas son las reales.
+
+Uso:
+    python -m benchmarks.detector_probabilistico --eventos 300000 --ips 150000
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from modules import cargar_ejemplo
+
+AttackDetector = cargar_ejemplo("04_security_logging").AttackDetector
+
+Evento = Tuple[str, str, bool, float]
+
+def generar_flood(eventos: int, ips: int, atacantes: int, proporcion: float, semilla: int = 1) -> List[Evento]:
+    """Fallos de la botnet en 60 segundos (dentro de una ventana)"""
+    aleatorio = random.Random(semilla)
+    botnet = [f"{aleatorio.randrange(1, 224)}.{aleatorio.randrange(256)}."
+              f"{aleatorio.randrange(256)}.{aleatorio.randrange(1, 255)}" for _ in range(ips)]
+    pesados = [f"203.0.113.{i}" for i in range(atacantes)]
+    # Pesos tipo Zipf: el primer atacante es el más activo
+    pesos = [1 / (i + 1) for i in range(atacantes)]
+    usuarios = [f"usuario{i}" for i in range(5000)]
+    inicio = 1_700_000_000.0
+    flood = []
+    for i in range(eventos):
+        if aleatorio.random() < proporcion:
+            ip = aleatorio.choices(pesados, pesos)[0]
+        else:
+            ip = botnet[aleatorio.randrange(ips)]
+        flood.append((aleatorio.choice(usuarios), ip, False, inicio + 60 * i / eventos))
+    return flood
+
+def analizar(modo: str, flood: List[Evento], opciones: Dict[str, int]):
+    detector = AttackDetector(modo=modo, **opciones)
+    for username, ip, success, timestamp in flood:
+        detector.analyze_login_pattern(username, ip, success, timestamp)
+    return detector
+
+def medir(modo: str, flood: List[Evento], **opciones) -> Dict[str, object]:
+    # Velocidad sin tracemalloc (frena cada asignación) y memoria en otra pasada
+    inicio = time.perf_counter()
+    analizar(modo, flood, opciones)
+    duracion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    detector = analizar(modo, flood, opciones)
+    memoria = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    ahora = flood[-1][3]
+    ips = {ip for _, ip, _, _ in flood}
+    return {
+        "detector": detector,
+        "ev_s": len(flood) / duracion,
+        "memoria": memoria,
+        "cuentas": {ip: detector.failed_by_ip.contar(ip, ahora) for ip in ips},
+        "peores": detector.worst_offenders(20, ahora),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="AttackDetector exacto vs Count-Min Sketch + Space-Saving")
+    parser.add_argument("--eventos", type=int, default=300000)
+    parser.add_argument("--ips", type=int, default=150000, help="IPs distintas de la botnet")
+    parser.add_argument("--atacantes", type=int, default=50, help="IPs con mucho tráfico")
+    parser.add_argument("--proporcion", type=float, default=0.05, help="Parte del tráfico de los atacantes")
+    parser.add_argument("--ancho", type=int, default=2 ** 18, help="Ancho del Count-Min Sketch")
+    parser.add_argument("--filas", type=int, default=4, help="Filas del Count-Min Sketch")
+    parser.add_argument("--top-k", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    flood = generar_flood(args.eventos, args.ips, args.atacantes, args.proporcion)
+    exacto = medir("exacto", flood)
+    aproximado = medir("probabilistico", flood, ancho_sketch=args.ancho,
+                       filas_sketch=args.filas, top_k=args.top_k)
+
+    detector = aproximado["detector"]
+    umbral = detector.umbral_ip
+    reales, estimadas = exacto["cuentas"], aproximado["cuentas"]
+    alertas_reales = {ip for ip, n in reales.items() if n >= umbral}
+    alertas = {ip for ip, n in estimadas.items() if n >= umbral}
+    peores = [ip for ip, _, _ in exacto["peores"]]
+    encontrados = {ip for ip, _, _ in aproximado["peores"]}
+    errores = [estimadas[ip] - reales[ip] for ip in peores]
+
+    print(f"Flood: {args.eventos:,} fallos, {len(reales):,} IPs distintas, "
+          f"{args.atacantes} atacantes con el {args.proporcion:.0%} del tráfico")
+    print(f"Sketch: {args.filas} x {args.ancho:,} (ε = {detector.failed_by_ip.epsilon:.1e}, "
+          f"δ = {detector.failed_by_ip.delta:.1%}, cota ε·N = {detector.failed_by_ip.epsilon * args.eventos:.1f}), "
+          f"top-k {args.top_k}\n")
+    print(f"{'modo':<16} {'memoria MB':>11} {'ev/s':>10}")
+    print("-" * 39)
+    for nombre, r in (("exacto", exacto), ("probabilístico", aproximado)):
+        print(f"{nombre:<16} {r['memoria'] / 1e6:>11.1f} {r['ev_s']:>10,.0f}")
+
+    print(f"\nAlertas BRUTE FORCE (>= {umbral} fallos): {len(alertas_reales):,} reales, "
+          f"{len(alertas - alertas_reales):,} falsos positivos, {len(alertas_reales - alertas):,} falsos negativos")
+    print(f"Error en los 20 peores atacantes: máx +{max(errores)}, medio +{sum(errores) / len(errores):.2f} fallos")
+    print(f"worst_offenders(20): {len(encontrados & set(peores))}/20 de los peores reales")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+⏱️ Benchmark: SanitizadorHTML (whitelist) vs html.escape
+========================================================
+
+Mide el coste por KB de sanitizar HTML enriquecido con la whitelist
+frente a escaparlo todo con html.escape, para documentos de 1 KB a 10 MB.
+Los documentos grandes se procesan en streaming (trozos de 64 KB) y se
+muestra el pico de memoria para comprobar que no crece con el tamaño.
+
+Uso:
+    python -m benchmarks.html_permitido [--max-mb 10]
+"""
+
+import argparse
+import html
+import random
+import time
+import tracemalloc
+from typing import Iterator
+
+from modules import cargar_ejemplo
+
+validacion = cargar_ejemplo("02_input_validation")
+
+TAMANOS = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+TAMANO_TROZO = 64 * 1024
+
+# Fragmentos de texto enriquecido, con algo de HTML que hay que eliminar
+FRAGMENTOS = [
+    "<p>Me gusta aprender sobre <b>seguridad</b> y <em>privacidad</em>.</p>",
+    "<ul><li>Validar</li><li>Sanitizar</li><li>Escapar</li></ul>",
+    '<a href="https://ejemplo.com/docs?id=1&lang=es" title="Docs">documentación</a>',
+    "<img src=x onerror=alert('XSS')>",
+    "<script>alert('hack')</script>",
+    "Texto normal con 5 < 10 && 3 > 1 y comillas \"dobles\".",
+    '<a href="javascript:alert(1)">no</a><br/>',
+]
+
+def generar_documento(tamano: int, semilla: int = 7) -> str:
+    rnd = random.Random(semilla)
+    partes = []
+    total = 0
+    while total < tamano:
+        fragmento = rnd.choice(FRAGMENTOS)
+        partes.append(fragmento)
+        total += len(fragmento)
+    return "".join(partes)[:tamano]
+
+def trozos(texto: str) -> Iterator[str]:
+    for i in range(0, len(texto), TAMANO_TROZO):
+        yield texto[i:i + TAMANO_TROZO]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del sanitizador HTML por whitelist")
+    parser.add_argument("--max-mb", type=float, default=10, help="Tamaño máximo de documento en MB")
+    args = parser.parse_args()
+    max_bytes = int(args.max_mb * 1024 * 1024)
+
+    validador = validacion.ValidadorSeguro()
+
+    print(f"{'tamaño':>10} | {'html.escape':>14} | {'whitelist':>14} | {'relación':>8} | {'pico memoria':>12}")
+    print("-" * 72)
+    for tamano in TAMANOS:
+        if tamano > max_bytes:
+            break
+        documento = generar_documento(tamano)
+        kb = len(documento) / 1024
+        repeticiones = max(1, (256 * 1024) // tamano)
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            html.escape(documento)
+        t_escape = (time.perf_counter() - inicio) / repeticiones
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            sanitizador = validacion.SanitizadorHTML(validador.validar_url)
+            for _ in sanitizador.sanitizar_stream(trozos(documento)):
+                pass
+        t_whitelist = (time.perf_counter() - inicio) / repeticiones
+
+        tracemalloc.start()
+        sanitizador = validacion.SanitizadorHTML(validador.validar_url)
+        for _ in sanitizador.sanitizar_stream(trozos(documento)):
+            pass
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{tamano // 1024:>7} KB | {t_escape * 1e6 / kb:>8.2f} µs/KB | {t_whitelist * 1e6 / kb:>8.2f} µs/KB | "
+              f"{t_whitelist / t_escape:>7.0f}x | {pico / 1024:>9.0f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+⏱️ Benchmark: instantáneas y reinicio en caliente de AttackDetector
+===================================================================
+
+Llena un detector con --ips IPs distintas (cada una falla con un
+usuario distinto, así que también crecen los contadores por usuario,
+los HyperLogLog y el trie de subredes) y mide:
+
+• Tamaño del estado binario y de la instantánea comprimida
+• Pausa del proceso principal al guardar en segundo plano (fork) frente
+  a guardar en el momento, y eventos/segundo mientras el hijo escribe
+• Tiempo de arranque en caliente: leer la instantánea y cargar el estado
+
+Uso:
+    python -m benchmarks.instantaneas --ips 1000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from modules.instantaneas_detector import AttackDetector, Instantaneas, leer_instantanea
+
+INICIO = 1_700_000_000.0
+
+def llenar(detector: AttackDetector, ips: int, desde: int = 0, total: Optional[int] = None) -> float:
+    """Un fallo por IP, repartidos en 60 segundos; devuelve eventos/segundo"""
+    analizar = detector.analyze_login_pattern
+    total = total or ips
+    inicio = time.perf_counter()
+    for i in range(desde, desde + ips):
+        analizar(f"usuario{i}", f"{10 + i % 200}.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+                 False, INICIO + 60 * min(i, total) / total)
+    return ips / (time.perf_counter() - inicio)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Instantáneas y reinicio en caliente de AttackDetector")
+    parser.add_argument("--ips", type=int, default=1000000, help="IPs (y usuarios) distintos seguidos")
+    parser.add_argument("--modo", choices=("exacto", "probabilistico"), default="exacto")
+    args = parser.parse_args(argv)
+
+    crear = lambda: AttackDetector(modo=args.modo, max_fuentes=args.ips)
+    print(f"Llenando el detector ({args.modo}) con {args.ips:,} IPs...")
+    detector = crear()
+    ev_s_normal = llenar(detector, args.ips)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = Path(directorio) / "detector.snap"
+        posicion = {"huella": "benchmark", "offset": 0}
+
+        inicio = time.perf_counter()
+        estado = detector.volcar_estado()
+        volcado = time.perf_counter() - inicio
+
+        instantaneas = Instantaneas(ruta, crear)
+        instantaneas.detector = detector
+        instantaneas.guardar(posicion, en_segundo_plano=False)
+        pausa_sincrona = instantaneas.pausa_maxima
+
+        if hasattr(os, "fork"):
+            instantaneas.pausa_maxima = 0.0
+            inicio = time.perf_counter()
+            instantaneas.guardar(posicion)
+            pausa_fork = instantaneas.pausa_maxima
+            # Se siguen procesando eventos mientras el hijo escribe
+            eventos = 0
+            while not instantaneas._recoger_hijo():
+                llenar(detector, 1000, desde=args.ips + eventos, total=args.ips)
+                eventos += 1000
+            escritura = time.perf_counter() - inicio
+            ev_s = eventos / escritura
+        else:
+            pausa_fork = escritura = ev_s = None
+
+        inicio = time.perf_counter()
+        _, datos = leer_instantanea(ruta)
+        lectura = time.perf_counter() - inicio
+        restaurado = crear()
+        inicio = time.perf_counter()
+        restaurado.cargar_estado(datos)
+        carga = time.perf_counter() - inicio
+
+        print(f"\nEstado: {len(estado) / 1e6:.1f} MB en {volcado:.2f} s; "
+              f"instantánea: {ruta.stat().st_size / 1e6:.1f} MB comprimida")
+        print(f"Pausa guardando en el momento: {pausa_sincrona * 1000:,.0f} ms")
+        if pausa_fork is not None:
+            print(f"Pausa guardando con fork:      {pausa_fork * 1000:,.1f} ms (el hijo tardó {escritura:.2f} s; "
+                  f"{ev_s:,.0f} ev/s mientras tanto, {ev_s_normal:,.0f} ev/s sin instantánea)")
+        print(f"Arranque en caliente: {lectura:.2f} s leyendo + {carga:.2f} s cargando = {lectura + carga:.2f} s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
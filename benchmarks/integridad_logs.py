@@ -0,0 +1,119 @@
+"""
+⏱️ Benchmark: coste del modo integridad de SecurityLogger
+=========================================================
+
+Mide si encadenar y sellar las líneas aguanta 100k eventos/segundo:
+
+• Sellado solo (SelladorIntegridad.sellar sobre líneas JSONL ya
+  formateadas), de una en una y por lotes de escritura: eventos/segundo
+• SecurityLogger JSONL síncrono sin y con integridad, evento a evento y
+  con log_many (la consola va a /dev/null)
+• Verificación del segmento entero en una pasada: entradas/s y MB/s
+• Pruebas de inclusión: hashes en el camino y µs para comprobar una
+
+Uso:
+    python -m benchmarks.integridad_logs --eventos 200000 --lote 1024
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from modules import cargar_ejemplo
+from modules.integridad_logs import (cargar_clave_privada, cargar_clave_publica, generar_claves,
+                                     prueba_inclusion, verificar_inclusion, verificar_log)
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+SecurityLogger = registro_seguridad.SecurityLogger
+SelladorIntegridad = registro_seguridad.SelladorIntegridad
+
+def _linea(i: int) -> str:
+    return (f'{{"timestamp": "2024-05-01T10:00:{i % 60:02d}.{i % 1000000:06d}+00:00", "level": "WARNING", '
+            f'"event": "LOGIN_FAILED", "event_type": "login_attempt", "details": {{"username": "usuario{i % 500}", '
+            f'"success": false, "ip_address": "10.0.{i % 256}.{i % 200}", "user_agent": "example-browser"}}, '
+            f'"source": "security_system"}}\n')
+
+def sellado(clave, lineas: List[str], escritura: int, lote: int) -> float:
+    """ev/s de sellar las líneas en escrituras de `escritura` líneas"""
+    sellador = SelladorIntegridad(clave, lote, intervalo=3600)
+    inicio = time.perf_counter()
+    for i in range(0, len(lineas), escritura):
+        sellador.sellar(lineas[i:i + escritura])
+    sellador.checkpoint()
+    return len(lineas) / (time.perf_counter() - inicio)
+
+def logger(eventos: int, directorio: Path, nombre: str, por_lotes: bool, **opciones) -> float:
+    consola = open(os.devnull, "w")
+    stderr, sys.stderr = sys.stderr, consola  # El StreamHandler toma sys.stderr al crearse
+    try:
+        registro = SecurityLogger(str(directorio / f"{nombre}.log"), formato="jsonl", max_bytes=0, **opciones)
+    finally:
+        sys.stderr = stderr
+    argumentos = [(f"usuario{i % 500}", i % 7 != 0, f"10.0.{i % 256}.{i % 200}") for i in range(eventos)]
+    inicio = time.perf_counter()
+    if por_lotes:
+        for i in range(0, eventos, 1000):
+            registro.log_many([("login_attempt", a) for a in argumentos[i:i + 1000]])
+    else:
+        for a in argumentos:
+            registro.log_login_attempt(*a)
+    registro.close()
+    consola.close()
+    return eventos / (time.perf_counter() - inicio)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Coste del modo integridad de SecurityLogger")
+    parser.add_argument("--eventos", type=int, default=200000)
+    parser.add_argument("--lote", type=int, default=1024, help="Líneas por checkpoint")
+    parser.add_argument("--pruebas", type=int, default=1000, help="Pruebas de inclusión a comprobar")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        directorio = Path(directorio)
+        generar_claves(directorio / "log.key", directorio / "log.pub")
+        clave = cargar_clave_privada(directorio / "log.key")
+        publica = cargar_clave_publica(directorio / "log.pub")
+
+        lineas = [_linea(i) for i in range(args.eventos)]
+        print(f"Sellado ({args.eventos:,} líneas JSONL, {args.lote} por checkpoint):")
+        for escritura in (1, 100, 1000):
+            print(f"  escrituras de {escritura:>5} líneas: {sellado(clave, lineas, escritura, args.lote):>12,.0f} ev/s")
+
+        print("\nSecurityLogger JSONL síncrono:")
+        for nombre, por_lotes, opciones in (
+            ("sin integridad", False, {}),
+            ("con integridad", False, {"clave_integridad": clave, "lote_integridad": args.lote}),
+            ("sin integridad, log_many", True, {}),
+            ("con integridad, log_many", True, {"clave_integridad": clave, "lote_integridad": args.lote}),
+        ):
+            print(f"  {nombre:<26} {logger(args.eventos, directorio, nombre, por_lotes, **opciones):>12,.0f} ev/s")
+
+        ruta = directorio / "con integridad.log"
+        inicio = time.perf_counter()
+        resultado, = verificar_log(ruta, publica)
+        segundos = time.perf_counter() - inicio
+        estado = "sin errores" if not resultado["errores"] else f"{len(resultado['errores'])} ERRORES"
+        print(f"\nVerificación en una pasada: {resultado['entradas'] / segundos:,.0f} entradas/s, "
+              f"{ruta.stat().st_size / 1e6 / segundos:,.0f} MB/s ({resultado['lotes']:,} lotes, {estado})")
+
+        # Líneas de entrada (no checkpoints) al azar; generar la prueba recorre el segmento
+        aleatorio = random.Random(1)
+        checkpoints = {i for i, linea in enumerate(open(ruta, "rb"), 1) if registro_seguridad.leer_checkpoint(linea)}
+        total = sum(1 for _ in open(ruta, "rb"))
+        numeros = [n for n in aleatorio.sample(range(1, total + 1), min(20, total)) if n not in checkpoints]
+        pruebas = [prueba_inclusion(ruta, n) for n in numeros]
+        inicio = time.perf_counter()
+        validas = sum(verificar_inclusion(pruebas[i % len(pruebas)], publica) for i in range(args.pruebas))
+        us = (time.perf_counter() - inicio) / args.pruebas * 1e6
+        hashes = max(len(prueba["camino"]) for prueba in pruebas)
+        print(f"Prueba de inclusión: {hashes} hashes en el camino, {us:,.0f} µs por comprobación "
+              f"({validas}/{args.pruebas} válidas)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+⏱️ Benchmark: formato texto vs JSONL de SecurityLogger
+=====================================================
+
+Eventos/segundo de SecurityLogger en modo síncrono con cada formato:
+
+• texto: dict de detalles + dict de entrada + json.dumps + Formatter
+  con asctime ("fecha - NIVEL - EVENTO: {json}")
+• jsonl: plantillas precompiladas por tipo de evento, valores escapados
+  en C y timestamp ISO cacheado por segundo
+
+Se mide solo el formateo (handler que descarta la línea) y el camino
+completo hasta el archivo. También se comprueba que cada línea JSONL es
+JSON válido con los mismos detalles que el formato texto.
+
+Uso:
+    python -m benchmarks.jsonl --eventos 100000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from modules import cargar_ejemplo
+
+SecurityLogger = cargar_ejemplo("04_security_logging").SecurityLogger
+
+class _Descartar(logging.Handler):
+    """Formatea cada registro y tira el resultado"""
+
+    def emit(self, record):
+        self.format(record)
+
+def _eventos(logger) -> List[Callable[[int], None]]:
+    """Mezcla de eventos parecida a la de un servidor real"""
+    return [
+        lambda i: logger.log_login_attempt(f"usuario{i % 500}", True, f"10.0.{i % 256}.{i % 200}"),
+        lambda i: logger.log_login_attempt(f"usuario{i % 500}", True, f"10.0.{i % 256}.{i % 200}"),
+        lambda i: logger.log_login_attempt(f"usuario{i % 500}", False, f"10.0.{i % 256}.{i % 200}"),
+        lambda i: logger.log_permission_denied(f"usuario{i % 500}", "/admin/config", "READ"),
+        lambda i: logger.log_data_access(f"usuario{i % 500}", "employee_salaries", "READ"),
+    ]
+
+def medir(formato: str, eventos: int, directorio: Path, solo_formateo: bool) -> float:
+    consola = open(os.devnull, "w")
+    stderr, sys.stderr = sys.stderr, consola
+    try:
+        logger = SecurityLogger(str(directorio / f"{formato}.log"), formato=formato)
+    finally:
+        sys.stderr = stderr
+
+    if solo_formateo:
+        descartar = _Descartar()
+        descartar.setFormatter(logger.logger.handlers[0].formatter)
+        for handler in list(logger.logger.handlers):
+            logger.logger.removeHandler(handler)
+        logger.logger.addHandler(descartar)
+        logger._handlers_propios.append(descartar)
+
+    acciones = _eventos(logger)
+    inicio = time.perf_counter()
+    for i in range(eventos):
+        acciones[i % len(acciones)](i)
+    duracion = time.perf_counter() - inicio
+
+    logger.close()
+    consola.close()
+    return eventos / duracion
+
+def comprobar(eventos: int = 1000):
+    with tempfile.TemporaryDirectory() as directorio:
+        directorio = Path(directorio)
+        medir("texto", eventos, directorio, solo_formateo=False)
+        medir("jsonl", eventos, directorio, solo_formateo=False)
+        texto = [json.loads(linea.split(": ", 1)[1]) for linea in open(directorio / "texto.log", encoding="utf-8")]
+        jsonl = [json.loads(linea) for linea in open(directorio / "jsonl.log", encoding="utf-8")]
+    assert len(texto) == len(jsonl) == eventos
+    for a, b in zip(texto, jsonl):
+        assert a["details"] == b["details"] and a["event_type"] == b["event_type"]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Eventos/seg de SecurityLogger: texto vs JSONL")
+    parser.add_argument("--eventos", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    print(f"{'camino':<16} {'texto ev/s':>12} {'jsonl ev/s':>12} {'mejora':>8}")
+    print("-" * 52)
+    with tempfile.TemporaryDirectory() as directorio:
+        directorio = Path(directorio)
+        for nombre, solo_formateo in (("solo formateo", True), ("hasta archivo", False)):
+            texto = medir("texto", args.eventos, directorio, solo_formateo)
+            jsonl = medir("jsonl", args.eventos, directorio, solo_formateo)
+            print(f"{nombre:<16} {texto:>12,.0f} {jsonl:>12,.0f} {jsonl / texto:>7.2f}x")
+
+    comprobar()
+    print("\n✅ Las líneas JSONL son JSON válido con los mismos detalles que el formato texto")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+⏱️ Benchmark: SecurityLogger evento a evento vs por lotes
+=========================================================
+
+Eventos/segundo de SecurityLogger en modo síncrono (archivo + consola)
+logeando de uno en uno con log_login_attempt() y con log_many() en lotes
+de distintos tamaños. Por lotes se ahorra, por cada evento, la búsqueda
+del llamador en la pila, el paso por los handlers y las dos escrituras
+(archivo y consola) con su flush.
+
+También se comprueba que el archivo queda igual que evento a evento
+(salvo los timestamps, que son los de cada llamada).
+
+La consola se redirige a /dev/null para no inundar la terminal.
+
+Uso:
+    python -m benchmarks.lotes_logger --eventos 200000 --lotes 1 10 100 1000
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from modules import cargar_ejemplo
+
+SecurityLogger = cargar_ejemplo("04_security_logging").SecurityLogger
+
+# Timestamps del formato texto (asctime y el del JSON) y del JSONL
+PATRON_TIMESTAMP = re.compile(r'^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3}|"timestamp": "[^"]*"')
+
+def _eventos(eventos: int) -> List[Tuple[str, tuple]]:
+    return [("login_attempt", (f"usuario{i % 500}", i % 7 != 0, f"10.0.{i % 256}.{i % 200}"))
+            for i in range(eventos)]
+
+def medir(eventos: List[Tuple[str, tuple]], lote: Optional[int], directorio: Path,
+          formato: str) -> Tuple[float, List[str]]:
+    """ev/s logeando de uno en uno (lote=None) o con log_many; y las líneas escritas"""
+    ruta = directorio / f"security-{lote}.log"
+    consola = open(os.devnull, "w")
+    stderr, sys.stderr = sys.stderr, consola  # El StreamHandler toma sys.stderr al crearse
+    try:
+        logger = SecurityLogger(str(ruta), formato=formato, max_bytes=0)
+    finally:
+        sys.stderr = stderr
+
+    inicio = time.perf_counter()
+    if lote is None:
+        for _, argumentos in eventos:
+            logger.log_login_attempt(*argumentos)
+    else:
+        for i in range(0, len(eventos), lote):
+            logger.log_many(eventos[i:i + lote])
+    ev_s = len(eventos) / (time.perf_counter() - inicio)
+    logger.close()
+    consola.close()
+
+    lineas = [PATRON_TIMESTAMP.sub("", linea) for linea in open(ruta, encoding="utf-8")]
+    return ev_s, lineas
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SecurityLogger evento a evento vs por lotes")
+    parser.add_argument("--eventos", type=int, default=200000)
+    parser.add_argument("--lotes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args(argv)
+
+    eventos = _eventos(args.eventos)
+    print(f"{'formato':<8} {'lote':>12} {'ev/s':>10} {'aceleración':>12} {'mismo archivo':>14}")
+    print("-" * 60)
+    for formato in ("texto", "jsonl"):
+        with tempfile.TemporaryDirectory() as directorio:
+            base, referencia = medir(eventos, None, Path(directorio), formato)
+            print(f"{formato:<8} {'uno a uno':>12} {base:>10,.0f} {1:>11.2f}x {'-':>14}")
+            for lote in args.lotes:
+                ev_s, lineas = medir(eventos, lote, Path(directorio), formato)
+                igual = "sí" if lineas == referencia else "NO"
+                print(f"{formato:<8} {lote:>12,} {ev_s:>10,.0f} {ev_s / base:>11.2f}x {igual:>14}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+⏱️ Benchmark: SecurityLogger con ráfagas juntadas y muestreo adaptativo
+======================================================================
+
+Simula un brute force en curso: unos pocos atacantes repiten el mismo
+LOGIN_FAILED miles de veces por segundo, mezclado con logins correctos y
+accesos a datos de tráfico normal. Lo logea con SecurityLogger:
+
+• sin agregación (una línea por evento)
+• juntando ráfagas de eventos idénticos (--ventana segundos)
+• juntando ráfagas y muestreando LOGIN_SUCCESS y DATA_ACCESS
+  (--presupuesto eventos/segundo por tipo)
+
+Para cada modo mide eventos/segundo, líneas y MB escritos, y pasa el
+archivo resultante por AttackDetector (como haría el seguidor de logs)
+para comprobar que se detectan los mismos atacantes que sin agregación.
+
+La consola se redirige a /dev/null para no inundar la terminal.
+
+Uso:
+    python -m benchmarks.rafagas_logger --eventos 200000 --ventana 1 --presupuesto 500
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from modules import cargar_ejemplo
+from modules.indice_logs import segundos
+from modules.seguidor_logs import extraer_logins
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+SecurityLogger = registro_seguridad.SecurityLogger
+AttackDetector = registro_seguridad.AttackDetector
+
+# "🚨 BRUTE FORCE: IP 203.0.113.7 tiene 12 intentos..." -> "🚨 BRUTE FORCE: IP 203.0.113.7"
+PATRON_SUJETO = re.compile(r"^(.*?) (?:tiene|probó) ")
+
+Evento = Tuple[str, tuple]
+
+def generar(eventos: int, semilla: int = 1) -> List[Evento]:
+    """70% fallos de 20 atacantes contra 5 usuarios cada uno, el resto tráfico normal"""
+    aleatorio = random.Random(semilla)
+    atacantes = [(f"203.0.113.{i}", [f"victima{i}_{j}" for j in range(5)]) for i in range(20)]
+    generados = []
+    for _ in range(eventos):
+        tirada = aleatorio.random()
+        if tirada < 0.7:
+            ip, victimas = aleatorio.choice(atacantes)
+            generados.append(("login_attempt", (aleatorio.choice(victimas), False, ip)))
+        elif tirada < 0.9:
+            usuario = aleatorio.randrange(5000)
+            generados.append(("login_attempt", (f"usuario{usuario}", True, f"10.1.{usuario % 256}.{usuario % 200}")))
+        else:
+            generados.append(("data_access", (f"usuario{aleatorio.randrange(5000)}", "pii", "read")))
+    # Algún atacante acierta: ese éxito no se puede perder por el muestreo
+    generados.append(("login_attempt", ("victima0_0", True, "203.0.113.0")))
+    return generados
+
+def sujetos_alertados(ruta: Path) -> Set[str]:
+    """IPs, usuarios y subredes que AttackDetector señala leyendo el archivo"""
+    detector = AttackDetector()
+    sujetos = set()
+    with open(ruta, "rb") as archivo:
+        for timestamp, username, ip_address, success, repeticiones in extraer_logins(archivo.readlines()):
+            for alerta in detector.analyze_login_pattern(username, ip_address, success, segundos(timestamp),
+                                                         cantidad=repeticiones):
+                coincidencia = PATRON_SUJETO.match(alerta)
+                sujetos.add(coincidencia.group(1) if coincidencia else alerta)
+    return sujetos
+
+def medir(eventos: List[Evento], directorio: Path, nombre: str, **opciones) -> Dict[str, object]:
+    ruta = directorio / f"{nombre}.log"
+    consola = open(os.devnull, "w")
+    stderr, sys.stderr = sys.stderr, consola  # El StreamHandler toma sys.stderr al crearse
+    try:
+        logger = SecurityLogger(str(ruta), formato="jsonl", max_bytes=0, **opciones)
+    finally:
+        sys.stderr = stderr
+
+    inicio = time.perf_counter()
+    for tipo, argumentos in eventos:
+        getattr(logger, "log_" + tipo)(*argumentos)
+    logger.close()  # Incluye los resúmenes de las ráfagas aún abiertas
+    ev_s = len(eventos) / (time.perf_counter() - inicio)
+    consola.close()
+
+    with open(ruta, "rb") as archivo:
+        lineas = sum(1 for _ in archivo)
+    return {"ev_s": ev_s, "lineas": lineas, "mb": ruta.stat().st_size / 1e6,
+            "sujetos": sujetos_alertados(ruta), "estadisticas": logger.estadisticas_rafagas()}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SecurityLogger con ráfagas juntadas y muestreo")
+    parser.add_argument("--eventos", type=int, default=200000)
+    parser.add_argument("--ventana", type=float, default=1.0, help="Segundos de cada ráfaga")
+    parser.add_argument("--presupuesto", type=float, default=500, help="Eventos INFO/segundo conservados por tipo")
+    args = parser.parse_args(argv)
+
+    eventos = generar(args.eventos)
+    muestreo = {"LOGIN_SUCCESS": args.presupuesto, "DATA_ACCESS": args.presupuesto}
+    modos = [
+        ("sin agregación", {}),
+        ("ráfagas", {"ventana_rafagas": args.ventana}),
+        ("ráfagas + muestreo", {"ventana_rafagas": args.ventana, "muestreo": muestreo}),
+    ]
+
+    print(f"{'modo':<20} {'ev/s':>10} {'líneas':>10} {'MB':>7} {'mismas alertas':>15}")
+    print("-" * 66)
+    with tempfile.TemporaryDirectory() as directorio:
+        referencia = None
+        for nombre, opciones in modos:
+            r = medir(eventos, Path(directorio), str(len(opciones)), **opciones)
+            if referencia is None:
+                referencia, iguales = r["sujetos"], "-"
+            else:
+                perdidos = referencia - r["sujetos"]
+                iguales = "sí" if not perdidos else f"NO ({len(perdidos)} perdidos)"
+            print(f"{nombre:<20} {r['ev_s']:>10,.0f} {r['lineas']:>10,} {r['mb']:>7.1f} {iguales:>15}")
+            for evento, contadores in r["estadisticas"].items():
+                print(f"    {evento:<18} juntados {contadores['agregados']:>8,}  resúmenes "
+                      f"{contadores['resumenes']:>6,}  descartados {contadores['descartados']:>8,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
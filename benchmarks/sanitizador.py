@@ -0,0 +1,87 @@
+"""
+⏱️ Benchmark: MotorSanitizacion vs str.replace encadenado
+=========================================================
+
+Compara, para textos de 1 KB a 10 MB, el tiempo y la memoria máxima
+asignada (tracemalloc) de las dos estrategias del motor:
+• sanitizar_sql: 7 str.replace encadenados vs una sola pasada
+• sanitizar_html: html.escape vs una sola pasada
+
+La columna "memoria" es pico(referencia) / pico(una pasada): > 1 significa
+que la pasada única ahorra memoria.
+
+Uso:
+    python -m benchmarks.sanitizador [--max-mb 10]
+"""
+
+import argparse
+import html
+import random
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from modules import cargar_ejemplo
+
+validacion = cargar_ejemplo("02_input_validation")
+
+TAMANOS = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+
+# Texto de comentarios "realista": palabras normales con algo de puntuación,
+# comillas y algún fragmento sospechoso de vez en cuando
+PALABRAS = ["seguridad", "usuario", "datos", "formulario", "contraseña", "hola",
+            "it's", "O'Brien", "a;b", "SELECT", "<b>", "&", "\"cita\"", "1--2"]
+
+def generar_texto(tamano: int, semilla: int = 42) -> str:
+    """Genera un texto de `tamano` caracteres aproximadamente"""
+    rnd = random.Random(semilla)
+    partes = []
+    total = 0
+    while total < tamano:
+        palabra = rnd.choice(PALABRAS)
+        partes.append(palabra)
+        total += len(palabra) + 1
+    return " ".join(partes)[:tamano]
+
+def medir(funcion: Callable[[str], str], texto: str, repeticiones: int) -> Tuple[float, int]:
+    """Devuelve (segundos por llamada, pico de memoria asignada en bytes)"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion(texto)
+    segundos = (time.perf_counter() - inicio) / repeticiones
+
+    tracemalloc.start()
+    funcion(texto)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico
+
+def comparar(nombre: str, referencia: Callable[[str], str], motor: Callable[[str], str], max_bytes: int):
+    print(f"\n{nombre}")
+    print(f"{'tamaño':>10} | {'referencia':>22} | {'una pasada':>22} | {'memoria':>8}")
+    print("-" * 74)
+    for tamano in TAMANOS:
+        if tamano > max_bytes:
+            break
+        texto = generar_texto(tamano)
+        assert referencia(texto) == motor(texto), "¡El motor cambió el resultado!"
+
+        repeticiones = max(1, (1024 * 1024) // tamano)
+        t_ref, m_ref = medir(referencia, texto, repeticiones)
+        t_mot, m_mot = medir(motor, texto, repeticiones)
+        print(f"{tamano // 1024:>7} KB | {t_ref * 1000:>9.3f} ms {m_ref / 1024:>7.0f} KB | "
+              f"{t_mot * 1000:>9.3f} ms {m_mot / 1024:>7.0f} KB | {m_ref / max(m_mot, 1):>6.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de sanitización")
+    parser.add_argument("--max-mb", type=float, default=10, help="Tamaño máximo de texto en MB")
+    args = parser.parse_args()
+    max_bytes = int(args.max_mb * 1024 * 1024)
+
+    motor_sql = validacion.MotorSanitizacion(validacion.REGLAS_SQL, una_pasada=True)
+    motor_html = validacion.MotorSanitizacion(validacion.REGLAS_HTML, una_pasada=True)
+    comparar("sanitizar_sql (REGLAS_SQL)", motor_sql.aplicar_secuencial, motor_sql.aplicar, max_bytes)
+    comparar("sanitizar_html (REGLAS_HTML)", html.escape, motor_html.aplicar, max_bytes)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+⏱️ Benchmark: latencia de SecurityLogger en el camino del request
+=================================================================
+
+Mide cuánto bloquea log_login_attempt() al hilo que atiende el request
+en modo síncrono (archivo + consola en el mismo hilo) y en modo
+asíncrono (solo encolar), con cada política de desborde.
+
+Los eventos llegan a un ritmo fijo (--ritmo eventos/seg), como los
+requests de un servidor; --ritmo 0 los lanza sin pausa para ver qué
+pasa cuando el logger se satura y actúa la política de desborde.
+
+La consola se redirige a /dev/null para no inundar la terminal: con una
+terminal real el modo síncrono sería todavía más lento.
+
+Uso:
+    python -m benchmarks.security_logger --eventos 20000 --ritmo 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from modules import cargar_ejemplo
+
+SecurityLogger = cargar_ejemplo("04_security_logging").SecurityLogger
+
+def percentil(ordenadas: List[int], p: float) -> float:
+    return ordenadas[min(int(len(ordenadas) * p), len(ordenadas) - 1)] / 1000
+
+def medir(eventos: int, ritmo: float, directorio: Path, **opciones) -> Dict[str, float]:
+    consola = open(os.devnull, "w")
+    stderr, sys.stderr = sys.stderr, consola  # El StreamHandler toma sys.stderr al crearse
+    try:
+        logger = SecurityLogger(str(directorio / "security.log"), **opciones)
+    finally:
+        sys.stderr = stderr
+
+    reloj = time.perf_counter_ns
+    latencias = []
+    inicio = reloj()
+    for i in range(eventos):
+        if ritmo:
+            # Entre requests el hilo estaría atendiendo otra cosa
+            espera = inicio + i * 1e9 / ritmo - reloj()
+            if espera > 0:
+                time.sleep(espera / 1e9)
+        t = reloj()
+        logger.log_login_attempt(f"usuario{i % 500}", i % 7 != 0, f"10.0.{i % 256}.{i % 200}")
+        latencias.append(reloj() - t)
+    en_request = (reloj() - inicio) / 1e9
+
+    logger.close()  # Incluye vaciar la cola en modo asíncrono
+    total = (reloj() - inicio) / 1e9
+    consola.close()
+
+    latencias.sort()
+    lineas = sum(1 for _ in open(directorio / "security.log", encoding="utf-8"))
+    return {
+        "p50_us": percentil(latencias, 0.50),
+        "p99_us": percentil(latencias, 0.99),
+        "p999_us": percentil(latencias, 0.999),
+        "max_us": latencias[-1] / 1000,
+        "en_request_s": en_request,
+        "total_s": total,
+        "escritos": lineas,
+        "descartados": logger.descartados,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Latencia de SecurityLogger síncrono vs asíncrono")
+    parser.add_argument("--eventos", type=int, default=20000)
+    parser.add_argument("--ritmo", type=float, default=2000, help="Eventos por segundo (0 = sin pausa)")
+    parser.add_argument("--cola", type=int, default=1000, help="Capacidad de la cola asíncrona")
+    args = parser.parse_args(argv)
+
+    modos = [
+        ("síncrono", {}),
+        ("asíncrono/bloquear", {"asincrono": True, "capacidad_cola": args.cola, "politica_desborde": "bloquear"}),
+        ("asíncrono/descartar", {"asincrono": True, "capacidad_cola": args.cola, "politica_desborde": "descartar_antiguo"}),
+        ("asíncrono/contar", {"asincrono": True, "capacidad_cola": args.cola, "politica_desborde": "contar"}),
+    ]
+
+    print(f"{'modo':<21} {'p50 µs':>8} {'p99 µs':>8} {'p99.9 µs':>9} {'max µs':>9} "
+          f"{'request s':>10} {'total s':>8} {'escritos':>9} {'descartados':>12}")
+    print("-" * 102)
+    for nombre, opciones in modos:
+        with tempfile.TemporaryDirectory() as directorio:
+            r = medir(args.eventos, args.ritmo, Path(directorio), **opciones)
+        print(f"{nombre:<21} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} {r['p999_us']:>9.1f} {r['max_us']:>9.0f} "
+              f"{r['en_request_s']:>10.2f} {r['total_s']:>8.2f} {r['escritos']:>9,} {r['descartados']:>12,}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+⏱️ Benchmark: latencia de alertas del seguidor de security.log
+==============================================================
+
+Un proceso escribe líneas de login en formato texto a un ritmo fijo
+(--ritmo eventos/seg), rotando el archivo por renombrado cada
+--rotar-mb como SecurityLogger, mientras el seguidor las lee y alimenta
+AttackDetector. Unas pocas IPs atacantes fallan continuamente para que
+haya alertas.
+
+La latencia de cada alerta es el tiempo desde el timestamp del evento
+(cuando se escribió) hasta que se emite la alerta. También se comprueba
+que el seguidor no pierde ni duplica eventos a través de las rotaciones.
+
+Uso:
+    python -m benchmarks.seguidor_logs --ritmo 50000 --segundos 10
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from modules.seguidor_logs import AlimentadorDetector, SeguidorLog
+
+LINEA = ('%s - %s - %s: {"timestamp": "%s", "event_type": "AUTHENTICATION", '
+         '"details": {"username": "usuario%d", "success": %s, "ip_address": "%s", '
+         '"user_agent": "benchmark"}, "severity": "%s"}\n')
+
+def escribir(log_file: Path, ritmo: float, segundos: float, rotar_bytes: int) -> None:
+    """Proceso escritor: lotes cada 10ms para mantener el ritmo pedido"""
+    archivo = open(log_file, "a", encoding="utf-8")
+    total = int(ritmo * segundos)
+    inicio = time.time()
+    i = 0
+    while i < total:
+        espera = inicio + i / ritmo - time.time()
+        if espera > 0:
+            time.sleep(espera)
+        ahora = datetime.now()
+        asctime = ahora.strftime("%Y-%m-%d %H:%M:%S,") + f"{ahora.microsecond // 1000:03d}"
+        iso = ahora.isoformat()
+        hasta = min(total, int((time.time() - inicio + 0.01) * ritmo))
+        lineas = []
+        for j in range(i, hasta):
+            if j % 100 == 0:  # Atacante
+                lineas.append(LINEA % (asctime, "WARNING", "LOGIN_FAILED", iso, j % 500, "false",
+                                       f"203.0.113.{j % 7}", "WARNING"))
+            else:
+                lineas.append(LINEA % (asctime, "INFO", "LOGIN_SUCCESS", iso, j % 500, "true",
+                                       f"10.0.{j % 256}.{j % 200}", "INFO"))
+        archivo.write("".join(lineas))
+        archivo.flush()
+        i = hasta
+        if archivo.tell() >= rotar_bytes:
+            archivo.close()
+            os.rename(log_file, log_file.with_name(f"{log_file.name}.{time.strftime('%Y%m%dT%H%M%S')}{i:012d}"))
+            archivo = open(log_file, "a", encoding="utf-8")
+    archivo.close()
+
+def percentil(ordenadas: List[float], p: float) -> float:
+    return ordenadas[min(int(len(ordenadas) * p), len(ordenadas) - 1)]
+
+def medir(ritmo: float, segundos: float, rotar_mb: float, intervalo: float, directorio: Path) -> Dict[str, float]:
+    log_file = directorio / "security.log"
+    log_file.touch()
+    seguidor = SeguidorLog(log_file, desde_inicio=True)
+
+    latencias: List[float] = []
+    alimentador = AlimentadorDetector(
+        alertar=lambda alerta: latencias.append(time.time() - datetime.fromisoformat(alerta["timestamp"]).timestamp()))
+
+    escritor = multiprocessing.Process(target=escribir, args=(log_file, ritmo, segundos, int(rotar_mb * 1024 * 1024)))
+    detener = threading.Event()
+    hilo = threading.Thread(target=seguidor.seguir, args=(alimentador, intervalo, detener))
+    inicio = time.perf_counter()
+    escritor.start()
+    hilo.start()
+    escritor.join()
+
+    # Dejar que el seguidor alcance al escritor
+    esperados = int(ritmo * segundos)
+    while alimentador.eventos < esperados and time.perf_counter() - inicio < segundos * 3 + 5:
+        time.sleep(0.05)
+    duracion = time.perf_counter() - inicio
+    detener.set()
+    hilo.join()
+
+    latencias.sort()
+    return {
+        "eventos": alimentador.eventos,
+        "esperados": esperados,
+        "ev_s": alimentador.eventos / duracion,
+        "alertas": len(latencias),
+        "p50_ms": percentil(latencias, 0.50) * 1000 if latencias else 0,
+        "p99_ms": percentil(latencias, 0.99) * 1000 if latencias else 0,
+        "max_ms": latencias[-1] * 1000 if latencias else 0,
+        "rotaciones": len(list(directorio.glob("security.log.*"))),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Latencia de alertas del seguidor de security.log")
+    parser.add_argument("--ritmo", type=float, default=50000, help="Eventos por segundo escritos")
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--rotar-mb", type=float, default=10, help="Rotar security.log cada N MB")
+    parser.add_argument("--intervalo", type=float, default=0.2, help="Segundos entre sondeos del seguidor")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        r = medir(args.ritmo, args.segundos, args.rotar_mb, args.intervalo, Path(directorio))
+
+    print(f"Eventos leídos:   {r['eventos']:,} de {r['esperados']:,} ({r['rotaciones']} rotaciones)")
+    print(f"Ritmo:            {r['ev_s']:,.0f} eventos/seg")
+    print(f"Alertas:          {r['alertas']:,}")
+    print(f"Latencia alertas: p50 {r['p50_ms']:.0f} ms, p99 {r['p99_ms']:.0f} ms, máx {r['max_ms']:.0f} ms")
+    if r["eventos"] != r["esperados"]:
+        print("❌ El seguidor perdió o duplicó eventos")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+⏱️ Benchmark: normalización NFKC y esqueletos de confundibles
+=============================================================
+
+Mide caracteres/segundo de normalizar() y esqueleto() sobre campos
+cortos (como los de un formulario) con texto ASCII, texto latino con
+acentos y texto con mezcla de alfabetos, y compara esqueleto() con una
+versión ingenua que recorre el texto carácter a carácter.
+
+Uso:
+    python -m benchmarks.unicode_texto
+"""
+
+import random
+import time
+import unicodedata
+from typing import Callable, List
+
+from modules.tablas_unicode import TABLA_ESQUELETO
+from modules.unicode_texto import esqueleto, normalizar
+
+CAMPOS = 20000
+
+MUESTRAS = {
+    "ascii": ["Ana Garcia", "juan_perez", "usuario@ejemplo.com", "Me gusta la seguridad"],
+    "latino": ["Ana García", "José Núñez", "Françoise Müller", "Ñandú pingüino"],
+    "mixto": ["pаypal", "Ａｎａ", "аdmіn", "𝐚𝐝𝐦𝐢𝐧", "Ελληνικά", "Москва", "ｒｏｏｔ１"],
+}
+
+def esqueleto_ingenuo(texto: str) -> str:
+    """Mismo resultado que esqueleto(), pero carácter a carácter"""
+    partes = []
+    for c in unicodedata.normalize("NFD", texto.casefold()):
+        partes.append(TABLA_ESQUELETO.get(ord(c), c))
+    return unicodedata.normalize("NFD", "".join(partes))
+
+def generar_campos(tipo: str, semilla: int = 3) -> List[str]:
+    rnd = random.Random(semilla)
+    return [rnd.choice(MUESTRAS[tipo]) for _ in range(CAMPOS)]
+
+def chars_por_segundo(funcion: Callable[[str], str], campos: List[str]) -> float:
+    total = sum(len(campo) for campo in campos)
+    inicio = time.perf_counter()
+    for campo in campos:
+        funcion(campo)
+    return total / (time.perf_counter() - inicio)
+
+def main():
+    print(f"{'entrada':>8} | {'normalizar':>14} | {'esqueleto':>14} | {'ingenuo':>14}")
+    print("-" * 60)
+    for tipo in MUESTRAS:
+        campos = generar_campos(tipo)
+        for campo in campos[:50]:
+            assert esqueleto(campo) == esqueleto_ingenuo(campo)
+
+        resultados = [chars_por_segundo(f, campos) for f in (normalizar, esqueleto, esqueleto_ingenuo)]
+        print(f"{tipo:>8} | " + " | ".join(f"{r / 1e6:>8.1f} Mc/s" for r in resultados))
+
+if __name__ == "__main__":
+    main()
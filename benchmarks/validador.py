@@ -0,0 +1,242 @@
+"""
+⏱️ Benchmark y corpus adversario de ValidadorSeguro
+===================================================
+
+Ejecuta cada método de ValidadorSeguro sobre un corpus generado con
+tres familias de entradas:
+• benignas: lo que envía un usuario normal
+• máxima longitud: justo en el límite (y un poco por encima)
+• maliciosas: las de DATOS_MALICIOSOS y variantes mutadas (fuzz)
+
+Para cada método informa ops/seg y latencia (p50, p99 y peor caso), y
+compara con una línea base guardada: sale con código 1 si algún método
+empeora más de lo tolerado. Además comprueba invariantes de seguridad
+(ningún método lanza excepciones, la salida de sanitizar_html no
+contiene '<', etc.) sobre todo el corpus.
+
+Uso:
+    python -m benchmarks.validador --guardar-baseline   # primera vez
+    python -m benchmarks.validador                      # compara con la base
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from modules import cargar_ejemplo
+
+validacion = cargar_ejemplo("02_input_validation")
+
+BASELINE = Path(__file__).parent / "baseline_validador.json"
+
+# Tolerancias frente a la línea base (las mediciones tienen ruido)
+TOLERANCIA_OPS = 0.40       # hasta un 40 % menos de ops/seg
+TOLERANCIA_PEOR_CASO = 3.0  # hasta 3x la peor latencia
+
+PAYLOADS = list(validacion.DATOS_MALICIOSOS.values()) + [
+    "' OR '1'='1", "1; DROP TABLE users", "admin'--", "/**/UNION/**/SELECT", "xp_cmdshell",
+    "<svg onload=alert(1)>", "<a href=\"javascript:alert(1)\">x</a>", "\"><script>alert(1)</script>",
+    "data:text/html;base64,PHNjcmlwdD4=", "vbscript:msgbox(1)", "JaVaScRiPt:alert(1)",
+    "https://ok.com/\x00", "‮\u0000﻿", "a" * 10000 + "@" + "b" * 10000,
+    "a@" + "a." * 200 + "!", "https://" + "a" * 5000, "-1", "1e10", "  42  ", "٤٢", "",
+]
+
+def mutar(texto: str, rnd: random.Random) -> str:
+    """Mutación simple estilo fuzzer: insertar, borrar, duplicar o cambiar mayúsculas"""
+    if not texto:
+        return rnd.choice(PAYLOADS)
+    i = rnd.randrange(len(texto))
+    operacion = rnd.randrange(5)
+    if operacion == 0:
+        return texto[:i] + rnd.choice("<>'\";-/*\\\x00%&@:") + texto[i:]
+    if operacion == 1:
+        return texto[:i] + texto[i + 1:]
+    if operacion == 2:
+        return texto[:i] + texto[i:] * 2
+    if operacion == 3:
+        return texto.swapcase()
+    return texto + rnd.choice(PAYLOADS)
+
+def generar_corpus(semilla: int = 2024, mutaciones: int = 300) -> Dict[str, Dict[str, List[Any]]]:
+    """Corpus por método y familia de entradas"""
+    rnd = random.Random(semilla)
+    maliciosos = PAYLOADS + [mutar(rnd.choice(PAYLOADS), rnd) for _ in range(mutaciones)]
+
+    return {
+        "validar_email": {
+            "benignas": [f"usuario{i}@ejemplo{i % 7}.com" for i in range(200)],
+            "maxima_longitud": ["a" * 64 + "@" + "b" * 185 + ".com", "a" * 64 + "@" + "b" * 186 + ".com"],
+            "maliciosas": maliciosos,
+        },
+        "validar_url": {
+            "benignas": [f"https://ejemplo.com/articulo/{i}?q=seguridad" for i in range(200)],
+            "maxima_longitud": ["https://a.com/" + "x" * 2034, "https://a.com/" + "x" * 2035],
+            "maliciosas": maliciosos,
+        },
+        "validar_edad": {
+            "benignas": [str(i) for i in range(100)] + list(range(100)),
+            "maxima_longitud": ["150", "151", "9" * 4000],
+            "maliciosas": maliciosos + [None, 3.7, [], {}],
+        },
+        "validar_campo_texto": {
+            "benignas": ["Ana García", "Me gusta aprender sobre seguridad", "Hola <b>mundo</b>!"] * 60,
+            "maxima_longitud": ["x" * 255, "x" * 256, " " * 2000 + "x"],
+            "maliciosas": maliciosos,
+        },
+        "sanitizar_html": {
+            "benignas": ["Texto normal", "5 < 10 && 3 > 1", "Hola <b>mundo</b>!"] * 60,
+            "maxima_longitud": ["<" * 10000, "&" * 10000],
+            "maliciosas": maliciosos,
+        },
+        "sanitizar_sql": {
+            "benignas": ["O'Brien", "It's fine", "Ana García"] * 60,
+            "maxima_longitud": ["'" * 10000, ";--" * 3000, "-;" * 5000],
+            "maliciosas": maliciosos,
+        },
+    }
+
+def _invariantes(metodo: str, entrada: Any, salida: Any) -> Optional[str]:
+    """Comprueba propiedades de seguridad; devuelve el problema o None"""
+    if metodo.startswith("validar_"):
+        if not (isinstance(salida, tuple) and len(salida) == 2 and isinstance(salida[0], bool)):
+            return "no devuelve (bool, resultado)"
+        valido, resultado = salida
+        if metodo == "validar_url" and valido and resultado.lower().startswith(("javascript:", "data:", "vbscript:")):
+            return "acepta un esquema peligroso"
+        if metodo == "validar_campo_texto" and valido and "<" in resultado:
+            return "deja '<' sin escapar"
+    elif metodo == "sanitizar_html" and ("<" in salida or ">" in salida):
+        return "deja '<' o '>' sin escapar"
+    elif metodo == "sanitizar_sql" and isinstance(entrada, str) and any(
+            token in salida for token in (";", "--", "/*", "*/")):
+        return "deja tokens SQL peligrosos"
+    return None
+
+def medir_metodo(funcion: Callable[[Any], Any], metodo: str,
+                 entradas: List[Any], rondas: int) -> Tuple[Dict[str, float], List[str]]:
+    problemas: List[str] = []
+
+    for entrada in entradas:
+        try:
+            problema = _invariantes(metodo, entrada, funcion(entrada))
+        except Exception as e:
+            problema = f"lanza {type(e).__name__}: {e}"
+        if problema:
+            problemas.append(f"{metodo}({str(entrada)[:40]!r}): {problema}")
+
+    # Para que la comparación con la línea base no dependa del ruido:
+    # ops/seg de la ronda más rápida y, por entrada, su mejor tiempo;
+    # el "peor caso" es la entrada más lenta, no una interrupción del SO
+    reloj = time.perf_counter_ns
+    mejor_por_entrada = [float("inf")] * len(entradas)
+    mejor_ronda = float("inf")
+    for _ in range(rondas):
+        inicio_ronda = reloj()
+        for i, entrada in enumerate(entradas):
+            inicio = reloj()
+            funcion(entrada)
+            mejor_por_entrada[i] = min(mejor_por_entrada[i], reloj() - inicio)
+        mejor_ronda = min(mejor_ronda, reloj() - inicio_ronda)
+
+    latencias = sorted(mejor_por_entrada)
+    return {
+        "ops_por_segundo": len(entradas) / (mejor_ronda / 1e9),
+        "p50_us": latencias[len(latencias) // 2] / 1000,
+        "p99_us": latencias[int(len(latencias) * 0.99)] / 1000,
+        "peor_us": latencias[-1] / 1000,
+    }, problemas
+
+def calibrar(rondas: int = 5) -> float:
+    """Velocidad de la máquina en este momento (ops/seg de una carga fija)
+
+    Se guarda con la línea base para escalarla: en máquinas compartidas
+    la velocidad de la CPU varía entre ejecuciones y sin esto cualquier
+    comparación de ops/seg daría falsas regresiones.
+    """
+    textos = [f"usuario{i}@ejemplo.com" for i in range(2000)]
+    mejor = float("inf")
+    for _ in range(rondas):
+        inicio = time.perf_counter_ns()
+        for texto in textos:
+            texto.strip().lower().replace("'", "''").split("@")
+        mejor = min(mejor, time.perf_counter_ns() - inicio)
+    return len(textos) / (mejor / 1e9)
+
+def ejecutar(rondas: int = 20) -> Tuple[Dict[str, Any], List[str]]:
+    validador = validacion.ValidadorSeguro()
+    resultados: Dict[str, Any] = {}
+    problemas: List[str] = []
+
+    for metodo, familias in generar_corpus().items():
+        funcion = getattr(validador, metodo)
+        resultados[metodo] = {}
+        for familia, entradas in familias.items():
+            medicion, encontrados = medir_metodo(funcion, metodo, entradas, rondas)
+            resultados[metodo][familia] = medicion
+            problemas.extend(encontrados)
+    return {"calibracion": calibrar(), "metodos": resultados}, problemas
+
+def comparar(resultados: Dict[str, Any], base: Dict[str, Any]) -> List[str]:
+    """Regresiones frente a la línea base, escalada a la velocidad actual de la máquina"""
+    escala = resultados["calibracion"] / base["calibracion"]
+    regresiones = []
+    for metodo, familias in resultados["metodos"].items():
+        for familia, actual in familias.items():
+            anterior = base["metodos"].get(metodo, {}).get(familia)
+            if not anterior:
+                continue
+            esperado_ops = anterior["ops_por_segundo"] * escala
+            esperado_peor = anterior["peor_us"] / escala
+            if actual["ops_por_segundo"] < esperado_ops * (1 - TOLERANCIA_OPS):
+                regresiones.append(f"{metodo}/{familia}: ops/seg esperadas {esperado_ops:,.0f}, medidas {actual['ops_por_segundo']:,.0f}")
+            if actual["peor_us"] > esperado_peor * TOLERANCIA_PEOR_CASO:
+                regresiones.append(f"{metodo}/{familia}: peor caso esperado {esperado_peor:.1f} µs, medido {actual['peor_us']:.1f} µs")
+    return regresiones
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de ValidadorSeguro")
+    parser.add_argument("--rondas", type=int, default=20, help="Veces que se recorre el corpus")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--guardar-baseline", action="store_true", help="Guardar esta ejecución como línea base")
+    args = parser.parse_args(argv)
+
+    resultados, problemas = ejecutar(args.rondas)
+
+    print(f"{'método':<22} {'familia':<16} {'ops/seg':>12} {'p50 µs':>9} {'p99 µs':>9} {'peor µs':>10}")
+    print("-" * 82)
+    for metodo, familias in resultados["metodos"].items():
+        for familia, m in familias.items():
+            print(f"{metodo:<22} {familia:<16} {m['ops_por_segundo']:>12,.0f} {m['p50_us']:>9.1f} "
+                  f"{m['p99_us']:>9.1f} {m['peor_us']:>10.1f}")
+    print(f"\nCalibración de la máquina: {resultados['calibracion']:,.0f} ops/seg")
+
+    codigo = 0
+    if problemas:
+        codigo = 1
+        print(f"\n❌ {len(problemas)} violaciones de invariantes de seguridad:")
+        for problema in problemas[:20]:
+            print(f"   • {problema}")
+
+    if args.guardar_baseline:
+        args.baseline.write_text(json.dumps(resultados, indent=2), encoding="utf-8")
+        print(f"\n💾 Línea base guardada en {args.baseline}")
+    elif args.baseline.exists():
+        regresiones = comparar(resultados, json.loads(args.baseline.read_text(encoding="utf-8")))
+        if regresiones:
+            codigo = 1
+            print(f"\n❌ {len(regresiones)} regresiones frente a {args.baseline}:")
+            for regresion in regresiones:
+                print(f"   • {regresion}")
+        else:
+            print(f"\n✅ Sin regresiones frente a {args.baseline}")
+    else:
+        print(f"\nℹ️ No hay línea base; créala con --guardar-baseline")
+
+    return codigo
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -30,7 +30,31 @@ LOGGING_CONFIG = {
     "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     "file": LOGS_DIR / "security.log",
     "max_bytes": 10485760,  # 10MB
-    "backup_count": 5
+    "backup_count": 5,
+    "max_age_days": 30,     # Segmentos rotados más antiguos se borran
+    "compression": "gzip",  # "gzip" o "zstd" (requiere el paquete zstandard)
+    "burst_window_seconds": None,  # Segundos para juntar eventos idénticos (None = no juntar)
+    "integrity_batch_size": 1024,  # Líneas por checkpoint firmado (modo integridad)
+    "integrity_interval_seconds": 5.0  # Sellar antes si el lote lleva abierto este tiempo
+}
+
+# Configuración de detección de ataques (AttackDetector)
+DETECTION_CONFIG = {
+    "window_seconds": 300,                 # Solo cuentan los fallos de los últimos 5 minutos
+    "bucket_seconds": 10,                  # Resolución de la ventana deslizante
+    "ip_failure_threshold": 5,             # Fallos desde una IP para alertar BRUTE FORCE
+    "user_failure_threshold": 3,           # Fallos contra un usuario para alertar TARGETED ATTACK
+    "mode": "exacto",                      # "exacto" o "probabilistico" (memoria fija para floods)
+    "sketch_width": 2 ** 18,               # Contadores por fila del Count-Min Sketch (error ε = e / ancho)
+    "sketch_depth": 4,                     # Filas del sketch (probabilidad de fallo δ = e^-filas)
+    "top_k": 100,                          # IPs seguidas por Space-Saving en modo probabilístico
+    "ip_distinct_users_threshold": 5,      # Usuarios distintos fallidos desde una IP (credential stuffing)
+    "subnet_distinct_users_threshold": 20, # Ídem desde una subred /24 (IPv4) o /64 (IPv6)
+    "hll_precision": 10,                   # HyperLogLog de 2^10 registros: ~1 KB por fuente, error ≈3%
+    "max_tracked_sources": 100000,         # IPs/subredes seguidas como mucho (se olvida la menos reciente)
+    "ipv4_prefix_thresholds": {16: 100, 24: 20},  # Fallos por subred IPv4 para alertar (prefijo: umbral)
+    "ipv6_prefix_thresholds": {48: 100, 64: 20},  # Ídem IPv6
+    "snapshot_interval_seconds": 60        # Cada cuánto se guarda el estado del detector (reinicio en caliente)
 }
 
 # Mensajes educativos
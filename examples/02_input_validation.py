@@ -10,11 +10,25 @@ y otros problemas de seguridad. ¡La primera línea de defensa!
 
 import re
 import html
+import functools
 import json
+import signal
+import sys
+import threading
+import time
 import urllib.parse
-from typing import Dict, List, Tuple, Union, Any
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union, Any
 from colorama import init, Fore, Style
 
+try:
+    from modules.unicode_texto import esqueleto, normalizar
+except ImportError:
+    # Ejecutado como script (python examples/02_...): modules/ está en la carpeta padre
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from modules.unicode_texto import esqueleto, normalizar
+
 # Inicializar colorama para Windows
 init()
 
@@ -29,6 +43,15 @@ def print_educational_header():
     print("   • Validar emails, URLs, números de forma segura")
     print(f"   • Escapar caracteres peligrosos correctamente{Style.RESET_ALL}\n")
 
+# Datos maliciosos que un atacante podría enviar
+DATOS_MALICIOSOS = {
+    "nombre": "<script>alert('XSS Attack!')</script>",
+    "email": "'; DROP TABLE users; --",
+    "edad": "no_soy_un_numero",
+    "website": "javascript:alert('Malicious!')",
+    "comentario": "Normal text<img src=x onerror=alert('XSS')>"
+}
+
 def demostrar_problema_sin_validacion():
     """Demuestra los problemas de no validar datos"""
     print(f"{Fore.RED}🚨 PROBLEMA: Datos sin validar")
@@ -36,14 +59,7 @@ def demostrar_problema_sin_validacion():
     
     print("Imagina un formulario de registro sin validación:")
     
-    # Datos maliciosos que un atacante podría enviar
-    datos_maliciosos = {
-        "nombre": "<script>alert('XSS Attack!')</script>",
-        "email": "'; DROP TABLE users; --",
-        "edad": "no_soy_un_numero",
-        "website": "javascript:alert('Malicious!')",
-        "comentario": "Normal text<img src=x onerror=alert('XSS')>"
-    }
+    datos_maliciosos = dict(DATOS_MALICIOSOS)
     
     print("\nDatos que recibimos del formulario:")
     for campo, valor in datos_maliciosos.items():
@@ -57,19 +73,337 @@ def demostrar_problema_sin_validacion():
     
     return datos_maliciosos
 
+# Reglas (patrón, reemplazo) que se aplican EN ORDEN; reemplazo '' = eliminar
+REGLAS_SQL = [
+    ("'", "''"),  # Escapar comillas simples (método básico, usar parámetros en producción)
+    (';', ''), ('--', ''), ('/*', ''), ('*/', ''), ('xp_', ''), ('sp_', '')
+]
+
+# Equivalente a html.escape(texto, quote=True)
+REGLAS_HTML = [
+    ('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;')
+]
+
+class MotorSanitizacion:
+    """Aplica una lista ordenada y configurable de reglas de reemplazo
+
+    Dos estrategias, ambas con resultado IDÉNTICO:
+    • Secuencial (por defecto): un str.replace por regla. Está escrito en C
+      y devuelve el mismo objeto si no hay nada que reemplazar, así que en
+      CPython es la opción más rápida (ver benchmarks/sanitizador.py).
+    • Una pasada (una_pasada=True): todas las reglas compiladas en una
+      única expresión regular (alternancia); el texto se recorre una vez.
+
+    Hay dos casos en los que una pasada no basta y se usa la secuencial:
+    • Coincidencias solapadas de reglas distintas (ej. '/*/' con '/*' y '*/')
+    • Una eliminación que "junta" una regla posterior (ej. '-;-' -> '--')
+    """
+
+    def __init__(self, reglas: List[Tuple[str, str]], una_pasada: bool = False):
+        if not reglas or any(not patron for patron, _ in reglas):
+            raise ValueError("Cada regla necesita un patrón no vacío")
+
+        self.reglas = list(reglas)
+        self.reemplazos = {patron: reemplazo for patron, reemplazo in self.reglas}
+        self.alfabeto = frozenset(''.join(patron for patron, _ in self.reglas))
+        self.combinable = self._admite_una_pasada()
+        self.una_pasada = una_pasada and self.combinable
+
+        # Solapes entre patrones de reglas distintas: si aparecen, cadena clásica
+        solapes = set()
+        for i, (a, _) in enumerate(self.reglas):
+            for j, (b, _) in enumerate(self.reglas):
+                if i != j:
+                    for k in range(1, min(len(a), len(b))):
+                        if a[-k:] == b[:k]:
+                            solapes.add(a + b[k:])
+
+        # Los solapes van primero para que ganen en la misma posición
+        alternativas = sorted(solapes, key=len, reverse=True) + list(self.reemplazos)
+        self.regex = re.compile('|'.join(re.escape(a) for a in alternativas))
+
+    def _admite_una_pasada(self) -> bool:
+        """Comprueba si las reglas se pueden combinar sin cambiar el resultado"""
+        patrones = [patron for patron, _ in self.reglas]
+        for i, patron in enumerate(patrones):
+            posteriores = patrones[i + 1:]
+            # Un patrón contenido en otro: el orden de las reglas decide
+            if any(patron in otro for otro in patrones[:i] + posteriores):
+                return False
+            # Un reemplazo que contiene caracteres de reglas posteriores
+            reemplazo = self.reglas[i][1]
+            if reemplazo and set(reemplazo) & set(''.join(posteriores)):
+                return False
+        return True
+
+    def aplicar_secuencial(self, texto: str) -> str:
+        """Aplica las reglas una tras otra con str.replace (referencia)"""
+        for patron, reemplazo in self.reglas:
+            texto = texto.replace(patron, reemplazo)
+        return texto
+
+    def aplicar(self, texto: str) -> str:
+        """Aplica todas las reglas con la estrategia configurada"""
+        if self.una_pasada:
+            return self.aplicar_una_pasada(texto)
+        return self.aplicar_secuencial(texto)
+
+    def aplicar_una_pasada(self, texto: str) -> str:
+        """Aplica todas las reglas recorriendo el texto una sola vez"""
+        if not self.combinable:
+            return self.aplicar_secuencial(texto)
+
+        partes = []
+        ultimo = 0
+        reemplazos = self.reemplazos
+        alfabeto = self.alfabeto
+
+        for m in self.regex.finditer(texto):
+            inicio, fin = m.span()
+            reemplazo = reemplazos.get(m.group())
+
+            # Solape entre reglas: solo la cadena clásica da el resultado exacto
+            if reemplazo is None:
+                return self.aplicar_secuencial(texto)
+
+            # Una eliminación entre dos caracteres de patrones puede crear otro patrón
+            if (not reemplazo and 0 < inicio and fin < len(texto)
+                    and texto[inicio - 1] in alfabeto and texto[fin] in alfabeto):
+                return self.aplicar_secuencial(texto)
+
+            partes.append(texto[ultimo:inicio])
+            partes.append(reemplazo)
+            ultimo = fin
+
+        if not partes:
+            return texto
+
+        partes.append(texto[ultimo:])
+        return ''.join(partes)
+
+# Sin temporizador (Windows o hilos secundarios) el presupuesto se aplica
+# limitando la longitud de la entrada que llega al motor de regex
+LONGITUD_MAXIMA_SIN_TEMPORIZADOR = 4096
+
+class PresupuestoRegexExcedido(Exception):
+    """La expresión regular superó su presupuesto de tiempo"""
+
+@functools.lru_cache(maxsize=256)
+def _compilar(patron: str) -> "re.Pattern":
+    return re.compile(patron)
+
+def coincidir_con_presupuesto(patron: str, texto: str, presupuesto_s: float) -> Optional[re.Match]:
+    """Ejecuta re.match cortándolo si tarda más de `presupuesto_s` segundos
+
+    El motor `re` usa backtracking: un patrón mal escrito puede tardar
+    minutos con una entrada hostil (ReDoS). El motor comprueba señales
+    mientras busca, así que un temporizador SIGALRM lo interrumpe. Solo
+    existe en Unix y en el hilo principal; en otro caso se limita la
+    longitud de la entrada (LONGITUD_MAXIMA_SIN_TEMPORIZADOR).
+
+    Si el programa ya tenía un ITIMER_REAL en marcha, al terminar se
+    restauran su manejador y lo que le quedaba (descontando lo que tardó
+    la coincidencia); si vencía mientras tanto, salta justo después.
+    """
+    regex = _compilar(patron)
+
+    if not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        if len(texto) > LONGITUD_MAXIMA_SIN_TEMPORIZADOR:
+            raise PresupuestoRegexExcedido(f"Entrada de {len(texto)} caracteres sin temporizador disponible")
+        return regex.match(texto)
+
+    def _alarma(signum, frame):
+        raise PresupuestoRegexExcedido(f"Regex superó {presupuesto_s * 1000:.1f} ms")
+
+    manejador_previo = signal.signal(signal.SIGALRM, _alarma)
+    inicio = time.monotonic()
+    restante_previo, intervalo_previo = signal.setitimer(signal.ITIMER_REAL, presupuesto_s)
+    try:
+        return regex.match(texto)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, manejador_previo)
+        if restante_previo > 0:
+            restante = restante_previo - (time.monotonic() - inicio)
+            signal.setitimer(signal.ITIMER_REAL, max(restante, 1e-6), intervalo_previo)
+
+# Whitelist de HTML enriquecido: etiqueta -> atributos permitidos
+ETIQUETAS_PERMITIDAS = {
+    'p': set(), 'br': set(), 'b': set(), 'strong': set(), 'i': set(), 'em': set(),
+    'u': set(), 'ul': set(), 'ol': set(), 'li': set(), 'blockquote': set(),
+    'code': set(), 'pre': set(), 'h3': set(), 'h4': set(),
+    'a': {'href', 'title'},
+    'img': {'src', 'alt', 'title'},
+}
+
+# Atributos que contienen URLs: se validan con validar_url
+ATRIBUTOS_URL = {'href', 'src'}
+
+# Etiquetas que no se cierran
+ETIQUETAS_VACIAS = {'br', 'img', 'hr'}
+
+# Etiquetas cuyo CONTENIDO también se elimina (no solo la etiqueta)
+ETIQUETAS_DESCARTAR_CONTENIDO = {'script', 'style', 'iframe', 'object', 'embed',
+                                 'template', 'noscript', 'textarea', 'title'}
+
+class SanitizadorHTML(HTMLParser):
+    """Sanitizador HTML por whitelist, en streaming
+
+    Conserva solo las etiquetas y atributos de `etiquetas`, valida las URLs
+    de href/src y elimina todo lo demás (el texto se conserva escapado).
+    Procesa el documento por trozos en tiempo lineal: lo pendiente de un
+    trozo a otro (una etiqueta a medio llegar) está limitado a
+    `max_pendiente` caracteres, y la pila de etiquetas abiertas a
+    `max_profundidad`.
+    """
+
+    def __init__(self, validar_url: Callable[[str], Tuple[bool, str]],
+                 etiquetas: Optional[Dict[str, set]] = None,
+                 max_pendiente: int = 8192, max_profundidad: int = 100):
+        super().__init__(convert_charrefs=True)
+        self.validar_url = validar_url
+        self.etiquetas = ETIQUETAS_PERMITIDAS if etiquetas is None else etiquetas
+        self.max_pendiente = max_pendiente
+        self.max_profundidad = max_profundidad
+        self._salida: List[str] = []
+        self._abiertas: List[str] = []
+        self._descartando = 0
+
+    def _atributos(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> str:
+        permitidos = self.etiquetas[tag]
+        partes = []
+        for nombre, valor in attrs:
+            if nombre not in permitidos or valor is None:
+                continue
+            if nombre in ATRIBUTOS_URL:
+                valido, valor = self.validar_url(valor)
+                if not valido:
+                    continue
+            partes.append(f' {nombre}="{html.escape(valor, quote=True)}"')
+        return ''.join(partes)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ETIQUETAS_DESCARTAR_CONTENIDO:
+            if tag not in ETIQUETAS_VACIAS:
+                self._descartando += 1
+            return
+        if self._descartando or tag not in self.etiquetas:
+            return
+
+        if tag in ETIQUETAS_VACIAS:
+            self._salida.append(f'<{tag}{self._atributos(tag, attrs)}>')
+        elif len(self._abiertas) < self.max_profundidad:
+            self._abiertas.append(tag)
+            self._salida.append(f'<{tag}{self._atributos(tag, attrs)}>')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in ETIQUETAS_VACIAS:
+            self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if tag in ETIQUETAS_DESCARTAR_CONTENIDO:
+            self._descartando = max(0, self._descartando - 1)
+            return
+        if self._descartando or tag not in self._abiertas:
+            return
+
+        # Cerrar también las etiquetas que quedaron abiertas dentro
+        while self._abiertas:
+            abierta = self._abiertas.pop()
+            self._salida.append(f'</{abierta}>')
+            if abierta == tag:
+                break
+
+    def handle_data(self, data):
+        if not self._descartando:
+            self._salida.append(html.escape(data, quote=False))
+
+    # Comentarios, declaraciones (<!DOCTYPE>) e instrucciones se descartan
+    def handle_comment(self, data):
+        pass
+
+    def handle_decl(self, decl):
+        pass
+
+    def handle_pi(self, data):
+        pass
+
+    def unknown_decl(self, data):
+        pass
+
+    def procesar(self, trozo: str) -> str:
+        """Procesa un trozo del documento y devuelve el HTML seguro producido"""
+        self.feed(trozo)
+
+        # Una etiqueta sin cerrar enorme haría crecer el buffer y volver a
+        # escanearlo en cada trozo (coste cuadrático): se emite como texto
+        if len(self.rawdata) > self.max_pendiente:
+            pendiente, self.rawdata = self.rawdata, ''
+            self.handle_data(pendiente)
+
+        salida = ''.join(self._salida)
+        self._salida.clear()
+        return salida
+
+    def terminar(self) -> str:
+        """Procesa lo pendiente y cierra las etiquetas abiertas"""
+        self.close()
+        while self._abiertas:
+            self._salida.append(f'</{self._abiertas.pop()}>')
+        salida = ''.join(self._salida)
+        self._salida.clear()
+        return salida
+
+    def sanitizar_stream(self, trozos: Iterable[str]) -> Iterator[str]:
+        """Sanitiza un documento que llega por trozos, con memoria acotada"""
+        for trozo in trozos:
+            salida = self.procesar(trozo)
+            if salida:
+                yield salida
+        salida = self.terminar()
+        if salida:
+            yield salida
+
+# Nombres que nadie debería poder imitar con caracteres parecidos ("аdmin" con 'а' cirílica)
+NOMBRES_RESERVADOS = ("admin", "administrador", "administrator", "root", "soporte", "support", "seguridad", "security")
+
 class ValidadorSeguro:
     """Clase para validar y sanitizar datos de forma segura"""
-    
-    def __init__(self):
+
+    def __init__(self, reglas_sql: Optional[List[Tuple[str, str]]] = None,
+                 presupuesto_regex_ms: Optional[float] = None,
+                 nombres_reservados: Iterable[str] = NOMBRES_RESERVADOS,
+                 una_pasada: bool = False):
+        # Reglas de sanitización compiladas una sola vez (una_pasada: ver MotorSanitizacion)
+        self.motor_sql = MotorSanitizacion(REGLAS_SQL if reglas_sql is None else reglas_sql, una_pasada)
+
+        # Tiempo máximo por coincidencia de regex (None = sin límite)
+        self.presupuesto_regex_ms = presupuesto_regex_ms
+
+        # Se comparan por esqueleto: igual esqueleto = se confunden a simple vista
+        self.esqueletos_reservados = frozenset(esqueleto(nombre) for nombre in nombres_reservados)
+
         # Patrones de validación comunes
         self.patterns = {
             'email': r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$',
             'phone': r'^\+?[\d\s\-\(\)]{10,}$',
             'url': r'^https?://[^\s/$.?#].[^\s]*$',
             'alphanumeric': r'^[a-zA-Z0-9]+$',
-            'safe_string': r'^[a-zA-Z0-9\s\-_.]+$'
+            'safe_string': r'^[a-zA-Z0-9\s\-_.]+$',
+            # Variantes Unicode (aplicar sobre texto normalizado con NFKC)
+            'alphanumeric_unicode': r'^[^\W_]+$',
+            'safe_string_unicode': r'^[\w\s\-.]+$'
         }
     
+    def _coincide(self, nombre: str, texto: str) -> bool:
+        """Aplica self.patterns[nombre] respetando el presupuesto de tiempo"""
+        if self.presupuesto_regex_ms is None:
+            return re.match(self.patterns[nombre], texto) is not None
+
+        return coincidir_con_presupuesto(
+            self.patterns[nombre], texto, self.presupuesto_regex_ms / 1000
+        ) is not None
+    
     def validar_email(self, email: str) -> Tuple[bool, str]:
         """Valida formato de email"""
         if not isinstance(email, str):
@@ -83,8 +417,11 @@ class ValidadorSeguro:
             return False, "Email demasiado largo"
         
         # Verificar patrón
-        if not re.match(self.patterns['email'], email):
-            return False, "Formato de email inválido"
+        try:
+            if not self._coincide('email', email):
+                return False, "Formato de email inválido"
+        except PresupuestoRegexExcedido:
+            return False, "Email demasiado costoso de validar"
         
         # Verificaciones adicionales
         if '..' in email:
@@ -124,8 +461,11 @@ class ValidadorSeguro:
             return False, "Esquema de URL no permitido"
         
         # Verificar patrón HTTP/HTTPS
-        if not re.match(self.patterns['url'], url):
-            return False, "Formato de URL inválido"
+        try:
+            if not self._coincide('url', url):
+                return False, "Formato de URL inválido"
+        except PresupuestoRegexExcedido:
+            return False, "URL demasiado costosa de validar"
         
         return True, url
     
@@ -139,30 +479,50 @@ class ValidadorSeguro:
         
         return texto_seguro
     
+    def sanitizar_html_permitido(self, texto: str,
+                                 etiquetas: Optional[Dict[str, set]] = None) -> str:
+        """Conserva solo el HTML de la whitelist (ETIQUETAS_PERMITIDAS)"""
+        if not isinstance(texto, str):
+            return str(texto)
+        
+        sanitizador = SanitizadorHTML(self.validar_url, etiquetas)
+        return sanitizador.procesar(texto) + sanitizador.terminar()
+    
     def sanitizar_sql(self, texto: str) -> str:
         """Sanitiza texto para prevenir inyección SQL básica"""
         if not isinstance(texto, str):
             return str(texto)
         
-        # Escapar comillas simples (método básico, usar parámetros en producción)
-        texto_seguro = texto.replace("'", "''")
-        
-        # Remover caracteres peligrosos
-        caracteres_peligrosos = [';', '--', '/*', '*/', 'xp_', 'sp_']
-        for char in caracteres_peligrosos:
-            texto_seguro = texto_seguro.replace(char, '')
-        
-        return texto_seguro
+        # Escapar comillas y remover caracteres peligrosos en una sola pasada
+        # (ver REGLAS_SQL; usar consultas parametrizadas en producción)
+        return self.motor_sql.aplicar(texto)
+    
+    def normalizar_unicode(self, texto: str) -> str:
+        """Normaliza a NFKC: 'Ａｎａ' -> 'Ana', 'García' siempre con la misma 'í'"""
+        return normalizar(texto)
     
     def validar_campo_texto(self, texto: str, max_length: int = 255, 
-                           allow_html: bool = False) -> Tuple[bool, str]:
-        """Valida campos de texto generales"""
+                           allow_html: bool = False, reservados: bool = False) -> Tuple[bool, str]:
+        """Valida campos de texto generales
+
+        El límite de longitud se aplica al texto ya normalizado y sin
+        espacios. Con reservados=True se rechaza también el texto que se
+        confunde con un nombre reservado (mismo esqueleto).
+        """
         if not isinstance(texto, str):
             return False, "El campo debe ser texto"
         
-        # Limpiar espacios
         texto = texto.strip()
         
+        # Cota previa para no normalizar entradas enormes: NFKC compone
+        # como mucho 4 caracteres en 1 (ᾂ = α + 3 marcas), así que un texto
+        # más largo que esto nunca quedaría dentro del límite
+        if len(texto) > max_length * 4:
+            return False, f"El texto no puede exceder {max_length} caracteres"
+        
+        # Normalizar Unicode y limpiar espacios (NFKC puede dejar alguno en los bordes)
+        texto = self.normalizar_unicode(texto).strip()
+        
         # Verificar longitud
         if len(texto) == 0:
             return False, "El campo no puede estar vacío"
@@ -170,9 +530,14 @@ class ValidadorSeguro:
         if len(texto) > max_length:
             return False, f"El texto no puede exceder {max_length} caracteres"
         
-        # Sanitizar si no se permite HTML
+        if reservados and esqueleto(texto) in self.esqueletos_reservados:
+            return False, "El texto se confunde con un nombre reservado"
+        
+        # Sanitizar: escapar todo, o conservar solo el HTML de la whitelist
         if not allow_html:
             texto = self.sanitizar_html(texto)
+        else:
+            texto = self.sanitizar_html_permitido(texto)
         
         return True, texto
 
@@ -248,7 +613,7 @@ def demostrar_validacion_completa():
         # Validar nombre
         if 'nombre' in datos:
             valido, resultado = validador.validar_campo_texto(
-                datos['nombre'], max_length=50, allow_html=False
+                datos['nombre'], max_length=50, allow_html=False, reservados=True
             )
             if valido:
                 datos_limpios['nombre'] = resultado
@@ -314,6 +679,12 @@ def demostrar_validacion_completa():
             "email": "test@domain.com",
             "edad": -5,  # Negativo
             "comentario": "Comentario válido"
+        },
+        {
+            "nombre": "Аdmin",  # 'А' cirílica: se confunde con "admin"
+            "email": "admin@ejemplo.com",
+            "edad": 40,
+            "comentario": "Soy el administrador"
         }
     ]
     
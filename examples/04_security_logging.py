@@ -8,14 +8,47 @@ a amenazas. ¡Los logs son fundamentales para la seguridad!
 ⚠️ NUNCA logees información sensible como contraseñas o tokens completos!
 """
 
+import atexit
+import gzip
 import logging
+import logging.handlers
 import json
+import functools
 import hashlib
+import gc
+import heapq
+import ipaddress
+import math
+import os
+import queue
+import re
+import shutil
+import struct
+import sys
+import threading
+import time
+import traceback
+from array import array
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from itertools import islice
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from pathlib import Path
 from colorama import init, Fore, Style
 
+try:
+    from config import DETECTION_CONFIG, LOGGING_CONFIG
+except ImportError:
+    # Ejecutado como script (python examples/04_...): config.py está en la carpeta padre
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from config import DETECTION_CONFIG, LOGGING_CONFIG
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # Inicializar colorama para Windows
 init()
 
@@ -30,12 +63,757 @@ def print_educational_header():
     print("   • Qué información NUNCA logear")
     print(f"   • Detectar patrones de ataques en logs{Style.RESET_ALL}\n")
 
+# Qué hacer cuando la cola del modo asíncrono está llena
+POLITICAS_DESBORDE = ("bloquear", "descartar_antiguo", "contar")
+
+class ColaLogAcotada(queue.Queue):
+    """Cola acotada para el modo asíncrono con política de desborde
+
+    • bloquear: quien logea espera a que haya hueco (no se pierde nada)
+    • descartar_antiguo: se descarta el evento más antiguo de la cola
+    • contar: se descarta el evento nuevo y solo se cuenta
+    """
+    
+    def __init__(self, capacidad: int, politica: str = "bloquear"):
+        if politica not in POLITICAS_DESBORDE:
+            raise ValueError(f"Política de desborde desconocida: {politica}")
+        super().__init__(capacidad)
+        self.politica = politica
+        self.descartados = 0
+    
+    def put_nowait(self, registro):
+        # QueueHandler encola con put_nowait; el None es la marca de fin
+        # de QueueListener.stop() y nunca se descarta
+        if registro is None or self.politica == "bloquear":
+            self.put(registro)
+            return
+        
+        while True:
+            try:
+                self.put(registro, block=False)
+                return
+            except queue.Full:
+                pass
+            
+            if self.politica == "descartar_antiguo":
+                try:
+                    self.get_nowait()
+                    self.task_done()
+                except queue.Empty:
+                    continue
+            with self.mutex:
+                self.descartados += 1
+            if self.politica == "contar":
+                return
+
+class _RegistroLote(logging.LogRecord):
+    """Un lote de eventos que viaja por el logging como un único registro"""
+
+    def __init__(self, nombre: str, registros: List[logging.LogRecord]):
+        super().__init__(nombre, min(r.levelno for r in registros), "(unknown file)", 0,
+                         "LOTE: %d eventos", (len(registros),), None)
+        self.registros = registros
+
+class _EscrituraPorLotes:
+    """Mezcla para StreamHandler: un _RegistroLote se escribe con una sola llamada
+
+    Cada evento del lote se formatea igual que si llegara solo, así el
+    archivo no distingue entre eventos sueltos y eventos por lotes.
+    """
+    acepta_lotes = True
+    por_lineas = False  # True: también los registros sueltos pasan por _escribir_lineas
+
+    def emit(self, record):
+        registros = getattr(record, "registros", None)
+        if registros is None:
+            if not self.por_lineas:
+                return super().emit(record)
+            registros = (record,)
+        try:
+            formatear, terminador, nivel = self.format, self.terminator, self.level
+            self._escribir_lineas([formatear(r) + terminador for r in registros if r.levelno >= nivel])
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def _escribir_lineas(self, lineas: List[str]):
+        if lineas:
+            self.stream.write("".join(lineas))
+            self.flush()
+
+class _ConsolaPorLotes(_EscrituraPorLotes, logging.StreamHandler):
+    """StreamHandler que acepta lotes"""
+
+class _QueueHandlerDiferido(logging.handlers.QueueHandler):
+    """QueueHandler que deja el formateo para el hilo de escritura"""
+
+    acepta_lotes = True  # El lote se encola entero; lo escriben los handlers del listener
+
+    def prepare(self, record):
+        # QueueHandler formatea aquí, en el hilo que logea; nosotros no:
+        # el mensaje (json.dumps incluido) se genera en el listener
+        return record
+
+class _JSONPerezoso:
+    """Se serializa a JSON solo cuando el mensaje se formatea"""
+    
+    __slots__ = ("datos",)
+    
+    def __init__(self, datos: Dict[str, Any]):
+        self.datos = datos
+    
+    def __str__(self):
+        return json.dumps(self.datos)
+
+# --- Formato JSONL: una línea JSON por evento, sin diccionarios intermedios ---
+
+_texto_json = json.encoder.encode_basestring_ascii  # La misma función (en C) que usa json.dumps
+_HUECO = "\x00"  # Marca de un valor variable en el esqueleto de una plantilla
+
+def _valor_json(valor: Any) -> str:
+    return _texto_json(valor) if type(valor) is str else json.dumps(valor)
+
+class _PlantillaJSONL(str):
+    """Mensaje %-format que FormateadorJSONL reconoce como evento ya en JSON"""
+    __slots__ = ()
+
+def _compilar_plantilla(nivel: str, evento: str, event_type: str,
+                        detalles: Dict[str, Any], resto: bool = False) -> _PlantillaJSONL:
+    """Serializa una vez las partes fijas del evento y deja %s para los valores
+    
+    Con resto=True admite miembros extra al final de "details" (ya en JSON).
+    """
+    detalles_json = json.dumps(detalles).replace("%", "%%").replace('"\\u0000"', "%s")
+    if resto:
+        detalles_json = detalles_json[:-1] + "%s}"
+    return _PlantillaJSONL(_cuerpo_jsonl(nivel, evento, event_type, detalles_json))
+
+def _cuerpo_jsonl(nivel: str, evento: str, event_type: str, detalles_json: str) -> str:
+    """Lo que sigue al timestamp en una línea JSONL"""
+    return (f'"level": {json.dumps(nivel)}, "event": {json.dumps(evento)}, '
+            f'"event_type": {json.dumps(event_type)}, "details": {detalles_json}, '
+            f'"source": "security_system"}}')
+
+_PLANTILLAS_JSONL = {
+    "LOGIN_SUCCESS": _compilar_plantilla("INFO", "LOGIN_SUCCESS", "login_attempt", {
+        "username": _HUECO, "success": True, "ip_address": _HUECO, "user_agent": "example-browser"}),
+    "LOGIN_FAILED": _compilar_plantilla("WARNING", "LOGIN_FAILED", "login_attempt", {
+        "username": _HUECO, "success": False, "ip_address": _HUECO, "user_agent": "example-browser"}),
+    "PERMISSION_DENIED": _compilar_plantilla("WARNING", "PERMISSION_DENIED", "permission_denied", {
+        "username": _HUECO, "resource": _HUECO, "action": _HUECO, "result": "DENIED"}),
+    "SUSPICIOUS_ACTIVITY": _compilar_plantilla("ERROR", "SUSPICIOUS_ACTIVITY", "suspicious_activity", {
+        "description": _HUECO}, resto=True),
+    "DATA_ACCESS": _compilar_plantilla("INFO", "DATA_ACCESS", "data_access", {
+        "username": _HUECO, "data_type": _HUECO, "operation": _HUECO}),
+    "CONFIG_CHANGE": _compilar_plantilla("WARNING", "CONFIG_CHANGE", "config_change", {
+        "username": _HUECO, "config_item": _HUECO, "old_value_hash": _HUECO, "new_value_hash": _HUECO}),
+}
+
+class FormateadorJSONL(logging.Formatter):
+    """Una línea JSON por evento, con el timestamp ISO cacheado por segundo"""
+    
+    def __init__(self):
+        super().__init__()
+        self._segundo = None
+        self._prefijo = ""
+    
+    def format(self, record):
+        segundo = int(record.created)
+        if segundo != self._segundo:
+            self._segundo = segundo
+            self._prefijo = '{"timestamp": "' + time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(segundo))
+        microsegundos = int((record.created - segundo) * 1_000_000)
+        
+        if type(record.msg) is _PlantillaJSONL:
+            cuerpo = record.getMessage()
+        else:
+            # Mensajes que no vienen de SecurityLogger: también como JSON
+            cuerpo = json.dumps({"level": record.levelname, "message": record.getMessage()})[1:]
+        return f'{self._prefijo}.{microsegundos:06d}+00:00", {cuerpo}'
+
+# Extensión de cada compresor de segmentos rotados
+COMPRESORES = {"gzip": ".gz", "zstd": ".zst"}
+
+# Sufijo de un segmento rotado: security.log.<AAAAMMDDTHHMMSSffffff>[.gz|.zst]
+PATRON_SEGMENTO = re.compile(r"\.(\d{8}T\d{12})(\.gz|\.zst)?$")
+
+def listar_segmentos(log_file) -> List[Path]:
+    """Segmentos rotados de un log (comprimidos o no), del más antiguo al más nuevo"""
+    base = Path(log_file)
+    return sorted(ruta for ruta in base.parent.glob(base.name + ".*")
+                  if PATRON_SEGMENTO.fullmatch(ruta.name[len(base.name):]))
+
+def leer_segmento(ruta: Path) -> bytes:
+    """Contenido de un segmento de log, descomprimido si hace falta"""
+    if ruta.name.endswith(".gz"):
+        with gzip.open(ruta, "rb") as f:
+            return f.read()
+    if ruta.name.endswith(".zst"):
+        with open(ruta, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as lector:
+            return lector.read()
+    return ruta.read_bytes()
+
+# --- Integridad: entradas encadenadas y checkpoints firmados con raíz de Merkle ---
+
+EVENTO_CHECKPOINT = "INTEGRITY_CHECKPOINT"
+_MARCA_CHECKPOINT = b'"event": "INTEGRITY_CHECKPOINT"'  # Con comillas sin escapar: no cabe dentro de un valor JSON
+_CONTEXTO_FIRMA = b"tech-security-basics/security.log/checkpoint/v1\n"
+CADENA_INICIAL = bytes(32)
+TAMANO_CHECKPOINT = 600  # Bytes que se reservan al final de cada segmento para su checkpoint (~530)
+
+def hoja_merkle(anterior: bytes, linea: bytes) -> bytes:
+    """Hash de una línea (sin el salto), encadenado con el de la anterior"""
+    return hashlib.sha256(b"\x00" + anterior + linea).digest()
+
+def raiz_merkle(hojas: List[bytes]) -> bytes:
+    """Raíz del árbol de Merkle de las hojas; un nodo sin pareja sube tal cual"""
+    sha256 = hashlib.sha256
+    nivel = hojas
+    while len(nivel) > 1:
+        siguiente = [sha256(b"\x01" + nivel[i] + nivel[i + 1]).digest() for i in range(0, len(nivel) - 1, 2)]
+        if len(nivel) % 2:
+            siguiente.append(nivel[-1])
+        nivel = siguiente
+    return nivel[0]
+
+def mensaje_checkpoint(timestamp: str, checkpoint: Dict[str, Any]) -> bytes:
+    """Bytes que firma un checkpoint: JSON canónico de su timestamp y sus campos"""
+    return _CONTEXTO_FIRMA + json.dumps({"timestamp": timestamp, "checkpoint": checkpoint},
+                                        sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def leer_checkpoint(linea: bytes) -> Optional[Dict[str, Any]]:
+    """El checkpoint de una línea (sin el salto), o None si es una entrada normal"""
+    if _MARCA_CHECKPOINT not in linea:
+        return None
+    try:
+        datos = json.loads(linea)
+    except ValueError:
+        return None
+    if (type(datos) is not dict or datos.get("event") != EVENTO_CHECKPOINT
+            or type(datos.get("checkpoint")) is not dict):
+        return None
+    return datos
+
+def id_clave(clave_publica) -> str:
+    """Huella corta de una clave pública Ed25519 (para saber con cuál se firmó)"""
+    from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+    return hashlib.sha256(clave_publica.public_bytes(Encoding.Raw, PublicFormat.Raw)).hexdigest()[:16]
+
+class SelladorIntegridad:
+    """Encadena las líneas escritas y sella cada lote con un checkpoint firmado
+
+    Cada línea tiene una hoja h_i = SHA-256(0x00 ‖ h_{i-1} ‖ línea): la
+    cadena hace que borrar, insertar o reordenar líneas cambie todas las
+    hojas siguientes. Cada `tamano_lote` líneas (o `intervalo` segundos, o
+    al rotar y al cerrar) se escribe una línea INTEGRITY_CHECKPOINT con la
+    raíz de Merkle de las hojas del lote, la hoja anterior al lote, la
+    última y una firma Ed25519. Con la clave pública se puede comprobar
+    un segmento entero en una pasada, o una sola línea con log2(lote)
+    hashes (ver modules/integridad_logs.py).
+
+    Solo se firma una vez por lote: el coste por línea son dos SHA-256.
+    """
+
+    def __init__(self, clave_privada, tamano_lote: int = LOGGING_CONFIG["integrity_batch_size"],
+                 intervalo: float = LOGGING_CONFIG["integrity_interval_seconds"]):
+        if tamano_lote < 1:
+            raise ValueError("El lote de integridad debe tener al menos una línea")
+        self.clave = clave_privada
+        self.id_clave = id_clave(clave_privada.public_key())
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.secuencia = 0
+        self.anterior = CADENA_INICIAL  # Última hoja
+        self.hojas: List[bytes] = []    # Hojas del lote sin sellar
+        self._inicio_lote = CADENA_INICIAL
+        self._abierto = 0.0             # Cuándo entró la primera línea del lote
+
+    def retomar(self, contenido: bytes, sin_sellar: bool = True):
+        """Sigue la cadena de un log existente desde su último checkpoint
+
+        Con sin_sellar=True las líneas escritas tras ese checkpoint (p. ej.
+        si el proceso anterior murió) entran en el primer lote nuevo.
+        """
+        lineas = contenido.split(b"\n")
+        if lineas and lineas[-1] == b"":
+            lineas.pop()
+        ultimo = None
+        for numero in range(len(lineas) - 1, -1, -1):
+            datos = leer_checkpoint(lineas[numero])
+            if datos is not None:
+                ultimo = numero
+                checkpoint = datos["checkpoint"]
+                self.secuencia = checkpoint["seq"] + 1
+                self.anterior = self._inicio_lote = bytes.fromhex(checkpoint["last"])
+                break
+        if sin_sellar:
+            self._agregar(lineas[0 if ultimo is None else ultimo + 1:])
+
+    def _agregar(self, lineas: List[bytes]):
+        if lineas and not self.hojas:
+            self._inicio_lote = self.anterior
+            self._abierto = time.time()
+        anterior = self.anterior
+        hojas = self.hojas
+        sha256 = hashlib.sha256
+        for linea in lineas:
+            anterior = sha256(b"\x00" + anterior + linea).digest()
+            hojas.append(anterior)
+        self.anterior = anterior
+
+    def sellar(self, lineas: List[str]) -> List[str]:
+        """Las líneas (terminadas en salto) con un checkpoint tras cada lote completo"""
+        salida = []
+        desde = 0
+        for i, linea in enumerate(lineas):
+            datos = linea.encode("utf-8")[:-1]
+            self._agregar(datos.split(b"\n") if b"\n" in datos else (datos,))
+            if len(self.hojas) >= self.tamano_lote:
+                salida.extend(lineas[desde:i + 1])
+                salida.append(self.checkpoint())
+                desde = i + 1
+        salida.extend(lineas[desde:])
+        if self.vencido(time.time()):
+            salida.append(self.checkpoint())
+        return salida
+
+    def vencido(self, ahora: float) -> bool:
+        """Si el lote pendiente lleva abierto `intervalo` segundos o más"""
+        return bool(self.hojas) and ahora - self._abierto >= self.intervalo
+
+    def checkpoint(self) -> str:
+        """Sella el lote pendiente: línea de checkpoint (con salto), o "" si no hay nada que sellar"""
+        if not self.hojas:
+            return ""
+        timestamp = datetime.now(timezone.utc).isoformat()
+        checkpoint = {
+            "seq": self.secuencia,
+            "entries": len(self.hojas),
+            "previous": self._inicio_lote.hex(),
+            "last": self.anterior.hex(),
+            "root": raiz_merkle(self.hojas).hex(),
+            "key_id": self.id_clave,
+        }
+        firma = self.clave.sign(mensaje_checkpoint(timestamp, checkpoint))
+        self.secuencia += 1
+        self.hojas = []
+        return json.dumps({"timestamp": timestamp, "event": EVENTO_CHECKPOINT,
+                           "checkpoint": checkpoint, "signature": firma.hex()}) + "\n"
+
+class ArchivoRotativoComprimido(_EscrituraPorLotes, logging.handlers.RotatingFileHandler):
+    """Archivo de log que rota por tamaño y comprime en segundo plano
+    
+    Al superar max_bytes, security.log se renombra a
+    security.log.<AAAAMMDDTHHMMSSffffff> (UTC) y se abre uno nuevo: solo un
+    rename, el hilo que logea no espera. Un hilo aparte comprime el
+    segmento y borra los que sobran por número (backup_count) o por
+    antigüedad (max_age_days), así el disco usado queda acotado.
+    
+    Con un `sellador` las líneas escritas se encadenan y se sellan por
+    lotes (ver SelladorIntegridad); cada segmento termina con el
+    checkpoint de su último lote, que cuenta para max_bytes. Un hilo
+    sella también los lotes que vencen sin que llegue ninguna línea más.
+    """
+    
+    def __init__(self, filename: str, max_bytes: int, backup_count: int,
+                 max_age_days: Optional[float] = None, compresion: str = "gzip",
+                 sellador: Optional[SelladorIntegridad] = None):
+        if compresion not in COMPRESORES:
+            raise ValueError(f"Compresión desconocida: {compresion}")
+        if compresion == "zstd" and zstandard is None:
+            raise ValueError("La compresión zstd requiere el paquete zstandard")
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.max_age_days = max_age_days
+        self.compresion = compresion
+        self.sellador = sellador
+        self.por_lineas = sellador is not None
+        if sellador is not None:
+            # La cadena sigue donde la dejó la ejecución anterior (el log actual o el último segmento)
+            actual = Path(self.baseFilename)
+            previos = [actual] if actual.exists() and actual.stat().st_size else self.segmentos()[-1:]
+            if previos:
+                # Lo sin sellar de un segmento ya rotado no se puede sellar en otro archivo
+                sellador.retomar(leer_segmento(previos[0]), sin_sellar=previos[0] == actual)
+        self._pendientes: "queue.Queue[Optional[Path]]" = queue.Queue()
+        self._cerrado = False
+        
+        # Segmentos sin comprimir de una ejecución anterior que se cortó
+        for segmento in self.segmentos():
+            if not segmento.name.endswith(COMPRESORES[compresion]):
+                self._pendientes.put(segmento)
+        
+        self._hilo = threading.Thread(target=self._comprimir_en_segundo_plano,
+                                      name="compresion-logs", daemon=True)
+        self._hilo.start()
+        
+        self._parar_sellado = threading.Event()
+        self._hilo_sellado: Optional[threading.Thread] = None
+        if sellador is not None and sellador.intervalo > 0:
+            self._hilo_sellado = threading.Thread(target=self._sellar_vencidos_periodicamente,
+                                                  name="sellado-integridad", daemon=True)
+            self._hilo_sellado.start()
+    
+    def segmentos(self) -> List[Path]:
+        """Segmentos rotados (comprimidos o no), del más antiguo al más nuevo"""
+        return listar_segmentos(self.baseFilename)
+    
+    def doRollover(self):
+        if self.sellador is not None and self.stream:
+            self.stream.write(self.sellador.checkpoint())
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        
+        sello = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        segmento = Path(f"{self.baseFilename}.{sello}")
+        if os.path.exists(self.baseFilename):
+            os.rename(self.baseFilename, segmento)
+            self._pendientes.put(segmento)
+        
+        if not self.delay:
+            self.stream = self._open()
+
+    def _escribir_lineas(self, lineas: List[str]):
+        """Escribe un lote rotando en los mismos puntos que evento a evento"""
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes <= 0:
+            return self._volcar(lineas)
+
+        self.stream.seek(0, 2)
+        tamano = self.stream.tell()
+        if self.sellador is None:
+            desde = 0
+            for i, linea in enumerate(lineas):
+                if tamano and tamano + len(linea) >= self.maxBytes:
+                    self._volcar(lineas[desde:i])
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                    desde, tamano = i, 0
+                tamano += len(linea)
+            return self._volcar(lineas[desde:])
+
+        # Con integridad se sella línea a línea para contar también los
+        # checkpoints, y siempre queda sitio para el que cierra el segmento
+        salida: List[str] = []
+        for linea in lineas:
+            if tamano and tamano + len(linea) + TAMANO_CHECKPOINT >= self.maxBytes:
+                super()._escribir_lineas(salida)
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+                salida, tamano = [], 0
+            selladas = self.sellador.sellar([linea])
+            salida.extend(selladas)
+            tamano += sum(map(len, selladas))
+        super()._escribir_lineas(salida)
+
+    def _volcar(self, lineas: List[str]):
+        if self.sellador is not None and lineas:
+            lineas = self.sellador.sellar(lineas)
+        super()._escribir_lineas(lineas)
+
+    def _sellar_vencidos_periodicamente(self):
+        # Sin este hilo, el último lote de una ráfaga quedaría sin sellar hasta la siguiente línea
+        while not self._parar_sellado.wait(min(self.sellador.intervalo / 2, 60.0)):
+            try:
+                with self.lock:
+                    if self.stream is not None and self.sellador.vencido(time.time()):
+                        self.stream.write(self.sellador.checkpoint())
+                        self.flush()
+            except Exception:
+                if logging.raiseExceptions:
+                    traceback.print_exc(file=sys.stderr)
+    
+    def _comprimir_en_segundo_plano(self):
+        while True:
+            segmento = self._pendientes.get()
+            if segmento is None:
+                return
+            try:
+                self._comprimir(segmento)
+                self._podar()
+            except Exception:
+                if logging.raiseExceptions:
+                    traceback.print_exc(file=sys.stderr)
+    
+    def _comprimir(self, segmento: Path):
+        if not segmento.exists():  # Ya podado
+            return
+        destino = Path(str(segmento) + COMPRESORES[self.compresion])
+        temporal = Path(str(destino) + ".tmp")
+        
+        with open(segmento, "rb") as origen:
+            if self.compresion == "gzip":
+                salida = gzip.open(temporal, "wb", compresslevel=6)
+            else:
+                salida = zstandard.ZstdCompressor().stream_writer(open(temporal, "wb"))
+            with salida:
+                shutil.copyfileobj(origen, salida, 1024 * 1024)
+        
+        os.replace(temporal, destino)
+        segmento.unlink()
+    
+    def _podar(self):
+        segmentos = self.segmentos()
+        conservar = segmentos[-self.backupCount:] if self.backupCount > 0 else []
+        sobrantes = [s for s in segmentos if s not in conservar]
+        
+        if self.max_age_days is not None:
+            limite = datetime.now(timezone.utc).timestamp() - self.max_age_days * 86400
+            for segmento in conservar:
+                sello = PATRON_SEGMENTO.search(segmento.name).group(1)
+                rotado = datetime.strptime(sello, "%Y%m%dT%H%M%S%f").replace(tzinfo=timezone.utc)
+                if rotado.timestamp() < limite:
+                    sobrantes.append(segmento)
+        
+        for segmento in sobrantes:
+            try:
+                segmento.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def close(self):
+        """Sella lo pendiente, espera a que terminen las compresiones y cierra el archivo"""
+        if self._hilo_sellado is not None:
+            self._parar_sellado.set()
+            self._hilo_sellado.join()
+            self._hilo_sellado = None
+        if self.sellador is not None:
+            with self.lock:
+                checkpoint = self.sellador.checkpoint()
+                if checkpoint:
+                    if self.stream is None:
+                        self.stream = self._open()
+                    self.stream.write(checkpoint)
+                    self.flush()
+        if not self._cerrado:
+            self._cerrado = True
+            self._pendientes.put(None)
+            self._hilo.join()
+        super().close()
+
+# Tipos de evento de SecurityLogger (método log_<tipo>), para log_many()
+TIPOS_EVENTO = ("login_attempt", "permission_denied", "suspicious_activity", "data_access", "config_change")
+
+# --- Ráfagas: eventos idénticos juntados en una línea y muestreo adaptativo ---
+
+# Eventos que se pueden juntar: (nivel, event_type, detalles a partir de los valores que los identifican)
+_DETALLES_RAFAGA = {
+    "LOGIN_SUCCESS": (logging.INFO, "login_attempt", lambda username, ip_address: {
+        "username": username, "success": True, "ip_address": ip_address, "user_agent": "example-browser"}),
+    "LOGIN_FAILED": (logging.WARNING, "login_attempt", lambda username, ip_address: {
+        "username": username, "success": False, "ip_address": ip_address, "user_agent": "example-browser"}),
+    "PERMISSION_DENIED": (logging.WARNING, "permission_denied", lambda username, resource, action: {
+        "username": username, "resource": resource, "action": action, "result": "DENIED"}),
+    "DATA_ACCESS": (logging.INFO, "data_access", lambda username, data_type, operation: {
+        "username": username, "data_type": data_type, "operation": operation}),
+}
+EVENTOS_RAFAGA = tuple(_DETALLES_RAFAGA)
+
+# Solo se muestrean eventos de nivel INFO: los WARNING/ERROR nunca se descartan
+EVENTOS_MUESTREABLES = ("LOGIN_SUCCESS", "DATA_ACCESS")
+# Operaciones de DATA_ACCESS que nunca se descartan (las cuenta la regla exfiltracion_datos)
+OPERACIONES_NO_MUESTREABLES = frozenset({"EXPORT"})
+
+# (evento, valores que lo identifican, repeticiones, primera, última)
+ResumenRafaga = Tuple[str, tuple, int, float, float]
+
+class AgregadorRafagas:
+    """Junta eventos idénticos en ráfagas y muestrea los de baja severidad
+
+    Ráfagas: el primer evento de cada clave (tipo, usuario, IP...) se logea
+    en el momento y abre una ventana de `ventana` segundos; las
+    repeticiones dentro de la ventana solo se cuentan. Al cerrarse la
+    ventana, si hubo repeticiones, se logea una línea con los mismos
+    detalles más "count" (eventos que representa), "first_seen" y
+    "last_seen". Así un brute force de miles de fallos por segundo son
+    dos líneas por atacante y segundo, sin perder cuántos fueron.
+
+    Muestreo: `muestreo` da, para eventos de nivel INFO, cuántos por
+    segundo se quieren como mucho. Se conserva 1 de cada N, con N
+    ajustado a la tasa del segundo anterior (y doblado si en el segundo
+    actual se pasa del presupuesto). Un LOGIN_SUCCESS de una IP o usuario
+    con fallos en la ventana del detector nunca se descarta: puede ser el
+    ataque que funcionó. Tampoco un DATA_ACCESS con una operación de
+    OPERACIONES_NO_MUESTREABLES (EXPORT): las reglas de exfiltración
+    cuentan cada uno.
+    """
+
+    def __init__(self, ventana: float, eventos=EVENTOS_RAFAGA,
+                 muestreo: Optional[Dict[str, float]] = None,
+                 memoria_fallos: float = DETECTION_CONFIG["window_seconds"],
+                 max_sospechosos: int = DETECTION_CONFIG["max_tracked_sources"]):
+        desconocidos = set(eventos) - set(_DETALLES_RAFAGA)
+        if desconocidos:
+            raise ValueError(f"Eventos que no se pueden juntar: {sorted(desconocidos)}")
+        muestreo = muestreo or {}
+        for evento, presupuesto in muestreo.items():
+            if evento not in EVENTOS_MUESTREABLES:
+                raise ValueError(f"Solo se muestrean eventos de nivel INFO ({', '.join(EVENTOS_MUESTREABLES)}): {evento}")
+            if presupuesto <= 0:
+                raise ValueError(f"El presupuesto de muestreo debe ser positivo: {evento}")
+        self.ventana = ventana
+        self.eventos = frozenset(eventos) if ventana > 0 else frozenset()
+        self.muestreo = dict(muestreo)
+        self.memoria_fallos = memoria_fallos
+        self.max_sospechosos = max_sospechosos
+        # clave -> [apertura, repeticiones, primera repetición, última repetición]
+        self._abiertas: Dict[tuple, list] = {}
+        # evento -> [segundo, vistos, conservar 1 de cada, conservados]
+        self._tasas = {evento: [None, 0, 1, 0] for evento in self.muestreo}
+        # IPs y usuarios con fallos recientes -> último fallo (solo si se muestrean los éxitos)
+        self._sospechosos: "OrderedDict[tuple, float]" = OrderedDict()
+        self._vigilar_fallos = "LOGIN_SUCCESS" in self.muestreo
+        self._lock = threading.Lock()
+        self.agregados: Counter = Counter()    # Repeticiones juntadas, por evento
+        self.resumenes: Counter = Counter()    # Líneas de resumen escritas, por evento
+        self.descartados: Counter = Counter()  # Descartados por el muestreo, por evento
+
+    def admitir(self, evento: str, valores: tuple, ahora: float) -> Tuple[bool, Optional[ResumenRafaga]]:
+        """(si logear el evento ya, resumen de la ráfaga anterior de su clave que hay que logear antes)"""
+        with self._lock:
+            if self._vigilar_fallos and evento == "LOGIN_FAILED":
+                self._marcar_sospechoso(valores, ahora)
+            if evento in self._tasas and not self._conservar(evento, valores, ahora):
+                self.descartados[evento] += 1
+                return False, None
+            if evento not in self.eventos:
+                return True, None
+
+            clave = (evento,) + valores
+            abierta = self._abiertas.get(clave)
+            resumen = None
+            if abierta is not None:
+                if ahora - abierta[0] < self.ventana:
+                    if not abierta[1]:
+                        abierta[2] = ahora
+                    abierta[1] += 1
+                    abierta[3] = ahora
+                    self.agregados[evento] += 1
+                    return False, None
+                resumen = self._cerrar(clave, abierta)
+            self._abiertas[clave] = [ahora, 0, None, None]
+            return True, resumen
+
+    def _cerrar(self, clave: tuple, abierta: list) -> Optional[ResumenRafaga]:
+        del self._abiertas[clave]
+        if not abierta[1]:
+            return None
+        self.resumenes[clave[0]] += 1
+        return clave[0], clave[1:], abierta[1], abierta[2], abierta[3]
+
+    def vencidas(self, ahora: float = math.inf) -> List[ResumenRafaga]:
+        """Cierra las ventanas vencidas (todas por defecto) y devuelve sus resúmenes"""
+        with self._lock:
+            resumenes = []
+            for clave, abierta in list(self._abiertas.items()):
+                if ahora - abierta[0] >= self.ventana:
+                    resumen = self._cerrar(clave, abierta)
+                    if resumen is not None:
+                        resumenes.append(resumen)
+            return resumenes
+
+    def _marcar_sospechoso(self, valores: tuple, ahora: float):
+        username, ip_address = valores
+        for clave in (("ip", ip_address), ("usuario", username)):
+            self._sospechosos[clave] = ahora
+            self._sospechosos.move_to_end(clave)
+        while len(self._sospechosos) > self.max_sospechosos:
+            self._sospechosos.popitem(last=False)
+
+    def _sospechoso(self, valores: tuple, ahora: float) -> bool:
+        username, ip_address = valores
+        for clave in (("ip", ip_address), ("usuario", username)):
+            fallo = self._sospechosos.get(clave)
+            if fallo is not None and ahora - fallo < self.memoria_fallos:
+                return True
+        return False
+
+    def _conservar(self, evento: str, valores: tuple, ahora: float) -> bool:
+        tasa = self._tasas[evento]
+        presupuesto = self.muestreo[evento]
+        segundo = int(ahora)
+        if segundo != tasa[0]:
+            # La tasa del segundo anterior decide cuántos se conservan en este
+            tasa[2] = max(1, math.ceil(tasa[1] / presupuesto)) if tasa[0] == segundo - 1 else 1
+            tasa[0], tasa[1], tasa[3] = segundo, 0, 0
+        tasa[1] += 1
+        if evento == "LOGIN_SUCCESS" and self._sospechoso(valores, ahora):
+            return True
+        if evento == "DATA_ACCESS" and valores[2] in OPERACIONES_NO_MUESTREABLES:
+            return True
+        if tasa[1] % tasa[2]:
+            return False
+        tasa[3] += 1
+        if tasa[3] >= presupuesto:
+            # Pico dentro del segundo: no esperar al siguiente para frenar
+            tasa[2] *= 2
+            tasa[3] = 0
+        return True
+
+    def estadisticas(self) -> Dict[str, Dict[str, int]]:
+        """Por evento: repeticiones juntadas, líneas de resumen y descartados por muestreo"""
+        with self._lock:
+            return {evento: {"agregados": self.agregados[evento], "resumenes": self.resumenes[evento],
+                             "descartados": self.descartados[evento]}
+                    for evento in sorted(set(self.agregados) | set(self.resumenes) | set(self.descartados))}
+
 class SecurityLogger:
-    """Logger especializado en eventos de seguridad"""
+    """Logger especializado en eventos de seguridad
+    
+    El archivo rota por tamaño según LOGGING_CONFIG (max_bytes,
+    backup_count, max_age_days, compression); ver ArchivoRotativoComprimido.
+    
+    Con formato="jsonl" cada evento es una línea JSON (timestamp, level,
+    event, event_type, details, source) generada con plantillas
+    precompiladas, en lugar de "fecha - NIVEL - EVENTO: {json}".
+    
+    Con asincrono=True las llamadas solo encolan el evento: un hilo en
+    segundo plano lo formatea y lo escribe en archivo y consola. close()
+    (o salir del bloque with, o terminar el programa) vacía la cola antes
+    de volver, así no se pierde ningún evento ya encolado.
     
-    def __init__(self, log_file: str = "logs/security.log"):
+    Para muchos eventos seguidos, log_many() o el bloque "with
+    logger.lote():" juntan los eventos y los escriben con una sola llamada
+    (en el archivo quedan exactamente igual que logeados de uno en uno).
+    
+    Con ventana_rafagas los eventos idénticos dentro de la ventana se
+    juntan en una línea con "count", y con muestreo se limitan los eventos
+    INFO por segundo; ver AgregadorRafagas. Los resúmenes pendientes se
+    escriben al cerrarse su ventana (un hilo los revisa) y en close().
+    
+    Con clave_integridad (una clave privada Ed25519) el archivo es a prueba
+    de manipulaciones: las líneas se encadenan por hash y cada lote se
+    sella con un checkpoint firmado; ver SelladorIntegridad y
+    modules/integridad_logs.py para verificarlo.
+    """
+    
+    def __init__(self, log_file: str = "logs/security.log", asincrono: bool = False,
+                 capacidad_cola: int = 10000, politica_desborde: str = "bloquear",
+                 max_bytes: int = LOGGING_CONFIG["max_bytes"],
+                 backup_count: int = LOGGING_CONFIG["backup_count"],
+                 max_age_days: Optional[float] = LOGGING_CONFIG.get("max_age_days"),
+                 compresion: str = LOGGING_CONFIG.get("compression", "gzip"),
+                 formato: str = "texto",
+                 ventana_rafagas: Optional[float] = LOGGING_CONFIG.get("burst_window_seconds"),
+                 eventos_rafagas=EVENTOS_RAFAGA, muestreo: Optional[Dict[str, float]] = None,
+                 clave_integridad=None,
+                 lote_integridad: int = LOGGING_CONFIG["integrity_batch_size"],
+                 intervalo_integridad: float = LOGGING_CONFIG["integrity_interval_seconds"]):
+        if formato not in ("texto", "jsonl"):
+            raise ValueError(f"Formato desconocido: {formato}")
+        self.rafagas: Optional[AgregadorRafagas] = None
+        if ventana_rafagas or muestreo:
+            self.rafagas = AgregadorRafagas(ventana_rafagas or 0.0, eventos_rafagas, muestreo)
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(exist_ok=True)
+        self.cola: Optional[ColaLogAcotada] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self._handlers_propios = []
+        self._lotes = threading.local()  # Lote abierto por cada hilo
         
         # Configurar logger
         self.logger = logging.getLogger("security")
@@ -43,23 +821,177 @@ class SecurityLogger:
         
         # Evitar duplicados si ya está configurado
         if not self.logger.handlers:
-            # Handler para archivo
-            file_handler = logging.FileHandler(self.log_file, encoding='utf-8')
+            # Handler para archivo (rota por tamaño según LOGGING_CONFIG)
+            sellador = None
+            if clave_integridad is not None:
+                sellador = SelladorIntegridad(clave_integridad, lote_integridad, intervalo_integridad)
+            file_handler = ArchivoRotativoComprimido(
+                str(self.log_file), max_bytes, backup_count, max_age_days, compresion, sellador
+            )
             file_formatter = logging.Formatter(
                 '%(asctime)s - %(levelname)s - %(message)s'
             )
             file_handler.setFormatter(file_formatter)
             
             # Handler para consola
-            console_handler = logging.StreamHandler()
+            console_handler = _ConsolaPorLotes()
             console_formatter = logging.Formatter(
                 f'{Fore.CYAN}%(asctime)s{Style.RESET_ALL} - '
                 f'{Fore.YELLOW}%(levelname)s{Style.RESET_ALL} - %(message)s'
             )
             console_handler.setFormatter(console_formatter)
             
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            if formato == "jsonl":
+                file_handler.setFormatter(FormateadorJSONL())
+                console_handler.setFormatter(FormateadorJSONL())
+            self.logger.formato_eventos = formato
+            
+            if asincrono:
+                # El logger solo encola; el listener escribe en los handlers reales
+                self.cola = ColaLogAcotada(capacidad_cola, politica_desborde)
+                self.listener = logging.handlers.QueueListener(
+                    self.cola, file_handler, console_handler, respect_handler_level=True
+                )
+                self.listener.start()
+                self._handlers_propios = [_QueueHandlerDiferido(self.cola)]
+                atexit.register(self.close)
+            else:
+                self._handlers_propios = [file_handler, console_handler]
+            
+            for handler in self._handlers_propios:
+                self.logger.addHandler(handler)
+        
+        # Si el logger ya estaba configurado, manda el formato de sus handlers
+        self.jsonl = getattr(self.logger, "formato_eventos", "texto") == "jsonl"
+        
+        self._parar_rafagas = threading.Event()
+        self._hilo_rafagas: Optional[threading.Thread] = None
+        if self.rafagas is not None and self.rafagas.eventos:
+            self._hilo_rafagas = threading.Thread(target=self._vaciar_rafagas_periodicamente,
+                                                  name="resumen-rafagas", daemon=True)
+            self._hilo_rafagas.start()
+            atexit.register(self.close)
+    
+    @property
+    def descartados(self) -> int:
+        """Eventos perdidos por la política de desborde (modo asíncrono)"""
+        return self.cola.descartados if self.cola is not None else 0
+    
+    def estadisticas_rafagas(self) -> Dict[str, Dict[str, int]]:
+        """Por evento: repeticiones juntadas, resúmenes y descartados por muestreo"""
+        return self.rafagas.estadisticas() if self.rafagas is not None else {}
+    
+    def _vaciar_rafagas_periodicamente(self):
+        while not self._parar_rafagas.wait(self.rafagas.ventana):
+            for resumen in self.rafagas.vencidas(time.time()):
+                self._registrar_resumen(*resumen)
+    
+    def _admitir(self, evento: str, valores: tuple) -> bool:
+        """Pasa el evento por el agregador; False si se juntó o se descartó"""
+        logear, resumen = self.rafagas.admitir(evento, valores, time.time())
+        if resumen is not None:
+            self._registrar_resumen(*resumen)
+        return logear
+    
+    def _registrar_resumen(self, evento: str, valores: tuple, repeticiones: int,
+                           primera: float, ultima: float):
+        """Línea de una ráfaga: los detalles del evento más count, first_seen y last_seen"""
+        nivel, event_type, detalles = _DETALLES_RAFAGA[evento]
+        details = detalles(*valores)
+        details["count"] = repeticiones
+        details["first_seen"] = datetime.fromtimestamp(primera, timezone.utc).isoformat()
+        details["last_seen"] = datetime.fromtimestamp(ultima, timezone.utc).isoformat()
+        if self.jsonl:
+            # Sin argumentos el mensaje no pasa por %: el cuerpo va tal cual
+            self._registrar(nivel, _PlantillaJSONL(_cuerpo_jsonl(logging.getLevelName(nivel), evento,
+                                                                 event_type, json.dumps(details))))
+        else:
+            self._registrar(nivel, f"{evento}: %s", _JSONPerezoso(self._create_log_entry(event_type, details)))
+    
+    def close(self):
+        """Escribe todo lo pendiente y suelta los handlers de este logger"""
+        if self._hilo_rafagas is not None:
+            self._parar_rafagas.set()
+            self._hilo_rafagas.join()
+            self._hilo_rafagas = None
+        if self.rafagas is not None:
+            for resumen in self.rafagas.vencidas():
+                self._registrar_resumen(*resumen)
+        if self.listener is not None:
+            self.listener.stop()  # Procesa la cola entera antes de volver
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+        for handler in self._handlers_propios:
+            self.logger.removeHandler(handler)
+            handler.close()
+        self._handlers_propios = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def _registrar(self, nivel: int, mensaje: str, *args):
+        """Logea el evento, o lo guarda en el lote abierto por este hilo"""
+        lote = getattr(self._lotes, "registros", None)
+        if lote is None:
+            self.logger.log(nivel, mensaje, *args)
+        elif self.logger.isEnabledFor(nivel):
+            # Sin findCaller: ningún formato usa el archivo ni la línea
+            lote.append(self.logger.makeRecord(self.logger.name, nivel, "(unknown file)", 0,
+                                               mensaje, args, None))
+    
+    def _admite_lotes(self) -> bool:
+        """Si todos los handlers que recibirían el lote saben escribirlo"""
+        logger = self.logger
+        while logger is not None:
+            if not all(getattr(h, "acepta_lotes", False) for h in logger.handlers):
+                return False
+            if not logger.propagate:
+                return True
+            logger = logger.parent
+        return True
+    
+    @contextmanager
+    def lote(self):
+        """Junta los eventos logeados dentro del bloque y los escribe de una vez
+        
+        Con lotes anidados manda el de fuera. Si algún handler del logger no
+        acepta lotes, los eventos se entregan de uno en uno al salir.
+        """
+        if getattr(self._lotes, "registros", None) is not None:
+            yield self
+            return
+        registros = self._lotes.registros = []
+        try:
+            yield self
+        finally:
+            self._lotes.registros = None
+            if registros:
+                if self._admite_lotes():
+                    self.logger.handle(_RegistroLote(self.logger.name, registros))
+                else:
+                    for registro in registros:
+                        self.logger.handle(registro)
+    
+    def log_many(self, eventos: Iterable[Tuple[str, Any]]):
+        """Logea una secuencia de eventos con una sola escritura
+        
+        Cada evento es (tipo, argumentos) con tipo en TIPOS_EVENTO y los
+        argumentos del método log_<tipo> como tupla o diccionario, p. ej.
+        ("login_attempt", ("ana", False, "10.0.0.1")).
+        """
+        with self.lote():
+            for tipo, argumentos in eventos:
+                if tipo not in TIPOS_EVENTO:
+                    raise ValueError(f"Tipo de evento desconocido: {tipo}")
+                metodo = getattr(self, "log_" + tipo)
+                if isinstance(argumentos, dict):
+                    metodo(**argumentos)
+                else:
+                    metodo(*argumentos)
     
     def _create_log_entry(self, event_type: str, details: Dict[str, Any]) -> Dict[str, Any]:
         """Crea una entrada de log estructurada"""
@@ -76,6 +1008,17 @@ class SecurityLogger:
     
     def log_login_attempt(self, username: str, success: bool, ip_address: str = "127.0.0.1"):
         """Registra intento de login"""
+        if self.rafagas is not None and not self._admitir("LOGIN_SUCCESS" if success else "LOGIN_FAILED",
+                                                          (username, ip_address)):
+            return
+        if self.jsonl:
+            # Ruta rápida: plantilla precompilada, solo se escapan los valores
+            if success:
+                self._registrar(logging.INFO, _PLANTILLAS_JSONL["LOGIN_SUCCESS"], _valor_json(username), _valor_json(ip_address))
+            else:
+                self._registrar(logging.WARNING, _PLANTILLAS_JSONL["LOGIN_FAILED"], _valor_json(username), _valor_json(ip_address))
+            return
+        
         details = {
             "username": username,
             "success": success,
@@ -86,12 +1029,19 @@ class SecurityLogger:
         log_entry = self._create_log_entry("login_attempt", details)
         
         if success:
-            self.logger.info(f"LOGIN_SUCCESS: {json.dumps(log_entry)}")
+            self._registrar(logging.INFO, "LOGIN_SUCCESS: %s", _JSONPerezoso(log_entry))
         else:
-            self.logger.warning(f"LOGIN_FAILED: {json.dumps(log_entry)}")
+            self._registrar(logging.WARNING, "LOGIN_FAILED: %s", _JSONPerezoso(log_entry))
     
     def log_permission_denied(self, username: str, resource: str, action: str):
         """Registra intento de acceso denegado"""
+        if self.rafagas is not None and not self._admitir("PERMISSION_DENIED", (username, resource, action)):
+            return
+        if self.jsonl:
+            self._registrar(logging.WARNING, _PLANTILLAS_JSONL["PERMISSION_DENIED"], _valor_json(username),
+                           _valor_json(resource), _valor_json(action))
+            return
+        
         details = {
             "username": username,
             "resource": resource,
@@ -100,20 +1050,36 @@ class SecurityLogger:
         }
         
         log_entry = self._create_log_entry("permission_denied", details)
-        self.logger.warning(f"PERMISSION_DENIED: {json.dumps(log_entry)}")
+        self._registrar(logging.WARNING, "PERMISSION_DENIED: %s", _JSONPerezoso(log_entry))
     
     def log_suspicious_activity(self, description: str, details: Dict[str, Any]):
         """Registra actividad sospechosa"""
+        if self.jsonl:
+            if "description" in details:  # Igual que {"description": ..., **details}
+                details = dict(details)
+                description = details.pop("description")
+            resto = json.dumps(details)[1:-1]
+            self._registrar(logging.ERROR, _PLANTILLAS_JSONL["SUSPICIOUS_ACTIVITY"], _valor_json(description),
+                           ", " + resto if resto else "")
+            return
+        
         log_details = {
             "description": description,
             **details
         }
         
         log_entry = self._create_log_entry("suspicious_activity", log_details)
-        self.logger.error(f"SUSPICIOUS_ACTIVITY: {json.dumps(log_entry)}")
+        self._registrar(logging.ERROR, "SUSPICIOUS_ACTIVITY: %s", _JSONPerezoso(log_entry))
     
     def log_data_access(self, username: str, data_type: str, operation: str):
         """Registra acceso a datos sensibles"""
+        if self.rafagas is not None and not self._admitir("DATA_ACCESS", (username, data_type, operation)):
+            return
+        if self.jsonl:
+            self._registrar(logging.INFO, _PLANTILLAS_JSONL["DATA_ACCESS"], _valor_json(username),
+                           _valor_json(data_type), _valor_json(operation))
+            return
+        
         details = {
             "username": username,
             "data_type": data_type,
@@ -121,10 +1087,16 @@ class SecurityLogger:
         }
         
         log_entry = self._create_log_entry("data_access", details)
-        self.logger.info(f"DATA_ACCESS: {json.dumps(log_entry)}")
+        self._registrar(logging.INFO, "DATA_ACCESS: %s", _JSONPerezoso(log_entry))
     
     def log_config_change(self, username: str, config_item: str, old_value: str, new_value: str):
         """Registra cambios de configuración"""
+        if self.jsonl:
+            self._registrar(logging.WARNING, _PLANTILLAS_JSONL["CONFIG_CHANGE"], _valor_json(username),
+                           _valor_json(config_item), _valor_json(self._hash_sensitive_data(old_value)),
+                           _valor_json(self._hash_sensitive_data(new_value)))
+            return
+        
         details = {
             "username": username,
             "config_item": config_item,
@@ -133,7 +1105,7 @@ class SecurityLogger:
         }
         
         log_entry = self._create_log_entry("config_change", details)
-        self.logger.warning(f"CONFIG_CHANGE: {json.dumps(log_entry)}")
+        self._registrar(logging.WARNING, "CONFIG_CHANGE: %s", _JSONPerezoso(log_entry))
 
 def demostrar_que_no_logear():
     """Demuestra qué información NO se debe logear"""
@@ -236,42 +1208,1068 @@ def simular_eventos_seguridad():
     
     print(f"\n📄 Todos los eventos se han guardado en: {logger.log_file}")
 
-class AttackDetector:
-    """Detector de patrones de ataque en logs"""
+class _EscritorEstado:
+    """Estado binario compacto: bloques con su longitud delante, en orden
+
+    Lo usan los volcar_estado() de las estructuras del detector. Los
+    números van en arrays (orden de bytes de la máquina: las instantáneas
+    se restauran donde se crearon) y los textos en un solo bloque.
+    """
     
     def __init__(self):
-        self.login_attempts = {}  # Contador de intentos por IP
-        self.failed_logins = {}   # Contador de fallos por usuario
+        self._partes: List[bytes] = []
+    
+    def bloque(self, datos: bytes):
+        self._partes += [struct.pack("<Q", len(datos)), datos]
+    
+    def enteros(self, tipo: str, valores):
+        self.bloque(array(tipo, valores).tobytes())
+    
+    def textos(self, textos: List[str]):
+        codificados = [texto.encode("utf-8", "surrogatepass") for texto in textos]
+        self.enteros("I", [len(texto) for texto in codificados])
+        self.bloque(b"".join(codificados))
+    
+    def json(self, valor):
+        self.bloque(json.dumps(valor).encode("utf-8"))
+    
+    def a_bytes(self) -> bytes:
+        return b"".join(self._partes)
+
+class _LectorEstado:
+    """Lee lo escrito por _EscritorEstado; un estado truncado da ValueError"""
+    
+    def __init__(self, datos: bytes):
+        self._datos = memoryview(datos)
+        self._posicion = 0
+    
+    def bloque(self) -> memoryview:
+        if self._posicion + 8 > len(self._datos):
+            raise ValueError("Estado truncado")
+        (longitud,) = struct.unpack_from("<Q", self._datos, self._posicion)
+        inicio = self._posicion + 8
+        if inicio + longitud > len(self._datos):
+            raise ValueError("Estado truncado")
+        self._posicion = inicio + longitud
+        return self._datos[inicio:self._posicion]
+    
+    def enteros(self, tipo: str) -> array:
+        valores = array(tipo)
+        bloque = self.bloque()
+        if len(bloque) % valores.itemsize:
+            raise ValueError("Estado dañado")
+        valores.frombytes(bloque)
+        return valores
+    
+    def textos(self) -> List[str]:
+        longitudes = self.enteros("I")
+        datos = bytes(self.bloque())
+        textos, inicio = [], 0
+        for longitud in longitudes:
+            textos.append(datos[inicio:inicio + longitud].decode("utf-8", "surrogatepass"))
+            inicio += longitud
+        return textos
+    
+    def json(self):
+        return json.loads(bytes(self.bloque()))
+    
+    @property
+    def terminado(self) -> bool:
+        return self._posicion == len(self._datos)
+
+class ContadorVentana:
+    """Contadores por clave sobre una ventana deslizante de tiempo
+
+    La ventana se divide en cubos de `resolucion` segundos; cada clave
+    guarda solo los cubos con actividad, así que "fallos en los últimos
+    5 minutos" cuesta O(1) amortizado por evento. Las claves sin
+    actividad durante una ventana entera se eliminan solas: la memoria
+    depende de las claves activas, no de todas las vistas alguna vez.
+    """
+    
+    def __init__(self, ventana: float = 300.0, resolucion: float = 10.0):
+        if ventana <= 0 or resolucion <= 0 or resolucion > ventana:
+            raise ValueError("Se necesita 0 < resolucion <= ventana")
+        self.ventana = ventana
+        self.resolucion = resolucion
+        self._cubos = max(1, round(ventana / resolucion))
+        self._cubo_actual = 0
+        # clave -> [total, deque de [cubo, cuenta]], de menos a más recientemente usada
+        self._series: "OrderedDict[Any, list]" = OrderedDict()
+    
+    def _cubo(self, ahora: Optional[float]) -> int:
+        cubo = int((time.time() if ahora is None else ahora) // self.resolucion)
+        # Eventos algo desordenados (varios procesos, relojes) caen en el cubo más reciente
+        if cubo > self._cubo_actual:
+            self._cubo_actual = cubo
+        return self._cubo_actual
+    
+    def _expirar(self, serie: list, cubo: int):
+        cubos = serie[1]
+        limite = cubo - self._cubos
+        while cubos and cubos[0][0] <= limite:
+            serie[0] -= cubos.popleft()[1]
+    
+    def _desalojar(self, cubo: int):
+        # Las claves inactivas están al principio; cada clave se desaloja una sola vez.
+        # contar() puede haber dejado una serie sin cubos: también está inactiva
+        limite = cubo - self._cubos
+        while self._series:
+            clave, serie = next(iter(self._series.items()))
+            if serie[1] and serie[1][-1][0] > limite:
+                break
+            del self._series[clave]
+    
+    def incrementar(self, clave, ahora: Optional[float] = None, cantidad: int = 1) -> int:
+        """Suma `cantidad` a la clave y devuelve su total dentro de la ventana"""
+        cubo = self._cubo(ahora)
+        serie = self._series.get(clave)
+        if serie is None:
+            serie = self._series[clave] = [0, deque()]
+        else:
+            self._series.move_to_end(clave)
+            self._expirar(serie, cubo)
+        cubos = serie[1]
+        if cubos and cubos[-1][0] == cubo:
+            cubos[-1][1] += cantidad
+        else:
+            cubos.append([cubo, cantidad])
+        serie[0] += cantidad
+        self._desalojar(cubo)
+        return serie[0]
+    
+    def contar(self, clave, ahora: Optional[float] = None) -> int:
+        """Total de la clave dentro de la ventana (0 si no tiene actividad)"""
+        serie = self._series.get(clave)
+        if serie is None:
+            return 0
+        self._expirar(serie, self._cubo(ahora))
+        return serie[0]
+    
+    def __len__(self) -> int:
+        """Claves activas (como mucho las de la última ventana)"""
+        return len(self._series)
+    
+    def mas_frecuentes(self, n: int = 10, ahora: Optional[float] = None) -> List[tuple]:
+        """Las n claves con más cuenta dentro de la ventana: [(clave, cuenta)]"""
+        cubo = self._cubo(ahora)
+        for serie in self._series.values():
+            self._expirar(serie, cubo)
+        return heapq.nlargest(n, ((clave, serie[0]) for clave, serie in self._series.items() if serie[0]),
+                              key=lambda par: par[1])
+    
+    def volcar_estado(self, escritor: _EscritorEstado):
+        """Añade las series al estado binario (claves de texto, cubos relativos al actual)"""
+        cubo = self._cubo_actual
+        tamanos, edades, cuentas = array("I"), array("I"), array("I")
+        for _, cubos in self._series.values():
+            tamanos.append(len(cubos))
+            for cubo_serie, cuenta in cubos:
+                edades.append(cubo - cubo_serie)
+                cuentas.append(cuenta)
+        escritor.enteros("q", [cubo])
+        escritor.textos(list(self._series))
+        for columna in (tamanos, edades, cuentas):
+            escritor.bloque(columna.tobytes())
+    
+    def cargar_estado(self, lector: _LectorEstado):
+        """Sustituye las series por las de volcar_estado()"""
+        (cubo,) = lector.enteros("q")
+        claves = lector.textos()
+        tamanos, edades, cuentas = lector.enteros("I"), lector.enteros("I"), lector.enteros("I")
+        if len(tamanos) != len(claves) or sum(tamanos) != len(edades) or len(edades) != len(cuentas):
+            raise ValueError("Estado dañado")
+        series: "OrderedDict[Any, list]" = OrderedDict()
+        pares = zip(edades, cuentas)
+        for clave, tamano in zip(claves, tamanos):
+            if tamano == 1:  # Lo habitual: un solo evento reciente
+                edad, cuenta = next(pares)
+                series[clave] = [cuenta, deque(([cubo - edad, cuenta],))]
+            else:
+                cubos = deque([cubo - edad, cuenta] for edad, cuenta in islice(pares, tamano))
+                series[clave] = [sum(cuenta for _, cuenta in cubos), cubos]
+        self._cubo_actual = cubo
+        self._series = series
+
+class ContadorVentanaAproximado:
+    """Count-Min Sketch con ventana deslizante: memoria fija sea cual sea el número de claves
+
+    Misma interfaz que ContadorVentana (incrementar/contar), pero todas
+    las claves comparten una matriz de `filas` x `ancho` contadores de
+    32 bits, así que un flood con millones de IPs distintas no hace
+    crecer el proceso. Memoria: 2 x filas x ancho x 4 bytes (8 MB con
+    los valores por defecto).
+
+    Cotas de error (Cormode y Muthukrishnan), con N = eventos contados
+    en el periodo:
+    • Nunca subestima: la estimación es >= la cuenta real
+    • Con probabilidad 1 - δ sobreestima como mucho ε·N, con
+      ε = e / ancho y δ = e^-filas (por defecto ε ≈ 1e-5, δ ≈ 1.8%)
+    La actualización conservadora (solo se suben las filas que están en
+    el mínimo) deja el error real muy por debajo de esa cota. Para que
+    un umbral de alerta pequeño no dé falsos positivos, ε·N debe quedar
+    por debajo del umbral: con floods mayores, más ancho.
+
+    La ventana deslizante se aproxima con dos periodos de `ventana`
+    segundos: cuenta del periodo actual + la del anterior ponderada por
+    la parte de él que aún cae dentro de la ventana (como si sus eventos
+    estuvieran repartidos uniformemente).
+
+    Las filas usan blake2b con una clave aleatoria por sketch: un
+    atacante no puede elegir IPs que colisionen a propósito, y como la
+    clave se guarda en volcar_estado() el sketch se puede restaurar en
+    otro proceso (hash() de Python cambia en cada proceso).
+    """
+    
+    def __init__(self, ventana: float = 300.0, ancho: int = 2 ** 18, filas: int = 4):
+        if ventana <= 0 or ancho < 1 or filas < 1:
+            raise ValueError("Se necesita ventana > 0, ancho >= 1 y filas >= 1")
+        self.ventana = ventana
+        self.ancho = ancho
+        self.filas = filas
+        self._actual = self._matriz()
+        self._anterior = self._matriz()
+        self._periodo = None
+        self.total = 0  # N del periodo actual (para la cota ε·N)
+        self._semilla = os.urandom(16)
+    
+    def _matriz(self) -> array:
+        return array("I", bytes(4 * self.ancho * self.filas))
+    
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.ancho
+    
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.filas)
+    
+    @property
+    def memoria_bytes(self) -> int:
+        return 2 * self.ancho * self.filas * self._actual.itemsize
+    
+    def _posiciones(self, clave) -> List[int]:
+        # Doble hashing: filas índices independientes a partir de un solo hash de 64 bits
+        h = int.from_bytes(hashlib.blake2b(str(clave).encode("utf-8", "surrogatepass"), digest_size=8,
+                                           key=self._semilla).digest(), "little")
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        ancho = self.ancho
+        return [fila * ancho + (h1 + fila * h2) % ancho for fila in range(self.filas)]
+    
+    def _peso_anterior(self, ahora: Optional[float]) -> float:
+        ahora = time.time() if ahora is None else ahora
+        periodo = int(ahora // self.ventana)
+        if self._periodo is None or periodo > self._periodo:
+            if self._periodo is not None and periodo == self._periodo + 1:
+                self._anterior = self._actual
+            else:
+                self._anterior = self._matriz()
+            self._actual = self._matriz()
+            self._periodo = periodo
+            self.total = 0
+        # Parte del periodo anterior que sigue dentro de la ventana
+        transcurrido = (ahora - self._periodo * self.ventana) / self.ventana
+        return min(1.0, max(0.0, 1.0 - transcurrido))
+    
+    def incrementar(self, clave, ahora: Optional[float] = None, cantidad: int = 1) -> int:
+        """Suma `cantidad` a la clave y devuelve su cuenta estimada en la ventana"""
+        peso = self._peso_anterior(ahora)
+        actual, anterior = self._actual, self._anterior
+        posiciones = self._posiciones(clave)
+        nuevo = min([actual[i] for i in posiciones]) + cantidad
+        for i in posiciones:
+            if actual[i] < nuevo:
+                actual[i] = nuevo
+        self.total += cantidad
+        return round(min([actual[i] + anterior[i] * peso for i in posiciones]))
     
-    def analyze_login_pattern(self, username: str, ip_address: str, success: bool):
-        """Analiza patrones de login para detectar ataques"""
+    def contar(self, clave, ahora: Optional[float] = None) -> int:
+        """Cuenta estimada de la clave en la ventana (nunca menor que la real)"""
+        peso = self._peso_anterior(ahora)
+        actual, anterior = self._actual, self._anterior
+        return round(min([actual[i] + anterior[i] * peso for i in self._posiciones(clave)]))
+    
+    def volcar_estado(self, escritor: _EscritorEstado):
+        escritor.json({"periodo": self._periodo, "total": self.total})
+        escritor.bloque(self._semilla)
+        escritor.bloque(self._actual.tobytes())
+        escritor.bloque(self._anterior.tobytes())
+    
+    def cargar_estado(self, lector: _LectorEstado):
+        cabecera = lector.json()
+        semilla = bytes(lector.bloque())
+        actual, anterior = lector.enteros("I"), lector.enteros("I")
+        if len(actual) != self.ancho * self.filas or len(anterior) != len(actual):
+            raise ValueError("El sketch guardado tiene otras dimensiones")
+        self._periodo, self.total = cabecera["periodo"], cabecera["total"]
+        self._semilla, self._actual, self._anterior = semilla, actual, anterior
+
+class TopKFrecuentes:
+    """Las k claves más frecuentes con memoria fija (algoritmo Space-Saving)
+
+    Guarda como mucho k claves. Cuando llega una clave nueva con el
+    resumen lleno, reemplaza a la de menor cuenta y hereda esa cuenta
+    como error. Garantías (Metwally et al.), con N = total agregado:
+    • cuenta - error <= cuenta real <= cuenta
+    • Toda clave con cuenta real > N / k está en el resumen
+    Los contadores se agrupan por valor, así que agregar es O(1).
+
+    envejecer() divide todas las cuentas entre 2: llamado una vez por
+    ventana, el resumen sigue a los atacantes actuales y no a los de hace
+    una semana (las garantías valen para las cuentas envejecidas).
+    """
+    
+    def __init__(self, k: int = 100):
+        if k < 1:
+            raise ValueError("k debe ser >= 1")
+        self.k = k
+        self.total = 0
+        self._cuentas: Dict[Any, List[int]] = {}  # clave -> [cuenta, error]
+        self._cubos: Dict[int, set] = {}          # cuenta -> claves con esa cuenta
+        self._minimo = 0
+    
+    def agregar(self, clave):
+        self.total += 1
+        entrada = self._cuentas.get(clave)
+        if entrada is not None:
+            cuenta = entrada[0]
+            cubo = self._cubos[cuenta]
+            cubo.discard(clave)
+            if not cubo:
+                del self._cubos[cuenta]
+                if self._minimo == cuenta:
+                    self._minimo = cuenta + 1
+            entrada[0] = cuenta + 1
+            self._cubos.setdefault(cuenta + 1, set()).add(clave)
+            return
         
-        # Contar intentos por IP
-        if ip_address not in self.login_attempts:
-            self.login_attempts[ip_address] = {"total": 0, "failed": 0}
+        if len(self._cuentas) < self.k:
+            self._cuentas[clave] = [1, 0]
+            self._cubos.setdefault(1, set()).add(clave)
+            self._minimo = 1
+            return
         
-        self.login_attempts[ip_address]["total"] += 1
+        # Lleno: la clave nueva reemplaza a una de las de menor cuenta
+        minimo = self._minimo
+        cubo = self._cubos[minimo]
+        del self._cuentas[cubo.pop()]
+        if not cubo:
+            del self._cubos[minimo]
+            self._minimo = minimo + 1
+        self._cuentas[clave] = [minimo + 1, minimo]
+        self._cubos.setdefault(minimo + 1, set()).add(clave)
+    
+    def envejecer(self):
+        """Divide cuentas y errores entre 2 (O(k)) y descarta las que llegan a 0"""
+        self.total //= 2
+        self._cuentas = {clave: [cuenta // 2, error // 2]
+                         for clave, (cuenta, error) in self._cuentas.items() if cuenta // 2}
+        self._cubos = {}
+        for clave, (cuenta, _) in self._cuentas.items():
+            self._cubos.setdefault(cuenta, set()).add(clave)
+        self._minimo = min(self._cubos, default=0)
+    
+    def mas_frecuentes(self, n: int = 10) -> List[tuple]:
+        """Las n claves con más cuenta: [(clave, cuenta, error)]"""
+        return [(clave, cuenta, error) for clave, (cuenta, error)
+                in heapq.nlargest(n, self._cuentas.items(), key=lambda par: par[1][0])]
+    
+    def volcar_estado(self, escritor: _EscritorEstado):
+        escritor.enteros("q", [self.total])
+        escritor.textos(list(self._cuentas))
+        escritor.enteros("q", [cuenta for cuenta, _ in self._cuentas.values()])
+        escritor.enteros("q", [error for _, error in self._cuentas.values()])
+    
+    def cargar_estado(self, lector: _LectorEstado):
+        (total,) = lector.enteros("q")
+        claves, cuentas, errores = lector.textos(), lector.enteros("q"), lector.enteros("q")
+        if not len(claves) == len(cuentas) == len(errores):
+            raise ValueError("Estado dañado")
+        self.total = total
+        self._cuentas = {clave: [cuenta, error] for clave, cuenta, error
+                         in heapq.nlargest(self.k, zip(claves, cuentas, errores), key=lambda fila: fila[1])}
+        self._cubos = {}
+        for clave, (cuenta, _) in self._cuentas.items():
+            self._cubos.setdefault(cuenta, set()).add(clave)
+        self._minimo = min(self._cubos, default=0)
+
+def _hash64(valor: str) -> int:
+    """Hash estable de 64 bits (igual en todos los procesos, para poder unir sketches)"""
+    return int.from_bytes(hashlib.blake2b(valor.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+
+class HyperLogLog:
+    """Estimador de cardinalidad (valores distintos) en memoria fija
+
+    2^precision registros de un byte (1 KB con precision=10) y error
+    típico 1.04 / sqrt(2^precision) (≈3%), sean 10 o 10 millones de
+    valores distintos. Mientras hay pocos valores (hasta 2^precision / 16)
+    se guardan sus hashes tal cual (modo disperso): la cuenta es exacta
+    justo en el rango de los umbrales de alerta, y la mayoría de fuentes,
+    con uno o dos usuarios, ocupan muy poco. La suma armónica se mantiene
+    al actualizar, así que estimar() es O(1).
+    """
+    
+    __slots__ = ("precision", "_registros", "_dispersos", "_suma", "_ceros", "_max_dispersos")
+    
+    def __init__(self, precision: int = 10):
+        if not 4 <= precision <= 16:
+            raise ValueError("La precisión debe estar entre 4 y 16")
+        self.precision = precision
+        self._registros: Optional[bytearray] = None
+        self._dispersos: Optional[set] = set()
+        self._suma = 0.0
+        self._ceros = 0
+        self._max_dispersos = (1 << precision) // 16  # ~4 KB como mucho con precision=10
+    
+    @property
+    def exacto(self) -> bool:
+        return self._dispersos is not None
+    
+    def agregar(self, valor: str):
+        self.agregar_hash(_hash64(valor))
+    
+    def agregar_hash(self, h: int):
+        if self._dispersos is not None:
+            self._dispersos.add(h)
+            if len(self._dispersos) <= self._max_dispersos:
+                return
+            dispersos, self._dispersos = self._dispersos, None
+            m = 1 << self.precision
+            self._registros = bytearray(m)
+            self._suma, self._ceros = float(m), m
+            for anterior in dispersos:
+                self._actualizar(anterior)
+            return
+        self._actualizar(h)
+    
+    def _actualizar(self, h: int):
+        bits = 64 - self.precision
+        indice = h >> bits
+        rango = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        actual = self._registros[indice]
+        if rango > actual:
+            self._registros[indice] = rango
+            self._suma += 2.0 ** -rango - 2.0 ** -actual
+            if actual == 0:
+                self._ceros -= 1
+    
+    def estimar(self) -> int:
+        if self._dispersos is not None:
+            return len(self._dispersos)
+        m = 1 << self.precision
+        estimacion = 0.7213 / (1 + 1.079 / m) * m * m / self._suma
+        if estimacion <= 2.5 * m and self._ceros:
+            estimacion = m * math.log(m / self._ceros)  # Corrección para cardinalidades bajas
+        return round(estimacion)
+    
+    def hashes(self) -> List[int]:
+        """Hashes guardados en modo disperso (vacío en modo denso)"""
+        return list(self._dispersos or ())
+    
+    def unir(self, otro: "HyperLogLog"):
+        """Suma a este sketch los valores de otro (mismo resultado que haberlos agregado aquí)"""
+        if otro.precision != self.precision:
+            raise ValueError("Solo se pueden unir sketches con la misma precisión")
+        if otro._dispersos is not None:
+            for h in otro._dispersos:
+                self.agregar_hash(h)
+            return
+        if self._dispersos is not None:
+            dispersos = self._dispersos
+            self._registros = bytearray(otro._registros)
+            self._dispersos = None
+            self._suma, self._ceros = otro._suma, otro._ceros
+            for h in dispersos:
+                self._actualizar(h)
+            return
+        for indice, rango in enumerate(otro._registros):
+            actual = self._registros[indice]
+            if rango > actual:
+                self._registros[indice] = rango
+                self._suma += 2.0 ** -rango - 2.0 ** -actual
+                if actual == 0:
+                    self._ceros -= 1
+    
+    @property
+    def memoria_bytes(self) -> int:
+        if self._dispersos is not None:
+            return sys.getsizeof(self._dispersos) + 32 * len(self._dispersos)
+        return sys.getsizeof(self._registros)
+
+class CardinalidadVentana:
+    """Valores distintos por clave (p. ej. usuarios por IP) en una ventana de tiempo
+
+    Cada clave tiene un HyperLogLog del periodo actual y otro con la unión
+    del actual y el anterior: la estimación cubre entre una y dos ventanas
+    y cuesta O(1). Las claves inactivas durante dos periodos se eliminan, y
+    como mucho se siguen `max_claves` (se expulsa la menos reciente).
+    """
+    
+    def __init__(self, ventana: float = 300.0, precision: int = 10, max_claves: int = 100000):
+        self.ventana = ventana
+        self.precision = precision
+        self.max_claves = max_claves
+        # clave -> [periodo, hll del periodo, hll actual ∪ anterior], de menos a más reciente
+        self._claves: "OrderedDict[Any, list]" = OrderedDict()
+    
+    def agregar(self, clave, valor: str, ahora: Optional[float] = None) -> int:
+        """Registra `valor` para la clave y devuelve cuántos distintos lleva en la ventana"""
+        return self.agregar_hash(clave, _hash64(valor), ahora)
+    
+    def agregar_hash(self, clave, h: int, ahora: Optional[float] = None) -> int:
+        """Como agregar(), con el valor ya hasheado (para reutilizar el hash en varias claves)"""
+        periodo = int((time.time() if ahora is None else ahora) // self.ventana)
+        entrada = self._claves.get(clave)
+        if entrada is None:
+            entrada = self._claves[clave] = [periodo, HyperLogLog(self.precision), HyperLogLog(self.precision)]
+        else:
+            self._claves.move_to_end(clave)
+            if periodo == entrada[0] + 1:
+                # Nuevo periodo: el actual pasa a ser el anterior
+                union = HyperLogLog(self.precision)
+                union.unir(entrada[1])
+                entrada[:] = [periodo, HyperLogLog(self.precision), union]
+            elif periodo > entrada[0] + 1:
+                entrada[:] = [periodo, HyperLogLog(self.precision), HyperLogLog(self.precision)]
+        entrada[1].agregar_hash(h)
+        entrada[2].agregar_hash(h)
+        self._desalojar(periodo)
+        return entrada[2].estimar()
+    
+    def _desalojar(self, periodo: int):
+        claves = self._claves
+        while claves:
+            clave = next(iter(claves))
+            if len(claves) <= self.max_claves and claves[clave][0] >= periodo - 1:
+                break
+            del claves[clave]
+    
+    def exacto(self, clave) -> bool:
+        entrada = self._claves.get(clave)
+        return entrada is None or entrada[2].exacto
+    
+    def __len__(self) -> int:
+        return len(self._claves)
+    
+    def volcar_estado(self, escritor: _EscritorEstado):
+        """Añade las claves y sus HyperLogLog al estado binario (por columnas)"""
+        periodos, tamanos, hashes = array("q"), array("q"), array("Q")
+        registros, sumas, ceros = [], array("d"), array("I")
+        for periodo, *sketches in self._claves.values():
+            periodos.append(periodo)
+            for hll in sketches:
+                if hll._dispersos is not None:
+                    tamanos.append(len(hll._dispersos))  # Disperso: sus hashes
+                    hashes.extend(hll._dispersos)
+                else:
+                    tamanos.append(-1)                   # Denso: registros, suma y ceros
+                    registros.append(hll._registros)
+                    sumas.append(hll._suma)
+                    ceros.append(hll._ceros)
+        escritor.textos(list(self._claves))
+        for columna in (periodos, tamanos, hashes):
+            escritor.bloque(columna.tobytes())
+        escritor.bloque(b"".join(registros))
+        escritor.bloque(sumas.tobytes())
+        escritor.bloque(ceros.tobytes())
+    
+    def cargar_estado(self, lector: _LectorEstado):
+        claves = lector.textos()
+        periodos, tamanos, hashes = lector.enteros("q"), lector.enteros("q"), lector.enteros("Q")
+        registros = bytes(lector.bloque())
+        sumas, ceros = lector.enteros("d"), lector.enteros("I")
+        m = 1 << self.precision
+        if (len(periodos) != len(claves) or len(tamanos) != 2 * len(claves)
+                or len(registros) != m * len(sumas) or len(sumas) != len(ceros)):
+            raise ValueError("Estado dañado")
+        posicion = denso = 0
+        entradas: "OrderedDict[Any, list]" = OrderedDict()
+        for numero, (clave, periodo) in enumerate(zip(claves, periodos)):
+            entrada = [periodo]
+            for tamano in tamanos[2 * numero:2 * numero + 2]:
+                hll = HyperLogLog(self.precision)
+                if tamano >= 0:
+                    hll._dispersos = set(hashes[posicion:posicion + tamano])
+                    posicion += tamano
+                else:
+                    hll._dispersos = None
+                    hll._registros = bytearray(registros[denso * m:(denso + 1) * m])
+                    hll._suma, hll._ceros = sumas[denso], ceros[denso]
+                    denso += 1
+                entrada.append(hll)
+            entradas[clave] = entrada
+        if posicion != len(hashes):
+            raise ValueError("Estado dañado")
+        self._claves = entradas
+
+@functools.lru_cache(maxsize=65536)
+def _direccion_ip(ip_address: str):
+    """IPv4Address/IPv6Address de un texto, o None; cacheado porque los atacantes repiten IPs"""
+    try:
+        ip = ipaddress.ip_address(ip_address)
+    except ValueError:
+        return None
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped  # ::ffff:1.2.3.4 cuenta en su subred IPv4
+    return ip
+
+@functools.lru_cache(maxsize=4096)
+def _texto_subred(version: int, direccion: int, longitud: int) -> str:
+    red = ipaddress.IPv4Network if version == 4 else ipaddress.IPv6Network
+    return str(red((direccion, longitud)))
+
+def subred(ip_address: str) -> Optional[str]:
+    """/24 de una IPv4 o /64 de una IPv6, como en TriePrefijos (None si no es una IP)"""
+    ip = _direccion_ip(ip_address)
+    if ip is None:
+        return None
+    resto = ip.max_prefixlen - (24 if ip.version == 4 else 64)
+    return _texto_subred(ip.version, int(ip) >> resto << resto, ip.max_prefixlen - resto)
+
+class _NodoPrefijo:
+    """Nodo de TriePrefijos: un prefijo y los fallos de todo lo que cuelga de él"""
+    
+    __slots__ = ("prefijo", "longitud", "hijos", "total", "cubos")
+    
+    def __init__(self, prefijo: int, longitud: int):
+        self.prefijo = prefijo      # Los `longitud` bits altos de la dirección
+        self.longitud = longitud
+        self.hijos: List[Optional["_NodoPrefijo"]] = [None, None]
+        self.total = 0              # Fallos dentro de la ventana
+        self.cubos = deque()        # [cubo, cuenta], como en ContadorVentana
+
+class TriePrefijos:
+    """Fallos agregados por subred en un trie radix comprimido (Patricia)
+
+    Cada fallo se inserta bit a bit hasta el prefijo más largo configurado
+    (por defecto /24 en IPv4 y /64 en IPv6) y suma uno en todos los nodos
+    del camino: O(longitud del prefijo) por evento. Los tramos sin
+    ramificaciones se comprimen en un solo nodo, así que hay como mucho
+    dos nodos por subred activa. Un prefijo configurado que cae dentro de
+    un tramo comprimido (p. ej. /16 con una sola /24 debajo) tiene la
+    misma cuenta que el nodo que lo cubre.
+
+    Las cuentas usan ventana deslizante por cubos (como ContadorVentana) y
+    una vez por ventana se podan las ramas sin actividad.
+    """
+    
+    def __init__(self, umbrales: Dict[int, Dict[int, int]], ventana: float = 300.0, resolucion: float = 10.0):
+        # umbrales: versión de IP -> {longitud de prefijo: fallos para alertar}
+        self.ventana = ventana
+        self.resolucion = resolucion
+        self._cubos = max(1, round(ventana / resolucion))
+        self._cubo_actual = 0
+        self._ultima_poda = 0
+        self._umbrales = {version: sorted(por_longitud.items()) for version, por_longitud in umbrales.items()}
+        self._longitud_max = {version: max(por_longitud) for version, por_longitud in umbrales.items()}
+        # Bit L encendido si el prefijo /L está configurado: comprobar un tramo es una operación
+        self._mascaras = {version: sum(1 << longitud for longitud in por_longitud)
+                          for version, por_longitud in umbrales.items()}
+        self._raices = {version: _NodoPrefijo(0, 0) for version in umbrales}
+    
+    def _cubo(self, ahora: Optional[float]) -> int:
+        cubo = int((time.time() if ahora is None else ahora) // self.resolucion)
+        if cubo > self._cubo_actual:
+            self._cubo_actual = cubo
+        return self._cubo_actual
+    
+    def _expirar(self, nodo: _NodoPrefijo, cubo: int):
+        cubos = nodo.cubos
+        limite = cubo - self._cubos
+        while cubos and cubos[0][0] <= limite:
+            nodo.total -= cubos.popleft()[1]
+    
+    def registrar(self, ip_address: str, ahora: Optional[float] = None,
+                  cantidad: int = 1) -> List[Tuple[str, int]]:
+        """Suma `cantidad` fallos de la IP; devuelve las subredes que pasan su umbral [(subred, fallos)]"""
+        ip = _direccion_ip(ip_address)
+        if ip is None or ip.version not in self._raices:
+            return []
+        cubo = self._cubo(ahora)
+        if cubo - self._ultima_poda >= self._cubos:
+            self.podar()
         
-        if not success:
-            self.login_attempts[ip_address]["failed"] += 1
+        version, bits = ip.version, ip.max_prefixlen
+        longitud_max = self._longitud_max[version]
+        umbrales = self._umbrales[version]
+        mascara = self._mascaras[version]
+        limite = cubo - self._cubos
+        clave = int(ip) >> (bits - longitud_max)
+        superadas = []
+        nodo = self._raices[version]
+        while nodo.longitud < longitud_max:
+            rama = (clave >> (longitud_max - nodo.longitud - 1)) & 1
+            hijo = nodo.hijos[rama]
+            if hijo is None:
+                hijo = nodo.hijos[rama] = _NodoPrefijo(clave, longitud_max)
+            else:
+                diferencia = (clave >> (longitud_max - hijo.longitud)) ^ hijo.prefijo
+                comun = hijo.longitud - diferencia.bit_length()
+                if comun < hijo.longitud:
+                    # La IP se separa a mitad del tramo comprimido: partirlo en `comun`
+                    intermedio = _NodoPrefijo(clave >> (longitud_max - comun), comun)
+                    intermedio.total = hijo.total
+                    intermedio.cubos = deque([cubo_, cuenta] for cubo_, cuenta in hijo.cubos)
+                    intermedio.hijos[(hijo.prefijo >> (hijo.longitud - comun - 1)) & 1] = hijo
+                    hijo = nodo.hijos[rama] = intermedio
             
-            # Contar fallos por usuario
-            if username not in self.failed_logins:
-                self.failed_logins[username] = 0
-            self.failed_logins[username] += 1
+            # Sumar el fallo en la ventana del nodo (el bucle caliente: sin llamadas)
+            cubos = hijo.cubos
+            while cubos and cubos[0][0] <= limite:
+                hijo.total -= cubos.popleft()[1]
+            if cubos and cubos[-1][0] == cubo:
+                cubos[-1][1] += cantidad
+            else:
+                cubos.append([cubo, cantidad])
+            hijo.total += cantidad
+            
+            # Prefijos configurados que cubre este nodo (los del tramo desde su padre)
+            if mascara & ((2 << hijo.longitud) - (2 << nodo.longitud)):
+                for longitud, umbral in umbrales:
+                    if nodo.longitud < longitud <= hijo.longitud and hijo.total >= umbral:
+                        red = _texto_subred(version, (clave >> (longitud_max - longitud)) << (bits - longitud), longitud)
+                        superadas.append((red, hijo.total))
+            nodo = hijo
+        return superadas
+    
+    def contar(self, subred_texto: str, ahora: Optional[float] = None) -> int:
+        """Fallos en la ventana de una subred (p. ej. "10.0.0.0/24")"""
+        red = ipaddress.ip_network(subred_texto, strict=False)
+        if red.version not in self._raices:
+            return 0
+        cubo = self._cubo(ahora)
+        longitud = red.prefixlen
+        objetivo = int(red.network_address) >> (red.max_prefixlen - longitud) if longitud else 0
+        nodo = self._raices[red.version]
+        while nodo.longitud < longitud:
+            hijo = nodo.hijos[(objetivo >> (longitud - nodo.longitud - 1)) & 1]
+            if hijo is None:
+                return 0
+            # El primer nodo que llega a `longitud` cubre la subred si coinciden los bits
+            corte = min(hijo.longitud, longitud)
+            if (hijo.prefijo >> (hijo.longitud - corte)) != (objetivo >> (longitud - corte)):
+                return 0
+            nodo = hijo
+        if nodo.longitud == 0:
+            return sum(self._total(hijo, cubo) for hijo in nodo.hijos if hijo)
+        return self._total(nodo, cubo)
+    
+    def _total(self, nodo: _NodoPrefijo, cubo: int) -> int:
+        self._expirar(nodo, cubo)
+        return nodo.total
+    
+    def podar(self):
+        """Quita las ramas sin fallos en la ventana y vuelve a comprimir los tramos"""
+        cubo = self._cubo_actual
+        self._ultima_poda = cubo
+        for raiz in self._raices.values():
+            for rama in (0, 1):
+                if raiz.hijos[rama] is not None:
+                    raiz.hijos[rama] = self._podar(raiz.hijos[rama], cubo)
+    
+    def _podar(self, nodo: _NodoPrefijo, cubo: int) -> Optional[_NodoPrefijo]:
+        self._expirar(nodo, cubo)
+        if nodo.total == 0:
+            return None  # Los hijos nunca cuentan más que el padre
+        for rama in (0, 1):
+            if nodo.hijos[rama] is not None:
+                nodo.hijos[rama] = self._podar(nodo.hijos[rama], cubo)
+        vivos = [hijo for hijo in nodo.hijos if hijo is not None]
+        if len(vivos) == 1:
+            return vivos[0]  # Un nodo interno con un solo hijo cuenta lo mismo que él
+        return nodo
+    
+    def volcar_estado(self, escritor: _EscritorEstado):
+        """Añade el trie al estado binario: nodos en preorden, sus cubos relativos al actual"""
+        cubo = self._cubo_actual
+        longitudes, hijos, altos, bajos = array("B"), array("B"), array("Q"), array("Q")
+        tamanos, edades, cuentas = array("I"), array("I"), array("I")
+        pendientes = list(reversed(self._raices.values()))
+        while pendientes:
+            nodo = pendientes.pop()
+            longitudes.append(nodo.longitud)
+            hijos.append((nodo.hijos[0] is not None) | (nodo.hijos[1] is not None) << 1)
+            altos.append(nodo.prefijo >> 64)
+            bajos.append(nodo.prefijo & 0xFFFFFFFFFFFFFFFF)
+            tamanos.append(len(nodo.cubos))
+            for cubo_nodo, cuenta in nodo.cubos:
+                edades.append(cubo - cubo_nodo)
+                cuentas.append(cuenta)
+            pendientes.extend(hijo for hijo in reversed(nodo.hijos) if hijo is not None)
+        escritor.json({"versiones": list(self._raices), "cubo": cubo, "ultima_poda": self._ultima_poda})
+        for columna in (longitudes, hijos, altos, bajos, tamanos, edades, cuentas):
+            escritor.bloque(columna.tobytes())
+    
+    def cargar_estado(self, lector: _LectorEstado):
+        cabecera = lector.json()
+        longitudes, hijos = lector.enteros("B"), lector.enteros("B")
+        altos, bajos = lector.enteros("Q"), lector.enteros("Q")
+        tamanos, edades, cuentas = lector.enteros("I"), lector.enteros("I"), lector.enteros("I")
+        if cabecera["versiones"] != list(self._raices):
+            raise ValueError("El trie guardado tiene otras versiones de IP")
+        if not len(longitudes) == len(hijos) == len(altos) == len(bajos) == len(tamanos):
+            raise ValueError("Estado dañado")
+        if sum(tamanos) != len(edades) or len(edades) != len(cuentas):
+            raise ValueError("Estado dañado")
+        cubo = cabecera["cubo"]
+        pares = zip(edades, cuentas)
+        siguiente = 0
+        
+        def leer_nodo() -> _NodoPrefijo:
+            # Recursivo: la profundidad está acotada por la longitud del prefijo (<= 128)
+            nonlocal siguiente
+            if siguiente >= len(longitudes):
+                raise ValueError("Estado dañado")
+            i = siguiente
+            siguiente += 1
+            nodo = _NodoPrefijo((altos[i] << 64) | bajos[i], longitudes[i])
+            nodo.cubos = deque([cubo - edad, cuenta] for edad, cuenta in islice(pares, tamanos[i]))
+            nodo.total = sum(cuenta for _, cuenta in nodo.cubos)
+            for rama in (0, 1):
+                if hijos[i] >> rama & 1:
+                    nodo.hijos[rama] = leer_nodo()
+            return nodo
+        
+        raices = {version: leer_nodo() for version in self._raices}
+        if siguiente != len(longitudes):
+            raise ValueError("Estado dañado")
+        self._raices = raices
+        self._cubo_actual, self._ultima_poda = cubo, cabecera["ultima_poda"]
+    
+    def __len__(self) -> int:
+        """Nodos del trie (sin contar las raíces)"""
+        pendientes = [hijo for raiz in self._raices.values() for hijo in raiz.hijos if hijo]
+        nodos = 0
+        while pendientes:
+            nodo = pendientes.pop()
+            nodos += 1
+            pendientes.extend(hijo for hijo in nodo.hijos if hijo)
+        return nodos
+
+# "exacto": un contador por clave (ContadorVentana)
+# "probabilistico": memoria fija (Count-Min Sketch + Space-Saving)
+MODOS_DETECCION = ("exacto", "probabilistico")
+
+# Partes de analyze_login_pattern según la clave que agrupa sus contadores:
+# IP, usuario o subred. Un despliegue fragmentado reparte cada parte al
+# proceso dueño de su clave (ver modules/detector_fragmentado.py)
+PARTES_DETECCION = ("ip", "usuario", "subred")
+
+class AttackDetector:
+    """Detector de patrones de ataque en logs
+
+    Los fallos se cuentan sobre una ventana deslizante (por defecto los
+    últimos 5 minutos, ver DETECTION_CONFIG): una IP que falló hace un mes
+    ya no cuenta, y las IPs y usuarios inactivos se olvidan solos.
+
+    Con modo="probabilistico" los contadores son Count-Min Sketches de
+    memoria fija y las IPs que pasan el umbral se siguen con Space-Saving
+    para worst_offenders(): pensado para floods de botnets con millones de
+    IPs distintas, a cambio de cuentas que pueden sobreestimar (ver
+    ContadorVentanaAproximado).
+    """
+    
+    def __init__(self, ventana: float = DETECTION_CONFIG["window_seconds"],
+                 resolucion: float = DETECTION_CONFIG["bucket_seconds"],
+                 umbral_ip: int = DETECTION_CONFIG["ip_failure_threshold"],
+                 umbral_usuario: int = DETECTION_CONFIG["user_failure_threshold"],
+                 modo: str = DETECTION_CONFIG["mode"],
+                 ancho_sketch: int = DETECTION_CONFIG["sketch_width"],
+                 filas_sketch: int = DETECTION_CONFIG["sketch_depth"],
+                 top_k: int = DETECTION_CONFIG["top_k"],
+                 umbral_usuarios_ip: int = DETECTION_CONFIG["ip_distinct_users_threshold"],
+                 umbral_usuarios_subred: int = DETECTION_CONFIG["subnet_distinct_users_threshold"],
+                 precision_hll: int = DETECTION_CONFIG["hll_precision"],
+                 max_fuentes: int = DETECTION_CONFIG["max_tracked_sources"],
+                 umbrales_prefijo: Optional[Dict[int, Dict[int, int]]] = None):
+        if modo not in MODOS_DETECCION:
+            raise ValueError(f"Modo de detección desconocido: {modo}")
+        self.modo = modo
+        if modo == "probabilistico":
+            crear = lambda: ContadorVentanaAproximado(ventana, ancho_sketch, filas_sketch)
+            self.peores_ips = TopKFrecuentes(top_k)
+        else:
+            crear = lambda: ContadorVentana(ventana, resolucion)
+            self.peores_ips = None
+        self.login_attempts = crear()  # Intentos por IP
+        self.failed_by_ip = crear()    # Fallos por IP
+        self.failed_logins = crear()   # Fallos por usuario
+        # Usuarios distintos que fallan desde una IP / subred (credential stuffing)
+        self.usuarios_por_ip = CardinalidadVentana(ventana, precision_hll, max_fuentes)
+        self.usuarios_por_subred = CardinalidadVentana(ventana, precision_hll, max_fuentes)
+        # Fallos agregados por subred (fuerza bruta distribuida): {versión IP: {prefijo: umbral}}
+        if umbrales_prefijo is None:
+            umbrales_prefijo = {4: DETECTION_CONFIG["ipv4_prefix_thresholds"],
+                                6: DETECTION_CONFIG["ipv6_prefix_thresholds"]}
+        self.fallos_por_prefijo = TriePrefijos(umbrales_prefijo, ventana, resolucion)
+        self.umbral_ip = umbral_ip
+        self.umbral_usuario = umbral_usuario
+        self.umbral_usuarios_ip = umbral_usuarios_ip
+        self.umbral_usuarios_subred = umbral_usuarios_subred
+        self.ventana = ventana
+        self._periodo_top = None
+        self._ventana_texto = f"{ventana / 60:g} min" if ventana >= 60 else f"{ventana:g} s"
+        self._aprox = "~" if modo == "probabilistico" else ""
+    
+    def analyze_login_pattern(self, username: str, ip_address: str, success: bool,
+                              timestamp: Optional[float] = None, partes=PARTES_DETECCION,
+                              cantidad: int = 1):
+        """Analiza patrones de login para detectar ataques
+
+        `timestamp` (segundos epoch) es el momento del evento; por defecto
+        ahora. Al procesar logs se pasa el del evento para que la ventana
+        refleje cuándo ocurrió, no cuándo se leyó. `partes` limita el
+        análisis a los contadores de algunas claves (ver PARTES_DETECCION).
+        `cantidad` > 1 cuenta el evento como varios idénticos (la línea
+        resumen de una ráfaga, ver AgregadorRafagas).
+        """
+        
+        por_ip, por_usuario, por_subred = ("ip" in partes, "usuario" in partes, "subred" in partes)
+        fallos_ip = fallos_usuario = usuarios_ip = usuarios_subred = 0
+        subredes = []
+        red = subred(ip_address) if por_subred else None
+        
+        # Contar intentos por IP
+        if por_ip:
+            self.login_attempts.incrementar(ip_address, timestamp, cantidad)
+        
+        if success:
+            # Un éxito tras muchos fallos también alerta: el ataque pudo funcionar
+            if por_ip:
+                fallos_ip = self.failed_by_ip.contar(ip_address, timestamp)
+            if por_usuario:
+                fallos_usuario = self.failed_logins.contar(username, timestamp)
+        else:
+            # Contar fallos por IP y por usuario
+            h = _hash64(username) if por_ip or por_subred else None
+            if por_ip:
+                fallos_ip = self.failed_by_ip.incrementar(ip_address, timestamp, cantidad)
+                if self.peores_ips is not None and fallos_ip >= self.umbral_ip:
+                    # Solo las IPs sospechosas: las miles de IPs de un solo fallo de
+                    # una botnet expulsarían a los atacantes de verdad del resumen
+                    self._agregar_top(ip_address, timestamp)
+                usuarios_ip = self.usuarios_por_ip.agregar_hash(ip_address, h, timestamp)
+            if por_usuario:
+                fallos_usuario = self.failed_logins.incrementar(username, timestamp, cantidad)
+            if por_subred:
+                if red is not None:
+                    usuarios_subred = self.usuarios_por_subred.agregar_hash(red, h, timestamp)
+                subredes = self.fallos_por_prefijo.registrar(ip_address, timestamp, cantidad)
         
         # Detectar patrones sospechosos
         alerts = []
         
         # Alerta: Muchos fallos desde una IP
-        if self.login_attempts[ip_address]["failed"] >= 5:
-            alerts.append(f"🚨 BRUTE FORCE: IP {ip_address} tiene {self.login_attempts[ip_address]['failed']} intentos fallidos")
+        if fallos_ip >= self.umbral_ip:
+            alerts.append(f"🚨 BRUTE FORCE: IP {ip_address} tiene {self._aprox}{fallos_ip} intentos fallidos "
+                          f"en los últimos {self._ventana_texto}")
         
         # Alerta: Muchos fallos para un usuario
-        if username in self.failed_logins and self.failed_logins[username] >= 3:
-            alerts.append(f"🚨 TARGETED ATTACK: Usuario '{username}' tiene {self.failed_logins[username]} intentos fallidos")
+        if fallos_usuario >= self.umbral_usuario:
+            alerts.append(f"🚨 TARGETED ATTACK: Usuario '{username}' tiene {self._aprox}{fallos_usuario} intentos fallidos "
+                          f"en los últimos {self._ventana_texto}")
+        
+        # Alerta: Una IP o subred probando muchos usuarios distintos
+        if usuarios_ip >= self.umbral_usuarios_ip:
+            aprox = "" if self.usuarios_por_ip.exacto(ip_address) else "~"
+            alerts.append(f"🚨 CREDENTIAL STUFFING: IP {ip_address} probó {aprox}{usuarios_ip} usuarios distintos "
+                          f"en los últimos {self._ventana_texto}")
+        if usuarios_subred >= self.umbral_usuarios_subred:
+            aprox = "" if self.usuarios_por_subred.exacto(red) else "~"
+            alerts.append(f"🚨 CREDENTIAL STUFFING: Subred {red} probó {aprox}{usuarios_subred} usuarios distintos "
+                          f"en los últimos {self._ventana_texto}")
+        
+        # Alerta: Muchos fallos repartidos entre las IPs de una subred
+        for prefijo, fallos in subredes:
+            alerts.append(f"🚨 DISTRIBUTED BRUTE FORCE: Subred {prefijo} tiene {fallos} intentos fallidos "
+                          f"en los últimos {self._ventana_texto}")
         
         return alerts
+    
+    def _agregar_top(self, ip_address: str, timestamp: Optional[float]):
+        # Una vez por ventana se envejece el resumen para que siga a los atacantes actuales
+        periodo = int((time.time() if timestamp is None else timestamp) // self.ventana)
+        if self._periodo_top is not None and periodo > self._periodo_top:
+            self.peores_ips.envejecer()
+        if self._periodo_top is None or periodo > self._periodo_top:
+            self._periodo_top = periodo
+        self.peores_ips.agregar(ip_address)
+    
+    def worst_offenders(self, n: int = 10, ahora: Optional[float] = None) -> List[tuple]:
+        """Las n IPs con más fallos en la ventana: [(ip, fallos, error)]
+
+        En modo exacto el error es 0. En modo probabilístico los candidatos
+        salen de Space-Saving y se ordenan por su cuenta del sketch; el error
+        es la cota ε·N (los fallos reales están entre fallos - error y fallos).
+        """
+        if self.peores_ips is None:
+            return [(ip, fallos, 0) for ip, fallos in self.failed_by_ip.mas_frecuentes(n, ahora)]
+        sketch = self.failed_by_ip
+        cota = math.ceil(sketch.epsilon * sketch.total)
+        candidatos = ((ip, sketch.contar(ip, ahora)) for ip, _, _ in self.peores_ips.mas_frecuentes(self.peores_ips.k))
+        return [(ip, fallos, cota) for ip, fallos in heapq.nlargest(n, candidatos, key=lambda par: par[1])]
+    
+    FORMATO_ESTADO = b"ATKDET01"  # Cambia si cambia el formato de volcar_estado()
+    
+    def _estructuras(self) -> list:
+        estructuras = [self.login_attempts, self.failed_by_ip, self.failed_logins,
+                       self.usuarios_por_ip, self.usuarios_por_subred, self.fallos_por_prefijo]
+        if self.peores_ips is not None:
+            estructuras.append(self.peores_ips)
+        return estructuras
+    
+    def _forma(self) -> Dict[str, Any]:
+        # Lo que determina la forma del estado; los umbrales no (se pueden cambiar entre reinicios)
+        forma = {"modo": self.modo, "ventana": self.ventana,
+                 "resolucion": self.fallos_por_prefijo.resolucion,
+                 "precision_hll": self.usuarios_por_ip.precision,
+                 "prefijos": {str(version): longitud for version, longitud
+                              in self.fallos_por_prefijo._longitud_max.items()}}
+        if self.modo == "probabilistico":
+            forma.update(ancho_sketch=self.failed_by_ip.ancho, filas_sketch=self.failed_by_ip.filas)
+        return forma
+    
+    def volcar_estado(self) -> bytes:
+        """Todos los contadores del detector en binario compacto (para reinicios en caliente)
+
+        Ver modules/instantaneas_detector.py, que lo guarda periódicamente
+        junto con la posición del log hasta la que llega.
+        """
+        escritor = _EscritorEstado()
+        escritor.bloque(self.FORMATO_ESTADO)
+        escritor.json({"forma": self._forma(), "periodo_top": self._periodo_top})
+        for estructura in self._estructuras():
+            estructura.volcar_estado(escritor)
+        return escritor.a_bytes()
+    
+    def cargar_estado(self, datos: bytes):
+        """Restaura lo guardado por volcar_estado()
+
+        Lanza ValueError si el estado está dañado o se guardó con otra
+        ventana, resolución o dimensiones de sketch. En ese caso el detector
+        puede quedar a medio restaurar: hay que descartarlo y crear otro.
+        """
+        lector = _LectorEstado(datos)
+        # Se crean millones de objetos que viven para siempre: sin pausar el
+        # recolector, este recorrería el heap entero una y otra vez
+        recolector = gc.isenabled()
+        gc.disable()
+        try:
+            if bytes(lector.bloque()) != self.FORMATO_ESTADO:
+                raise ValueError("No es un estado de AttackDetector")
+            cabecera = lector.json()
+            if cabecera["forma"] != self._forma():
+                raise ValueError(f"Estado guardado con otra configuración: {cabecera['forma']}")
+            for estructura in self._estructuras():
+                estructura.cargar_estado(lector)
+            if not lector.terminado:
+                raise ValueError("Estado dañado")
+        except (KeyError, TypeError, IndexError, struct.error) as e:
+            raise ValueError(f"Estado dañado: {e}") from e
+        finally:
+            if recolector:
+                gc.enable()
+        self._periodo_top = cabecera["periodo_top"]
 
 def demostrar_deteccion_ataques():
     """Demuestra detección automática de ataques"""
@@ -304,6 +2302,9 @@ def demostrar_deteccion_ataques():
         ("juan_perez", "192.168.1.100", True)
     ]
     
+    # Ataque distribuido: 20 IPs de la misma /24, cada una por debajo del umbral por IP
+    ataques += [(f"empleado{i}", f"203.0.113.{i}", False) for i in range(1, 21)]
+    
     for username, ip, success in ataques:
         # Logear el evento
         logger.log_login_attempt(username, success, ip)
@@ -0,0 +1,38 @@
+"""
+🧩 Módulos reutilizables - Tech Security Basics
+===============================================
+
+Herramientas que llevan las clases de los ejemplos (ValidadorSeguro,
+SecurityLogger, AttackDetector) a volúmenes de datos reales.
+
+Ejecútalas desde la raíz del proyecto, por ejemplo:
+    python -m modules.validacion_masiva datos.csv
+"""
+
+import importlib.util
+import sys
+
+from config import EXAMPLES_DIR
+
+
+def cargar_ejemplo(nombre: str):
+    """Carga un ejemplo numerado (p. ej. "02_input_validation") como módulo
+
+    Los nombres de los ejemplos empiezan por un número y no se pueden
+    importar con `import`, así que los cargamos igual que demo.py. El
+    módulo se registra en sys.modules para que sus clases se puedan
+    usar con pickle (pools de procesos).
+    """
+    nombre_modulo = f"examples_{nombre}"
+    if nombre_modulo in sys.modules:
+        return sys.modules[nombre_modulo]
+
+    spec = importlib.util.spec_from_file_location(nombre_modulo, EXAMPLES_DIR / f"{nombre}.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[nombre_modulo] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[nombre_modulo]
+        raise
+    return module
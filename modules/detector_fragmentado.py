@@ -0,0 +1,362 @@
+"""
+🧩 AttackDetector fragmentado en varios procesos
+================================================
+
+Un AttackDetector usa un solo núcleo. DetectorFragmentado reparte el
+trabajo entre N procesos, cada uno con su propio detector:
+
+• Cada evento tiene tres partes (ver PARTES_DETECCION): los contadores
+  por IP, por usuario y por subred. Cada parte va al fragmento dueño de
+  su clave según un anillo de hash consistente, así que todos los
+  eventos de una IP (o de un usuario, o de una subred) acaban en el mismo
+  fragmento y sus alertas son las mismas que con un solo detector. La
+  clave de subred es el prefijo más corto configurado (p. ej. /16), que
+  contiene las /24 de CREDENTIAL STUFFING y todos los prefijos del trie
+• Las consultas globales (worst_offenders) se responden uniendo los
+  resúmenes que cada fragmento envía periódicamente: como cada IP vive
+  en un solo fragmento, el top-n global sale de los top-n de cada uno
+• Cambiar el número de fragmentos solo mueve ~1/N de las claves (nodos
+  virtuales en el anillo). Las claves movidas no pierden su historia:
+  durante un horizonte (dos ventanas) el dueño anterior las sigue
+  procesando y alertando mientras el nuevo las procesa en silencio;
+  pasado ese tiempo el nuevo tiene la ventana completa y toma el relevo
+
+Los eventos se envían por lotes. Las alertas de distintos fragmentos no
+salen en orden entre sí: cada una lleva el timestamp de su evento.
+
+Uso:
+    with DetectorFragmentado(fragmentos=4) as detector:
+        for ts, alerta in detector.procesar(eventos):
+            ...
+        alertas_finales = detector.cerrar()
+"""
+
+import bisect
+import heapq
+import multiprocessing
+import os
+import queue
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import DETECTION_CONFIG
+from modules import cargar_ejemplo
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+AttackDetector = registro_seguridad.AttackDetector
+PARTES_DETECCION = registro_seguridad.PARTES_DETECCION
+_direccion_ip = registro_seguridad._direccion_ip
+_hash64 = registro_seguridad._hash64
+
+NODOS_VIRTUALES = 128     # Puntos de cada fragmento en el anillo
+TAMANO_LOTE = 2000        # Eventos por mensaje a un fragmento
+INTERVALO_RESUMEN = 1.0   # Segundos entre resúmenes de cada fragmento
+MAX_CACHE_RUTAS = 1 << 20 # Claves con su fragmento ya calculado
+
+# (username, ip_address, success, timestamp)
+EventoLogin = Tuple[str, str, bool, float]
+# (fragmento que alerta, fragmento que procesa en silencio o None)
+Ruta = Tuple[int, Optional[int]]
+# (username, ip_address, success, timestamp, partes que alertan, partes en silencio)
+Mensaje = Tuple[str, str, bool, float, Tuple[str, ...], Tuple[str, ...]]
+
+class AnilloConsistente:
+    """Anillo de hash consistente: clave -> nodo, moviendo pocas claves al añadir o quitar nodos"""
+
+    def __init__(self, nodos: Iterable[int] = (), virtuales: int = NODOS_VIRTUALES):
+        self.virtuales = virtuales
+        self._puntos: List[int] = []
+        self._duenos: List[int] = []
+        for nodo in nodos:
+            self.agregar(nodo)
+
+    def agregar(self, nodo: int):
+        for replica in range(self.virtuales):
+            punto = _hash64(f"{nodo}#{replica}")
+            i = bisect.bisect_left(self._puntos, punto)
+            self._puntos.insert(i, punto)
+            self._duenos.insert(i, nodo)
+
+    def quitar(self, nodo: int):
+        conservar = [i for i, dueno in enumerate(self._duenos) if dueno != nodo]
+        self._puntos = [self._puntos[i] for i in conservar]
+        self._duenos = [self._duenos[i] for i in conservar]
+
+    @property
+    def nodos(self) -> List[int]:
+        return sorted(set(self._duenos))
+
+    def nodo(self, clave: str) -> int:
+        """Nodo dueño de la clave: el primer punto del anillo a partir de su hash"""
+        i = bisect.bisect_right(self._puntos, _hash64(clave))
+        return self._duenos[i if i < len(self._puntos) else 0]
+
+    def copia(self) -> "AnilloConsistente":
+        anillo = AnilloConsistente(virtuales=self.virtuales)
+        anillo._puntos, anillo._duenos = list(self._puntos), list(self._duenos)
+        return anillo
+
+def _fragmento(numero: int, opciones: Dict[str, Any], entrada: multiprocessing.Queue,
+               salida: multiprocessing.Queue, intervalo_resumen: float):
+    """Proceso de un fragmento: analiza sus mensajes y devuelve alertas y resúmenes"""
+    detector = AttackDetector(**opciones)
+    analizar = detector.analyze_login_pattern
+    eventos = 0
+    ultimo_resumen = time.monotonic()
+
+    def resumen(ahora: float) -> Dict[str, Any]:
+        # `ahora` es el último evento de todo el despliegue: un fragmento poco activo también envejece
+        return {"eventos": eventos, "peores": detector.worst_offenders(DETECTION_CONFIG["top_k"], ahora),
+                "ips": len(detector.failed_by_ip), "usuarios": len(detector.failed_logins)}
+
+    while True:
+        ahora, lote = entrada.get()
+        if lote is None:
+            salida.put((numero, 0, [], resumen(ahora), True))
+            return
+        alertas = []
+        for username, ip_address, success, timestamp, partes, silencio in lote:
+            if partes:
+                for alerta in analizar(username, ip_address, success, timestamp, partes):
+                    alertas.append((timestamp, alerta))
+            if silencio:
+                analizar(username, ip_address, success, timestamp, silencio)
+        eventos += len(lote)
+        enviar_resumen = None
+        if time.monotonic() - ultimo_resumen >= intervalo_resumen:
+            enviar_resumen, ultimo_resumen = resumen(ahora), time.monotonic()
+        salida.put((numero, len(lote), alertas, enviar_resumen, False))
+
+class DetectorFragmentado:
+    """AttackDetector repartido entre procesos por hash consistente de IP, usuario y subred"""
+
+    def __init__(self, fragmentos: int = os.cpu_count() or 1, opciones: Optional[Dict[str, Any]] = None,
+                 tamano_lote: int = TAMANO_LOTE, intervalo_resumen: float = INTERVALO_RESUMEN):
+        if fragmentos < 1:
+            raise ValueError("Se necesita al menos un fragmento")
+        self.opciones = opciones or {}
+        self.tamano_lote = tamano_lote
+        self.intervalo_resumen = intervalo_resumen
+        ventana = self.opciones.get("ventana", DETECTION_CONFIG["window_seconds"])
+        resolucion = self.opciones.get("resolucion", DETECTION_CONFIG["bucket_seconds"])
+        # Lo más antiguo que puede influir en una alerta: los HyperLogLog cubren hasta dos ventanas
+        self.horizonte = 2 * ventana + resolucion
+
+        # La subred se enruta por el prefijo más corto: contiene todos los demás (y la /24 o /64)
+        umbrales = self.opciones.get("umbrales_prefijo") or {4: DETECTION_CONFIG["ipv4_prefix_thresholds"],
+                                                             6: DETECTION_CONFIG["ipv6_prefix_thresholds"]}
+        self._prefijo_ruta = {4: min([24, *umbrales.get(4, ())]), 6: min([64, *umbrales.get(6, ())])}
+
+        self._salida: multiprocessing.Queue = multiprocessing.Queue()
+        self._entradas: Dict[int, multiprocessing.Queue] = {}
+        self._procesos: Dict[int, multiprocessing.Process] = {}
+        self._pendientes: Dict[int, List[Mensaje]] = {}
+        self._en_vuelo = 0         # Lotes enviados de los que aún no llegó respuesta
+        self._resumenes: Dict[int, Dict[str, Any]] = {}
+        self._anillo = AnilloConsistente()
+        self._anterior: Optional[AnilloConsistente] = None  # Anillo durante un cambio de tamaño
+        self._fin_transicion = 0.0
+        self._retirados = set()
+        # Rutas ya calculadas: IP -> (ruta de la IP, ruta de su subred); usuario -> ruta
+        self._rutas_ip: Dict[str, Tuple[Ruta, Ruta]] = {}
+        self._rutas_usuario: Dict[str, Ruta] = {}
+        self._cerrado = False
+        self._ultimo_ts: Optional[float] = None
+        self.eventos = 0
+        for numero in range(fragmentos):
+            self._arrancar(numero)
+            self._anillo.agregar(numero)
+
+    # --- Procesos ---
+
+    def _arrancar(self, numero: int):
+        entrada = multiprocessing.Queue(maxsize=4)  # Acotada: si un fragmento no da abasto, se espera
+        proceso = multiprocessing.Process(target=_fragmento, name=f"fragmento-{numero}", daemon=True,
+                                          args=(numero, self.opciones, entrada, self._salida, self.intervalo_resumen))
+        proceso.start()
+        self._entradas[numero], self._procesos[numero] = entrada, proceso
+        self._pendientes[numero] = []
+
+    def _detener(self, numero: int):
+        self._enviar(numero)
+        self._entradas[numero].put((self._ultimo_ts, None))
+        self._en_vuelo += 1
+
+    @property
+    def fragmentos(self) -> List[int]:
+        return self._anillo.nodos
+
+    # --- Enrutado ---
+
+    def _clave_subred(self, ip_address: str) -> str:
+        ip = _direccion_ip(ip_address)
+        if ip is None:
+            return ip_address
+        prefijo = self._prefijo_ruta[ip.version]
+        return f"{int(ip) >> (ip.max_prefixlen - prefijo)}/{prefijo}"
+
+    def _ruta(self, clave: str) -> Ruta:
+        dueno = self._anillo.nodo(clave)
+        anterior = self._anterior.nodo(clave) if self._anterior is not None else dueno
+        return (anterior, dueno) if anterior != dueno else (dueno, None)
+
+    def _olvidar_rutas(self):
+        self._rutas_ip.clear()
+        self._rutas_usuario.clear()
+
+    def _repartir(self, username: str, ip_address: str, success: bool, timestamp: float):
+        rutas_ip = self._rutas_ip.get(ip_address)
+        if rutas_ip is None:
+            if len(self._rutas_ip) >= MAX_CACHE_RUTAS:
+                self._rutas_ip.clear()
+            rutas_ip = self._rutas_ip[ip_address] = (self._ruta(ip_address),
+                                                     self._ruta(self._clave_subred(ip_address)))
+        ruta_usuario = self._rutas_usuario.get(username)
+        if ruta_usuario is None:
+            if len(self._rutas_usuario) >= MAX_CACHE_RUTAS:
+                self._rutas_usuario.clear()
+            ruta_usuario = self._rutas_usuario[username] = self._ruta(username)
+        ruta_ip, ruta_subred = rutas_ip
+        if ruta_ip == ruta_usuario == ruta_subred and ruta_ip[1] is None:
+            # Las tres claves en el mismo fragmento (siempre, si solo hay uno): un solo mensaje
+            self._pendientes[ruta_ip[0]].append((username, ip_address, success, timestamp, PARTES_DETECCION, ()))
+            return
+        rutas = (ruta_ip, ruta_usuario, ruta_subred)
+        por_fragmento: Dict[int, Tuple[List[str], List[str]]] = {}
+        for parte, (alerta, silencio) in zip(PARTES_DETECCION, rutas):
+            por_fragmento.setdefault(alerta, ([], []))[0].append(parte)
+            if silencio is not None:
+                por_fragmento.setdefault(silencio, ([], []))[1].append(parte)
+        for numero, (partes, en_silencio) in por_fragmento.items():
+            self._pendientes[numero].append((username, ip_address, success, timestamp,
+                                             tuple(partes), tuple(en_silencio)))
+
+    def _enviar(self, numero: int):
+        lote = self._pendientes[numero]
+        if lote:
+            self._pendientes[numero] = []
+            self._entradas[numero].put((self._ultimo_ts, lote))
+            self._en_vuelo += 1
+
+    # --- Resultados ---
+
+    def _recoger(self, bloquear: bool) -> List[Tuple[float, str]]:
+        alertas = []
+        while self._en_vuelo:
+            try:
+                numero, _, nuevas, resumen, terminado = self._salida.get(block=bloquear)
+            except queue.Empty:
+                break
+            self._en_vuelo -= 1
+            alertas.extend(nuevas)
+            if resumen is not None:
+                self._resumenes[numero] = resumen
+            if terminado:
+                self._procesos.pop(numero).join()
+                del self._entradas[numero], self._pendientes[numero]
+                if numero in self._retirados:
+                    # Retirado tras un cambio de tamaño: sus claves ya están enteras en su dueño nuevo
+                    self._retirados.discard(numero)
+                    self._resumenes.pop(numero, None)
+        return alertas
+
+    def procesar(self, eventos: Iterable[EventoLogin]) -> List[Tuple[float, str]]:
+        """Reparte los eventos y devuelve las alertas que ya estén listas [(timestamp, alerta)]
+
+        Los eventos deben llegar en orden de tiempo (como en el log). Las
+        alertas de eventos aún en vuelo salen en llamadas posteriores o en
+        cerrar().
+        """
+        alertas = []
+        for username, ip_address, success, timestamp in eventos:
+            if timestamp is None:
+                timestamp = time.time()
+            if self._anterior is not None and timestamp >= self._fin_transicion:
+                self._terminar_transicion()
+            self._repartir(username, ip_address, success, timestamp)
+            self._ultimo_ts = timestamp
+            self.eventos += 1
+            if self.eventos % self.tamano_lote == 0:
+                for numero in list(self._pendientes):
+                    self._enviar(numero)
+                alertas.extend(self._recoger(bloquear=False))
+        return alertas
+
+    def vaciar(self) -> List[Tuple[float, str]]:
+        """Envía lo pendiente y espera todas las alertas"""
+        for numero in list(self._pendientes):
+            self._enviar(numero)
+        return self._recoger(bloquear=True)
+
+    def worst_offenders(self, n: int = 10) -> List[tuple]:
+        """Las n IPs con más fallos, uniendo el último resumen de cada fragmento: [(ip, fallos, error)]"""
+        # Durante un cambio de tamaño una IP puede estar en dos fragmentos: vale la cuenta mayor
+        mejores: Dict[str, tuple] = {}
+        for resumen in self._resumenes.values():
+            for fila in resumen["peores"]:
+                if fila[0] not in mejores or fila[1] > mejores[fila[0]][1]:
+                    mejores[fila[0]] = fila
+        return heapq.nlargest(n, mejores.values(), key=lambda fila: fila[1])
+
+    def resumen(self) -> Dict[str, Any]:
+        """Totales a partir del último resumen de cada fragmento"""
+        return {"fragmentos": len(self.fragmentos), "eventos": self.eventos,
+                "ips": sum(resumen["ips"] for resumen in self._resumenes.values()),
+                "usuarios": sum(resumen["usuarios"] for resumen in self._resumenes.values()),
+                "en_transicion": self._anterior is not None}
+
+    # --- Cambio de tamaño ---
+
+    def redimensionar(self, fragmentos: int, ahora: Optional[float] = None) -> float:
+        """Cambia el número de fragmentos; devuelve la parte de las claves que cambia de dueño
+
+        `ahora` es el timestamp del último evento procesado: la transición
+        dura un horizonte a partir de él. Se puede redimensionar otra vez
+        cuando termina.
+        """
+        if fragmentos < 1:
+            raise ValueError("Se necesita al menos un fragmento")
+        if self._anterior is not None:
+            raise RuntimeError("Ya hay un cambio de tamaño en curso")
+        actuales = self.fragmentos
+        if fragmentos == len(actuales):
+            return 0.0
+        self._anterior = self._anillo.copia()
+        if fragmentos > len(actuales):
+            libres = (numero for numero in range(max(actuales) + 1 + fragmentos) if numero not in self._procesos)
+            for numero in [next(libres) for _ in range(fragmentos - len(actuales))]:
+                self._arrancar(numero)
+                self._anillo.agregar(numero)
+        else:
+            for numero in actuales[fragmentos:]:
+                self._anillo.quitar(numero)  # Sigue vivo como dueño anterior hasta el final de la transición
+        self._olvidar_rutas()
+        self._fin_transicion = (time.time() if ahora is None else ahora) + self.horizonte
+        muestra = [f"clave{i}" for i in range(10000)]
+        return sum(self._anterior.nodo(clave) != self._anillo.nodo(clave) for clave in muestra) / len(muestra)
+
+    def _terminar_transicion(self):
+        self._retirados = set(self._anterior.nodos) - set(self._anillo.nodos)
+        self._anterior = None
+        self._olvidar_rutas()
+        for numero in self._retirados:
+            self._detener(numero)
+
+    # --- Cierre ---
+
+    def cerrar(self) -> List[Tuple[float, str]]:
+        """Procesa lo pendiente, para los fragmentos y devuelve las últimas alertas"""
+        if self._cerrado:
+            return []
+        self._cerrado = True
+        alertas = self.vaciar()
+        for numero in list(self._procesos):
+            self._detener(numero)
+        alertas.extend(self._recoger(bloquear=True))
+        return alertas
+
+    def __enter__(self) -> "DetectorFragmentado":
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
@@ -0,0 +1,339 @@
+"""
+📧 Canonicalización de emails e índice de duplicados
+====================================================
+
+validar_email solo pasa el email a minúsculas, así que estas cuentas
+parecen distintas aunque lleguen al mismo buzón:
+
+    Ana.Garcia+promo@gmail.com   anagarcia@googlemail.com   ANAGARCIA@GMAIL.COM
+
+Este módulo:
+• Canonicaliza emails con reglas por dominio (puntos, +etiquetas, alias)
+  y normaliza Unicode (NFKC) y dominios internacionales (IDNA/punycode)
+• Mantiene un índice de huellas (hash) de las formas canónicas que
+  responde "¿ya registrado?" en O(1), ocupando ~12 bytes por email
+• Construye el índice en bloque desde millones de emails existentes,
+  opcionalmente en paralelo, y lo guarda/carga de disco
+
+Uso:
+    python -m modules.emails construir emails.txt indice.bin --procesos 4
+    python -m modules.emails consultar indice.bin ana.garcia+x@gmail.com
+"""
+
+import argparse
+import hashlib
+import json
+import secrets
+import sys
+import unicodedata
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from modules.validacion_masiva import ValidadorSeguro
+
+# Reglas por dominio:
+# • alias_de: el dominio es un alias de otro (googlemail.com == gmail.com)
+# • separador_etiqueta: lo que va tras este carácter se ignora (ana+promo)
+# • quitar_puntos: los puntos de la parte local se ignoran (a.na == ana)
+REGLAS_DOMINIO: Dict[str, Dict[str, Any]] = {
+    "gmail.com": {"separador_etiqueta": "+", "quitar_puntos": True},
+    "googlemail.com": {"alias_de": "gmail.com"},
+    "outlook.com": {"separador_etiqueta": "+"},
+    "hotmail.com": {"separador_etiqueta": "+"},
+    "live.com": {"separador_etiqueta": "+"},
+    "icloud.com": {"separador_etiqueta": "+"},
+    "me.com": {"alias_de": "icloud.com"},
+    "mac.com": {"alias_de": "icloud.com"},
+    "yahoo.com": {"separador_etiqueta": "-"},
+    "proton.me": {"separador_etiqueta": "+"},
+    "protonmail.com": {"alias_de": "proton.me"},
+    "fastmail.com": {"separador_etiqueta": "+"},
+}
+
+# Para el resto de dominios solo quitamos la +etiqueta (convención muy extendida)
+REGLA_POR_DEFECTO: Dict[str, Any] = {"separador_etiqueta": "+"}
+
+TAMANO_LOTE = 50000
+CARGA_MAXIMA = 0.7
+CABECERA = b"TSBIDX02"  # Seguida de la clave, las reglas de canonicalización y la tabla
+
+class CanonicalizadorEmail:
+    """Reduce un email a su forma canónica según reglas por dominio"""
+
+    def __init__(self, reglas: Optional[Dict[str, Dict[str, Any]]] = None,
+                 regla_por_defecto: Optional[Dict[str, Any]] = None,
+                 validador: Optional[ValidadorSeguro] = None):
+        self.reglas = REGLAS_DOMINIO if reglas is None else reglas
+        self.regla_por_defecto = REGLA_POR_DEFECTO if regla_por_defecto is None else regla_por_defecto
+        self.validador = validador or ValidadorSeguro()
+
+    def _dominio_ascii(self, dominio: str) -> str:
+        """Convierte un dominio internacional a punycode (ej. españa.es -> xn--espaa-rta.es)"""
+        dominio = dominio.rstrip(".")
+        try:
+            return dominio.encode("idna").decode("ascii").lower()
+        except UnicodeError:
+            return ""
+
+    def canonicalizar(self, email: str) -> Tuple[bool, str]:
+        """Devuelve (True, forma canónica) o (False, mensaje de error)"""
+        if not isinstance(email, str):
+            return False, "Email debe ser una cadena de texto"
+
+        # NFKC unifica variantes Unicode (ｅｊｅｍｐｌｏ -> ejemplo); casefold > lower
+        email = unicodedata.normalize("NFKC", email.strip()).casefold()
+        local, arroba, dominio = email.rpartition("@")
+        if not arroba or not local:
+            return False, "Formato de email inválido"
+
+        dominio = self._dominio_ascii(dominio)
+        if not dominio:
+            return False, "Dominio de email inválido"
+
+        # Reutilizamos las comprobaciones de ValidadorSeguro sobre la forma ASCII
+        valido, resultado = self.validador.validar_email(f"{local}@{dominio}")
+        if not valido:
+            return False, resultado
+
+        regla = self.reglas.get(dominio, self.regla_por_defecto)
+        if "alias_de" in regla:
+            dominio = regla["alias_de"]
+            regla = self.reglas.get(dominio, self.regla_por_defecto)
+
+        separador = regla.get("separador_etiqueta")
+        if separador and separador in local:
+            local = local.split(separador, 1)[0]
+        if regla.get("quitar_puntos"):
+            local = local.replace(".", "")
+
+        if not local:
+            return False, "Formato de email inválido"
+        return True, f"{local}@{dominio}"
+
+class IndiceEmails:
+    """Índice de huellas de emails canónicos con búsqueda O(1)
+
+    Cada email se guarda como una huella de 64 bits (BLAKE2b con clave
+    secreta, para que nadie pueda fabricar colisiones) en una tabla hash
+    de direccionamiento abierto sobre un array: ~8 bytes por hueco.
+    Nunca da falsos negativos; la probabilidad de un falso positivo con
+    n emails es ~n²/2⁶⁵ (≈ 3·10⁻⁶ con 10 millones).
+    """
+
+    def __init__(self, capacidad: int = 1024, clave: Optional[bytes] = None,
+                 canonicalizador: Optional[CanonicalizadorEmail] = None):
+        self.clave = clave or secrets.token_bytes(16)
+        self.canonicalizador = canonicalizador or CanonicalizadorEmail()
+        self._tabla = self._tabla_vacia(capacidad)
+        self._total = 0
+
+    @staticmethod
+    def _tabla_vacia(capacidad: int) -> array:
+        tamano = 8
+        while tamano * CARGA_MAXIMA < capacidad:
+            tamano *= 2
+        return array("Q", bytes(8 * tamano))
+
+    def huella(self, email_canonico: str) -> int:
+        """Huella de 64 bits de un email ya canonicalizado (0 queda reservado)"""
+        digest = hashlib.blake2b(email_canonico.encode("utf-8"), digest_size=8, key=self.clave).digest()
+        return int.from_bytes(digest, "little") or 1
+
+    def _hueco(self, huella: int) -> Tuple[int, bool]:
+        """Posición de la huella en la tabla y si ya estaba (sondeo lineal)"""
+        tabla = self._tabla
+        mascara = len(tabla) - 1
+        i = huella & mascara
+        while True:
+            valor = tabla[i]
+            if valor == huella:
+                return i, True
+            if valor == 0:
+                return i, False
+            i = (i + 1) & mascara
+
+    def _crecer(self):
+        antigua = self._tabla
+        self._tabla = self._tabla_vacia(len(antigua))
+        for huella in antigua:
+            if huella:
+                self._tabla[self._hueco(huella)[0]] = huella
+
+    def agregar_huella(self, huella: int) -> bool:
+        """Añade una huella; devuelve False si ya existía"""
+        i, existe = self._hueco(huella)
+        if existe:
+            return False
+        self._tabla[i] = huella
+        self._total += 1
+        if self._total > len(self._tabla) * CARGA_MAXIMA:
+            self._crecer()
+        return True
+
+    def agregar(self, email: str) -> Tuple[bool, str]:
+        """Registra un email; (False, motivo) si es inválido o duplicado"""
+        valido, canonico = self.canonicalizador.canonicalizar(email)
+        if not valido:
+            return False, canonico
+        if not self.agregar_huella(self.huella(canonico)):
+            return False, "Email ya registrado"
+        return True, canonico
+
+    def ya_registrado(self, email: str) -> bool:
+        """¿Existe ya una cuenta con la misma forma canónica? O(1)"""
+        valido, canonico = self.canonicalizador.canonicalizar(email)
+        return valido and self._hueco(self.huella(canonico))[1]
+
+    def __len__(self) -> int:
+        return self._total
+
+    # --- Construcción en bloque y persistencia ----------------------------
+
+    @classmethod
+    def construir(cls, emails: Iterable[str], procesos: int = 0, capacidad: int = 1024,
+                  clave: Optional[bytes] = None,
+                  canonicalizador: Optional[CanonicalizadorEmail] = None) -> "IndiceEmails":
+        """Construye el índice desde muchos emails existentes
+
+        La canonicalización y el hash (lo caro) se reparten por lotes en un
+        pool de procesos; el proceso principal solo inserta enteros.
+        Si se conoce el total, `capacidad` evita redimensionar la tabla.
+        """
+        indice = cls(capacidad=capacidad, clave=clave, canonicalizador=canonicalizador)
+        lotes = _lotes(emails, TAMANO_LOTE)
+
+        if procesos <= 1:
+            resultados = (_huellas_lote(indice.clave, lote, indice.canonicalizador) for lote in lotes)
+            for huellas in resultados:
+                indice._insertar_huellas(huellas)
+            return indice
+
+        # Cada proceso recibe el canonicalizador del índice una sola vez, al arrancar
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso,
+                                 initargs=(indice.canonicalizador,)) as pool:
+            pendientes = []
+            for lote in lotes:
+                pendientes.append(pool.submit(_huellas_lote, indice.clave, lote))
+                if len(pendientes) >= procesos * 2:
+                    indice._insertar_huellas(pendientes.pop(0).result())
+            for futuro in pendientes:
+                indice._insertar_huellas(futuro.result())
+        return indice
+
+    def _insertar_huellas(self, huellas: array):
+        # Crecer una sola vez por lote en lugar de varias durante la inserción
+        while (self._total + len(huellas)) > len(self._tabla) * CARGA_MAXIMA:
+            self._crecer()
+        tabla = self._tabla
+        mascara = len(tabla) - 1
+        for huella in huellas:
+            i = huella & mascara
+            while True:
+                valor = tabla[i]
+                if valor == huella:
+                    break
+                if valor == 0:
+                    tabla[i] = huella
+                    self._total += 1
+                    break
+                i = (i + 1) & mascara
+
+    def guardar(self, ruta: Path):
+        """Guarda clave + reglas + tabla en binario (se carga sin recalcular nada)
+
+        Las reglas se guardan con el índice: consultarlo con otras daría
+        formas canónicas (y huellas) distintas de las indexadas.
+        """
+        reglas = json.dumps({"reglas": self.canonicalizador.reglas,
+                             "regla_por_defecto": self.canonicalizador.regla_por_defecto}).encode("utf-8")
+        with open(ruta, "wb") as f:
+            f.write(CABECERA)
+            f.write(len(self.clave).to_bytes(1, "little"))
+            f.write(self.clave)
+            f.write(len(reglas).to_bytes(4, "little"))
+            f.write(reglas)
+            f.write(self._total.to_bytes(8, "little"))
+            self._tabla.tofile(f)
+
+    @classmethod
+    def cargar(cls, ruta: Path, validador: Optional[ValidadorSeguro] = None) -> "IndiceEmails":
+        ruta = Path(ruta)
+        with open(ruta, "rb") as f:
+            cabecera = f.read(len(CABECERA))
+            if cabecera != CABECERA:
+                raise ValueError(f"{ruta} no es un índice de emails")
+            clave = f.read(int.from_bytes(f.read(1), "little"))
+            reglas = json.loads(f.read(int.from_bytes(f.read(4), "little")).decode("utf-8"))
+            total = int.from_bytes(f.read(8), "little")
+            tabla = array("Q")
+            tabla.frombytes(f.read())
+
+        canonicalizador = CanonicalizadorEmail(reglas["reglas"], reglas["regla_por_defecto"], validador)
+        indice = cls(capacidad=0, clave=clave, canonicalizador=canonicalizador)
+        indice._tabla = tabla
+        indice._total = total
+        return indice
+
+def _lotes(elementos: Iterable[str], tamano: int) -> Iterator[List[str]]:
+    iterador = iter(elementos)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+# El canonicalizador del índice, uno por proceso del pool
+_canonicalizador_proceso: Optional[CanonicalizadorEmail] = None
+
+def _iniciar_proceso(canonicalizador: CanonicalizadorEmail):
+    global _canonicalizador_proceso
+    _canonicalizador_proceso = canonicalizador
+
+def _huellas_lote(clave: bytes, emails: List[str],
+                  canonicalizador: Optional[CanonicalizadorEmail] = None) -> array:
+    """Canonicaliza y calcula huellas de un lote (se ejecuta en el pool)"""
+    canonicalizar = (canonicalizador or _canonicalizador_proceso).canonicalizar
+    blake2b = hashlib.blake2b
+    huellas = array("Q")
+    for email in emails:
+        valido, canonico = canonicalizar(email)
+        if valido:
+            digest = blake2b(canonico.encode("utf-8"), digest_size=8, key=clave).digest()
+            huellas.append(int.from_bytes(digest, "little") or 1)
+    return huellas
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Índice de emails canónicos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    construir = sub.add_parser("construir", help="Crear índice desde un archivo (un email por línea)")
+    construir.add_argument("emails", type=Path)
+    construir.add_argument("indice", type=Path)
+    construir.add_argument("--procesos", type=int, default=0)
+    construir.add_argument("--capacidad", type=int, default=1024, help="Número aproximado de emails")
+
+    consultar = sub.add_parser("consultar", help="¿Está registrado este email?")
+    consultar.add_argument("indice", type=Path)
+    consultar.add_argument("email", nargs="+")
+
+    args = parser.parse_args(argv)
+
+    if args.comando == "construir":
+        with open(args.emails, "r", encoding="utf-8") as f:
+            indice = IndiceEmails.construir((linea.strip() for linea in f),
+                                            procesos=args.procesos, capacidad=args.capacidad)
+        indice.guardar(args.indice)
+        print(f"✅ {len(indice)} emails canónicos indexados en {args.indice}")
+        return 0
+
+    indice = IndiceEmails.cargar(args.indice)
+    for email in args.email:
+        estado = "ya registrado" if indice.ya_registrado(email) else "libre"
+        print(f"{email}: {estado}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
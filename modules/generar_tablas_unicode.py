@@ -0,0 +1,131 @@
+"""
+🏗️ Generador de tablas Unicode (se ejecuta al construir, no en cada request)
+============================================================================
+
+Genera modules/tablas_unicode.py con la tabla de "esqueletos" que usa
+modules/unicode_texto.py con str.translate:
+
+• Caracteres de compatibilidad que NFKC convierte en letras/dígitos ASCII
+  (ｅ, 𝐞, ℯ, ⓔ, ᵉ...) -> su letra ASCII
+• Caracteres confundibles de otros alfabetos (cirílico, griego...) que se
+  ven igual que una letra latina (а cirílica -> a) -> su prototipo
+
+Por defecto usa una lista curada (CONFUNDIBLES_BASICOS). Para la lista
+completa de Unicode, descarga confusables.txt de
+https://www.unicode.org/Public/security/latest/confusables.txt y pásalo:
+
+    python -m modules.generar_tablas_unicode --confusables confusables.txt
+"""
+
+import argparse
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SALIDA = Path(__file__).parent / "tablas_unicode.py"
+
+# Confundible -> prototipo latino (tras casefold, así que solo minúsculas)
+CONFUNDIBLES_BASICOS = {
+    # Cirílico
+    "а": "a", "в": "b", "е": "e", "ё": "e", "к": "k", "м": "m", "н": "h", "о": "o",
+    "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "ѕ": "s", "і": "i", "ї": "i",
+    "ј": "j", "ԁ": "d", "ԛ": "q", "ԝ": "w", "һ": "h", "ӏ": "l", "ԍ": "g", "ɡ": "g",
+    "ь": "b", "п": "n", "г": "r",
+    # Griego
+    "α": "a", "β": "b", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p",
+    "τ": "t", "υ": "u", "χ": "x", "γ": "y", "η": "n", "ω": "w", "ϲ": "c", "ϳ": "j",
+    # Latín extendido y símbolos
+    "ı": "i", "ȷ": "j", "ℓ": "l", "ǀ": "l", "ɩ": "i", "ʏ": "y", "ᴀ": "a", "ᴄ": "c",
+    "ᴏ": "o", "ᴜ": "u", "ᴠ": "v", "ᴡ": "w", "ᴢ": "z", "ꮃ": "w",
+    # Dígitos y puntuación que se leen como letras
+    "0": "o", "1": "l", "|": "l",
+}
+
+def _nfd(texto: str) -> str:
+    return unicodedata.normalize("NFD", texto)
+
+def leer_confusables(ruta: Path) -> Dict[str, str]:
+    """Lee confusables.txt de Unicode (formato: origen ; destino ; tipo # ...)"""
+    tabla = {}
+    with open(ruta, "r", encoding="utf-8-sig") as f:
+        for linea in f:
+            linea = linea.split("#", 1)[0].strip()
+            if not linea:
+                continue
+            origen, destino = [campo.strip() for campo in linea.split(";")[:2]]
+            origen = "".join(chr(int(c, 16)) for c in origen.split())
+            destino = "".join(chr(int(c, 16)) for c in destino.split())
+            # str.translate solo puede mapear caracteres sueltos
+            if len(origen) == 1:
+                tabla[origen] = destino.casefold()
+    return tabla
+
+def construir_tabla(confundibles: Dict[str, str]) -> Dict[int, str]:
+    """Tabla ord(carácter) -> reemplazo, lista para str.translate"""
+    tabla: Dict[int, str] = {}
+
+    # 1. Compatibilidad: solo lo que NFKC convierte en letras o dígitos ASCII
+    for codigo in range(0x80, sys.maxunicode + 1):
+        c = chr(codigo)
+        if unicodedata.category(c) in ("Cs", "Cn"):
+            continue
+        destino = unicodedata.normalize("NFKC", c).casefold()
+        if destino != c and destino.isascii() and destino.isalnum():
+            tabla[codigo] = destino
+
+    # 2. Confundibles: se aplican sobre texto en NFD, así que el destino también
+    for origen, destino in confundibles.items():
+        origen = _nfd(origen.casefold())
+        if len(origen) == 1 and destino != origen:
+            tabla[ord(origen)] = _nfd(destino)
+
+    # Resolver cadenas (a -> b -> c) para que una pasada de translate baste
+    for codigo, destino in list(tabla.items()):
+        vistos = {codigo}
+        while len(destino) == 1 and ord(destino) in tabla and ord(destino) not in vistos:
+            vistos.add(ord(destino))
+            destino = tabla[ord(destino)]
+        tabla[codigo] = destino
+
+    return {codigo: destino for codigo, destino in tabla.items() if destino != chr(codigo)}
+
+def escribir_modulo(tabla: Dict[int, str], ruta: Path, origen: str):
+    lineas: List[str] = [
+        '"""',
+        "Tablas Unicode precalculadas para modules/unicode_texto.py",
+        "",
+        "⚠️ ARCHIVO GENERADO por modules/generar_tablas_unicode.py - no editar a mano",
+        '"""',
+        "",
+        f"VERSION_UNICODE = {unicodedata.unidata_version!r}",
+        f"ORIGEN_CONFUNDIBLES = {origen!r}",
+        "",
+        "# ord(carácter) -> esqueleto, para str.translate",
+        "TABLA_ESQUELETO = {",
+    ]
+    for codigo in sorted(tabla):
+        lineas.append(f"    0x{codigo:04X}: {tabla[codigo]!r},")
+    lineas.append("}")
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Genera las tablas Unicode precalculadas")
+    parser.add_argument("--confusables", type=Path, help="Ruta a confusables.txt de Unicode")
+    parser.add_argument("--salida", type=Path, default=SALIDA)
+    args = parser.parse_args(argv)
+
+    if args.confusables:
+        confundibles = {**CONFUNDIBLES_BASICOS, **leer_confusables(args.confusables)}
+        origen = args.confusables.name
+    else:
+        confundibles = CONFUNDIBLES_BASICOS
+        origen = "CONFUNDIBLES_BASICOS"
+
+    tabla = construir_tabla(confundibles)
+    escribir_modulo(tabla, args.salida, origen)
+    print(f"✅ {len(tabla)} entradas escritas en {args.salida} (Unicode {unicodedata.unidata_version})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
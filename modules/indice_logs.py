@@ -0,0 +1,501 @@
+"""
+🔎 Índice y consultas rápidas sobre logs/security.log
+=====================================================
+
+Buscar con grep por usuario o IP en gigas de logs tarda minutos en
+pleno incidente. Este módulo mantiene un índice por segmento de log
+(el archivo vivo y cada segmento rotado por SecurityLogger):
+
+• Índice temporal disperso: cada EVENTOS_POR_BLOQUE eventos se guarda el
+  offset del bloque y su timestamp mínimo y máximo
+• Índices invertidos: event, event_type, username e ip_address ->
+  offsets (en bytes) de las líneas que los contienen
+
+Las consultas (rango de tiempo + filtros por campo) descartan segmentos
+y bloques por tiempo, cruzan los índices invertidos y solo leen (con
+mmap) las líneas candidatas. Entiende el formato texto y el JSONL.
+Los segmentos comprimidos (.gz/.zst) no se pueden mapear: se
+descomprimen en memoria solo si tienen candidatos, y eso domina el
+tiempo de la consulta.
+
+El indexado es incremental: solo se leen los bytes nuevos de cada
+segmento; un segmento rotado (y luego comprimido) conserva su índice
+porque se identifica por una huella de su primera línea, no por su nombre.
+Los índices se guardan en logs/.security.log.indices/.
+
+Uso:
+    python -m modules.indice_logs indexar logs/security.log --seguir 5
+    python -m modules.indice_logs buscar logs/security.log --usuario admin --evento LOGIN_FAILED \\
+        --desde 2024-05-01T10:00 --hasta 2024-05-01T12:00
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mmap
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from modules import cargar_ejemplo
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+listar_segmentos = registro_seguridad.listar_segmentos
+zstandard = registro_seguridad.zstandard
+
+VERSION_INDICE = 1
+EVENTOS_POR_BLOQUE = 256
+CAMPOS = ("event", "event_type", "username", "ip_address")
+
+Contenido = Union[bytes, mmap.mmap]
+
+def parsear_linea(linea: bytes) -> Optional[Dict[str, Any]]:
+    """Evento de una línea de log (formato texto o JSONL), o None si no es un evento"""
+    inicio = linea.find(b"{")
+    if inicio < 0:
+        return None
+    try:
+        evento = json.loads(linea[inicio:])
+    except ValueError:
+        return None
+    if not isinstance(evento, dict):
+        return None
+
+    if inicio > 0:
+        # Formato texto: "fecha - NIVEL - EVENTO: {json}"
+        partes = linea[:inicio].decode("utf-8", "replace").rstrip(": ").split(" - ")
+        if len(partes) >= 3:
+            evento.setdefault("level", partes[1])
+            evento.setdefault("event", partes[2])
+    return evento
+
+def valor_campo(evento: Dict[str, Any], campo: str) -> Optional[str]:
+    if campo in ("event", "event_type"):
+        valor = evento.get(campo)
+    else:
+        detalles = evento.get("details")
+        valor = detalles.get(campo) if isinstance(detalles, dict) else None
+    return valor if isinstance(valor, str) else None
+
+def segundos(timestamp: Any) -> Optional[float]:
+    """Timestamp ISO 8601 -> segundos desde epoch (sin zona = UTC)"""
+    if not isinstance(timestamp, str):
+        return None
+    try:
+        fecha = datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha.timestamp()
+
+def abrir_contenido(ruta: Path) -> Contenido:
+    """Contenido completo de un segmento: mmap si es texto plano, descomprimido si no"""
+    if ruta.suffix == ".gz":
+        with gzip.open(ruta, "rb") as f:
+            return f.read()
+    if ruta.suffix == ".zst":
+        with open(ruta, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as lector:
+            return lector.read()
+    with open(ruta, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def huella(ruta: Path) -> Optional[str]:
+    """Identifica un segmento por su primera línea (sobrevive a rename y compresión)"""
+    if ruta.suffix == ".gz":
+        with gzip.open(ruta, "rb") as f:
+            inicio = f.read(65536)
+    elif ruta.suffix == ".zst":
+        with open(ruta, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as lector:
+            inicio = lector.read(65536)
+    else:
+        with open(ruta, "rb") as f:
+            inicio = f.read(65536)
+    fin = inicio.find(b"\n")
+    if fin < 0:
+        return None  # Aún no hay una línea completa
+    return hashlib.sha256(inicio[:fin + 1]).hexdigest()[:20]
+
+class IndiceSegmento:
+    """Índice de un segmento: bloques temporales + índices invertidos
+
+    En disco: una línea JSON con los metadatos y los bloques, una sección
+    por campo con una línea por término ("valor"<TAB>inicio<TAB>cantidad)
+    y, al final, todos los offsets como uint64. Al cargar solo se parsea
+    la primera línea; un término se busca con bytes.find en la sección de
+    su campo y solo se decodifican los offsets de los términos consultados.
+    """
+
+    def __init__(self, huella_segmento: str):
+        self.huella = huella_segmento
+        self.bytes_indexados = 0
+        self.eventos = 0
+        self.completo = False  # Segmento rotado e indexado entero: no volver a leerlo
+        self.ts_min = float("inf")
+        self.ts_max = float("-inf")
+        self.bloques: List[List[float]] = []  # [offset, ts_min, ts_max, eventos]
+        self.terminos: Dict[str, Dict[str, array]] = {campo: {} for campo in CAMPOS}
+        self._datos = b""                                   # Archivo de índice cargado
+        self._secciones: Dict[str, Tuple[int, int]] = {}    # campo -> (inicio, fin) de su línea
+        self._inicio_postings = 0
+
+    def agregar(self, offset: int, evento: Dict[str, Any]):
+        ts = segundos(evento.get("timestamp"))
+        if ts is not None:
+            self.ts_min = min(self.ts_min, ts)
+            self.ts_max = max(self.ts_max, ts)
+            if not self.bloques or self.bloques[-1][3] >= EVENTOS_POR_BLOQUE:
+                self.bloques.append([offset, ts, ts, 0])
+            bloque = self.bloques[-1]
+            bloque[1] = min(bloque[1], ts)
+            bloque[2] = max(bloque[2], ts)
+            bloque[3] += 1
+
+        for campo in CAMPOS:
+            valor = valor_campo(evento, campo)
+            if valor is not None:
+                lista = self.terminos[campo].get(valor)
+                if lista is None:
+                    lista = self.terminos[campo][valor] = array("Q")
+                lista.append(offset)
+        self.eventos += 1
+
+    def offsets(self, campo: str, valor: str) -> array:
+        lista = self.terminos[campo].get(valor)
+        if lista is None and self._datos:
+            # Búsqueda directa en la sección del campo, sin parsear el diccionario entero
+            inicio, fin = self._secciones[campo]
+            clave = b"\n" + json.dumps(valor, ensure_ascii=False).encode("utf-8") + b"\t"
+            posicion = self._datos.find(clave, inicio, fin)
+            if posicion >= 0:
+                posicion += len(clave)
+                primero, cantidad = self._datos[posicion:self._datos.index(b"\n", posicion)].split(b"\t")
+                lista = self._decodificar(int(primero), int(cantidad))
+                self.terminos[campo][valor] = lista
+        return lista if lista is not None else array("Q")
+
+    def _decodificar(self, primero: int, cantidad: int) -> array:
+        inicio = self._inicio_postings + primero * 8
+        lista = array("Q")
+        lista.frombytes(self._datos[inicio:inicio + cantidad * 8])
+        return lista
+
+    def materializar(self):
+        """Decodifica todo el índice cargado (necesario antes de agregar eventos)"""
+        for campo, (inicio, fin) in self._secciones.items():
+            for linea in self._datos[inicio:fin].split(b"\n"):
+                if linea:
+                    valor, primero, cantidad = linea.rsplit(b"\t", 2)
+                    valor = json.loads(valor)
+                    if valor not in self.terminos[campo]:
+                        self.terminos[campo][valor] = self._decodificar(int(primero), int(cantidad))
+        self._datos = b""
+        self._secciones = {}
+
+    def guardar(self, ruta: Path):
+        """Escribe el índice de forma atómica (archivo temporal + rename)"""
+        self.materializar()
+        secciones = []
+        postings = array("Q")
+        for campo in CAMPOS:
+            # Un término por línea: "valor"<TAB>primer offset<TAB>cantidad
+            lineas = [b""]
+            for valor, lista in self.terminos[campo].items():
+                lineas.append(b"%s\t%d\t%d" % (json.dumps(valor, ensure_ascii=False).encode("utf-8"),
+                                                 len(postings), len(lista)))
+                postings.extend(lista)
+            secciones.append(b"\n".join(lineas) + b"\n")
+
+        metadatos = json.dumps({
+            "version": VERSION_INDICE, "huella": self.huella, "bytes_indexados": self.bytes_indexados,
+            "eventos": self.eventos, "completo": self.completo,
+            "ts_min": self.ts_min if self.bloques else None, "ts_max": self.ts_max if self.bloques else None,
+            "bloques": self.bloques, "tamanos_terminos": [len(seccion) for seccion in secciones],
+        }).encode("utf-8") + b"\n"
+
+        temporal = ruta.with_suffix(".tmp")
+        with open(temporal, "wb") as f:
+            f.write(metadatos)
+            f.writelines(secciones)
+            f.write(postings.tobytes())
+        temporal.replace(ruta)
+
+    @classmethod
+    def cargar(cls, ruta: Path) -> Optional["IndiceSegmento"]:
+        try:
+            datos = ruta.read_bytes()
+        except FileNotFoundError:
+            return None
+        fin_metadatos = datos.find(b"\n") + 1
+        try:
+            metadatos = json.loads(datos[:fin_metadatos])
+        except ValueError:
+            return None
+        if metadatos.get("version") != VERSION_INDICE:
+            return None  # Formato antiguo: se reconstruye
+
+        indice = cls(metadatos["huella"])
+        indice.bytes_indexados = metadatos["bytes_indexados"]
+        indice.eventos = metadatos["eventos"]
+        indice.completo = metadatos["completo"]
+        if metadatos["ts_min"] is not None:
+            indice.ts_min, indice.ts_max = metadatos["ts_min"], metadatos["ts_max"]
+        indice.bloques = metadatos["bloques"]
+
+        indice._datos = datos
+        posicion = fin_metadatos
+        for campo, tamano in zip(CAMPOS, metadatos["tamanos_terminos"]):
+            indice._secciones[campo] = (posicion, posicion + tamano)
+            posicion += tamano
+        indice._inicio_postings = posicion
+        return indice
+
+class IndiceLogs:
+    """Índice de todos los segmentos de un log y consultas sobre ellos"""
+
+    def __init__(self, log_file: Union[str, Path] = "logs/security.log"):
+        self.log_file = Path(log_file)
+        self.directorio = self.log_file.with_name(f".{self.log_file.name}.indices")
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self._indices: Dict[str, IndiceSegmento] = {}
+        self._huellas: Dict[Path, tuple] = {}  # ruta -> (tamaño, mtime, huella)
+
+    def segmentos(self) -> List[Path]:
+        """Segmentos rotados y el archivo vivo, del más antiguo al más nuevo"""
+        segmentos = listar_segmentos(self.log_file)
+        if self.log_file.exists():
+            segmentos.append(self.log_file)
+        return segmentos
+
+    def _huella(self, ruta: Path) -> Optional[str]:
+        estado = ruta.stat()
+        cacheada = self._huellas.get(ruta)
+        if cacheada and cacheada[:2] == (estado.st_size, estado.st_mtime_ns):
+            return cacheada[2]
+        valor = huella(ruta)
+        self._huellas[ruta] = (estado.st_size, estado.st_mtime_ns, valor)
+        return valor
+
+    def _indice(self, huella_segmento: str) -> IndiceSegmento:
+        indice = self._indices.get(huella_segmento)
+        if indice is None:
+            indice = IndiceSegmento.cargar(self.directorio / f"{huella_segmento}.idx")
+            if indice is None or indice.huella != huella_segmento:
+                indice = IndiceSegmento(huella_segmento)
+            self._indices[huella_segmento] = indice
+        return indice
+
+    def actualizar(self) -> Dict[str, int]:
+        """Indexa los bytes nuevos de cada segmento; devuelve cuánto trabajo hizo"""
+        estadisticas = {"segmentos": 0, "segmentos_leidos": 0, "eventos_nuevos": 0}
+        vigentes = set()
+
+        for ruta in self.segmentos():
+            try:
+                huella_segmento = self._huella(ruta)
+            except (FileNotFoundError, EOFError, OSError):
+                continue  # Rotado o podado mientras tanto
+            if huella_segmento is None:
+                continue
+            vigentes.add(huella_segmento)
+            estadisticas["segmentos"] += 1
+
+            indice = self._indice(huella_segmento)
+            es_vivo = ruta == self.log_file
+            if indice.completo or (not ruta.suffix.startswith((".gz", ".zst"))
+                                   and ruta.stat().st_size == indice.bytes_indexados and es_vivo):
+                continue
+
+            try:
+                contenido = abrir_contenido(ruta)
+            except FileNotFoundError:
+                continue
+            estadisticas["segmentos_leidos"] += 1
+            indice.materializar()
+            antes = indice.eventos
+            self._indexar(indice, contenido)
+            # Un segmento rotado ya no crece: no hace falta volver a leerlo
+            indice.completo = not es_vivo and indice.bytes_indexados == len(contenido)
+            if isinstance(contenido, mmap.mmap):
+                contenido.close()
+            indice.guardar(self.directorio / f"{huella_segmento}.idx")
+            estadisticas["eventos_nuevos"] += indice.eventos - antes
+
+        # Índices de segmentos que ya no existen (podados por la rotación)
+        for ruta in self.directorio.glob("*.idx"):
+            if ruta.stem not in vigentes:
+                ruta.unlink()
+                self._indices.pop(ruta.stem, None)
+        return estadisticas
+
+    @staticmethod
+    def _indexar(indice: IndiceSegmento, contenido: Contenido):
+        posicion = indice.bytes_indexados
+        while True:
+            fin = contenido.find(b"\n", posicion)
+            if fin < 0:
+                break  # Línea a medio escribir: se indexará en la próxima pasada
+            evento = parsear_linea(contenido[posicion:fin])
+            if evento is not None:
+                indice.agregar(posicion, evento)
+            posicion = fin + 1
+        indice.bytes_indexados = posicion
+
+    def buscar(self, desde: Optional[float] = None, hasta: Optional[float] = None,
+               limite: Optional[int] = None, actualizar: bool = True,
+               **filtros: str) -> Iterator[Dict[str, Any]]:
+        """Eventos que cumplen el rango [desde, hasta] (epoch) y los filtros por campo
+
+        Los filtros son los de CAMPOS, p. ej. buscar(username="admin", event="LOGIN_FAILED").
+        """
+        for campo in filtros:
+            if campo not in CAMPOS:
+                raise ValueError(f"Campo no indexado: {campo} (usa uno de {', '.join(CAMPOS)})")
+        if actualizar:
+            self.actualizar()
+
+        desde = float("-inf") if desde is None else desde
+        hasta = float("inf") if hasta is None else hasta
+        encontrados = 0
+
+        for ruta in self.segmentos():
+            huella_segmento = self._huellas.get(ruta, (None, None, None))[2]
+            indice = self._indices.get(huella_segmento)
+            if indice is None or not indice.eventos or indice.ts_max < desde or indice.ts_min > hasta:
+                continue
+
+            rangos = self._rangos(indice, desde, hasta)
+            offsets = self._offsets(indice, filtros, rangos) if filtros else None
+            if not rangos or offsets == []:
+                continue
+            try:
+                contenido = abrir_contenido(ruta)
+            except FileNotFoundError:
+                continue
+            try:
+                lineas = offsets if offsets is not None else self._lineas(contenido, rangos)
+                for offset in lineas:
+                    evento = parsear_linea(contenido[offset:contenido.find(b"\n", offset)])
+                    if evento is None or not self._cumple(evento, desde, hasta, filtros):
+                        continue
+                    yield evento
+                    encontrados += 1
+                    if limite is not None and encontrados >= limite:
+                        return
+            finally:
+                if isinstance(contenido, mmap.mmap):
+                    contenido.close()
+
+    @staticmethod
+    def _rangos(indice: IndiceSegmento, desde: float, hasta: float) -> List[Tuple[int, int]]:
+        """Rangos de bytes de los bloques cuyo intervalo de tiempo solapa [desde, hasta]"""
+        rangos: List[Tuple[int, int]] = []
+        bloques = indice.bloques
+        for i, (offset, ts_min, ts_max, _) in enumerate(bloques):
+            if ts_max < desde or ts_min > hasta:
+                continue
+            fin = bloques[i + 1][0] if i + 1 < len(bloques) else indice.bytes_indexados
+            if rangos and rangos[-1][1] == offset:
+                rangos[-1] = (rangos[-1][0], int(fin))  # Bloques contiguos: un solo rango
+            else:
+                rangos.append((int(offset), int(fin)))
+        return rangos
+
+    @staticmethod
+    def _offsets(indice: IndiceSegmento, filtros: Dict[str, str], rangos: List[Tuple[int, int]]) -> List[int]:
+        """Intersección de los índices invertidos, limitada a los rangos de tiempo"""
+        listas = sorted((indice.offsets(campo, valor) for campo, valor in filtros.items()), key=len)
+        if not listas[0]:
+            return []
+        comunes = set(listas[0])
+        for lista in listas[1:]:
+            comunes.intersection_update(lista)
+
+        inicios = [inicio for inicio, _ in rangos]
+        offsets = []
+        for offset in sorted(comunes):
+            i = bisect_right(inicios, offset) - 1
+            if i >= 0 and offset < rangos[i][1]:
+                offsets.append(offset)
+        return offsets
+
+    @staticmethod
+    def _lineas(contenido: Contenido, rangos: List[Tuple[int, int]]) -> Iterator[int]:
+        """Offsets de todas las líneas de los rangos (consultas solo por tiempo)"""
+        for inicio, fin in rangos:
+            while inicio < fin:
+                yield inicio
+                siguiente = contenido.find(b"\n", inicio, fin)
+                if siguiente < 0:
+                    break
+                inicio = siguiente + 1
+
+    @staticmethod
+    def _cumple(evento: Dict[str, Any], desde: float, hasta: float, filtros: Dict[str, str]) -> bool:
+        ts = segundos(evento.get("timestamp"))
+        if ts is None or not desde <= ts <= hasta:
+            return False
+        return all(valor_campo(evento, campo) == valor for campo, valor in filtros.items())
+
+def _fecha(texto: str) -> float:
+    """Fecha del CLI (ISO 8601, sin zona = UTC) -> epoch"""
+    valor = segundos(texto)
+    if valor is None:
+        raise argparse.ArgumentTypeError(f"Fecha inválida: {texto} (usa ISO 8601, p. ej. 2024-05-01T10:00)")
+    return valor
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Índice y consultas sobre los logs de seguridad")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    indexar = subcomandos.add_parser("indexar", help="Indexa los segmentos (incremental)")
+    indexar.add_argument("log", type=Path, nargs="?", default=Path("logs/security.log"))
+    indexar.add_argument("--seguir", type=float, metavar="SEG",
+                         help="Seguir indexando cada SEG segundos a medida que se escribe")
+
+    buscar = subcomandos.add_parser("buscar", help="Busca eventos usando los índices")
+    buscar.add_argument("log", type=Path, nargs="?", default=Path("logs/security.log"))
+    buscar.add_argument("--desde", type=_fecha)
+    buscar.add_argument("--hasta", type=_fecha)
+    buscar.add_argument("--usuario", dest="username")
+    buscar.add_argument("--ip", dest="ip_address")
+    buscar.add_argument("--tipo", dest="event_type", help="p. ej. login_attempt")
+    buscar.add_argument("--evento", dest="event", help="p. ej. LOGIN_FAILED")
+    buscar.add_argument("--limite", type=int)
+    args = parser.parse_args(argv)
+
+    indice = IndiceLogs(args.log)
+
+    if args.comando == "indexar":
+        while True:
+            inicio = time.perf_counter()
+            estadisticas = indice.actualizar()
+            print(f"📇 {estadisticas['eventos_nuevos']:,} eventos nuevos en {estadisticas['segmentos_leidos']} "
+                  f"de {estadisticas['segmentos']} segmentos ({(time.perf_counter() - inicio) * 1000:.0f} ms)",
+                  file=sys.stderr)
+            if not args.seguir:
+                return 0
+            time.sleep(args.seguir)
+
+    filtros = {campo: getattr(args, campo) for campo in CAMPOS if getattr(args, campo)}
+    inicio = time.perf_counter()
+    indice.actualizar()
+    indexado = time.perf_counter()
+    total = 0
+    for evento in indice.buscar(args.desde, args.hasta, args.limite, actualizar=False, **filtros):
+        print(json.dumps(evento, ensure_ascii=False))
+        total += 1
+    fin = time.perf_counter()
+    print(f"🔎 {total:,} eventos (indexado {(indexado - inicio) * 1000:.0f} ms, "
+          f"consulta {(fin - indexado) * 1000:.0f} ms)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,429 @@
+"""
+🏭 Ingesta masiva de altas: validar → hashear → persistir
+=========================================================
+
+Dar de alta usuarios de uno en uno (ValidadorSeguro, bcrypt.hashpw e
+insertar) desperdicia la máquina: bcrypt es deliberadamente lento y
+mientras se calcula un hash no se valida ni se guarda nada.
+
+Este módulo separa el trabajo en tres etapas que avanzan a la vez:
+
+    filas ──▶ [validación] ──cola──▶ [hash bcrypt] ──cola──▶ [persistencia]
+               pool propio            pool de procesos        escrituras por lotes
+
+• Cada etapa tiene su propio tamaño de pool, así se dimensiona por separado
+• Las colas entre etapas están acotadas: si una etapa se atrasa, las
+  anteriores se frenan (backpressure) en vez de llenar la memoria
+• Cada etapa informa su rendimiento, cuánto tiempo pasó esperando y la
+  profundidad de su cola de entrada: la etapa con la cola llena delante
+  y sin esperas es el cuello de botella
+
+Uso:
+    python -m modules.ingesta_altas altas.jsonl --procesos-hash 4 --salida usuarios.jsonl
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import bcrypt
+
+from modules.validacion_masiva import ESQUEMA_REGISTRO, ReporteErrores, en_lotes, leer_filas, validar_lote
+
+TAMANO_LOTE = 500        # Filas por lote de validación
+TAMANO_LOTE_HASH = 16    # Contraseñas por tarea de bcrypt (cada una tarda ~0.25 s)
+CAPACIDAD_COLA = 4       # Lotes en cada cola entre etapas
+RONDAS_BCRYPT = 12
+MAX_BYTES_PASSWORD = 72  # bcrypt ignora lo que pase de 72 bytes
+
+_FIN = object()          # Marca de fin de flujo que recorre las colas
+
+def validar_altas(inicio: int, lote: List[Dict[str, Any]], esquema: Dict[str, Dict[str, Any]],
+                  campo_password: str) -> Tuple[int, int, List[Tuple[Dict[str, Any], str]], List[Tuple[int, str, str]]]:
+    """Valida un lote de altas (se ejecuta en el pool de validación)
+
+    Devuelve (inicio, tamaño, [(fila limpia, password)], errores). La
+    contraseña no pasa por el esquema: no se sanitiza, solo se comprueba
+    que exista y que bcrypt la acepte tal cual: sin pasar de 72 bytes ni
+    bytes NUL (según la versión de bcrypt, hashpw la corta ahí o lanza
+    ValueError y tumba la etapa de hash entera).
+    """
+    limpias, errores = validar_lote(lote, esquema)
+    registros = []
+
+    for i, (fila, limpia) in enumerate(zip(lote, limpias)):
+        password = fila.get(campo_password)
+        if not isinstance(password, str) or not password:
+            errores.append((i, campo_password, f"{campo_password.capitalize()} es requerido"))
+        elif len(password.encode("utf-8")) > MAX_BYTES_PASSWORD:
+            errores.append((i, campo_password, f"Password demasiado largo (máx. {MAX_BYTES_PASSWORD} bytes)"))
+        elif "\x00" in password:
+            errores.append((i, campo_password, "Password con caracteres no permitidos"))
+        elif limpia is not None:
+            registros.append((limpia, password))
+
+    return inicio, len(lote), registros, errores
+
+def hashear_passwords(passwords: List[str], rondas: int) -> List[bytes]:
+    """Hashea un grupo de contraseñas con bcrypt (se ejecuta en el pool de hash)"""
+    return [bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rondas)) for password in passwords]
+
+class AlmacenUsuarios:
+    """La "base de datos" del Módulo 1, con inserciones por lotes
+
+    Cualquier objeto con guardar_lote(registros) -> insertados sirve como
+    almacén (una tabla real haría un único INSERT de varias filas).
+    """
+
+    def __init__(self, campo_clave: str = "email"):
+        self.campo_clave = campo_clave
+        self.usuarios: Dict[str, Dict[str, Any]] = {}
+        self.duplicados = 0
+
+    def _insertar(self, registros: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Inserta los registros nuevos y devuelve cuáles lo eran"""
+        nuevos = []
+        for registro in registros:
+            clave = registro[self.campo_clave]
+            if clave in self.usuarios:
+                self.duplicados += 1  # "Usuario ya existe"
+                continue
+            self.usuarios[clave] = registro
+            nuevos.append(registro)
+        return nuevos
+
+    def guardar_lote(self, registros: List[Dict[str, Any]]) -> int:
+        return len(self._insertar(registros))
+
+class AlmacenJSONL(AlmacenUsuarios):
+    """Almacén que además escribe cada lote en un archivo JSONL con una sola escritura"""
+
+    def __init__(self, ruta: Path, campo_clave: str = "email"):
+        super().__init__(campo_clave)
+        self.archivo = open(ruta, "w", encoding="utf-8")
+
+    def guardar_lote(self, registros: List[Dict[str, Any]]) -> int:
+        nuevos = self._insertar(registros)
+        self.archivo.write("".join(
+            json.dumps({**r, "password_hash": r["password_hash"].decode("ascii")}, ensure_ascii=False) + "\n"
+            for r in nuevos))
+        return len(nuevos)
+
+    def cerrar(self):
+        self.archivo.close()
+
+class MetricasEtapa:
+    """Rendimiento y esperas de una etapa del pipeline"""
+
+    def __init__(self, nombre: str, cola_entrada: "queue.Queue"):
+        self.nombre = nombre
+        self.cola_entrada = cola_entrada
+        self.lotes = 0
+        self.registros = 0
+        self.ocupado_s = 0.0         # Trabajando (incluye esperar a su pool)
+        self.espera_entrada_s = 0.0  # Sin trabajo: la etapa anterior no da abasto
+        self.espera_salida_s = 0.0   # Bloqueada: la etapa siguiente no da abasto
+        self.profundidad_max = 0
+        self._suma_profundidad = 0
+        self._muestras = 0
+        self.inicio = self.fin = 0.0
+
+    def muestrear_cola(self):
+        profundidad = self.cola_entrada.qsize()
+        self.profundidad_max = max(self.profundidad_max, profundidad)
+        self._suma_profundidad += profundidad
+        self._muestras += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        duracion = max(self.fin - self.inicio, 1e-9)
+        return {
+            "etapa": self.nombre,
+            "lotes": self.lotes,
+            "registros": self.registros,
+            "registros_por_segundo": self.registros / duracion,
+            # Lo que rendiría la etapa si nunca esperase a las demás
+            "capacidad_por_segundo": self.registros / self.ocupado_s if self.ocupado_s else None,
+            "ocupacion": self.ocupado_s / duracion,
+            "espera_entrada_s": self.espera_entrada_s,
+            "espera_salida_s": self.espera_salida_s,
+            "cola_entrada_max": self.profundidad_max,
+            "cola_entrada_media": self._suma_profundidad / self._muestras if self._muestras else 0.0,
+            "cola_entrada_capacidad": self.cola_entrada.maxsize,
+        }
+
+class PipelineAltas:
+    """Pipeline de altas en tres etapas con colas acotadas entre ellas
+
+    procesos_validacion / procesos_hash = 0 ejecuta esa etapa en su propio
+    hilo, sin pool (útil para depurar o con CPUs de un solo núcleo).
+    """
+
+    def __init__(self, esquema: Optional[Dict[str, Dict[str, Any]]] = None,
+                 almacen: Optional[AlmacenUsuarios] = None,
+                 procesos_validacion: int = 1, procesos_hash: int = 2,
+                 tamano_lote: int = TAMANO_LOTE, tamano_lote_hash: int = TAMANO_LOTE_HASH,
+                 capacidad_cola: int = CAPACIDAD_COLA, rondas_bcrypt: int = RONDAS_BCRYPT,
+                 campo_password: str = "password"):
+        self.esquema = esquema or ESQUEMA_REGISTRO
+        self.almacen = almacen if almacen is not None else AlmacenUsuarios()
+        self.procesos_validacion = procesos_validacion
+        self.procesos_hash = procesos_hash
+        self.tamano_lote = tamano_lote
+        self.tamano_lote_hash = tamano_lote_hash
+        self.capacidad_cola = capacidad_cola
+        self.rondas_bcrypt = rondas_bcrypt
+        self.campo_password = campo_password
+        self.reporte = ReporteErrores()
+        self.insertados = 0
+
+        self._detener = threading.Event()
+        self._error: Optional[BaseException] = None
+        self.metricas: List[MetricasEtapa] = []
+
+    # --- Colas con backpressure que no se quedan colgadas si algo falla ---
+
+    def _poner(self, cola: "queue.Queue", elemento: Any, metricas: MetricasEtapa):
+        inicio = time.perf_counter()
+        while not self._detener.is_set():
+            try:
+                cola.put(elemento, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        metricas.espera_salida_s += time.perf_counter() - inicio
+
+    def _tomar(self, cola: "queue.Queue", metricas: MetricasEtapa) -> Any:
+        metricas.muestrear_cola()
+        inicio = time.perf_counter()
+        while not self._detener.is_set():
+            try:
+                elemento = cola.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        else:
+            elemento = _FIN
+        metricas.espera_entrada_s += time.perf_counter() - inicio
+        return elemento
+
+    def _etapa(self, metricas: MetricasEtapa, entrada: "queue.Queue", salida: Optional["queue.Queue"],
+               procesar: Callable[[Any], Any], pool: Optional[Executor], en_vuelo: int):
+        """Bucle genérico de una etapa: toma de su cola, procesa y entrega en orden
+
+        Con pool mantiene como mucho `en_vuelo` tareas pendientes; procesar()
+        devuelve entonces un Future en lugar del resultado.
+        """
+        pendientes: List[Tuple[Future, int]] = []
+
+        def entregar(resultado, registros: int):
+            metricas.lotes += 1
+            metricas.registros += registros
+            if salida is not None and resultado is not None:
+                self._poner(salida, resultado, metricas)
+
+        def esperar_primero():
+            futuro, registros = pendientes.pop(0)
+            inicio = time.perf_counter()
+            resultado = futuro.result()
+            metricas.ocupado_s += time.perf_counter() - inicio
+            entregar(resultado, registros)
+
+        metricas.inicio = time.perf_counter()
+        try:
+            while True:
+                elemento = self._tomar(entrada, metricas)
+                if elemento is _FIN:
+                    break
+                inicio = time.perf_counter()
+                resultado, registros = procesar(elemento)
+                metricas.ocupado_s += time.perf_counter() - inicio
+
+                if pool is None:
+                    entregar(resultado, registros)
+                    continue
+                pendientes.append((resultado, registros))
+                if len(pendientes) >= en_vuelo:
+                    esperar_primero()
+            while pendientes and not self._detener.is_set():
+                esperar_primero()
+        except BaseException as e:
+            self._error = self._error or e
+            self._detener.set()
+        finally:
+            metricas.fin = time.perf_counter()
+            if salida is not None:
+                self._poner(salida, _FIN, metricas)
+
+    # --- Trabajo de cada etapa ---
+
+    def _validar(self, pool: Optional[Executor]):
+        def procesar(tarea):
+            inicio, lote = tarea
+            if pool is None:
+                return self._tras_validar(validar_altas(inicio, lote, self.esquema, self.campo_password)), len(lote)
+            futuro = pool.submit(validar_altas, inicio, lote, self.esquema, self.campo_password)
+            return _FuturoDerivado([futuro], lambda r: self._tras_validar(r[0])), len(lote)
+        return procesar
+
+    def _tras_validar(self, resultado):
+        """Registra errores y pasa solo los registros válidos a la etapa de hash"""
+        inicio, tamano, registros, errores = resultado
+        filas_con_error = {indice for indice, _, _ in errores}
+        self.reporte.registrar_lote(inicio, tamano, tamano - len(filas_con_error), errores)
+        return registros or None
+
+    def _hashear(self, pool: Optional[Executor]):
+        def procesar(registros):
+            passwords = [password for _, password in registros]
+            filas = [fila for fila, _ in registros]
+            grupos = [passwords[i:i + self.tamano_lote_hash]
+                      for i in range(0, len(passwords), self.tamano_lote_hash)]
+
+            if pool is None:
+                hashes = [h for grupo in grupos for h in hashear_passwords(grupo, self.rondas_bcrypt)]
+                return _con_hashes(filas, hashes), len(filas)
+
+            # Un lote de validación se reparte en varias tareas de bcrypt
+            futuros = [pool.submit(hashear_passwords, grupo, self.rondas_bcrypt) for grupo in grupos]
+            return _FuturoDerivado(futuros, lambda partes: _con_hashes(filas, [h for p in partes for h in p])), len(filas)
+        return procesar
+
+    def _persistir(self, registros):
+        self.insertados += self.almacen.guardar_lote(registros)
+        return None, len(registros)
+
+    # --- Ejecución ---
+
+    def ejecutar(self, filas: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """Procesa todas las filas y devuelve las métricas por etapa"""
+        cola_validar: "queue.Queue" = queue.Queue(self.capacidad_cola)
+        cola_hash: "queue.Queue" = queue.Queue(self.capacidad_cola)
+        cola_persistir: "queue.Queue" = queue.Queue(self.capacidad_cola)
+
+        lectura = MetricasEtapa("lectura", queue.Queue())
+        validacion = MetricasEtapa("validación", cola_validar)
+        hash_ = MetricasEtapa("hash bcrypt", cola_hash)
+        persistencia = MetricasEtapa("persistencia", cola_persistir)
+        self.metricas = [lectura, validacion, hash_, persistencia]
+
+        pool_validacion = ProcessPoolExecutor(self.procesos_validacion) if self.procesos_validacion > 0 else None
+        pool_hash = ProcessPoolExecutor(self.procesos_hash) if self.procesos_hash > 0 else None
+        inicio = time.perf_counter()
+        try:
+            hilos = [
+                threading.Thread(target=self._etapa, name="validacion", args=(
+                    validacion, cola_validar, cola_hash, self._validar(pool_validacion),
+                    pool_validacion, max(self.procesos_validacion, 1) * 2)),
+                threading.Thread(target=self._etapa, name="hash", args=(
+                    hash_, cola_hash, cola_persistir, self._hashear(pool_hash),
+                    pool_hash, max(self.procesos_hash, 1))),
+                threading.Thread(target=self._etapa, name="persistencia", args=(
+                    persistencia, cola_persistir, None, self._persistir, None, 0)),
+            ]
+            for hilo in hilos:
+                hilo.start()
+
+            # La lectura corre en el hilo que llama
+            lectura.inicio = time.perf_counter()
+            try:
+                for numero, lote in enumerate(en_lotes(filas, self.tamano_lote)):
+                    if self._detener.is_set():
+                        break
+                    lectura.lotes += 1
+                    lectura.registros += len(lote)
+                    self._poner(cola_validar, (numero * self.tamano_lote, lote), lectura)
+            except BaseException as e:
+                self._error = self._error or e
+                self._detener.set()
+            finally:
+                lectura.fin = time.perf_counter()
+                self._poner(cola_validar, _FIN, lectura)
+
+            for hilo in hilos:
+                hilo.join()
+        finally:
+            for pool in (pool_validacion, pool_hash):
+                if pool is not None:
+                    pool.shutdown(cancel_futures=True)
+
+        if self._error is not None:
+            raise self._error
+
+        return {
+            "segundos": time.perf_counter() - inicio,
+            "insertados": self.insertados,
+            "etapas": [m.to_dict() for m in self.metricas],
+            "cuello_de_botella": self.cuello_de_botella(),
+        }
+
+    def cuello_de_botella(self) -> Optional[str]:
+        """La etapa más ocupada (la que frena a las demás)"""
+        trabajo = [m for m in self.metricas[1:] if m.registros]
+        if not trabajo:
+            return None
+        return max(trabajo, key=lambda m: m.ocupado_s / max(m.fin - m.inicio, 1e-9)).nombre
+
+def _con_hashes(filas: List[Dict[str, Any]], hashes: List[bytes]) -> List[Dict[str, Any]]:
+    return [{**fila, "password_hash": h} for fila, h in zip(filas, hashes)]
+
+class _FuturoDerivado:
+    """Future mínimo cuyo resultado se calcula a partir de otros futures"""
+
+    def __init__(self, futuros: List[Future], combinar: Callable[[List[Any]], Any]):
+        self.futuros = futuros
+        self.combinar = combinar
+
+    def result(self):
+        return self.combinar([futuro.result() for futuro in self.futuros])
+
+def imprimir_metricas(resultado: Dict[str, Any], salida=sys.stderr):
+    print(f"\n{'etapa':<14} {'registros':>10} {'reg/s':>9} {'capacidad':>10} {'ocupación':>10} "
+          f"{'espera ent.':>12} {'espera sal.':>12} {'cola máx/media':>15}", file=salida)
+    for etapa in resultado["etapas"]:
+        capacidad = f"{etapa['capacidad_por_segundo']:,.0f}" if etapa["capacidad_por_segundo"] else "-"
+        cola = (f"{etapa['cola_entrada_max']}/{etapa['cola_entrada_media']:.1f}"
+                if etapa["cola_entrada_capacidad"] else "-")
+        print(f"{etapa['etapa']:<14} {etapa['registros']:>10,} {etapa['registros_por_segundo']:>9,.0f} "
+              f"{capacidad:>10} {etapa['ocupacion']:>9.0%} {etapa['espera_entrada_s']:>11.2f}s "
+              f"{etapa['espera_salida_s']:>11.2f}s {cola:>15}", file=salida)
+    print(f"\n⏱️ {resultado['insertados']:,} altas en {resultado['segundos']:.2f} s; "
+          f"cuello de botella: {resultado['cuello_de_botella']}", file=salida)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingesta masiva de altas: validar, hashear y persistir")
+    parser.add_argument("entrada", type=Path, help="Archivo .csv o .jsonl con una columna 'password'")
+    parser.add_argument("--salida", type=Path, help="JSONL donde persistir los usuarios (por defecto solo en memoria)")
+    parser.add_argument("--reporte", type=Path, help="Archivo JSON para el reporte de errores y métricas")
+    parser.add_argument("--procesos-validacion", type=int, default=1)
+    parser.add_argument("--procesos-hash", type=int, default=2)
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por lote de validación")
+    parser.add_argument("--lote-hash", type=int, default=TAMANO_LOTE_HASH, help="Contraseñas por tarea de bcrypt")
+    parser.add_argument("--cola", type=int, default=CAPACIDAD_COLA, help="Lotes por cola entre etapas")
+    parser.add_argument("--rondas", type=int, default=RONDAS_BCRYPT, help="Factor de coste de bcrypt")
+    args = parser.parse_args(argv)
+
+    almacen = AlmacenJSONL(args.salida) if args.salida else AlmacenUsuarios()
+    pipeline = PipelineAltas(almacen=almacen, procesos_validacion=args.procesos_validacion,
+                             procesos_hash=args.procesos_hash, tamano_lote=args.lote,
+                             tamano_lote_hash=args.lote_hash, capacidad_cola=args.cola,
+                             rondas_bcrypt=args.rondas)
+    try:
+        resultado = pipeline.ejecutar(leer_filas(args.entrada))
+    finally:
+        if isinstance(almacen, AlmacenJSONL):
+            almacen.cerrar()
+
+    imprimir_metricas(resultado)
+    if args.reporte:
+        informe = {"metricas": resultado, "errores": pipeline.reporte.to_dict(), "duplicados": almacen.duplicados}
+        args.reporte.write_text(json.dumps(informe, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+💾 Instantáneas de AttackDetector para reinicios en caliente
+============================================================
+
+Un reinicio o un despliegue vacía todos los contadores de AttackDetector:
+sin instantáneas, un atacante estrena presupuesto de intentos con cada
+versión que sale. Con ellas:
+
+• Cada `intervalo` segundos se guarda el estado del detector en binario
+  compacto (AttackDetector.volcar_estado, comprimido con zlib) junto con
+  la posición del log hasta la que llega
+• La escritura la hace un proceso hijo creado con fork(): el hijo ve una
+  copia congelada de la memoria (copy-on-write) y el proceso principal
+  sigue procesando eventos. La única pausa es el propio fork, unos
+  milisegundos aunque haya millones de claves (sin fork, p. ej. en
+  Windows, se escribe en el momento). El hijo corre con menos prioridad
+  para no quitarle CPU al proceso principal
+• Al arrancar se carga la última instantánea y el seguidor reprocesa los
+  eventos escritos en el log desde esa posición: el detector queda igual
+  que si no se hubiera parado. Las alertas de esos eventos pueden salir
+  otra vez (al menos una vez)
+• Se escribe en un temporal y se renombra (nunca queda a medias) y lleva
+  un CRC32. Si está dañada o se guardó con otra ventana o dimensiones de
+  sketch, se arranca en frío con un aviso
+
+Uso:
+    python -m modules.seguidor_logs logs/security.log --instantanea logs/detector.snap
+    python -m modules.instantaneas_detector logs/detector.snap   # Qué contiene
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from config import DETECTION_CONFIG
+from modules import cargar_ejemplo
+
+AttackDetector = cargar_ejemplo("04_security_logging").AttackDetector
+
+MAGIA = b"INSTDET1"
+CABECERA = struct.Struct("<8sII")  # Magia, CRC32 del resto, longitud de los metadatos JSON
+
+def escribir_instantanea(ruta: Union[str, Path], estado: bytes, metadatos: Dict[str, object]):
+    """Escribe estado + metadatos de forma atómica (temporal, fsync y rename)"""
+    ruta = Path(ruta)
+    meta = json.dumps(metadatos).encode("utf-8")
+    cuerpo = meta + zlib.compress(estado, 1)
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+    with open(temporal, "wb") as archivo:
+        archivo.write(CABECERA.pack(MAGIA, zlib.crc32(cuerpo), len(meta)))
+        archivo.write(cuerpo)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+
+def leer_instantanea(ruta: Union[str, Path]) -> Tuple[Dict[str, object], bytes]:
+    """(metadatos, estado) de una instantánea; ValueError si está dañada"""
+    datos = Path(ruta).read_bytes()
+    if len(datos) < CABECERA.size:
+        raise ValueError("Instantánea truncada")
+    magia, crc, longitud = CABECERA.unpack_from(datos)
+    cuerpo = memoryview(datos)[CABECERA.size:]
+    if magia != MAGIA:
+        raise ValueError("No es una instantánea de AttackDetector")
+    if zlib.crc32(cuerpo) != crc:
+        raise ValueError("Instantánea dañada (CRC incorrecto)")
+    try:
+        return json.loads(bytes(cuerpo[:longitud])), zlib.decompress(cuerpo[longitud:])
+    except zlib.error as e:
+        raise ValueError(f"Instantánea dañada: {e}") from e
+
+class Instantaneas:
+    """Guarda periódicamente el estado de un detector y lo restaura al arrancar
+
+    Se pasa como `al_avanzar` a SeguidorLog.seguir(): recibe la posición
+    del log después de cada lote ya procesado, así que el estado guardado
+    y la posición siempre corresponden.
+    """
+
+    def __init__(self, ruta: Union[str, Path],
+                 crear_detector: Callable[[], AttackDetector] = AttackDetector,
+                 intervalo: float = DETECTION_CONFIG["snapshot_interval_seconds"]):
+        self.ruta = Path(ruta)
+        self.crear_detector = crear_detector
+        self.intervalo = intervalo
+        self.detector: Optional[AttackDetector] = None
+        self.guardadas = 0
+        self.pausa_maxima = 0.0     # Segundos que el proceso principal estuvo parado guardando
+        self._hijo: Optional[int] = None
+        self._ultima = time.monotonic()
+
+    def cargar(self) -> Tuple[AttackDetector, Optional[Dict[str, object]]]:
+        """(detector, posición del log) de la última instantánea, o uno vacío y None"""
+        self.detector = self.crear_detector()
+        try:
+            metadatos, estado = leer_instantanea(self.ruta)
+            self.detector.cargar_estado(estado)
+            return self.detector, metadatos["posicion"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            print(f"⚠️ No se pudo restaurar {self.ruta} ({e}); se arranca en frío", file=sys.stderr)
+            self.detector = self.crear_detector()  # El que falló pudo quedar a medias
+        return self.detector, None
+
+    def _recoger_hijo(self, esperar: bool = False) -> bool:
+        """True si no hay ninguna escritura en curso (con `esperar`, espera a que acabe)"""
+        if self._hijo is None:
+            return True
+        pid, estado = os.waitpid(self._hijo, 0 if esperar else os.WNOHANG)
+        if pid == 0:
+            return False
+        self._hijo = None
+        if os.waitstatus_to_exitcode(estado) == 0:
+            self.guardadas += 1
+        else:
+            print(f"⚠️ Falló la escritura de la instantánea {self.ruta}", file=sys.stderr)
+        return True
+
+    def guardar(self, posicion: Dict[str, object], en_segundo_plano: bool = True) -> bool:
+        """Guarda el detector con la posición del log; False si aún se está escribiendo la anterior"""
+        if not self._recoger_hijo(esperar=not en_segundo_plano):
+            return False
+        metadatos = {"posicion": posicion, "creada": time.time()}
+        inicio = time.perf_counter()
+        self._ultima = time.monotonic()
+        if en_segundo_plano and hasattr(os, "fork"):
+            pid = os.fork()
+            if pid == 0:
+                # Hijo: serializa su copia de la memoria y termina sin ejecutar atexit ni vaciar buffers
+                codigo = 1
+                try:
+                    os.nice(10)  # Con pocos núcleos, que no le quite CPU al proceso principal
+                    escribir_instantanea(self.ruta, self.detector.volcar_estado(), metadatos)
+                    codigo = 0
+                finally:
+                    os._exit(codigo)
+            self._hijo = pid
+        else:
+            escribir_instantanea(self.ruta, self.detector.volcar_estado(), metadatos)
+            self.guardadas += 1
+        self.pausa_maxima = max(self.pausa_maxima, time.perf_counter() - inicio)
+        return True
+
+    def __call__(self, posicion: Optional[Dict[str, object]], final: bool = False):
+        if posicion is None or self.detector is None:
+            return
+        if final:
+            self.guardar(posicion, en_segundo_plano=False)
+        elif time.monotonic() - self._ultima >= self.intervalo:
+            self.guardar(posicion)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Muestra el contenido de una instantánea de AttackDetector")
+    parser.add_argument("instantanea", type=Path)
+    args = parser.parse_args(argv)
+
+    try:
+        metadatos, estado = leer_instantanea(args.instantanea)
+        detector = AttackDetector()
+        detector.cargar_estado(estado)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    antiguedad = time.time() - metadatos["creada"]
+    print(f"💾 {args.instantanea}: {args.instantanea.stat().st_size / 1e6:.1f} MB en disco, "
+          f"{len(estado) / 1e6:.1f} MB de estado, creada hace {antiguedad:,.0f} s")
+    print(f"   Posición del log: {metadatos['posicion']}")
+    print(f"   Modo {detector.modo}: {len(detector.failed_by_ip):,} IPs y {len(detector.failed_logins):,} "
+          f"usuarios con fallos, {len(detector.usuarios_por_ip):,} fuentes con usuarios distintos, "
+          f"{len(detector.fallos_por_prefijo):,} nodos del trie de subredes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+🔏 Verificación de logs a prueba de manipulaciones
+=================================================
+
+Con clave_integridad, SecurityLogger encadena cada línea con la anterior
+(h_i = SHA-256(0x00 ‖ h_{i-1} ‖ línea)) y cada lote termina con una línea
+INTEGRITY_CHECKPOINT firmada con Ed25519 que lleva la raíz de Merkle de
+las hojas del lote (ver SelladorIntegridad). Este módulo comprueba esos
+logs con la clave pública, sin necesitar la privada:
+
+• Segmento entero en una pasada: se leen las líneas en streaming (también
+  .gz/.zst) guardando solo las del lote en curso; se comprueban firmas,
+  raíces, número de entradas, la secuencia de checkpoints y que cada lote
+  empiece donde terminó el anterior (también entre segmentos)
+• Una sola línea en O(log n): la prueba de inclusión es la línea, la hoja
+  anterior, los hashes hermanos del camino hasta la raíz y el checkpoint
+  firmado; comprobarla cuesta log2(lote) hashes y una verificación de firma
+
+Editar, borrar, insertar o reordenar líneas cambia las hojas desde ese
+punto y no cuadra con la raíz firmada; quitar un checkpoint junta dos
+lotes y no cuadra el número de entradas. Las líneas escritas después del
+último checkpoint todavía no están protegidas: se informan como sin sellar.
+
+Uso:
+    python -m modules.integridad_logs claves --privada claves/log.key --publica claves/log.pub
+    python -m modules.integridad_logs verificar logs/security.log --publica claves/log.pub
+    python -m modules.integridad_logs probar logs/security.log --linea 1234 --publica claves/log.pub > prueba.json
+    python -m modules.integridad_logs comprobar prueba.json --publica claves/log.pub
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
+
+from modules import cargar_ejemplo
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+hoja_merkle = registro_seguridad.hoja_merkle
+raiz_merkle = registro_seguridad.raiz_merkle
+mensaje_checkpoint = registro_seguridad.mensaje_checkpoint
+leer_checkpoint = registro_seguridad.leer_checkpoint
+id_clave = registro_seguridad.id_clave
+listar_segmentos = registro_seguridad.listar_segmentos
+zstandard = registro_seguridad.zstandard
+
+TAMANO_LECTURA = 1024 * 1024  # Bytes por lectura al recorrer un segmento
+
+# --- Claves ---
+
+def generar_claves(privada: Path, publica: Path):
+    """Par de claves Ed25519 en PEM; la privada solo legible por el propietario"""
+    clave = Ed25519PrivateKey.generate()
+    privada.parent.mkdir(parents=True, exist_ok=True)
+    publica.parent.mkdir(parents=True, exist_ok=True)
+    descriptor = os.open(privada, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "wb") as archivo:
+        archivo.write(clave.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                          serialization.NoEncryption()))
+    publica.write_bytes(clave.public_key().public_bytes(serialization.Encoding.PEM,
+                                                        serialization.PublicFormat.SubjectPublicKeyInfo))
+
+def cargar_clave_privada(ruta: Union[str, Path]) -> Ed25519PrivateKey:
+    """Clave privada para SecurityLogger(clave_integridad=...)"""
+    clave = serialization.load_pem_private_key(Path(ruta).read_bytes(), password=None)
+    if not isinstance(clave, Ed25519PrivateKey):
+        raise ValueError(f"{ruta}: se esperaba una clave privada Ed25519")
+    return clave
+
+def cargar_clave_publica(ruta: Union[str, Path]) -> Ed25519PublicKey:
+    clave = serialization.load_pem_public_key(Path(ruta).read_bytes())
+    if not isinstance(clave, Ed25519PublicKey):
+        raise ValueError(f"{ruta}: se esperaba una clave pública Ed25519")
+    return clave
+
+# --- Árbol de Merkle ---
+
+def camino_merkle(hojas: List[bytes], indice: int) -> List[bytes]:
+    """Hashes hermanos desde la hoja `indice` hasta la raíz (como raiz_merkle)"""
+    sha256 = hashlib.sha256
+    camino = []
+    nivel = hojas
+    while len(nivel) > 1:
+        hermano = indice ^ 1
+        if hermano < len(nivel):
+            camino.append(nivel[hermano])
+        siguiente = [sha256(b"\x01" + nivel[i] + nivel[i + 1]).digest() for i in range(0, len(nivel) - 1, 2)]
+        if len(nivel) % 2:
+            siguiente.append(nivel[-1])
+        nivel = siguiente
+        indice //= 2
+    return camino
+
+def raiz_desde_camino(hoja: bytes, indice: int, total: int, camino: List[bytes]) -> Optional[bytes]:
+    """Raíz a la que lleva el camino, o None si no encaja con la posición
+
+    El lado de cada hermano sale de la posición y del tamaño del lote, no
+    de la prueba: una prueba no puede mover la línea a otro sitio.
+    """
+    if not 0 <= indice < total:
+        return None
+    sha256 = hashlib.sha256
+    pasos = iter(camino)
+    nodo = hoja
+    while total > 1:
+        if indice % 2:
+            nodo = sha256(b"\x01" + next(pasos, b"") + nodo).digest()
+        elif indice + 1 < total:
+            nodo = sha256(b"\x01" + nodo + next(pasos, b"")).digest()
+        indice //= 2
+        total = (total + 1) // 2
+    if next(pasos, None) is not None:
+        return None
+    return nodo
+
+def firma_valida(datos: Dict[str, Any], clave_publica: Ed25519PublicKey) -> bool:
+    """Si la línea de checkpoint está firmada por la clave (y los campos no cambiaron)"""
+    try:
+        clave_publica.verify(bytes.fromhex(datos["signature"]),
+                             mensaje_checkpoint(datos["timestamp"], datos["checkpoint"]))
+        return True
+    except (InvalidSignature, KeyError, TypeError, ValueError):
+        return False
+
+# --- Recorrido de segmentos ---
+
+def lineas_segmento(ruta: Path) -> Iterator[bytes]:
+    """Líneas de un segmento (sin el salto), leyendo en streaming aunque esté comprimido"""
+    with open(ruta, "rb") as crudo:
+        if ruta.name.endswith(".gz"):
+            archivo = gzip.GzipFile(fileobj=crudo)
+        elif ruta.name.endswith(".zst"):
+            archivo = zstandard.ZstdDecompressor().stream_reader(crudo)
+        else:
+            archivo = crudo
+        resto = b""
+        while True:
+            bloque = archivo.read(TAMANO_LECTURA)
+            if not bloque:
+                break
+            lineas = (resto + bloque).split(b"\n")
+            resto = lineas.pop()
+            yield from lineas
+    if resto:
+        yield resto  # Última línea a medio escribir
+
+def _comprobar_lote(datos: Dict[str, Any], lineas: List[bytes], clave_publica: Ed25519PublicKey,
+                    huella: str) -> List[str]:
+    """Errores de un lote frente a su checkpoint (lista vacía si cuadra)"""
+    checkpoint = datos["checkpoint"]
+    errores = []
+    if checkpoint.get("key_id") != huella:
+        errores.append(f"checkpoint firmado con otra clave ({checkpoint.get('key_id')})")
+    elif not firma_valida(datos, clave_publica):
+        errores.append("firma inválida")
+    try:
+        anterior = bytes.fromhex(checkpoint["previous"])
+        hojas = []
+        for linea in lineas:
+            anterior = hoja_merkle(anterior, linea)
+            hojas.append(anterior)
+        if len(hojas) != checkpoint["entries"]:
+            errores.append(f"{len(hojas)} líneas y el checkpoint sella {checkpoint['entries']}")
+        elif hojas and raiz_merkle(hojas).hex() != checkpoint["root"]:
+            errores.append("la raíz de Merkle no cuadra: líneas modificadas, insertadas o reordenadas")
+        elif hojas and hojas[-1].hex() != checkpoint["last"]:
+            errores.append("la última hoja no cuadra con el checkpoint")
+    except (KeyError, TypeError, ValueError) as error:
+        errores.append(f"checkpoint mal formado: {error}")
+    return errores
+
+def verificar_segmento(ruta: Union[str, Path], clave_publica: Ed25519PublicKey,
+                       anterior: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Comprueba un segmento entero en una pasada
+
+    `anterior` es el resultado del segmento previo: su último checkpoint
+    debe encadenar con el primero de este. Devuelve lotes, entradas
+    verificadas, líneas sin sellar al final, errores [(primera línea,
+    última línea, motivo)] y el último checkpoint visto.
+    """
+    ruta = Path(ruta)
+    huella = id_clave(clave_publica)
+    ultimo = anterior.get("ultimo_checkpoint") if anterior else None
+    resultado = {"segmento": str(ruta), "lotes": 0, "entradas": 0, "sin_sellar": 0,
+                 "errores": [], "ultimo_checkpoint": ultimo}
+    pendientes: List[bytes] = []
+    primera = 1
+    numero = 0
+    for numero, linea in enumerate(lineas_segmento(ruta), 1):
+        datos = leer_checkpoint(linea)
+        if datos is None:
+            pendientes.append(linea)
+            continue
+
+        errores = _comprobar_lote(datos, pendientes, clave_publica, huella)
+        checkpoint = datos["checkpoint"]
+        if ultimo is not None:
+            if checkpoint.get("seq") != ultimo.get("seq", -2) + 1:
+                errores.append(f"checkpoint {checkpoint.get('seq')} tras el {ultimo.get('seq')}: falta o sobra alguno")
+            if checkpoint.get("previous") != ultimo.get("last"):
+                errores.append("el lote no empieza donde terminó el anterior: cadena rota")
+        for error in errores:
+            resultado["errores"].append((primera, numero, error))
+        resultado["lotes"] += 1
+        if not errores:
+            resultado["entradas"] += len(pendientes)
+        ultimo = checkpoint
+        pendientes = []
+        primera = numero + 1
+
+    resultado["sin_sellar"] = len(pendientes)
+    resultado["ultimo_checkpoint"] = ultimo
+    return resultado
+
+def verificar_log(log_file: Union[str, Path], clave_publica: Ed25519PublicKey) -> List[Dict[str, Any]]:
+    """Verifica los segmentos rotados y el archivo actual, encadenados entre sí"""
+    log_file = Path(log_file)
+    rutas = listar_segmentos(log_file) + ([log_file] if log_file.exists() else [])
+    resultados = []
+    anterior = None
+    for ruta in rutas:
+        anterior = verificar_segmento(ruta, clave_publica, anterior)
+        resultados.append(anterior)
+    return resultados
+
+# --- Pruebas de inclusión ---
+
+def prueba_inclusion(ruta: Union[str, Path], numero_linea: int) -> Dict[str, Any]:
+    """Prueba de que la línea `numero_linea` (desde 1) del segmento está sellada
+
+    Generarla recorre el segmento hasta el checkpoint de su lote;
+    comprobarla (verificar_inclusion) solo necesita la prueba.
+    """
+    pendientes: List[bytes] = []
+    primera = 1
+    for numero, linea in enumerate(lineas_segmento(Path(ruta)), 1):
+        datos = leer_checkpoint(linea)
+        if datos is None:
+            pendientes.append(linea)
+            continue
+        if numero == numero_linea:
+            raise ValueError(f"La línea {numero_linea} es un checkpoint, no una entrada")
+        if primera <= numero_linea < numero:
+            indice = numero_linea - primera
+            anterior = bytes.fromhex(datos["checkpoint"]["previous"])
+            hojas = []
+            for pendiente in pendientes:
+                anterior = hoja_merkle(anterior, pendiente)
+                hojas.append(anterior)
+            previa = hojas[indice - 1] if indice else bytes.fromhex(datos["checkpoint"]["previous"])
+            return {
+                "linea": pendientes[indice].decode("utf-8", "surrogateescape"),
+                "numero": numero_linea,
+                "indice": indice,
+                "anterior": previa.hex(),
+                "camino": [hermano.hex() for hermano in camino_merkle(hojas, indice)],
+                "checkpoint": datos,
+            }
+        pendientes = []
+        primera = numero + 1
+    raise ValueError(f"La línea {numero_linea} no existe o todavía no está sellada")
+
+def verificar_inclusion(prueba: Dict[str, Any], clave_publica: Ed25519PublicKey) -> bool:
+    """Comprueba una prueba de inclusión: log2(lote) hashes y una firma"""
+    try:
+        datos = prueba["checkpoint"]
+        checkpoint = datos["checkpoint"]
+        if checkpoint["key_id"] != id_clave(clave_publica) or not firma_valida(datos, clave_publica):
+            return False
+        hoja = hoja_merkle(bytes.fromhex(prueba["anterior"]), prueba["linea"].encode("utf-8", "surrogateescape"))
+        raiz = raiz_desde_camino(hoja, prueba["indice"], checkpoint["entries"],
+                                 [bytes.fromhex(hermano) for hermano in prueba["camino"]])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return raiz is not None and raiz.hex() == checkpoint["root"]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Verificación de logs a prueba de manipulaciones")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    claves = subcomandos.add_parser("claves", help="Genera el par de claves Ed25519")
+    claves.add_argument("--privada", type=Path, required=True)
+    claves.add_argument("--publica", type=Path, required=True)
+
+    verificar = subcomandos.add_parser("verificar", help="Verifica todos los segmentos en una pasada")
+    verificar.add_argument("log", type=Path, nargs="?", default=Path("logs/security.log"))
+    verificar.add_argument("--publica", type=Path, required=True)
+
+    probar = subcomandos.add_parser("probar", help="Genera la prueba de inclusión de una línea")
+    probar.add_argument("log", type=Path, help="Segmento (archivo actual o rotado)")
+    probar.add_argument("--linea", type=int, required=True, help="Número de línea, desde 1")
+    probar.add_argument("--publica", type=Path, help="Además comprobarla con esta clave")
+
+    comprobar = subcomandos.add_parser("comprobar", help="Comprueba una prueba de inclusión guardada")
+    comprobar.add_argument("prueba", type=Path)
+    comprobar.add_argument("--publica", type=Path, required=True)
+    args = parser.parse_args(argv)
+
+    if args.comando == "claves":
+        generar_claves(args.privada, args.publica)
+        print(f"🔑 Claves en {args.privada} (privada, para SecurityLogger) y {args.publica} (pública, para verificar)",
+              file=sys.stderr)
+        return 0
+
+    if args.comando == "verificar":
+        clave_publica = cargar_clave_publica(args.publica)
+        inicio = time.perf_counter()
+        resultados = verificar_log(args.log, clave_publica)
+        errores = 0
+        for resultado in resultados:
+            estado = "✅" if not resultado["errores"] else "❌"
+            print(f"{estado} {resultado['segmento']}: {resultado['lotes']:,} lotes, {resultado['entradas']:,} "
+                  f"entradas verificadas, {resultado['sin_sellar']:,} sin sellar")
+            for primera, ultima, motivo in resultado["errores"]:
+                print(f"   líneas {primera}-{ultima}: {motivo}")
+            errores += len(resultado["errores"])
+        print(f"🔏 {len(resultados)} segmentos en {time.perf_counter() - inicio:.2f} s", file=sys.stderr)
+        return 1 if errores else 0
+
+    if args.comando == "probar":
+        prueba = prueba_inclusion(args.log, args.linea)
+        print(json.dumps(prueba, ensure_ascii=False))
+        if args.publica is None:
+            return 0
+        valida = verificar_inclusion(prueba, cargar_clave_publica(args.publica))
+    else:
+        prueba = json.loads(args.prueba.read_text(encoding="utf-8"))
+        valida = verificar_inclusion(prueba, cargar_clave_publica(args.publica))
+    print(f"{'✅ Incluida' if valida else '❌ No incluida'}: línea {prueba.get('numero')} "
+          f"({len(prueba.get('camino', []))} hashes en el camino)", file=sys.stderr)
+    return 0 if valida else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
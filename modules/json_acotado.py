@@ -0,0 +1,363 @@
+"""
+📨 Lector JSON en streaming con límites de tamaño
+=================================================
+
+json.loads necesita el cuerpo completo en memoria: un atacante puede
+enviar 500 MB y solo después descubrimos que un campo excede max_length.
+
+Este lector procesa el cuerpo por trozos y aplica los límites MIENTRAS lee:
+• Tamaño total del cuerpo (bytes)
+• Profundidad de anidamiento
+• Número total de claves
+• Longitud de cada campo (por ruta, ej. "nombre" o "direccion.ciudad")
+
+En cuanto un límite se supera se rechaza el cuerpo, habiendo leído solo
+el prefijo ofensivo (más, como mucho, un trozo). Cada valor se pasa a los
+validadores de ValidadorSeguro en cuanto termina de leerse.
+
+Uso:
+    ok, resultado = leer_json_acotado(request_stream, esquema=ESQUEMA_REGISTRO)
+"""
+
+import codecs
+import re
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple, Union
+
+from modules.validacion_masiva import ESQUEMA_REGISTRO, METODOS_VALIDACION, ValidadorSeguro
+
+Validador = Callable[[Any], Tuple[bool, Any]]
+
+MAX_BYTES = 1024 * 1024
+MAX_PROFUNDIDAD = 32
+MAX_CLAVES = 1000
+MAX_LONGITUD_CAMPO = 10000
+MAX_LONGITUD_CLAVE = 256
+TAMANO_TROZO = 64 * 1024
+
+# Límites de longitud implícitos de los validadores (ver ValidadorSeguro)
+LIMITES_VALIDADOR = {"email": 254, "url": 2048}
+
+_RE_ESPACIOS = re.compile(r'[ \t\n\r]*')
+_RE_TEXTO = re.compile(r'[^"\\\x00-\x1f]*')
+_RE_CARACTERES_NUMERO = re.compile(r'[0-9eE.+-]*')
+_RE_NUMERO = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_LITERALES = {'t': ('true', True), 'f': ('false', False), 'n': ('null', None)}
+
+class JSONRechazado(ValueError):
+    """El cuerpo JSON es inválido o supera algún límite"""
+
+    def __init__(self, motivo: str, bytes_leidos: int):
+        super().__init__(f"{motivo} (tras leer {bytes_leidos} bytes)")
+        self.motivo = motivo
+        self.bytes_leidos = bytes_leidos
+
+def validadores_de_esquema(esquema: Dict[str, Dict[str, Any]],
+                           validador: Optional[ValidadorSeguro] = None,
+                           ) -> Tuple[Dict[str, Validador], Dict[str, int], Set[str]]:
+    """Traduce un esquema (formato de validacion_masiva) a validadores por ruta
+
+    Devuelve (validadores, límites de longitud, campos requeridos).
+    """
+    validador = validador or ValidadorSeguro()
+    validadores: Dict[str, Validador] = {}
+    limites: Dict[str, int] = {}
+    requeridos: Set[str] = set()
+
+    for campo, regla in esquema.items():
+        metodo = getattr(validador, METODOS_VALIDACION[regla["validador"]])
+        extra = {opcion: regla[opcion] for opcion in ("max_length", "reservados") if opcion in regla}
+        validadores[campo] = (lambda valor, m=metodo, e=extra: m(valor, **e)) if extra else metodo
+        if "max_length" in regla:
+            limites[campo] = regla["max_length"]
+        elif regla["validador"] in LIMITES_VALIDADOR:
+            limites[campo] = LIMITES_VALIDADOR[regla["validador"]]
+        if regla.get("requerido"):
+            requeridos.add(campo)
+
+    return validadores, limites, requeridos
+
+class LectorJSONAcotado:
+    """Parser JSON incremental que aplica límites y validación al vuelo
+
+    Los límites de longitud cuentan caracteres tal como llegan (incluidos
+    los espacios que luego quitaría strip()), así que un campo con mucho
+    relleno puede rechazarse aunque tras limpiarlo cupiera.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, max_profundidad: int = MAX_PROFUNDIDAD,
+                 max_claves: int = MAX_CLAVES, max_longitud_campo: int = MAX_LONGITUD_CAMPO,
+                 limites_campo: Optional[Dict[str, int]] = None,
+                 validadores: Optional[Dict[str, Validador]] = None,
+                 requeridos: Optional[Set[str]] = None, tamano_trozo: int = TAMANO_TROZO):
+        self.max_bytes = max_bytes
+        self.max_profundidad = max_profundidad
+        self.max_claves = max_claves
+        self.max_longitud_campo = max_longitud_campo
+        self.limites_campo = limites_campo or {}
+        self.validadores = validadores or {}
+        self.requeridos = requeridos or set()
+        self.tamano_trozo = tamano_trozo
+
+    @classmethod
+    def desde_esquema(cls, esquema: Dict[str, Dict[str, Any]] = ESQUEMA_REGISTRO,
+                      validador: Optional[ValidadorSeguro] = None, **limites) -> "LectorJSONAcotado":
+        """Crea un lector que valida con ValidadorSeguro según el esquema"""
+        validadores, limites_campo, requeridos = validadores_de_esquema(esquema, validador)
+        return cls(limites_campo=limites_campo, validadores=validadores,
+                   requeridos=requeridos, **limites)
+
+    # --- Lectura por trozos -------------------------------------------------
+
+    def _trozos(self, fuente) -> Iterable[bytes]:
+        if isinstance(fuente, (bytes, str)):
+            yield fuente
+        elif hasattr(fuente, "read"):
+            while True:
+                trozo = fuente.read(self.tamano_trozo)
+                if not trozo:
+                    return
+                yield trozo
+        else:
+            yield from fuente
+
+    def _rellenar(self) -> bool:
+        """Añade el siguiente trozo al buffer; False si no quedan datos"""
+        for trozo in self._fuente:
+            if isinstance(trozo, str):
+                trozo = trozo.encode("utf-8")
+            self.bytes_leidos += len(trozo)
+            if self.bytes_leidos > self.max_bytes:
+                self._error(f"El cuerpo supera {self.max_bytes} bytes")
+            texto = self._decodificador.decode(trozo)
+            if texto:
+                self.buf = self.buf[self.pos:] + texto
+                self.pos = 0
+                return True
+        texto = self._decodificador.decode(b"", final=True)
+        if texto:
+            self.buf = self.buf[self.pos:] + texto
+            self.pos = 0
+            return True
+        return False
+
+    def _error(self, motivo: str):
+        raise JSONRechazado(motivo, self.bytes_leidos)
+
+    def _siguiente(self) -> str:
+        """Devuelve el próximo carácter que no es espacio (sin consumirlo)"""
+        while True:
+            self.pos = _RE_ESPACIOS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._rellenar():
+                return ""
+
+    def _asegurar(self, n: int) -> bool:
+        """Garantiza n caracteres disponibles desde pos (si el cuerpo los tiene)"""
+        while len(self.buf) - self.pos < n:
+            if not self._rellenar():
+                return False
+        return True
+
+    # --- Gramática JSON -----------------------------------------------------
+
+    def _texto(self, limite: int, que: str) -> str:
+        self.pos += 1  # Comilla de apertura
+        partes = []
+        longitud = 0
+        while True:
+            m = _RE_TEXTO.match(self.buf, self.pos)
+            segmento = m.group()
+            if segmento:
+                longitud += len(segmento)
+                if longitud > limite:
+                    self._error(f"{que} supera {limite} caracteres")
+                partes.append(segmento)
+                self.pos = m.end()
+
+            if self.pos >= len(self.buf):
+                if not self._rellenar():
+                    self._error("Texto sin cerrar")
+                continue
+
+            c = self.buf[self.pos]
+            if c == '"':
+                self.pos += 1
+                return ''.join(partes)
+            if c != '\\':
+                self._error("Carácter de control en texto")
+
+            if not self._asegurar(2):
+                self._error("Escape incompleto")
+            escape = self.buf[self.pos + 1]
+            if escape == 'u':
+                partes.append(self._unicode())
+            elif escape in _ESCAPES:
+                partes.append(_ESCAPES[escape])
+                self.pos += 2
+            else:
+                self._error(f"Escape inválido: \\{escape}")
+
+            longitud += 1
+            if longitud > limite:
+                self._error(f"{que} supera {limite} caracteres")
+
+    def _unicode(self) -> str:
+        if not self._asegurar(6):
+            self._error("Escape \\u incompleto")
+        try:
+            codigo = int(self.buf[self.pos + 2:self.pos + 6], 16)
+        except ValueError:
+            self._error("Escape \\u inválido")
+        self.pos += 6
+
+        # Par sustituto (emojis y otros caracteres fuera del BMP)
+        if 0xD800 <= codigo <= 0xDBFF and self._asegurar(6) and self.buf.startswith('\\u', self.pos):
+            try:
+                bajo = int(self.buf[self.pos + 2:self.pos + 6], 16)
+            except ValueError:
+                self._error("Escape \\u inválido")
+            if 0xDC00 <= bajo <= 0xDFFF:
+                self.pos += 6
+                return chr(0x10000 + ((codigo - 0xD800) << 10) + (bajo - 0xDC00))
+        return chr(codigo)
+
+    def _numero(self, limite: int):
+        # El número termina en el primer carácter que no puede formar parte de él
+        while True:
+            fin = _RE_CARACTERES_NUMERO.match(self.buf, self.pos).end()
+            if fin - self.pos > limite:
+                self._error(f"Número de más de {limite} caracteres")
+            if fin < len(self.buf) or not self._rellenar():
+                break
+
+        literal = self.buf[self.pos:fin]
+        if not _RE_NUMERO.fullmatch(literal):
+            self._error("Valor JSON inválido")
+        self.pos = fin
+        if '.' in literal or 'e' in literal or 'E' in literal:
+            return float(literal)
+        try:
+            return int(literal)
+        except ValueError:
+            # Más dígitos que sys.get_int_max_str_digits(): int() se niega a convertirlo
+            self._error(f"Número entero de {len(literal)} dígitos")
+
+    def _valor(self, ruta: str, profundidad: int):
+        c = self._siguiente()
+        limite = self.limites_campo.get(ruta, self.max_longitud_campo)
+
+        if c == '{':
+            return self._objeto(ruta, profundidad + 1)
+        if c == '[':
+            return self._lista(ruta, profundidad + 1)
+        if c == '"':
+            return self._texto(limite, f"El campo '{ruta or '$'}'")
+        if c in _LITERALES:
+            palabra, valor = _LITERALES[c]
+            if not self._asegurar(len(palabra)) or not self.buf.startswith(palabra, self.pos):
+                self._error("Valor JSON inválido")
+            self.pos += len(palabra)
+            return valor
+        if c == '':
+            self._error("Cuerpo JSON incompleto")
+        return self._numero(limite)
+
+    def _comprobar_profundidad(self, profundidad: int):
+        if profundidad > self.max_profundidad:
+            self._error(f"Anidamiento mayor que {self.max_profundidad} niveles")
+
+    def _objeto(self, ruta: str, profundidad: int) -> Dict[str, Any]:
+        self._comprobar_profundidad(profundidad)
+        self.pos += 1
+        resultado: Dict[str, Any] = {}
+
+        if self._siguiente() == '}':
+            self.pos += 1
+            return resultado
+
+        while True:
+            if self._siguiente() != '"':
+                self._error("Se esperaba una clave")
+            clave = self._texto(MAX_LONGITUD_CLAVE, "Una clave")
+            self.claves += 1
+            if self.claves > self.max_claves:
+                self._error(f"Más de {self.max_claves} claves")
+
+            if self._siguiente() != ':':
+                self._error("Se esperaba ':'")
+            self.pos += 1
+
+            ruta_campo = f"{ruta}.{clave}" if ruta else clave
+            valor = self._valor(ruta_campo, profundidad)
+
+            # Validar el campo en cuanto llega, sin esperar al resto del cuerpo
+            if ruta_campo in self.validadores:
+                valido, valor = self.validadores[ruta_campo](valor)
+                if not valido:
+                    self._error(f"{ruta_campo}: {valor}")
+            resultado[clave] = valor
+
+            c = self._siguiente()
+            self.pos += 1
+            if c == '}':
+                return resultado
+            if c != ',':
+                self._error("Se esperaba ',' o '}'")
+
+    def _lista(self, ruta: str, profundidad: int) -> list:
+        self._comprobar_profundidad(profundidad)
+        self.pos += 1
+        resultado = []
+
+        if self._siguiente() == ']':
+            self.pos += 1
+            return resultado
+
+        while True:
+            resultado.append(self._valor(ruta, profundidad))
+            c = self._siguiente()
+            self.pos += 1
+            if c == ']':
+                return resultado
+            if c != ',':
+                self._error("Se esperaba ',' o ']'")
+
+    def leer(self, fuente: Union[bytes, str, Iterable[bytes], Any]) -> Any:
+        """Lee un cuerpo JSON (bytes, str, iterable de trozos u objeto con .read)
+
+        Lanza JSONRechazado en cuanto el cuerpo es inválido o excede un límite.
+        """
+        self._fuente = iter(self._trozos(fuente))
+        self._decodificador = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.bytes_leidos = 0
+        self.claves = 0
+
+        try:
+            resultado = self._valor("", 0)
+            if self._siguiente() != "":
+                self._error("Datos extra tras el JSON")
+        except UnicodeDecodeError:
+            self._error("El cuerpo no es UTF-8 válido")
+        except RecursionError:
+            self._error("Anidamiento demasiado profundo")
+
+        if self.requeridos:
+            if not isinstance(resultado, dict):
+                self._error("Se esperaba un objeto JSON")
+            for campo in sorted(self.requeridos):
+                if campo not in resultado:
+                    self._error(f"{campo.capitalize()} es requerido")
+        return resultado
+
+def leer_json_acotado(fuente, esquema: Optional[Dict[str, Dict[str, Any]]] = None,
+                      **limites) -> Tuple[bool, Union[Any, str]]:
+    """Lee y valida un cuerpo JSON; devuelve (válido, datos o mensaje de error)"""
+    lector = LectorJSONAcotado.desde_esquema(esquema, **limites) if esquema else LectorJSONAcotado(**limites)
+    try:
+        return True, lector.leer(fuente)
+    except JSONRechazado as e:
+        return False, str(e)
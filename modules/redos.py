@@ -0,0 +1,351 @@
+"""
+🧨 Analizador de ReDoS para ValidadorSeguro.patterns
+====================================================
+
+El motor `re` de Python usa backtracking: con ciertos patrones y una
+entrada hostil el tiempo de búsqueda crece de forma polinómica o incluso
+exponencial (ReDoS = Regular expression Denial of Service).
+
+Este módulo:
+• Analiza el árbol de cada patrón y marca construcciones peligrosas
+  - Cuantificadores anidados, ej. (a+)+           -> riesgo ALTO (exponencial)
+  - Alternativas solapadas en una repetición, ej. (a|a)*, (a|aa)+
+                                                     -> riesgo ALTO
+  - Cuantificadores seguidos que comparten caracteres, ej. \\d+\\d+
+                                                     -> riesgo MEDIO (polinómico)
+• Genera entradas adversarias para cada hallazgo y mide el peor tiempo
+  de re.match y cómo crece con la longitud de la entrada
+
+Uso (sale con código 1 si algún patrón es de riesgo ALTO o no lineal):
+    python -m modules.redos
+    python -m modules.redos --patron "^(a+)+$"
+"""
+
+import argparse
+import math
+import re
+import sys
+import time
+from typing import Any, Dict, FrozenSet, List, Optional
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants  # Python 3.11+
+except ImportError:
+    import sre_parse, sre_constants
+
+from modules import cargar_ejemplo
+
+validacion = cargar_ejemplo("02_input_validation")
+
+# Caracteres de prueba para aproximar el conjunto que acepta cada nodo
+ALFABETO_PRUEBA = frozenset(
+    [chr(i) for i in range(32, 127)] + ['\t', '\n', '\x00', 'é', 'ñ', 'а', '٣']
+)
+
+# Sufijos típicos que hacen fallar la coincidencia y fuerzan el backtracking
+SUFIJOS_FALLO = ['\x00', ' ', '!', '\n', '@']
+
+REPETICIONES = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+CATEGORIAS = {
+    sre_constants.CATEGORY_DIGIT: r'\d', sre_constants.CATEGORY_NOT_DIGIT: r'\D',
+    sre_constants.CATEGORY_SPACE: r'\s', sre_constants.CATEGORY_NOT_SPACE: r'\S',
+    sre_constants.CATEGORY_WORD: r'\w', sre_constants.CATEGORY_NOT_WORD: r'\W',
+}
+
+def _conjunto_clase(items) -> FrozenSet[str]:
+    """Caracteres de ALFABETO_PRUEBA aceptados por una clase [...]"""
+    negada = False
+    aceptados = set()
+    for op, av in items:
+        if op == sre_constants.NEGATE:
+            negada = True
+        elif op == sre_constants.LITERAL:
+            aceptados.add(chr(av))
+        elif op == sre_constants.RANGE:
+            aceptados.update(c for c in ALFABETO_PRUEBA if av[0] <= ord(c) <= av[1])
+        elif op == sre_constants.CATEGORY and av in CATEGORIAS:
+            aceptados.update(c for c in ALFABETO_PRUEBA if re.fullmatch(CATEGORIAS[av], c))
+    return frozenset(ALFABETO_PRUEBA - aceptados if negada else aceptados)
+
+def conjunto(sub) -> FrozenSet[str]:
+    """Caracteres que puede consumir un subpatrón (aproximación)"""
+    resultado = set()
+    for op, av in sub:
+        if op == sre_constants.LITERAL:
+            resultado.add(chr(av))
+        elif op == sre_constants.NOT_LITERAL:
+            resultado.update(ALFABETO_PRUEBA - {chr(av)})
+        elif op == sre_constants.ANY:
+            resultado.update(ALFABETO_PRUEBA - {'\n'})
+        elif op == sre_constants.IN:
+            resultado.update(_conjunto_clase(av))
+        elif op in REPETICIONES:
+            resultado.update(conjunto(av[2]))
+        elif op == sre_constants.SUBPATTERN:
+            resultado.update(conjunto(av[-1]))
+        elif op == sre_constants.BRANCH:
+            for rama in av[1]:
+                resultado.update(conjunto(rama))
+    return frozenset(resultado)
+
+def _caracter(conjunto_chars: FrozenSet[str]) -> str:
+    """Elige un carácter representativo (preferimos alfanuméricos)"""
+    return min(conjunto_chars, key=lambda c: (not c.isalnum(), c))
+
+def ejemplo_minimo(sub) -> str:
+    """Genera la cadena más corta (aprox.) que encaja con el subpatrón"""
+    partes = []
+    for op, av in sub:
+        if op == sre_constants.LITERAL:
+            partes.append(chr(av))
+        elif op in (sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN):
+            chars = conjunto([(op, av)])
+            if chars:
+                partes.append(_caracter(chars))
+        elif op in REPETICIONES:
+            partes.append(ejemplo_minimo(av[2]) * av[0])
+        elif op == sre_constants.SUBPATTERN:
+            partes.append(ejemplo_minimo(av[-1]))
+        elif op == sre_constants.BRANCH:
+            partes.append(ejemplo_minimo(av[1][0]))
+    return ''.join(partes)
+
+def _puede_vaciarse(sub) -> bool:
+    """Si el subpatrón puede coincidir sin consumir nada"""
+    for op, av in sub:
+        if op in REPETICIONES:
+            if av[0] > 0 and not _puede_vaciarse(av[2]):
+                return False
+        elif op == sre_constants.SUBPATTERN:
+            if not _puede_vaciarse(av[-1]):
+                return False
+        elif op == sre_constants.BRANCH:
+            if not any(_puede_vaciarse(rama) for rama in av[1]):
+                return False
+        elif op not in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return False
+    return True
+
+def primeros(sub) -> FrozenSet[str]:
+    """Caracteres con los que puede empezar una coincidencia del subpatrón (aproximación)"""
+    resultado = set()
+    for op, av in sub:
+        if op in REPETICIONES:
+            resultado.update(primeros(av[2]))
+        elif op == sre_constants.SUBPATTERN:
+            resultado.update(primeros(av[-1]))
+        elif op == sre_constants.BRANCH:
+            for rama in av[1]:
+                resultado.update(primeros(rama))
+        else:
+            resultado.update(conjunto([(op, av)]))
+        if not _puede_vaciarse([(op, av)]):
+            break
+    return frozenset(resultado)
+
+def _alternancias(sub, despues: list) -> List[tuple]:
+    """(ramas, lo que sigue) de cada BRANCH del subpatrón, atravesando grupos
+
+    No entra en repeticiones internas: esas se analizan por su cuenta.
+    `despues` es lo que viene tras el subpatrón (en una repetición, el
+    cuerpo de la iteración siguiente).
+    """
+    resultado = []
+    items = list(sub)
+    for indice, (op, av) in enumerate(items):
+        siguiente = items[indice + 1:] + despues
+        if op == sre_constants.BRANCH:
+            resultado.append((av[1], siguiente))
+            for rama in av[1]:
+                resultado.extend(_alternancias(rama, siguiente))
+        elif op == sre_constants.SUBPATTERN:
+            resultado.extend(_alternancias(av[-1], siguiente))
+    return resultado
+
+def _es_variable(av) -> bool:
+    """Una repetición es variable si puede consumir un número distinto de veces"""
+    minimo, maximo, _ = av
+    return maximo != minimo and maximo > 1
+
+def _recorrer(sub, prefijo: str, dentro_de_repeticion: bool, hallazgos: List[Dict[str, Any]]):
+    items = list(sub)
+    for indice, (op, av) in enumerate(items):
+        previo = prefijo + ejemplo_minimo(items[:indice])
+
+        if op in REPETICIONES:
+            cuerpo = av[2]
+            chars = conjunto(cuerpo)
+
+            if dentro_de_repeticion and _es_variable(av) and chars:
+                hallazgos.append({
+                    "tipo": "cuantificador_anidado", "riesgo": "ALTO",
+                    "detalle": "Repetición variable dentro de otra repetición",
+                    "prefijo": previo, "bomba": _caracter(chars),
+                })
+
+            if av[1] > 1:
+                # sre_parse saca el prefijo común de las ramas: (a|aa) queda a(?:|a),
+                # así que una rama que puede vaciarse aporta lo que viene detrás
+                for alternativas, siguiente in _alternancias(cuerpo, list(cuerpo)):
+                    ramas = [conjunto(rama) | (primeros(siguiente) if _puede_vaciarse(rama) else frozenset())
+                             for rama in alternativas]
+                    for i in range(len(ramas)):
+                        for j in range(i + 1, len(ramas)):
+                            comunes = ramas[i] & ramas[j]
+                            if comunes:
+                                hallazgos.append({
+                                    "tipo": "alternancia_solapada", "riesgo": "ALTO",
+                                    "detalle": "Dos alternativas de una repetición aceptan el mismo carácter",
+                                    "prefijo": previo, "bomba": _caracter(comunes),
+                                })
+
+            if _es_variable(av) and chars:
+                # Lo que sigue y también puede consumir esta repetición
+                for op_sig, av_sig in items[indice + 1:]:
+                    if op_sig == sre_constants.AT:
+                        continue
+                    chars_sig = conjunto([(op_sig, av_sig)])
+                    if op_sig in REPETICIONES and _es_variable(av_sig) and chars & chars_sig:
+                        hallazgos.append({
+                            "tipo": "cuantificadores_solapados", "riesgo": "MEDIO",
+                            "detalle": "Dos repeticiones seguidas comparten caracteres",
+                            "prefijo": previo, "bomba": _caracter(chars & chars_sig),
+                        })
+                        break
+                    if not chars_sig or not chars_sig <= chars:
+                        break
+
+            _recorrer(cuerpo, previo, dentro_de_repeticion or av[1] > 1, hallazgos)
+
+        elif op == sre_constants.SUBPATTERN:
+            _recorrer(av[-1], previo, dentro_de_repeticion, hallazgos)
+        elif op == sre_constants.BRANCH:
+            for rama in av[1]:
+                _recorrer(rama, previo, dentro_de_repeticion, hallazgos)
+        # ATOMIC_GROUP y POSSESSIVE_REPEAT no hacen backtracking: no se analizan
+
+def analizar_patron(patron: str) -> List[Dict[str, Any]]:
+    """Busca construcciones con riesgo de backtracking catastrófico"""
+    hallazgos: List[Dict[str, Any]] = []
+    _recorrer(sre_parse.parse(patron), "", False, hallazgos)
+
+    # Un mismo problema puede aparecer varias veces por la recursión
+    unicos = {}
+    for hallazgo in hallazgos:
+        unicos.setdefault((hallazgo["tipo"], hallazgo["prefijo"], hallazgo["bomba"]), hallazgo)
+    return list(unicos.values())
+
+def _tiempo_peor(regex: "re.Pattern", prefijo: str, bomba: str, n: int,
+                 limite_s: float, repeticiones: int = 3) -> float:
+    """Peor tiempo de re.match entre los sufijos de fallo (inf si supera el límite)
+
+    Cada entrada se mide varias veces y se toma el mínimo para quitar ruido.
+    """
+    peor = 0.0
+    for sufijo in SUFIJOS_FALLO:
+        texto = prefijo + bomba * n + sufijo
+        mejor = math.inf
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            try:
+                validacion.coincidir_con_presupuesto(regex.pattern, texto, limite_s)
+            except validacion.PresupuestoRegexExcedido:
+                return math.inf
+            mejor = min(mejor, time.perf_counter() - inicio)
+        peor = max(peor, mejor)
+    return peor
+
+def medir_peor_caso(patron: str, hallazgos: Optional[List[Dict[str, Any]]] = None,
+                    longitud_max: int = 4096, limite_s: float = 1.0) -> Dict[str, Any]:
+    """Mide re.match con entradas adversarias de longitud creciente
+
+    La longitud se duplica en cada paso. El exponente es la pendiente
+    log-log entre las dos últimas mediciones: ~1 lineal, ~2 cuadrático,
+    e "inf" si se supera el límite de tiempo (típico de patrones exponenciales).
+    """
+    regex = re.compile(patron)
+    if hallazgos is None:
+        hallazgos = analizar_patron(patron)
+
+    # Sin hallazgos medimos igualmente con el ejemplo mínimo como bomba
+    candidatos = [(h["prefijo"], h["bomba"]) for h in hallazgos]
+    if not candidatos:
+        minimo = ejemplo_minimo(sre_parse.parse(patron)) or "a"
+        candidatos = [(minimo[:-1], minimo[-1])]
+
+    peor = {"peor_tiempo_s": 0.0, "longitud": 0, "exponente": 0.0, "entrada": ""}
+    for prefijo, bomba in candidatos:
+        anterior = None
+        n = 8
+        while True:
+            t = _tiempo_peor(regex, prefijo, bomba, n, limite_s)
+            if t == math.inf:
+                exponente = math.inf
+            elif anterior and anterior > 0:
+                exponente = math.log2(t / anterior)
+            else:
+                exponente = 0.0
+            if t == math.inf or n * 2 > longitud_max:
+                break
+            anterior = t
+            n *= 2
+
+        if t >= peor["peor_tiempo_s"]:
+            peor = {"peor_tiempo_s": t, "longitud": n, "exponente": exponente,
+                    "entrada": repr(prefijo + bomba * 3) + "..."}
+    return peor
+
+def analizar_validador(validador=None, longitud_max: int = 4096,
+                       limite_s: float = 1.0) -> Dict[str, Dict[str, Any]]:
+    """Analiza y mide todos los patrones de un ValidadorSeguro"""
+    validador = validador or validacion.ValidadorSeguro()
+    resultados = {}
+    for nombre, patron in validador.patterns.items():
+        hallazgos = analizar_patron(patron)
+        resultados[nombre] = {
+            "patron": patron,
+            "hallazgos": hallazgos,
+            "medicion": medir_peor_caso(patron, hallazgos, longitud_max, limite_s),
+        }
+    return resultados
+
+def es_seguro(resultado: Dict[str, Any], exponente_max: float = 1.5) -> bool:
+    """Sin riesgo ALTO y con crecimiento aproximadamente lineal"""
+    if any(h["riesgo"] == "ALTO" for h in resultado["hallazgos"]):
+        return False
+    return resultado["medicion"]["exponente"] <= exponente_max
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analizador de ReDoS")
+    parser.add_argument("--patron", action="append", help="Analizar este patrón (se puede repetir)")
+    parser.add_argument("--longitud-max", type=int, default=4096, help="Longitud máxima de la entrada adversaria")
+    parser.add_argument("--limite-ms", type=float, default=1000, help="Tiempo máximo por coincidencia")
+    args = parser.parse_args(argv)
+
+    if args.patron:
+        resultados = {}
+        for i, patron in enumerate(args.patron, 1):
+            hallazgos = analizar_patron(patron)
+            resultados[f"patron_{i}"] = {
+                "patron": patron, "hallazgos": hallazgos,
+                "medicion": medir_peor_caso(patron, hallazgos, args.longitud_max, args.limite_ms / 1000),
+            }
+    else:
+        resultados = analizar_validador(longitud_max=args.longitud_max, limite_s=args.limite_ms / 1000)
+
+    todo_seguro = True
+    for nombre, resultado in resultados.items():
+        medicion = resultado["medicion"]
+        seguro = es_seguro(resultado)
+        todo_seguro = todo_seguro and seguro
+        estado = "✅" if seguro else "❌"
+        tiempo = "> límite" if medicion["peor_tiempo_s"] == math.inf else f"{medicion['peor_tiempo_s'] * 1000:.2f} ms"
+        print(f"{estado} {nombre}: {resultado['patron']}")
+        print(f"   peor caso: {tiempo} con {medicion['longitud']} chars, exponente ~{medicion['exponente']:.2f}")
+        for hallazgo in resultado["hallazgos"]:
+            print(f"   [{hallazgo['riesgo']}] {hallazgo['tipo']}: {hallazgo['detalle']}")
+
+    return 0 if todo_seguro else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""
+📏 Motor de reglas de detección declarativas
+============================================
+
+Las reglas de detección se escriben en un archivo JSON en lugar de estar
+fijas en el código (ver reglas_deteccion.json en la raíz del proyecto):
+
+    {"nombre": "fuerza_bruta_ip", "evento": "LOGIN_FAILED",
+     "agrupar_por": "ip_address", "ventana": 300, "umbral": 5,
+     "accion": "alertar", "mensaje": "🚨 BRUTE FORCE: IP {clave} ..."}
+
+Campos opcionales: "donde" (igualdades sobre los detalles del evento),
+"distintos" (contar valores distintos de un campo con HyperLogLog en vez
+de eventos) y "evento": "*" (todos los eventos).
+
+"ventana" y "umbral" pueden ser también el nombre de una clave de
+DETECTION_CONFIG (config.py): así las reglas de login del archivo usan los
+mismos umbrales que AttackDetector en lugar de repetirlos.
+
+• Las reglas se compilan en una tabla de despacho por tipo de evento:
+  cada evento solo evalúa las reglas que le aplican
+• Las reglas con el mismo evento, agrupación, filtro y ventana comparten
+  contador: se incrementa una vez por evento y los umbrales disparados se
+  buscan por bisección, así que 1000 umbrales no cuestan 1000 contadores
+• Recarga en caliente: si el archivo cambia se recompila, conservando los
+  contadores de los grupos que no cambian; si el archivo nuevo no es
+  válido se siguen usando las reglas anteriores
+• Estadísticas por regla: evaluaciones, disparos y tiempo (las reglas de
+  un mismo grupo comparten evaluaciones y tiempo)
+
+Uso:
+    python -m modules.reglas_deteccion logs/security.log --reglas reglas_deteccion.json
+    python -m modules.reglas_deteccion --validar reglas_deteccion.json
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from config import DETECTION_CONFIG
+from modules import cargar_ejemplo
+from modules.indice_logs import parsear_linea, segundos
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+ContadorVentana = registro_seguridad.ContadorVentana
+CardinalidadVentana = registro_seguridad.CardinalidadVentana
+
+REGLAS_POR_DEFECTO = Path(__file__).resolve().parent.parent / "reglas_deteccion.json"
+COMODIN = "*"
+INTERVALO_RECARGA = 1.0  # Segundos entre comprobaciones del archivo de reglas
+RESOLUCION_MAX = 10.0    # Resolución de las ventanas (o ventana / 30 si es menor)
+
+CAMPOS_REGLA = {"nombre", "evento", "agrupar_por", "ventana", "umbral", "accion",
+                "mensaje", "donde", "distintos"}
+
+Accion = Callable[[Dict[str, Any]], None]
+
+def _registrar(alerta: Dict[str, Any]):
+    logging.getLogger("security").warning("RULE_ALERT: %s", json.dumps(alerta, ensure_ascii=False))
+
+# Acciones disponibles sin configurar nada ("alertar" solo devuelve la alerta)
+ACCIONES = {
+    "alertar": lambda alerta: None,
+    "registrar": _registrar,
+}
+
+def _texto_clave(clave: Any) -> str:
+    # Agrupación por varios campos: "eve/salaries"
+    return "/".join(map(str, clave)) if type(clave) is tuple else str(clave)
+
+class ReglaInvalida(ValueError):
+    """Una regla del archivo no se puede compilar"""
+
+    def __init__(self, nombre: str, motivo: str):
+        super().__init__(f"Regla '{nombre}': {motivo}")
+        self.nombre = nombre
+        self.motivo = motivo
+
+class Regla:
+    """Una regla ya validada, con sus estadísticas"""
+
+    def __init__(self, definicion: Dict[str, Any], acciones: Dict[str, Accion]):
+        nombre = definicion.get("nombre")
+        if not isinstance(nombre, str) or not nombre:
+            raise ReglaInvalida(str(nombre), "falta el nombre")
+        desconocidos = set(definicion) - CAMPOS_REGLA
+        if desconocidos:
+            raise ReglaInvalida(nombre, f"campos desconocidos: {', '.join(sorted(desconocidos))}")
+
+        self.nombre = nombre
+        self.evento = definicion.get("evento")
+        if not isinstance(self.evento, str) or not self.evento:
+            raise ReglaInvalida(nombre, "'evento' debe ser un tipo de evento o '*'")
+
+        agrupar_por = definicion.get("agrupar_por")
+        if isinstance(agrupar_por, str):
+            agrupar_por = [agrupar_por]
+        if not isinstance(agrupar_por, list) or not agrupar_por or not all(isinstance(c, str) for c in agrupar_por):
+            raise ReglaInvalida(nombre, "'agrupar_por' debe ser un campo o una lista de campos")
+        self.agrupar_por: Tuple[str, ...] = tuple(agrupar_por)
+
+        for campo in ("ventana", "umbral"):
+            valor = definicion.get(campo)
+            if isinstance(valor, str):
+                # Referencia a config.py, compartida con AttackDetector
+                if valor not in DETECTION_CONFIG:
+                    raise ReglaInvalida(nombre, f"'{campo}': {valor} no está en DETECTION_CONFIG")
+                valor = DETECTION_CONFIG[valor]
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)) or valor <= 0:
+                raise ReglaInvalida(nombre, f"'{campo}' debe ser un número positivo o una clave de DETECTION_CONFIG")
+            setattr(self, campo, valor)
+
+        self.accion = definicion.get("accion", "alertar")
+        if self.accion not in acciones:
+            raise ReglaInvalida(nombre, f"acción desconocida: {self.accion}")
+        self.mensaje = definicion.get("mensaje", f"🚨 {nombre}: {{clave}} llegó a {{cuenta}} en {{ventana}} s")
+        try:
+            self.mensaje.format(clave="", cuenta=0, ventana=0, umbral=0, regla=nombre)
+        except (KeyError, IndexError, ValueError) as error:
+            raise ReglaInvalida(nombre, f"mensaje inválido: {error}")
+
+        self.donde = definicion.get("donde", {})
+        if not isinstance(self.donde, dict):
+            raise ReglaInvalida(nombre, "'donde' debe ser un objeto {campo: valor}")
+        self.distintos = definicion.get("distintos")
+        if self.distintos is not None and not isinstance(self.distintos, str):
+            raise ReglaInvalida(nombre, "'distintos' debe ser un nombre de campo")
+
+        self.disparos = 0
+
+    @property
+    def firma(self) -> str:
+        """Reglas con la misma firma comparten contador"""
+        return json.dumps([self.evento, self.agrupar_por, self.ventana, self.donde, self.distintos],
+                          sort_keys=True)
+
+class _Grupo:
+    """Contador compartido por las reglas con la misma firma"""
+
+    def __init__(self, modelo: Regla):
+        self.agrupar_por = modelo.agrupar_por
+        self.donde = tuple(modelo.donde.items())
+        self.distintos = modelo.distintos
+        self.ventana = modelo.ventana
+        if modelo.distintos is None:
+            resolucion = min(RESOLUCION_MAX, modelo.ventana / 30)
+            self.contador = ContadorVentana(modelo.ventana, resolucion)
+            self.horizonte = modelo.ventana + resolucion  # El cubo más antiguo puede empezar antes
+        else:
+            self.contador = CardinalidadVentana(modelo.ventana)
+            self.horizonte = 2 * modelo.ventana  # Cubre entre una y dos ventanas
+        self.reglas: List[Regla] = []
+        self.umbrales: List[float] = []
+        self.evaluaciones = 0
+        self.tiempo_ns = 0
+
+    def ordenar(self):
+        self.reglas.sort(key=lambda regla: regla.umbral)
+        self.umbrales = [regla.umbral for regla in self.reglas]
+
+    def evaluar(self, detalles: Dict[str, Any], ahora: Optional[float]) -> List[Tuple[Regla, Any, int]]:
+        for campo, valor in self.donde:
+            if detalles.get(campo) != valor:
+                return []
+        if len(self.agrupar_por) == 1:
+            clave = detalles.get(self.agrupar_por[0])
+            if clave is None or type(clave) in (list, dict):
+                return []
+        else:
+            clave = tuple(detalles.get(campo) for campo in self.agrupar_por)
+            if None in clave or any(type(parte) in (list, dict) for parte in clave):
+                return []
+        if self.distintos is None:
+            # Una línea que resume una ráfaga cuenta como sus "count" eventos
+            repeticiones = detalles.get("count", 1)
+            if type(repeticiones) is not int or repeticiones < 1:
+                repeticiones = 1
+            cuenta = self.contador.incrementar(clave, ahora, repeticiones)
+        else:
+            valor = detalles.get(self.distintos)
+            if valor is None:
+                return []
+            cuenta = self.contador.agregar(clave, str(valor), ahora)
+        # Umbrales ordenados: disparan todas las reglas con umbral <= cuenta
+        disparadas = bisect.bisect_right(self.umbrales, cuenta)
+        return [(regla, clave, cuenta) for regla in self.reglas[:disparadas]]
+
+class MotorReglas:
+    """Evalúa eventos contra reglas declarativas compiladas por tipo de evento"""
+
+    def __init__(self, reglas: Union[str, Path, List[Dict[str, Any]], None] = None,
+                 acciones: Optional[Dict[str, Accion]] = None, recarga: bool = True):
+        self.acciones = {**ACCIONES, **(acciones or {})}
+        self.archivo: Optional[Path] = None
+        self.recarga = recarga
+        self._mtime: Optional[float] = None
+        self._ultima_comprobacion = 0.0
+        self._grupos: Dict[str, _Grupo] = {}
+        self._despacho: Dict[str, List[_Grupo]] = {}
+        self._comodin: List[_Grupo] = []
+        self.reglas: List[Regla] = []
+        self.recargas = 0
+        self.errores_recarga: List[str] = []
+
+        if reglas is None:
+            reglas = REGLAS_POR_DEFECTO
+        if isinstance(reglas, (str, Path)):
+            self.archivo = Path(reglas)
+            self._mtime = os.stat(self.archivo).st_mtime_ns
+            self._compilar(self._leer(self.archivo))
+        else:
+            self._compilar(reglas)
+
+    @staticmethod
+    def _leer(archivo: Path) -> List[Dict[str, Any]]:
+        datos = json.loads(archivo.read_text(encoding="utf-8"))
+        reglas = datos.get("reglas") if isinstance(datos, dict) else datos
+        if not isinstance(reglas, list):
+            raise ValueError(f"{archivo}: se esperaba una lista de reglas o {{\"reglas\": [...]}}")
+        return reglas
+
+    def _compilar(self, definiciones: List[Dict[str, Any]]):
+        """Compila y sustituye las reglas; si alguna es inválida no cambia nada"""
+        reglas = []
+        nombres = set()
+        for definicion in definiciones:
+            if not isinstance(definicion, dict):
+                raise ReglaInvalida(str(definicion), "cada regla debe ser un objeto")
+            regla = Regla(definicion, self.acciones)
+            if regla.nombre in nombres:
+                raise ReglaInvalida(regla.nombre, "nombre repetido")
+            nombres.add(regla.nombre)
+            reglas.append(regla)
+
+        # Los grupos que siguen existiendo conservan su contador (y sus estadísticas)
+        grupos: Dict[str, _Grupo] = {}
+        for regla in reglas:
+            grupo = grupos.get(regla.firma)
+            if grupo is None:
+                grupo = self._grupos.get(regla.firma) or _Grupo(regla)
+                grupo.reglas = []
+                grupos[regla.firma] = grupo
+            anterior = next((r for r in self.reglas if r.nombre == regla.nombre), None)
+            if anterior is not None:
+                regla.disparos = anterior.disparos
+            grupo.reglas.append(regla)
+
+        despacho: Dict[str, List[_Grupo]] = {}
+        comodin: List[_Grupo] = []
+        for grupo in grupos.values():
+            grupo.ordenar()
+            evento = grupo.reglas[0].evento
+            if evento == COMODIN:
+                comodin.append(grupo)
+            else:
+                despacho.setdefault(evento, []).append(grupo)
+        for evento in despacho:
+            despacho[evento].extend(comodin)
+
+        self.reglas, self._grupos, self._despacho, self._comodin = reglas, grupos, despacho, comodin
+
+    def recargar_si_cambia(self, forzar: bool = False) -> bool:
+        """Recompila si el archivo cambió; devuelve True si se recargó"""
+        if self.archivo is None:
+            return False
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultima_comprobacion < INTERVALO_RECARGA:
+            return False
+        self._ultima_comprobacion = ahora
+        try:
+            mtime = os.stat(self.archivo).st_mtime_ns
+            if not forzar and mtime == self._mtime:
+                return False
+            self._compilar(self._leer(self.archivo))
+        except (OSError, ValueError) as error:
+            # Archivo a medio escribir o con errores: seguir con las reglas anteriores
+            self.errores_recarga.append(str(error))
+            print(f"⚠️ No se recargaron las reglas: {error}", file=sys.stderr)
+            return False
+        self._mtime = mtime
+        self.recargas += 1
+        return True
+
+    def procesar(self, evento: Dict[str, Any], ahora: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Evalúa un evento ({"event", "details", "timestamp"}) y devuelve las alertas"""
+        if self.recarga:
+            self.recargar_si_cambia()
+        grupos = self._despacho.get(evento.get("event"), self._comodin)
+        if not grupos:
+            return []
+        detalles = evento.get("details")
+        if not isinstance(detalles, dict):
+            return []
+        if ahora is None:
+            ahora = segundos(evento.get("timestamp"))
+
+        alertas = []
+        reloj = time.perf_counter_ns
+        for grupo in grupos:
+            inicio = reloj()
+            disparadas = grupo.evaluar(detalles, ahora)
+            grupo.tiempo_ns += reloj() - inicio
+            grupo.evaluaciones += 1
+            for regla, clave, cuenta in disparadas:
+                regla.disparos += 1
+                alerta = {
+                    "regla": regla.nombre,
+                    "accion": regla.accion,
+                    "clave": clave,
+                    "cuenta": cuenta,
+                    "mensaje": regla.mensaje.format(clave=_texto_clave(clave), cuenta=cuenta, ventana=regla.ventana,
+                                                    umbral=regla.umbral, regla=regla.nombre),
+                }
+                self.acciones[regla.accion](alerta)
+                alertas.append(alerta)
+        return alertas
+
+    def estadisticas(self) -> List[Dict[str, Any]]:
+        """Evaluaciones, disparos y tiempo por regla"""
+        filas = []
+        for grupo in self._grupos.values():
+            for regla in grupo.reglas:
+                filas.append({
+                    "regla": regla.nombre,
+                    "evento": regla.evento,
+                    "evaluaciones": grupo.evaluaciones,
+                    "disparos": regla.disparos,
+                    "tiempo_ms": grupo.tiempo_ns / 1e6,
+                    "reglas_en_grupo": len(grupo.reglas),
+                })
+        return filas
+
+    @property
+    def grupos(self) -> int:
+        return len(self._grupos)
+
+    @property
+    def horizonte(self) -> float:
+        """Segundos hacia atrás que pueden influir en una alerta (la ventana más larga, con margen)"""
+        return max((grupo.horizonte for grupo in self._grupos.values()), default=0.0)
+
+    @property
+    def tipos_evento(self) -> Optional[frozenset]:
+        """Tipos de evento con alguna regla (None si alguna regla usa '*')"""
+        return None if self._comodin else frozenset(self._despacho)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Evalúa reglas de detección sobre un log de seguridad")
+    parser.add_argument("log", type=Path, nargs="?", help="Log a evaluar (texto o JSONL)")
+    parser.add_argument("--reglas", type=Path, default=REGLAS_POR_DEFECTO)
+    parser.add_argument("--validar", type=Path, help="Solo comprobar que un archivo de reglas compila")
+    args = parser.parse_args(argv)
+
+    if args.validar:
+        try:
+            motor = MotorReglas(args.validar, recarga=False)
+        except (OSError, ValueError) as error:
+            print(f"❌ {error}")
+            return 1
+        print(f"✅ {len(motor.reglas)} reglas en {motor.grupos} grupos")
+        return 0
+    if args.log is None:
+        parser.error("indica el log a evaluar o --validar")
+
+    motor = MotorReglas(args.reglas)
+    eventos = 0
+    with open(args.log, "rb") as f:
+        for linea in f:
+            evento = parsear_linea(linea)
+            if evento is None:
+                continue
+            eventos += 1
+            for alerta in motor.procesar(evento):
+                print(json.dumps(alerta, ensure_ascii=False))
+
+    print(f"\n📏 {eventos:,} eventos evaluados", file=sys.stderr)
+    print(f"{'regla':<28} {'evaluaciones':>12} {'disparos':>9} {'ms':>9}", file=sys.stderr)
+    for fila in motor.estadisticas():
+        print(f"{fila['regla']:<28} {fila['evaluaciones']:>12,} {fila['disparos']:>9,} {fila['tiempo_ms']:>9.1f}",
+              file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
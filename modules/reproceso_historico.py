@@ -0,0 +1,334 @@
+"""
+⏪ Reprocesado histórico de security.log con las reglas de detección
+===================================================================
+
+Al añadir una regla nueva a reglas_deteccion.json queremos saber qué
+habría detectado en los últimos meses. Este módulo pasa las reglas por
+todos los segmentos de log (rotados, comprimidos o no, y el vivo) en
+paralelo:
+
+• Los segmentos sin comprimir se parten en trozos de `tamano_trozo` bytes
+  cortando siempre en un salto de línea (con mmap, sin leerlos); uno
+  comprimido es un solo trozo
+• Cada trozo se analiza en un proceso del pool con su propio MotorReglas.
+  Para que las ventanas que cruzan el inicio del trozo cuenten igual que
+  en una pasada secuencial, antes de su trozo el proceso "calienta" el
+  motor con los eventos de los `horizonte` segundos anteriores (la
+  ventana más larga de las reglas, con margen), que localiza por
+  bisección en los trozos previos. Así cada trozo es independiente:
+  las alertas son las mismas que procesando el log de principio a fin
+• Las alertas de los trozos se juntan en orden de tiempo y se informa de
+  los disparos por regla y del rendimiento en GB/min
+
+Las acciones de las reglas no se ejecutan (reprocesar no debe volver a
+escribir en security.log): solo se devuelven las alertas.
+
+Solo se puede reprocesar lo que la rotación conserva (backup_count y
+max_age_days de LOGGING_CONFIG): por defecto se miran max_age_days días
+y, si se piden más de los que quedan en disco, se avisa por stderr.
+
+Uso:
+    python -m modules.reproceso_historico logs/security.log --reglas reglas_deteccion.json --dias 30
+"""
+
+import argparse
+import gzip
+import json
+import mmap
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from config import LOGGING_CONFIG
+from modules.indice_logs import Contenido, abrir_contenido, listar_segmentos, parsear_linea, segundos, zstandard
+from modules.reglas_deteccion import ACCIONES, REGLAS_POR_DEFECTO, MotorReglas
+
+TAMANO_TROZO = 64 * 1024 * 1024  # Bytes por trozo de un segmento sin comprimir
+COMPRIMIDOS = (".gz", ".zst")
+DIAS = LOGGING_CONFIG.get("max_age_days") or 30  # Más atrás la rotación ya lo ha borrado
+
+# (ruta, inicio, fin, timestamp del primer evento); fin = None hasta el final del segmento
+Trozo = Tuple[str, int, Optional[int], float]
+Reglas = Union[str, Path, List[Dict[str, Any]]]
+
+def _abrir(ruta: str) -> Contenido:
+    """Contenido de un segmento, aunque se haya comprimido después de planificar"""
+    try:
+        return abrir_contenido(Path(ruta))
+    except FileNotFoundError:
+        for sufijo in COMPRIMIDOS:
+            if Path(ruta + sufijo).exists():
+                return abrir_contenido(Path(ruta + sufijo))
+        raise
+
+def _cerrar(contenido: Contenido):
+    if isinstance(contenido, mmap.mmap):
+        contenido.close()
+
+def _inicio_comprimido(ruta: Path) -> bytes:
+    """Primeros 64 KB descomprimidos (para el timestamp del primer evento sin descomprimir todo)"""
+    if ruta.suffix == ".gz":
+        with gzip.open(ruta, "rb") as f:
+            return f.read(65536)
+    with open(ruta, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as lector:
+        return lector.read(65536)
+
+def _timestamp_desde(contenido: Contenido, posicion: int, fin: int) -> Tuple[Optional[float], int]:
+    """(timestamp, offset) de la primera línea con evento a partir de `posicion`"""
+    while posicion < fin:
+        salto = contenido.find(b"\n", posicion, fin)
+        if salto < 0:
+            salto = fin
+        evento = parsear_linea(contenido[posicion:salto])
+        ts = segundos(evento.get("timestamp")) if evento is not None else None
+        if ts is not None:
+            return ts, posicion
+        posicion = salto + 1
+    return None, fin
+
+def _inicio_linea(contenido: Contenido, posicion: int, inicio: int, fin: int) -> int:
+    """Inicio de la primera línea que empieza en `posicion` o después"""
+    if posicion <= inicio:
+        return inicio
+    salto = contenido.find(b"\n", posicion - 1, fin)
+    return fin if salto < 0 else salto + 1
+
+def _buscar_offset(contenido: Contenido, inicio: int, fin: int, desde: float) -> int:
+    """Offset de la primera línea con timestamp >= desde (el log está en orden de tiempo)"""
+    bajo, alto = inicio, fin
+    while bajo < alto:
+        medio = (bajo + alto) // 2
+        ts, _ = _timestamp_desde(contenido, _inicio_linea(contenido, medio, inicio, fin), fin)
+        if ts is None or ts >= desde:
+            alto = medio
+        else:
+            bajo = medio + 1
+    return _inicio_linea(contenido, bajo, inicio, fin)
+
+def _eventos(contenido: Contenido, inicio: int, fin: int,
+             tipos: Optional[frozenset]) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """(timestamp, evento) de las líneas de [inicio, fin) cuyo tipo tiene reglas"""
+    # En formato texto el tipo va antes del JSON: se descartan sin parsearlo
+    marcas = None if tipos is None else tuple(f"- {tipo}: ".encode("utf-8") for tipo in tipos)
+    posicion = inicio
+    while posicion < fin:
+        salto = contenido.find(b"\n", posicion, fin)
+        if salto < 0:
+            salto = fin
+        linea = contenido[posicion:salto]
+        posicion = salto + 1
+        if marcas is not None and not linea.startswith(b"{"):
+            llave = linea.find(b"{")
+            if llave < 0 or not linea.endswith(marcas, 0, llave):
+                continue
+        evento = parsear_linea(linea)
+        if evento is None or (tipos is not None and evento.get("event") not in tipos):
+            continue
+        ts = segundos(evento.get("timestamp"))
+        if ts is not None:
+            yield ts, evento
+
+def _analizar_trozo(tarea: Tuple[Reglas, Trozo, List[Trozo], float, Optional[float]]) -> Dict[str, Any]:
+    """Proceso del pool: calienta un motor con el horizonte previo y analiza el trozo"""
+    reglas, trozo, previos, horizonte, desde = tarea
+    motor = MotorReglas(reglas, acciones={accion: lambda alerta: None for accion in ACCIONES}, recarga=False)
+    tipos = motor.tipos_evento
+    ruta, inicio, fin, primer_ts = trozo
+
+    calentamiento = 0
+    for ruta_previa, inicio_previo, fin_previo, _ in previos:
+        contenido = _abrir(ruta_previa)
+        try:
+            fin_previo = len(contenido) if fin_previo is None else fin_previo
+            posicion = _buscar_offset(contenido, inicio_previo, fin_previo, primer_ts - horizonte)
+            for ts, evento in _eventos(contenido, posicion, fin_previo, tipos):
+                motor.procesar(evento, ts)
+                calentamiento += 1
+        finally:
+            _cerrar(contenido)
+
+    alertas: List[Dict[str, Any]] = []
+    eventos = 0
+    contenido = _abrir(ruta)
+    try:
+        fin = len(contenido) if fin is None else fin
+        for ts, evento in _eventos(contenido, inicio, fin, tipos):
+            eventos += 1
+            disparadas = motor.procesar(evento, ts)
+            if disparadas and (desde is None or ts >= desde):
+                for alerta in disparadas:
+                    alerta["timestamp"] = evento["timestamp"]
+                    alertas.append(alerta)
+    finally:
+        _cerrar(contenido)
+    return {"alertas": alertas, "eventos": eventos, "calentamiento": calentamiento, "bytes": fin - inicio}
+
+class ReprocesoHistorico:
+    """Pasa reglas de detección por los segmentos de un log, en paralelo y por trozos"""
+
+    def __init__(self, log_file: Union[str, Path] = "logs/security.log", reglas: Reglas = REGLAS_POR_DEFECTO,
+                 dias: Optional[float] = DIAS, procesos: int = os.cpu_count() or 1,
+                 tamano_trozo: int = TAMANO_TROZO):
+        self.log_file = Path(log_file)
+        self.reglas = str(reglas) if isinstance(reglas, Path) else reglas
+        self.horizonte = MotorReglas(self.reglas, recarga=False).horizonte  # También valida las reglas
+        self.desde = None if dias is None else time.time() - dias * 86400
+        self.procesos = procesos
+        self.tamano_trozo = tamano_trozo
+        self.eventos = 0
+        self.eventos_calentamiento = 0
+        self.bytes = 0
+        self.disparos: Counter = Counter()
+        self.duracion = 0.0
+        self.aviso_cobertura: Optional[str] = None
+
+    def primer_evento(self) -> Optional[float]:
+        """Timestamp del evento más antiguo que sigue en disco (None si no hay ninguno)"""
+        for ruta in listar_segmentos(self.log_file) + [self.log_file]:
+            try:
+                if ruta.suffix in COMPRIMIDOS:
+                    inicio = _inicio_comprimido(ruta)
+                    ts, _ = _timestamp_desde(inicio, 0, inicio.rfind(b"\n") + 1)
+                else:
+                    contenido = abrir_contenido(ruta)
+                    try:
+                        ts, _ = _timestamp_desde(contenido, 0, len(contenido))
+                    finally:
+                        _cerrar(contenido)
+            except (FileNotFoundError, EOFError, OSError):
+                continue  # Podado mientras tanto
+            if ts is not None:
+                return ts
+        return None
+
+    def comprobar_cobertura(self) -> Optional[str]:
+        """Aviso si la ventana pedida empieza antes del evento más antiguo que queda"""
+        if self.desde is None:
+            return None
+        primero = self.primer_evento()
+        if primero is None or primero <= self.desde:
+            return None
+        pedidos = (time.time() - self.desde) / 86400
+        disponibles = (time.time() - primero) / 86400
+        return (f"Se pidieron {pedidos:g} días pero el evento más antiguo que queda es de hace "
+                f"{disponibles:.1f} días (retención: backup_count={LOGGING_CONFIG['backup_count']}, "
+                f"max_bytes={LOGGING_CONFIG['max_bytes']}, max_age_days={LOGGING_CONFIG.get('max_age_days')}): "
+                f"lo anterior ya no se puede reprocesar")
+
+    def segmentos(self) -> List[Path]:
+        """Segmentos que pueden tener eventos desde `desde` (con el horizonte), del más antiguo al más nuevo"""
+        segmentos = listar_segmentos(self.log_file)
+        if self.log_file.exists():
+            segmentos.append(self.log_file)
+        if self.desde is None:
+            return segmentos
+        # La última escritura de un segmento rotado es su mtime: si es anterior, no tiene nada reciente
+        return [ruta for ruta in segmentos if ruta.stat().st_mtime >= self.desde - self.horizonte]
+
+    def trozos(self) -> List[Trozo]:
+        """Trozos de todos los segmentos en orden de tiempo, cortados en saltos de línea"""
+        trozos: List[Trozo] = []
+        for ruta in self.segmentos():
+            if ruta.suffix in COMPRIMIDOS:
+                inicio = _inicio_comprimido(ruta)
+                ts, _ = _timestamp_desde(inicio, 0, inicio.rfind(b"\n") + 1)
+                if ts is not None:
+                    trozos.append((str(ruta), 0, None, ts))
+                continue
+            contenido = abrir_contenido(ruta)
+            try:
+                limite = contenido.rfind(b"\n") + 1  # El vivo puede tener una línea a medio escribir
+                posicion = 0
+                while posicion < limite:
+                    corte = contenido.find(b"\n", min(posicion + self.tamano_trozo, limite) - 1, limite)
+                    fin = limite if corte < 0 else corte + 1
+                    ts, _ = _timestamp_desde(contenido, posicion, fin)
+                    if ts is not None:
+                        trozos.append((str(ruta), posicion, fin, ts))
+                    posicion = fin
+            finally:
+                _cerrar(contenido)
+        return trozos
+
+    def _tareas(self, trozos: List[Trozo]) -> Iterator[tuple]:
+        for i, trozo in enumerate(trozos):
+            # Trozos previos que terminan dentro del horizonte (termina donde empieza el siguiente)
+            previos = []
+            j = i - 1
+            while j >= 0 and trozos[j + 1][3] >= trozo[3] - self.horizonte:
+                previos.append(trozos[j])
+                j -= 1
+            if self.desde is not None and i + 1 < len(trozos) and trozos[i + 1][3] < self.desde:
+                continue  # Todo el trozo es anterior a `desde`: solo sirve para calentar
+            yield self.reglas, trozo, previos[::-1], self.horizonte, self.desde
+
+    def _resultados(self, trozos: List[Trozo]) -> Iterator[Dict[str, Any]]:
+        """Resultados por trozo, en orden, en el proceso actual o en un pool"""
+        tareas = self._tareas(trozos)
+        if self.procesos <= 1:
+            for tarea in tareas:
+                yield _analizar_trozo(tarea)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+            # Como mucho 2 trozos en vuelo por proceso: las alertas se emiten en orden
+            pendientes = []
+            for tarea in tareas:
+                pendientes.append(pool.submit(_analizar_trozo, tarea))
+                if len(pendientes) >= self.procesos * 2:
+                    yield pendientes.pop(0).result()
+            for futuro in pendientes:
+                yield futuro.result()
+
+    def alertas(self) -> Iterator[Dict[str, Any]]:
+        """Alertas de todo el histórico en orden de tiempo (las estadísticas se actualizan al avanzar)"""
+        inicio = time.perf_counter()
+        self.aviso_cobertura = self.comprobar_cobertura()
+        if self.aviso_cobertura:
+            print(f"⚠️ {self.aviso_cobertura}", file=sys.stderr)
+        for resultado in self._resultados(self.trozos()):
+            self.eventos += resultado["eventos"]
+            self.eventos_calentamiento += resultado["calentamiento"]
+            self.bytes += resultado["bytes"]
+            for alerta in resultado["alertas"]:
+                self.disparos[alerta["regla"]] += 1
+                yield alerta
+            self.duracion = time.perf_counter() - inicio
+
+    @property
+    def gb_por_minuto(self) -> float:
+        return self.bytes / 1e9 / (self.duracion / 60) if self.duracion else 0.0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pasa las reglas de detección por el histórico de logs")
+    parser.add_argument("log", type=Path, nargs="?", default=Path("logs/security.log"))
+    parser.add_argument("--reglas", type=Path, default=REGLAS_POR_DEFECTO)
+    parser.add_argument("--dias", type=float, default=DIAS, help="Días hacia atrás (0 = todo el histórico)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo")
+    parser.add_argument("--trozo-mb", type=float, default=TAMANO_TROZO / 1024 / 1024,
+                        help="Tamaño de los trozos de los segmentos sin comprimir")
+    args = parser.parse_args(argv)
+
+    try:
+        reproceso = ReprocesoHistorico(args.log, args.reglas, args.dias or None, args.procesos,
+                                       int(args.trozo_mb * 1024 * 1024))
+    except (OSError, ValueError) as error:
+        print(f"❌ {error}", file=sys.stderr)
+        return 1
+    for alerta in reproceso.alertas():
+        print(json.dumps(alerta, ensure_ascii=False))
+
+    print(f"\n⏪ {reproceso.eventos:,} eventos ({reproceso.bytes / 1e9:.2f} GB) en {reproceso.duracion:.1f} s: "
+          f"{reproceso.gb_por_minuto:.2f} GB/min con {args.procesos} procesos "
+          f"({reproceso.eventos_calentamiento:,} eventos de calentamiento, horizonte {reproceso.horizonte:g} s)",
+          file=sys.stderr)
+    for regla, disparos in reproceso.disparos.most_common():
+        print(f"   {regla:<28} {disparos:>9,} alertas", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
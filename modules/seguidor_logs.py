@@ -0,0 +1,332 @@
+"""
+👀 Seguidor en tiempo real de logs/security.log para AttackDetector
+===================================================================
+
+Ejecuta la detección de ataques fuera del proceso que logea, leyendo el
+log a medida que crece (como `tail -F`):
+
+• Lee solo los bytes nuevos, por lotes, y se queda con las líneas
+  LOGIN_SUCCESS / LOGIN_FAILED (formato texto o JSONL)
+• Sigue al archivo a través de las rotaciones de SecurityLogger: cuando
+  security.log se renombra, termina de leer el archivo viejo (el
+  descriptor abierto sigue siendo válido) y continúa con el nuevo
+• Guarda su posición (huella de la primera línea + offset) para que al
+  reiniciar continúe donde lo dejó, aunque el archivo haya rotado y el
+  segmento esté ya comprimido. La posición se guarda como mucho una vez
+  por segundo: tras una caída se pueden reprocesar eventos de ese último
+  segundo (entrega "al menos una vez"), nunca perderlos
+• Cada alerta se escribe como una línea JSON en stdout
+• Con --instantanea, el estado de AttackDetector se guarda periódicamente
+  y al reiniciar se recupera y se reprocesa el log desde la posición de
+  la instantánea (ver modules/instantaneas_detector.py)
+
+Uso:
+    python -m modules.seguidor_logs logs/security.log --intervalo 0.2
+    python -m modules.seguidor_logs logs/security.log --instantanea logs/detector.snap
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from config import DETECTION_CONFIG
+from modules import cargar_ejemplo
+from modules.indice_logs import abrir_contenido, huella, listar_segmentos, segundos
+from modules.instantaneas_detector import Instantaneas
+
+AttackDetector = cargar_ejemplo("04_security_logging").AttackDetector
+
+TAMANO_LECTURA = 1024 * 1024  # Bytes por lectura
+INTERVALO = 0.2               # Segundos entre sondeos cuando no hay datos nuevos
+INTERVALO_ESTADO = 1.0        # Segundos entre escrituras del archivo de estado
+EVENTOS_LOGIN = ("LOGIN_SUCCESS", "LOGIN_FAILED")
+
+# (timestamp ISO, username, ip_address, success, repeticiones)
+EventoLogin = Tuple[str, str, str, bool, int]
+
+def extraer_logins(lineas: List[bytes]) -> List[EventoLogin]:
+    """Eventos de login de un lote de líneas; el resto se descarta sin parsear
+
+    Es el camino caliente del seguidor: el tipo de evento se mira en los
+    bytes del prefijo ("fecha - NIVEL - EVENTO: ") sin decodificarlo, y
+    solo los logins pasan por json.loads. Una línea que resume una ráfaga
+    ("count" en los detalles, ver AgregadorRafagas) sale una sola vez con
+    repeticiones = "count", para sumarla como peso y no copia a copia.
+    """
+    eventos = []
+    for linea in lineas:
+        if b"LOGIN_" not in linea:
+            continue
+        inicio = linea.find(b"{")
+        if inicio < 0:
+            continue
+        try:
+            evento = json.loads(linea[inicio:])
+        except ValueError:
+            continue
+        if inicio:
+            if linea.endswith(b"LOGIN_SUCCESS: ", 0, inicio):
+                success = True
+            elif linea.endswith(b"LOGIN_FAILED: ", 0, inicio):
+                success = False
+            else:
+                continue
+        elif type(evento) is dict and evento.get("event") in EVENTOS_LOGIN:
+            success = evento["event"] == "LOGIN_SUCCESS"
+        else:
+            continue
+        detalles = evento.get("details") if type(evento) is dict else None
+        if type(detalles) is not dict:
+            continue
+        repeticiones = detalles.get("count", 1)
+        if type(repeticiones) is not int or repeticiones < 1:
+            repeticiones = 1
+        eventos.append((evento.get("timestamp", ""), str(detalles.get("username")),
+                        str(detalles.get("ip_address")), success, repeticiones))
+    return eventos
+
+class SeguidorLog:
+    """Lee las líneas nuevas de un log, sobreviviendo a rotaciones y reinicios"""
+
+    def __init__(self, log_file: Union[str, Path] = "logs/security.log",
+                 estado: Optional[Union[str, Path]] = None, desde_inicio: bool = False,
+                 tamano_lectura: int = TAMANO_LECTURA, posicion: Optional[Dict[str, object]] = None):
+        self.log_file = Path(log_file)
+        self.estado = Path(estado) if estado else self.log_file.with_name(f".{self.log_file.name}.seguidor.json")
+        self.tamano_lectura = tamano_lectura
+        self._archivo: Optional[BinaryIO] = None
+        self._inodo: Optional[int] = None
+        self._huella: Optional[str] = None
+        self._resto = b""                 # Línea a medio escribir
+        self._pendientes: List[bytes] = []  # Líneas recuperadas de un segmento ya rotado
+        self._ultimo_guardado = 0.0
+        # Una posición explícita (la de una instantánea del detector) manda sobre el archivo de estado
+        self._restaurar(desde_inicio, posicion)
+
+    # --- Posición ---
+
+    @property
+    def offset(self) -> int:
+        """Bytes del archivo actual ya entregados (sin la línea a medio escribir)"""
+        return self._archivo.tell() - len(self._resto) if self._archivo else 0
+
+    @property
+    def posicion(self) -> Optional[Dict[str, object]]:
+        """Huella y offset de lo ya entregado (None si el archivo aún no tiene ninguna línea)"""
+        huella_actual = self._huella_actual()
+        if huella_actual is None:
+            return None
+        return {"huella": huella_actual, "offset": self.offset}
+
+    def _restaurar(self, desde_inicio: bool, guardado: Optional[Dict[str, object]]):
+        if guardado is None:
+            try:
+                guardado = json.loads(self.estado.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                guardado = None
+
+        if guardado is None:
+            # Primera ejecución: como tail -F, solo lo que se escriba a partir de ahora
+            self._abrir(0 if desde_inicio else None)
+            return
+
+        if self.log_file.exists() and huella(self.log_file) == guardado["huella"]:
+            self._abrir(guardado["offset"])
+            return
+
+        # El archivo rotó mientras no estábamos: terminar el segmento donde quedó
+        # y leer enteros los que rotaron después, antes de pasar al actual
+        segmentos = listar_segmentos(self.log_file)
+        for indice in range(len(segmentos) - 1, -1, -1):
+            try:
+                if huella(segmentos[indice]) != guardado["huella"]:
+                    continue
+                contenido = abrir_contenido(segmentos[indice])
+            except (FileNotFoundError, EOFError, OSError):
+                continue
+            self._pendientes = bytes(contenido[guardado["offset"]:]).splitlines()
+            for posterior in segmentos[indice + 1:]:
+                try:
+                    self._pendientes.extend(bytes(abrir_contenido(posterior)).splitlines())
+                except (FileNotFoundError, EOFError, OSError):
+                    continue
+            break
+        else:
+            print(f"⚠️ No se encontró el segmento donde se quedó el seguidor; "
+                  f"se continúa desde el inicio de {self.log_file}", file=sys.stderr)
+        self._abrir(0)
+
+    def _abrir(self, offset: Optional[int]):
+        try:
+            archivo = open(self.log_file, "rb")
+        except FileNotFoundError:
+            self._archivo = None
+            return
+        if offset is None:
+            archivo.seek(0, os.SEEK_END)
+        else:
+            archivo.seek(offset)
+        self._archivo = archivo
+        self._inodo = os.fstat(archivo.fileno()).st_ino
+        self._huella = None
+        self._resto = b""
+
+    def _huella_actual(self) -> Optional[str]:
+        # Misma huella que modules.indice_logs, pero del archivo abierto (la ruta puede ser ya otro)
+        if self._huella is None and self._archivo is not None:
+            inicio = os.pread(self._archivo.fileno(), 65536, 0)
+            fin = inicio.find(b"\n")
+            if fin >= 0:
+                self._huella = hashlib.sha256(inicio[:fin + 1]).hexdigest()[:20]
+        return self._huella
+
+    def _inodo_ruta(self) -> Optional[int]:
+        try:
+            return os.stat(self.log_file).st_ino
+        except FileNotFoundError:
+            return None
+
+    def guardar_estado(self, forzar: bool = False):
+        """Guarda la posición de forma atómica (como mucho cada INTERVALO_ESTADO segundos)"""
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultimo_guardado < INTERVALO_ESTADO:
+            return
+        posicion = self.posicion
+        if posicion is None:
+            return
+        temporal = self.estado.with_suffix(".tmp")
+        temporal.write_text(json.dumps(posicion), encoding="utf-8")
+        temporal.replace(self.estado)
+        self._ultimo_guardado = ahora
+
+    # --- Lectura ---
+
+    def _leer_disponible(self) -> List[bytes]:
+        lineas: List[bytes] = []
+        while True:
+            trozo = self._archivo.read(self.tamano_lectura)
+            if not trozo:
+                return lineas
+            datos = self._resto + trozo
+            fin = datos.rfind(b"\n")
+            if fin < 0:
+                self._resto = datos
+                continue
+            lineas.extend(datos[:fin].split(b"\n"))
+            self._resto = datos[fin + 1:]
+
+    def leer_nuevos(self) -> List[bytes]:
+        """Todas las líneas completas escritas desde la última llamada"""
+        lineas, self._pendientes = self._pendientes, []
+        if self._archivo is None:
+            self._abrir(0)
+            if self._archivo is None:
+                return lineas
+
+        lineas.extend(self._leer_disponible())
+        inodo = self._inodo_ruta()
+        if inodo is not None and inodo != self._inodo:
+            # Rotación: vaciar el archivo viejo y pasar al nuevo desde el principio
+            lineas.extend(self._leer_disponible())
+            if self._resto:
+                lineas.append(self._resto)
+            self._archivo.close()
+            self._abrir(0)
+            if self._archivo is not None:
+                lineas.extend(self._leer_disponible())
+        elif inodo is not None and os.fstat(self._archivo.fileno()).st_size < self.offset:
+            # Truncado en el sitio (copytruncate): empezar de nuevo
+            self._archivo.seek(0)
+            self._resto = b""
+            self._huella = None
+            lineas.extend(self._leer_disponible())
+        return [linea for linea in lineas if linea]
+
+    def seguir(self, procesar_lote: Callable[[List[bytes]], None], intervalo: float = INTERVALO,
+               detener: Optional[threading.Event] = None, al_avanzar: Optional[Callable[..., None]] = None):
+        """Llama a procesar_lote con cada lote de líneas nuevas hasta que se active `detener`
+
+        `al_avanzar(posicion)` se llama tras cada lote ya procesado, y
+        `al_avanzar(posicion, final=True)` al terminar si el último lote
+        se procesó entero (p. ej. Instantaneas de modules.instantaneas_detector).
+        """
+        detener = detener or threading.Event()
+        lote_completo = True
+        try:
+            while not detener.is_set():
+                lineas = self.leer_nuevos()
+                if lineas:
+                    lote_completo = False
+                    procesar_lote(lineas)
+                    lote_completo = True
+                    if al_avanzar is not None:
+                        al_avanzar(self.posicion)
+                self.guardar_estado()
+                if not lineas:
+                    detener.wait(intervalo)
+        finally:
+            if al_avanzar is not None and lote_completo:
+                al_avanzar(self.posicion, final=True)
+            self.guardar_estado(forzar=True)
+            if self._archivo is not None:
+                self._archivo.close()
+
+class AlimentadorDetector:
+    """Pasa los logins de cada lote a AttackDetector y reporta las alertas"""
+
+    def __init__(self, detector: Optional[AttackDetector] = None,
+                 alertar: Optional[Callable[[Dict[str, object]], None]] = None):
+        self.detector = detector or AttackDetector()
+        self.alertar = alertar or (lambda alerta: print(json.dumps(alerta, ensure_ascii=False), flush=True))
+        self.eventos = 0
+        self.alertas = 0
+        self._timestamp = None  # Último timestamp convertido (muchos eventos lo comparten)
+        self._segundos = None
+
+    def __call__(self, lineas: List[bytes]):
+        analizar = self.detector.analyze_login_pattern
+        for timestamp, username, ip_address, success, repeticiones in extraer_logins(lineas):
+            self.eventos += repeticiones
+            # La ventana del detector usa la hora del evento, no la de lectura
+            if timestamp != self._timestamp:
+                self._timestamp, self._segundos = timestamp, segundos(timestamp)
+            alertas = analizar(username, ip_address, success, self._segundos, cantidad=repeticiones)
+            for alerta in alertas:
+                self.alertas += 1
+                self.alertar({"alerta": alerta, "timestamp": timestamp,
+                              "username": username, "ip_address": ip_address})
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sigue security.log y alimenta AttackDetector")
+    parser.add_argument("log", type=Path, nargs="?", default=Path("logs/security.log"))
+    parser.add_argument("--estado", type=Path, help="Archivo donde guardar la posición")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO, help="Segundos entre sondeos")
+    parser.add_argument("--desde-inicio", action="store_true",
+                        help="Sin estado previo, leer el archivo desde el principio (por defecto solo lo nuevo)")
+    parser.add_argument("--instantanea", type=Path,
+                        help="Archivo de instantáneas del detector (se restaura al arrancar)")
+    parser.add_argument("--intervalo-instantanea", type=float, default=DETECTION_CONFIG["snapshot_interval_seconds"],
+                        help="Segundos entre instantáneas")
+    args = parser.parse_args(argv)
+
+    instantaneas, detector, posicion = None, None, None
+    if args.instantanea:
+        instantaneas = Instantaneas(args.instantanea, intervalo=args.intervalo_instantanea)
+        detector, posicion = instantaneas.cargar()
+    seguidor = SeguidorLog(args.log, args.estado, args.desde_inicio, posicion=posicion)
+    alimentador = AlimentadorDetector(detector)
+    try:
+        seguidor.seguir(alimentador, args.intervalo, al_avanzar=instantaneas)
+    except KeyboardInterrupt:
+        pass
+    print(f"👀 {alimentador.eventos:,} logins analizados, {alimentador.alertas:,} alertas", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
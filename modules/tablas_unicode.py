@@ -0,0 +1,1256 @@
+"""
+Tablas Unicode precalculadas para modules/unicode_texto.py
+
+⚠️ ARCHIVO GENERADO por modules/generar_tablas_unicode.py - no editar a mano
+"""
+
+VERSION_UNICODE = '14.0.0'
+ORIGEN_CONFUNDIBLES = 'CONFUNDIBLES_BASICOS'
+
+# ord(carácter) -> esqueleto, para str.translate
+TABLA_ESQUELETO = {
+    0x0030: 'o',
+    0x0031: 'l',
+    0x007C: 'l',
+    0x00AA: 'a',
+    0x00B2: '2',
+    0x00B3: '3',
+    0x00B9: 'l',
+    0x00BA: 'o',
+    0x00DF: 'ss',
+    0x0131: 'i',
+    0x0132: 'ij',
+    0x0133: 'ij',
+    0x017F: 's',
+    0x01C0: 'l',
+    0x01C7: 'lj',
+    0x01C8: 'lj',
+    0x01C9: 'lj',
+    0x01CA: 'nj',
+    0x01CB: 'nj',
+    0x01CC: 'nj',
+    0x01F1: 'dz',
+    0x01F2: 'dz',
+    0x01F3: 'dz',
+    0x0237: 'j',
+    0x0261: 'g',
+    0x0269: 'i',
+    0x028F: 'y',
+    0x02B0: 'h',
+    0x02B2: 'j',
+    0x02B3: 'r',
+    0x02B7: 'w',
+    0x02B8: 'y',
+    0x02E1: 'l',
+    0x02E2: 's',
+    0x02E3: 'x',
+    0x03B1: 'a',
+    0x03B2: 'b',
+    0x03B3: 'y',
+    0x03B5: 'e',
+    0x03B7: 'n',
+    0x03B9: 'i',
+    0x03BA: 'k',
+    0x03BD: 'v',
+    0x03BF: 'o',
+    0x03C1: 'p',
+    0x03C4: 't',
+    0x03C5: 'u',
+    0x03C7: 'x',
+    0x03C9: 'w',
+    0x03F2: 'c',
+    0x03F3: 'j',
+    0x0430: 'a',
+    0x0432: 'b',
+    0x0433: 'r',
+    0x0435: 'e',
+    0x043A: 'k',
+    0x043C: 'm',
+    0x043D: 'h',
+    0x043E: 'o',
+    0x043F: 'n',
+    0x0440: 'p',
+    0x0441: 'c',
+    0x0442: 't',
+    0x0443: 'y',
+    0x0445: 'x',
+    0x044C: 'b',
+    0x0455: 's',
+    0x0456: 'i',
+    0x0458: 'j',
+    0x04BB: 'h',
+    0x04CF: 'l',
+    0x0501: 'd',
+    0x050D: 'g',
+    0x051B: 'q',
+    0x051D: 'w',
+    0x13B3: 'w',
+    0x1D00: 'a',
+    0x1D04: 'c',
+    0x1D0F: 'o',
+    0x1D1C: 'u',
+    0x1D20: 'v',
+    0x1D21: 'w',
+    0x1D22: 'z',
+    0x1D2C: 'a',
+    0x1D2E: 'b',
+    0x1D30: 'd',
+    0x1D31: 'e',
+    0x1D33: 'g',
+    0x1D34: 'h',
+    0x1D35: 'i',
+    0x1D36: 'j',
+    0x1D37: 'k',
+    0x1D38: 'l',
+    0x1D39: 'm',
+    0x1D3A: 'n',
+    0x1D3C: 'o',
+    0x1D3E: 'p',
+    0x1D3F: 'r',
+    0x1D40: 't',
+    0x1D41: 'u',
+    0x1D42: 'w',
+    0x1D43: 'a',
+    0x1D47: 'b',
+    0x1D48: 'd',
+    0x1D49: 'e',
+    0x1D4D: 'g',
+    0x1D4F: 'k',
+    0x1D50: 'm',
+    0x1D52: 'o',
+    0x1D56: 'p',
+    0x1D57: 't',
+    0x1D58: 'u',
+    0x1D5B: 'v',
+    0x1D62: 'i',
+    0x1D63: 'r',
+    0x1D64: 'u',
+    0x1D65: 'v',
+    0x1D9C: 'c',
+    0x1DA0: 'f',
+    0x1DBB: 'z',
+    0x1E9E: 'ss',
+    0x2070: 'o',
+    0x2071: 'i',
+    0x2074: '4',
+    0x2075: '5',
+    0x2076: '6',
+    0x2077: '7',
+    0x2078: '8',
+    0x2079: '9',
+    0x207F: 'n',
+    0x2080: 'o',
+    0x2081: 'l',
+    0x2082: '2',
+    0x2083: '3',
+    0x2084: '4',
+    0x2085: '5',
+    0x2086: '6',
+    0x2087: '7',
+    0x2088: '8',
+    0x2089: '9',
+    0x2090: 'a',
+    0x2091: 'e',
+    0x2092: 'o',
+    0x2093: 'x',
+    0x2095: 'h',
+    0x2096: 'k',
+    0x2097: 'l',
+    0x2098: 'm',
+    0x2099: 'n',
+    0x209A: 'p',
+    0x209B: 's',
+    0x209C: 't',
+    0x20A8: 'rs',
+    0x2102: 'c',
+    0x210A: 'g',
+    0x210B: 'h',
+    0x210C: 'h',
+    0x210D: 'h',
+    0x210E: 'h',
+    0x2110: 'i',
+    0x2111: 'i',
+    0x2112: 'l',
+    0x2113: 'l',
+    0x2115: 'n',
+    0x2116: 'no',
+    0x2119: 'p',
+    0x211A: 'q',
+    0x211B: 'r',
+    0x211C: 'r',
+    0x211D: 'r',
+    0x2120: 'sm',
+    0x2121: 'tel',
+    0x2122: 'tm',
+    0x2124: 'z',
+    0x2128: 'z',
+    0x212A: 'k',
+    0x212C: 'b',
+    0x212D: 'c',
+    0x212F: 'e',
+    0x2130: 'e',
+    0x2131: 'f',
+    0x2133: 'm',
+    0x2134: 'o',
+    0x2139: 'i',
+    0x213B: 'fax',
+    0x2145: 'd',
+    0x2146: 'd',
+    0x2147: 'e',
+    0x2148: 'i',
+    0x2149: 'j',
+    0x2160: 'i',
+    0x2161: 'ii',
+    0x2162: 'iii',
+    0x2163: 'iv',
+    0x2164: 'v',
+    0x2165: 'vi',
+    0x2166: 'vii',
+    0x2167: 'viii',
+    0x2168: 'ix',
+    0x2169: 'x',
+    0x216A: 'xi',
+    0x216B: 'xii',
+    0x216C: 'l',
+    0x216D: 'c',
+    0x216E: 'd',
+    0x216F: 'm',
+    0x2170: 'i',
+    0x2171: 'ii',
+    0x2172: 'iii',
+    0x2173: 'iv',
+    0x2174: 'v',
+    0x2175: 'vi',
+    0x2176: 'vii',
+    0x2177: 'viii',
+    0x2178: 'ix',
+    0x2179: 'x',
+    0x217A: 'xi',
+    0x217B: 'xii',
+    0x217C: 'l',
+    0x217D: 'c',
+    0x217E: 'd',
+    0x217F: 'm',
+    0x2460: 'l',
+    0x2461: '2',
+    0x2462: '3',
+    0x2463: '4',
+    0x2464: '5',
+    0x2465: '6',
+    0x2466: '7',
+    0x2467: '8',
+    0x2468: '9',
+    0x2469: '10',
+    0x246A: '11',
+    0x246B: '12',
+    0x246C: '13',
+    0x246D: '14',
+    0x246E: '15',
+    0x246F: '16',
+    0x2470: '17',
+    0x2471: '18',
+    0x2472: '19',
+    0x2473: '20',
+    0x24B6: 'a',
+    0x24B7: 'b',
+    0x24B8: 'c',
+    0x24B9: 'd',
+    0x24BA: 'e',
+    0x24BB: 'f',
+    0x24BC: 'g',
+    0x24BD: 'h',
+    0x24BE: 'i',
+    0x24BF: 'j',
+    0x24C0: 'k',
+    0x24C1: 'l',
+    0x24C2: 'm',
+    0x24C3: 'n',
+    0x24C4: 'o',
+    0x24C5: 'p',
+    0x24C6: 'q',
+    0x24C7: 'r',
+    0x24C8: 's',
+    0x24C9: 't',
+    0x24CA: 'u',
+    0x24CB: 'v',
+    0x24CC: 'w',
+    0x24CD: 'x',
+    0x24CE: 'y',
+    0x24CF: 'z',
+    0x24D0: 'a',
+    0x24D1: 'b',
+    0x24D2: 'c',
+    0x24D3: 'd',
+    0x24D4: 'e',
+    0x24D5: 'f',
+    0x24D6: 'g',
+    0x24D7: 'h',
+    0x24D8: 'i',
+    0x24D9: 'j',
+    0x24DA: 'k',
+    0x24DB: 'l',
+    0x24DC: 'm',
+    0x24DD: 'n',
+    0x24DE: 'o',
+    0x24DF: 'p',
+    0x24E0: 'q',
+    0x24E1: 'r',
+    0x24E2: 's',
+    0x24E3: 't',
+    0x24E4: 'u',
+    0x24E5: 'v',
+    0x24E6: 'w',
+    0x24E7: 'x',
+    0x24E8: 'y',
+    0x24E9: 'z',
+    0x24EA: 'o',
+    0x2C7C: 'j',
+    0x2C7D: 'v',
+    0x3250: 'pte',
+    0x3251: '21',
+    0x3252: '22',
+    0x3253: '23',
+    0x3254: '24',
+    0x3255: '25',
+    0x3256: '26',
+    0x3257: '27',
+    0x3258: '28',
+    0x3259: '29',
+    0x325A: '30',
+    0x325B: '31',
+    0x325C: '32',
+    0x325D: '33',
+    0x325E: '34',
+    0x325F: '35',
+    0x32B1: '36',
+    0x32B2: '37',
+    0x32B3: '38',
+    0x32B4: '39',
+    0x32B5: '40',
+    0x32B6: '41',
+    0x32B7: '42',
+    0x32B8: '43',
+    0x32B9: '44',
+    0x32BA: '45',
+    0x32BB: '46',
+    0x32BC: '47',
+    0x32BD: '48',
+    0x32BE: '49',
+    0x32BF: '50',
+    0x32CC: 'hg',
+    0x32CD: 'erg',
+    0x32CE: 'ev',
+    0x32CF: 'ltd',
+    0x3371: 'hpa',
+    0x3372: 'da',
+    0x3373: 'au',
+    0x3374: 'bar',
+    0x3375: 'ov',
+    0x3376: 'pc',
+    0x3377: 'dm',
+    0x3378: 'dm2',
+    0x3379: 'dm3',
+    0x337A: 'iu',
+    0x3380: 'pa',
+    0x3381: 'na',
+    0x3383: 'ma',
+    0x3384: 'ka',
+    0x3385: 'kb',
+    0x3386: 'mb',
+    0x3387: 'gb',
+    0x3388: 'cal',
+    0x3389: 'kcal',
+    0x338A: 'pf',
+    0x338B: 'nf',
+    0x338E: 'mg',
+    0x338F: 'kg',
+    0x3390: 'hz',
+    0x3391: 'khz',
+    0x3392: 'mhz',
+    0x3393: 'ghz',
+    0x3394: 'thz',
+    0x3396: 'ml',
+    0x3397: 'dl',
+    0x3398: 'kl',
+    0x3399: 'fm',
+    0x339A: 'nm',
+    0x339C: 'mm',
+    0x339D: 'cm',
+    0x339E: 'km',
+    0x339F: 'mm2',
+    0x33A0: 'cm2',
+    0x33A1: 'm2',
+    0x33A2: 'km2',
+    0x33A3: 'mm3',
+    0x33A4: 'cm3',
+    0x33A5: 'm3',
+    0x33A6: 'km3',
+    0x33A9: 'pa',
+    0x33AA: 'kpa',
+    0x33AB: 'mpa',
+    0x33AC: 'gpa',
+    0x33AD: 'rad',
+    0x33B0: 'ps',
+    0x33B1: 'ns',
+    0x33B3: 'ms',
+    0x33B4: 'pv',
+    0x33B5: 'nv',
+    0x33B7: 'mv',
+    0x33B8: 'kv',
+    0x33B9: 'mv',
+    0x33BA: 'pw',
+    0x33BB: 'nw',
+    0x33BD: 'mw',
+    0x33BE: 'kw',
+    0x33BF: 'mw',
+    0x33C3: 'bq',
+    0x33C4: 'cc',
+    0x33C5: 'cd',
+    0x33C8: 'db',
+    0x33C9: 'gy',
+    0x33CA: 'ha',
+    0x33CB: 'hp',
+    0x33CC: 'in',
+    0x33CD: 'kk',
+    0x33CE: 'km',
+    0x33CF: 'kt',
+    0x33D0: 'lm',
+    0x33D1: 'ln',
+    0x33D2: 'log',
+    0x33D3: 'lx',
+    0x33D4: 'mb',
+    0x33D5: 'mil',
+    0x33D6: 'mol',
+    0x33D7: 'ph',
+    0x33D9: 'ppm',
+    0x33DA: 'pr',
+    0x33DB: 'sr',
+    0x33DC: 'sv',
+    0x33DD: 'wb',
+    0x33FF: 'gal',
+    0xA7F2: 'c',
+    0xA7F3: 'f',
+    0xA7F4: 'q',
+    0xFB00: 'ff',
+    0xFB01: 'fi',
+    0xFB02: 'fl',
+    0xFB03: 'ffi',
+    0xFB04: 'ffl',
+    0xFB05: 'st',
+    0xFB06: 'st',
+    0xFF10: 'o',
+    0xFF11: 'l',
+    0xFF12: '2',
+    0xFF13: '3',
+    0xFF14: '4',
+    0xFF15: '5',
+    0xFF16: '6',
+    0xFF17: '7',
+    0xFF18: '8',
+    0xFF19: '9',
+    0xFF21: 'a',
+    0xFF22: 'b',
+    0xFF23: 'c',
+    0xFF24: 'd',
+    0xFF25: 'e',
+    0xFF26: 'f',
+    0xFF27: 'g',
+    0xFF28: 'h',
+    0xFF29: 'i',
+    0xFF2A: 'j',
+    0xFF2B: 'k',
+    0xFF2C: 'l',
+    0xFF2D: 'm',
+    0xFF2E: 'n',
+    0xFF2F: 'o',
+    0xFF30: 'p',
+    0xFF31: 'q',
+    0xFF32: 'r',
+    0xFF33: 's',
+    0xFF34: 't',
+    0xFF35: 'u',
+    0xFF36: 'v',
+    0xFF37: 'w',
+    0xFF38: 'x',
+    0xFF39: 'y',
+    0xFF3A: 'z',
+    0xFF41: 'a',
+    0xFF42: 'b',
+    0xFF43: 'c',
+    0xFF44: 'd',
+    0xFF45: 'e',
+    0xFF46: 'f',
+    0xFF47: 'g',
+    0xFF48: 'h',
+    0xFF49: 'i',
+    0xFF4A: 'j',
+    0xFF4B: 'k',
+    0xFF4C: 'l',
+    0xFF4D: 'm',
+    0xFF4E: 'n',
+    0xFF4F: 'o',
+    0xFF50: 'p',
+    0xFF51: 'q',
+    0xFF52: 'r',
+    0xFF53: 's',
+    0xFF54: 't',
+    0xFF55: 'u',
+    0xFF56: 'v',
+    0xFF57: 'w',
+    0xFF58: 'x',
+    0xFF59: 'y',
+    0xFF5A: 'z',
+    0x107A5: 'q',
+    0x1D400: 'a',
+    0x1D401: 'b',
+    0x1D402: 'c',
+    0x1D403: 'd',
+    0x1D404: 'e',
+    0x1D405: 'f',
+    0x1D406: 'g',
+    0x1D407: 'h',
+    0x1D408: 'i',
+    0x1D409: 'j',
+    0x1D40A: 'k',
+    0x1D40B: 'l',
+    0x1D40C: 'm',
+    0x1D40D: 'n',
+    0x1D40E: 'o',
+    0x1D40F: 'p',
+    0x1D410: 'q',
+    0x1D411: 'r',
+    0x1D412: 's',
+    0x1D413: 't',
+    0x1D414: 'u',
+    0x1D415: 'v',
+    0x1D416: 'w',
+    0x1D417: 'x',
+    0x1D418: 'y',
+    0x1D419: 'z',
+    0x1D41A: 'a',
+    0x1D41B: 'b',
+    0x1D41C: 'c',
+    0x1D41D: 'd',
+    0x1D41E: 'e',
+    0x1D41F: 'f',
+    0x1D420: 'g',
+    0x1D421: 'h',
+    0x1D422: 'i',
+    0x1D423: 'j',
+    0x1D424: 'k',
+    0x1D425: 'l',
+    0x1D426: 'm',
+    0x1D427: 'n',
+    0x1D428: 'o',
+    0x1D429: 'p',
+    0x1D42A: 'q',
+    0x1D42B: 'r',
+    0x1D42C: 's',
+    0x1D42D: 't',
+    0x1D42E: 'u',
+    0x1D42F: 'v',
+    0x1D430: 'w',
+    0x1D431: 'x',
+    0x1D432: 'y',
+    0x1D433: 'z',
+    0x1D434: 'a',
+    0x1D435: 'b',
+    0x1D436: 'c',
+    0x1D437: 'd',
+    0x1D438: 'e',
+    0x1D439: 'f',
+    0x1D43A: 'g',
+    0x1D43B: 'h',
+    0x1D43C: 'i',
+    0x1D43D: 'j',
+    0x1D43E: 'k',
+    0x1D43F: 'l',
+    0x1D440: 'm',
+    0x1D441: 'n',
+    0x1D442: 'o',
+    0x1D443: 'p',
+    0x1D444: 'q',
+    0x1D445: 'r',
+    0x1D446: 's',
+    0x1D447: 't',
+    0x1D448: 'u',
+    0x1D449: 'v',
+    0x1D44A: 'w',
+    0x1D44B: 'x',
+    0x1D44C: 'y',
+    0x1D44D: 'z',
+    0x1D44E: 'a',
+    0x1D44F: 'b',
+    0x1D450: 'c',
+    0x1D451: 'd',
+    0x1D452: 'e',
+    0x1D453: 'f',
+    0x1D454: 'g',
+    0x1D456: 'i',
+    0x1D457: 'j',
+    0x1D458: 'k',
+    0x1D459: 'l',
+    0x1D45A: 'm',
+    0x1D45B: 'n',
+    0x1D45C: 'o',
+    0x1D45D: 'p',
+    0x1D45E: 'q',
+    0x1D45F: 'r',
+    0x1D460: 's',
+    0x1D461: 't',
+    0x1D462: 'u',
+    0x1D463: 'v',
+    0x1D464: 'w',
+    0x1D465: 'x',
+    0x1D466: 'y',
+    0x1D467: 'z',
+    0x1D468: 'a',
+    0x1D469: 'b',
+    0x1D46A: 'c',
+    0x1D46B: 'd',
+    0x1D46C: 'e',
+    0x1D46D: 'f',
+    0x1D46E: 'g',
+    0x1D46F: 'h',
+    0x1D470: 'i',
+    0x1D471: 'j',
+    0x1D472: 'k',
+    0x1D473: 'l',
+    0x1D474: 'm',
+    0x1D475: 'n',
+    0x1D476: 'o',
+    0x1D477: 'p',
+    0x1D478: 'q',
+    0x1D479: 'r',
+    0x1D47A: 's',
+    0x1D47B: 't',
+    0x1D47C: 'u',
+    0x1D47D: 'v',
+    0x1D47E: 'w',
+    0x1D47F: 'x',
+    0x1D480: 'y',
+    0x1D481: 'z',
+    0x1D482: 'a',
+    0x1D483: 'b',
+    0x1D484: 'c',
+    0x1D485: 'd',
+    0x1D486: 'e',
+    0x1D487: 'f',
+    0x1D488: 'g',
+    0x1D489: 'h',
+    0x1D48A: 'i',
+    0x1D48B: 'j',
+    0x1D48C: 'k',
+    0x1D48D: 'l',
+    0x1D48E: 'm',
+    0x1D48F: 'n',
+    0x1D490: 'o',
+    0x1D491: 'p',
+    0x1D492: 'q',
+    0x1D493: 'r',
+    0x1D494: 's',
+    0x1D495: 't',
+    0x1D496: 'u',
+    0x1D497: 'v',
+    0x1D498: 'w',
+    0x1D499: 'x',
+    0x1D49A: 'y',
+    0x1D49B: 'z',
+    0x1D49C: 'a',
+    0x1D49E: 'c',
+    0x1D49F: 'd',
+    0x1D4A2: 'g',
+    0x1D4A5: 'j',
+    0x1D4A6: 'k',
+    0x1D4A9: 'n',
+    0x1D4AA: 'o',
+    0x1D4AB: 'p',
+    0x1D4AC: 'q',
+    0x1D4AE: 's',
+    0x1D4AF: 't',
+    0x1D4B0: 'u',
+    0x1D4B1: 'v',
+    0x1D4B2: 'w',
+    0x1D4B3: 'x',
+    0x1D4B4: 'y',
+    0x1D4B5: 'z',
+    0x1D4B6: 'a',
+    0x1D4B7: 'b',
+    0x1D4B8: 'c',
+    0x1D4B9: 'd',
+    0x1D4BB: 'f',
+    0x1D4BD: 'h',
+    0x1D4BE: 'i',
+    0x1D4BF: 'j',
+    0x1D4C0: 'k',
+    0x1D4C1: 'l',
+    0x1D4C2: 'm',
+    0x1D4C3: 'n',
+    0x1D4C5: 'p',
+    0x1D4C6: 'q',
+    0x1D4C7: 'r',
+    0x1D4C8: 's',
+    0x1D4C9: 't',
+    0x1D4CA: 'u',
+    0x1D4CB: 'v',
+    0x1D4CC: 'w',
+    0x1D4CD: 'x',
+    0x1D4CE: 'y',
+    0x1D4CF: 'z',
+    0x1D4D0: 'a',
+    0x1D4D1: 'b',
+    0x1D4D2: 'c',
+    0x1D4D3: 'd',
+    0x1D4D4: 'e',
+    0x1D4D5: 'f',
+    0x1D4D6: 'g',
+    0x1D4D7: 'h',
+    0x1D4D8: 'i',
+    0x1D4D9: 'j',
+    0x1D4DA: 'k',
+    0x1D4DB: 'l',
+    0x1D4DC: 'm',
+    0x1D4DD: 'n',
+    0x1D4DE: 'o',
+    0x1D4DF: 'p',
+    0x1D4E0: 'q',
+    0x1D4E1: 'r',
+    0x1D4E2: 's',
+    0x1D4E3: 't',
+    0x1D4E4: 'u',
+    0x1D4E5: 'v',
+    0x1D4E6: 'w',
+    0x1D4E7: 'x',
+    0x1D4E8: 'y',
+    0x1D4E9: 'z',
+    0x1D4EA: 'a',
+    0x1D4EB: 'b',
+    0x1D4EC: 'c',
+    0x1D4ED: 'd',
+    0x1D4EE: 'e',
+    0x1D4EF: 'f',
+    0x1D4F0: 'g',
+    0x1D4F1: 'h',
+    0x1D4F2: 'i',
+    0x1D4F3: 'j',
+    0x1D4F4: 'k',
+    0x1D4F5: 'l',
+    0x1D4F6: 'm',
+    0x1D4F7: 'n',
+    0x1D4F8: 'o',
+    0x1D4F9: 'p',
+    0x1D4FA: 'q',
+    0x1D4FB: 'r',
+    0x1D4FC: 's',
+    0x1D4FD: 't',
+    0x1D4FE: 'u',
+    0x1D4FF: 'v',
+    0x1D500: 'w',
+    0x1D501: 'x',
+    0x1D502: 'y',
+    0x1D503: 'z',
+    0x1D504: 'a',
+    0x1D505: 'b',
+    0x1D507: 'd',
+    0x1D508: 'e',
+    0x1D509: 'f',
+    0x1D50A: 'g',
+    0x1D50D: 'j',
+    0x1D50E: 'k',
+    0x1D50F: 'l',
+    0x1D510: 'm',
+    0x1D511: 'n',
+    0x1D512: 'o',
+    0x1D513: 'p',
+    0x1D514: 'q',
+    0x1D516: 's',
+    0x1D517: 't',
+    0x1D518: 'u',
+    0x1D519: 'v',
+    0x1D51A: 'w',
+    0x1D51B: 'x',
+    0x1D51C: 'y',
+    0x1D51E: 'a',
+    0x1D51F: 'b',
+    0x1D520: 'c',
+    0x1D521: 'd',
+    0x1D522: 'e',
+    0x1D523: 'f',
+    0x1D524: 'g',
+    0x1D525: 'h',
+    0x1D526: 'i',
+    0x1D527: 'j',
+    0x1D528: 'k',
+    0x1D529: 'l',
+    0x1D52A: 'm',
+    0x1D52B: 'n',
+    0x1D52C: 'o',
+    0x1D52D: 'p',
+    0x1D52E: 'q',
+    0x1D52F: 'r',
+    0x1D530: 's',
+    0x1D531: 't',
+    0x1D532: 'u',
+    0x1D533: 'v',
+    0x1D534: 'w',
+    0x1D535: 'x',
+    0x1D536: 'y',
+    0x1D537: 'z',
+    0x1D538: 'a',
+    0x1D539: 'b',
+    0x1D53B: 'd',
+    0x1D53C: 'e',
+    0x1D53D: 'f',
+    0x1D53E: 'g',
+    0x1D540: 'i',
+    0x1D541: 'j',
+    0x1D542: 'k',
+    0x1D543: 'l',
+    0x1D544: 'm',
+    0x1D546: 'o',
+    0x1D54A: 's',
+    0x1D54B: 't',
+    0x1D54C: 'u',
+    0x1D54D: 'v',
+    0x1D54E: 'w',
+    0x1D54F: 'x',
+    0x1D550: 'y',
+    0x1D552: 'a',
+    0x1D553: 'b',
+    0x1D554: 'c',
+    0x1D555: 'd',
+    0x1D556: 'e',
+    0x1D557: 'f',
+    0x1D558: 'g',
+    0x1D559: 'h',
+    0x1D55A: 'i',
+    0x1D55B: 'j',
+    0x1D55C: 'k',
+    0x1D55D: 'l',
+    0x1D55E: 'm',
+    0x1D55F: 'n',
+    0x1D560: 'o',
+    0x1D561: 'p',
+    0x1D562: 'q',
+    0x1D563: 'r',
+    0x1D564: 's',
+    0x1D565: 't',
+    0x1D566: 'u',
+    0x1D567: 'v',
+    0x1D568: 'w',
+    0x1D569: 'x',
+    0x1D56A: 'y',
+    0x1D56B: 'z',
+    0x1D56C: 'a',
+    0x1D56D: 'b',
+    0x1D56E: 'c',
+    0x1D56F: 'd',
+    0x1D570: 'e',
+    0x1D571: 'f',
+    0x1D572: 'g',
+    0x1D573: 'h',
+    0x1D574: 'i',
+    0x1D575: 'j',
+    0x1D576: 'k',
+    0x1D577: 'l',
+    0x1D578: 'm',
+    0x1D579: 'n',
+    0x1D57A: 'o',
+    0x1D57B: 'p',
+    0x1D57C: 'q',
+    0x1D57D: 'r',
+    0x1D57E: 's',
+    0x1D57F: 't',
+    0x1D580: 'u',
+    0x1D581: 'v',
+    0x1D582: 'w',
+    0x1D583: 'x',
+    0x1D584: 'y',
+    0x1D585: 'z',
+    0x1D586: 'a',
+    0x1D587: 'b',
+    0x1D588: 'c',
+    0x1D589: 'd',
+    0x1D58A: 'e',
+    0x1D58B: 'f',
+    0x1D58C: 'g',
+    0x1D58D: 'h',
+    0x1D58E: 'i',
+    0x1D58F: 'j',
+    0x1D590: 'k',
+    0x1D591: 'l',
+    0x1D592: 'm',
+    0x1D593: 'n',
+    0x1D594: 'o',
+    0x1D595: 'p',
+    0x1D596: 'q',
+    0x1D597: 'r',
+    0x1D598: 's',
+    0x1D599: 't',
+    0x1D59A: 'u',
+    0x1D59B: 'v',
+    0x1D59C: 'w',
+    0x1D59D: 'x',
+    0x1D59E: 'y',
+    0x1D59F: 'z',
+    0x1D5A0: 'a',
+    0x1D5A1: 'b',
+    0x1D5A2: 'c',
+    0x1D5A3: 'd',
+    0x1D5A4: 'e',
+    0x1D5A5: 'f',
+    0x1D5A6: 'g',
+    0x1D5A7: 'h',
+    0x1D5A8: 'i',
+    0x1D5A9: 'j',
+    0x1D5AA: 'k',
+    0x1D5AB: 'l',
+    0x1D5AC: 'm',
+    0x1D5AD: 'n',
+    0x1D5AE: 'o',
+    0x1D5AF: 'p',
+    0x1D5B0: 'q',
+    0x1D5B1: 'r',
+    0x1D5B2: 's',
+    0x1D5B3: 't',
+    0x1D5B4: 'u',
+    0x1D5B5: 'v',
+    0x1D5B6: 'w',
+    0x1D5B7: 'x',
+    0x1D5B8: 'y',
+    0x1D5B9: 'z',
+    0x1D5BA: 'a',
+    0x1D5BB: 'b',
+    0x1D5BC: 'c',
+    0x1D5BD: 'd',
+    0x1D5BE: 'e',
+    0x1D5BF: 'f',
+    0x1D5C0: 'g',
+    0x1D5C1: 'h',
+    0x1D5C2: 'i',
+    0x1D5C3: 'j',
+    0x1D5C4: 'k',
+    0x1D5C5: 'l',
+    0x1D5C6: 'm',
+    0x1D5C7: 'n',
+    0x1D5C8: 'o',
+    0x1D5C9: 'p',
+    0x1D5CA: 'q',
+    0x1D5CB: 'r',
+    0x1D5CC: 's',
+    0x1D5CD: 't',
+    0x1D5CE: 'u',
+    0x1D5CF: 'v',
+    0x1D5D0: 'w',
+    0x1D5D1: 'x',
+    0x1D5D2: 'y',
+    0x1D5D3: 'z',
+    0x1D5D4: 'a',
+    0x1D5D5: 'b',
+    0x1D5D6: 'c',
+    0x1D5D7: 'd',
+    0x1D5D8: 'e',
+    0x1D5D9: 'f',
+    0x1D5DA: 'g',
+    0x1D5DB: 'h',
+    0x1D5DC: 'i',
+    0x1D5DD: 'j',
+    0x1D5DE: 'k',
+    0x1D5DF: 'l',
+    0x1D5E0: 'm',
+    0x1D5E1: 'n',
+    0x1D5E2: 'o',
+    0x1D5E3: 'p',
+    0x1D5E4: 'q',
+    0x1D5E5: 'r',
+    0x1D5E6: 's',
+    0x1D5E7: 't',
+    0x1D5E8: 'u',
+    0x1D5E9: 'v',
+    0x1D5EA: 'w',
+    0x1D5EB: 'x',
+    0x1D5EC: 'y',
+    0x1D5ED: 'z',
+    0x1D5EE: 'a',
+    0x1D5EF: 'b',
+    0x1D5F0: 'c',
+    0x1D5F1: 'd',
+    0x1D5F2: 'e',
+    0x1D5F3: 'f',
+    0x1D5F4: 'g',
+    0x1D5F5: 'h',
+    0x1D5F6: 'i',
+    0x1D5F7: 'j',
+    0x1D5F8: 'k',
+    0x1D5F9: 'l',
+    0x1D5FA: 'm',
+    0x1D5FB: 'n',
+    0x1D5FC: 'o',
+    0x1D5FD: 'p',
+    0x1D5FE: 'q',
+    0x1D5FF: 'r',
+    0x1D600: 's',
+    0x1D601: 't',
+    0x1D602: 'u',
+    0x1D603: 'v',
+    0x1D604: 'w',
+    0x1D605: 'x',
+    0x1D606: 'y',
+    0x1D607: 'z',
+    0x1D608: 'a',
+    0x1D609: 'b',
+    0x1D60A: 'c',
+    0x1D60B: 'd',
+    0x1D60C: 'e',
+    0x1D60D: 'f',
+    0x1D60E: 'g',
+    0x1D60F: 'h',
+    0x1D610: 'i',
+    0x1D611: 'j',
+    0x1D612: 'k',
+    0x1D613: 'l',
+    0x1D614: 'm',
+    0x1D615: 'n',
+    0x1D616: 'o',
+    0x1D617: 'p',
+    0x1D618: 'q',
+    0x1D619: 'r',
+    0x1D61A: 's',
+    0x1D61B: 't',
+    0x1D61C: 'u',
+    0x1D61D: 'v',
+    0x1D61E: 'w',
+    0x1D61F: 'x',
+    0x1D620: 'y',
+    0x1D621: 'z',
+    0x1D622: 'a',
+    0x1D623: 'b',
+    0x1D624: 'c',
+    0x1D625: 'd',
+    0x1D626: 'e',
+    0x1D627: 'f',
+    0x1D628: 'g',
+    0x1D629: 'h',
+    0x1D62A: 'i',
+    0x1D62B: 'j',
+    0x1D62C: 'k',
+    0x1D62D: 'l',
+    0x1D62E: 'm',
+    0x1D62F: 'n',
+    0x1D630: 'o',
+    0x1D631: 'p',
+    0x1D632: 'q',
+    0x1D633: 'r',
+    0x1D634: 's',
+    0x1D635: 't',
+    0x1D636: 'u',
+    0x1D637: 'v',
+    0x1D638: 'w',
+    0x1D639: 'x',
+    0x1D63A: 'y',
+    0x1D63B: 'z',
+    0x1D63C: 'a',
+    0x1D63D: 'b',
+    0x1D63E: 'c',
+    0x1D63F: 'd',
+    0x1D640: 'e',
+    0x1D641: 'f',
+    0x1D642: 'g',
+    0x1D643: 'h',
+    0x1D644: 'i',
+    0x1D645: 'j',
+    0x1D646: 'k',
+    0x1D647: 'l',
+    0x1D648: 'm',
+    0x1D649: 'n',
+    0x1D64A: 'o',
+    0x1D64B: 'p',
+    0x1D64C: 'q',
+    0x1D64D: 'r',
+    0x1D64E: 's',
+    0x1D64F: 't',
+    0x1D650: 'u',
+    0x1D651: 'v',
+    0x1D652: 'w',
+    0x1D653: 'x',
+    0x1D654: 'y',
+    0x1D655: 'z',
+    0x1D656: 'a',
+    0x1D657: 'b',
+    0x1D658: 'c',
+    0x1D659: 'd',
+    0x1D65A: 'e',
+    0x1D65B: 'f',
+    0x1D65C: 'g',
+    0x1D65D: 'h',
+    0x1D65E: 'i',
+    0x1D65F: 'j',
+    0x1D660: 'k',
+    0x1D661: 'l',
+    0x1D662: 'm',
+    0x1D663: 'n',
+    0x1D664: 'o',
+    0x1D665: 'p',
+    0x1D666: 'q',
+    0x1D667: 'r',
+    0x1D668: 's',
+    0x1D669: 't',
+    0x1D66A: 'u',
+    0x1D66B: 'v',
+    0x1D66C: 'w',
+    0x1D66D: 'x',
+    0x1D66E: 'y',
+    0x1D66F: 'z',
+    0x1D670: 'a',
+    0x1D671: 'b',
+    0x1D672: 'c',
+    0x1D673: 'd',
+    0x1D674: 'e',
+    0x1D675: 'f',
+    0x1D676: 'g',
+    0x1D677: 'h',
+    0x1D678: 'i',
+    0x1D679: 'j',
+    0x1D67A: 'k',
+    0x1D67B: 'l',
+    0x1D67C: 'm',
+    0x1D67D: 'n',
+    0x1D67E: 'o',
+    0x1D67F: 'p',
+    0x1D680: 'q',
+    0x1D681: 'r',
+    0x1D682: 's',
+    0x1D683: 't',
+    0x1D684: 'u',
+    0x1D685: 'v',
+    0x1D686: 'w',
+    0x1D687: 'x',
+    0x1D688: 'y',
+    0x1D689: 'z',
+    0x1D68A: 'a',
+    0x1D68B: 'b',
+    0x1D68C: 'c',
+    0x1D68D: 'd',
+    0x1D68E: 'e',
+    0x1D68F: 'f',
+    0x1D690: 'g',
+    0x1D691: 'h',
+    0x1D692: 'i',
+    0x1D693: 'j',
+    0x1D694: 'k',
+    0x1D695: 'l',
+    0x1D696: 'm',
+    0x1D697: 'n',
+    0x1D698: 'o',
+    0x1D699: 'p',
+    0x1D69A: 'q',
+    0x1D69B: 'r',
+    0x1D69C: 's',
+    0x1D69D: 't',
+    0x1D69E: 'u',
+    0x1D69F: 'v',
+    0x1D6A0: 'w',
+    0x1D6A1: 'x',
+    0x1D6A2: 'y',
+    0x1D6A3: 'z',
+    0x1D7CE: 'o',
+    0x1D7CF: 'l',
+    0x1D7D0: '2',
+    0x1D7D1: '3',
+    0x1D7D2: '4',
+    0x1D7D3: '5',
+    0x1D7D4: '6',
+    0x1D7D5: '7',
+    0x1D7D6: '8',
+    0x1D7D7: '9',
+    0x1D7D8: 'o',
+    0x1D7D9: 'l',
+    0x1D7DA: '2',
+    0x1D7DB: '3',
+    0x1D7DC: '4',
+    0x1D7DD: '5',
+    0x1D7DE: '6',
+    0x1D7DF: '7',
+    0x1D7E0: '8',
+    0x1D7E1: '9',
+    0x1D7E2: 'o',
+    0x1D7E3: 'l',
+    0x1D7E4: '2',
+    0x1D7E5: '3',
+    0x1D7E6: '4',
+    0x1D7E7: '5',
+    0x1D7E8: '6',
+    0x1D7E9: '7',
+    0x1D7EA: '8',
+    0x1D7EB: '9',
+    0x1D7EC: 'o',
+    0x1D7ED: 'l',
+    0x1D7EE: '2',
+    0x1D7EF: '3',
+    0x1D7F0: '4',
+    0x1D7F1: '5',
+    0x1D7F2: '6',
+    0x1D7F3: '7',
+    0x1D7F4: '8',
+    0x1D7F5: '9',
+    0x1D7F6: 'o',
+    0x1D7F7: 'l',
+    0x1D7F8: '2',
+    0x1D7F9: '3',
+    0x1D7FA: '4',
+    0x1D7FB: '5',
+    0x1D7FC: '6',
+    0x1D7FD: '7',
+    0x1D7FE: '8',
+    0x1D7FF: '9',
+    0x1F12B: 'c',
+    0x1F12C: 'r',
+    0x1F12D: 'cd',
+    0x1F12E: 'wz',
+    0x1F130: 'a',
+    0x1F131: 'b',
+    0x1F132: 'c',
+    0x1F133: 'd',
+    0x1F134: 'e',
+    0x1F135: 'f',
+    0x1F136: 'g',
+    0x1F137: 'h',
+    0x1F138: 'i',
+    0x1F139: 'j',
+    0x1F13A: 'k',
+    0x1F13B: 'l',
+    0x1F13C: 'm',
+    0x1F13D: 'n',
+    0x1F13E: 'o',
+    0x1F13F: 'p',
+    0x1F140: 'q',
+    0x1F141: 'r',
+    0x1F142: 's',
+    0x1F143: 't',
+    0x1F144: 'u',
+    0x1F145: 'v',
+    0x1F146: 'w',
+    0x1F147: 'x',
+    0x1F148: 'y',
+    0x1F149: 'z',
+    0x1F14A: 'hv',
+    0x1F14B: 'mv',
+    0x1F14C: 'sd',
+    0x1F14D: 'ss',
+    0x1F14E: 'ppv',
+    0x1F14F: 'wc',
+    0x1F16A: 'mc',
+    0x1F16B: 'md',
+    0x1F16C: 'mr',
+    0x1F190: 'dj',
+    0x1FBF0: 'o',
+    0x1FBF1: 'l',
+    0x1FBF2: '2',
+    0x1FBF3: '3',
+    0x1FBF4: '4',
+    0x1FBF5: '5',
+    0x1FBF6: '6',
+    0x1FBF7: '7',
+    0x1FBF8: '8',
+    0x1FBF9: '9',
+}
@@ -0,0 +1,52 @@
+"""
+🔤 Normalización Unicode y esqueletos de caracteres confundibles
+================================================================
+
+Dos textos pueden verse idénticos y ser distintos para el ordenador:
+
+    "paypal" (latín)  vs  "pаypal" (con 'а' cirílica)
+    "Ana"             vs  "Ａｎａ" (ancho completo)
+
+• normalizar(texto): NFKC, la forma que debe guardarse y compararse
+• esqueleto(texto): forma "visual" (UTS #39): dos textos con el mismo
+  esqueleto se confunden a simple vista -> útil para detectar
+  suplantación de nombres de usuario
+
+ValidadorSeguro (examples/02_input_validation.py) usa ambas: normaliza
+los campos de texto y rechaza los que imitan un nombre reservado.
+
+El esqueleto usa TABLA_ESQUELETO, precalculada por
+modules/generar_tablas_unicode.py, y se aplica con un único str.translate.
+Ambas funciones tienen un atajo para ASCII, el caso más frecuente.
+"""
+
+import unicodedata
+
+from modules.tablas_unicode import TABLA_ESQUELETO
+
+# Atajo ASCII: las entradas ASCII -> ASCII de la tabla como tabla de bytes,
+# bytes.translate es varias veces más rápido que str.translate con un dict
+_ASCII = {codigo: destino for codigo, destino in TABLA_ESQUELETO.items()
+          if codigo < 0x80 and len(destino) == 1 and destino.isascii()}
+TABLA_ESQUELETO_ASCII = bytes.maketrans(bytes(_ASCII), "".join(_ASCII.values()).encode("ascii"))
+
+def normalizar(texto: str) -> str:
+    """Normaliza a NFKC (sin copiar si ya está normalizado)"""
+    if texto.isascii() or unicodedata.is_normalized("NFKC", texto):
+        return texto
+    return unicodedata.normalize("NFKC", texto)
+
+def esqueleto(texto: str) -> str:
+    """Forma visual del texto: igual esqueleto = confundibles a simple vista"""
+    if texto.isascii():
+        return texto.lower().encode("ascii").translate(TABLA_ESQUELETO_ASCII).decode("ascii")
+
+    texto = unicodedata.normalize("NFD", texto.casefold()).translate(TABLA_ESQUELETO)
+    # Los reemplazos ya están en NFD, pero pueden quedar marcas mal ordenadas
+    if not unicodedata.is_normalized("NFD", texto):
+        texto = unicodedata.normalize("NFD", texto)
+    return texto
+
+def son_confundibles(a: str, b: str) -> bool:
+    """True si a y b se ven igual aunque sean cadenas distintas"""
+    return esqueleto(a) == esqueleto(b)
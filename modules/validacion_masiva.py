@@ -0,0 +1,302 @@
+"""
+📦 Validación masiva de registros (CSV / JSONL)
+===============================================
+
+Valida archivos de altas con millones de filas usando ValidadorSeguro,
+sin cargar el archivo en memoria:
+
+• Las filas se leen de forma perezosa y se procesan en lotes
+• Cada lote se valida columna por columna (un validador por columna)
+• Opcionalmente, los lotes se reparten en un pool de procesos
+• El resultado es un flujo de filas limpias + un reporte compacto de errores
+
+Uso:
+    python -m modules.validacion_masiva altas.csv --salida limpias.jsonl --procesos 4
+"""
+
+import argparse
+import csv
+import json
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from modules import cargar_ejemplo
+
+ValidadorSeguro = cargar_ejemplo("02_input_validation").ValidadorSeguro
+
+# Esquema por defecto: el mismo formulario de registro del Módulo 2
+ESQUEMA_REGISTRO = {
+    "nombre": {"validador": "texto", "requerido": True, "max_length": 50, "reservados": True},
+    "email": {"validador": "email", "requerido": True},
+    "edad": {"validador": "edad", "requerido": False},
+    "website": {"validador": "url", "requerido": False},
+    "comentario": {"validador": "texto", "requerido": False, "max_length": 500},
+}
+
+# Nombre corto del validador -> método de ValidadorSeguro
+METODOS_VALIDACION = {
+    "email": "validar_email",
+    "edad": "validar_edad",
+    "url": "validar_url",
+    "texto": "validar_campo_texto",
+}
+
+TAMANO_LOTE = 5000
+MAX_MUESTRAS_ERROR = 5
+MAX_BYTES_LINEA = 1024 * 1024  # Una línea más larga se descarta sin cargarla entera
+
+def _lineas_acotadas(f, max_bytes: int, defectuosas: List[str]) -> Iterator[str]:
+    """Líneas de un archivo binario como texto, sin leer nunca más de max_bytes de golpe
+
+    Una línea demasiado larga o con UTF-8 inválido se anota en
+    `defectuosas` y en su lugar sale una línea vacía.
+    """
+    while True:
+        linea = f.readline(max_bytes + 1)
+        if not linea:
+            return
+        if len(linea) > max_bytes and not linea.endswith(b"\n"):
+            # Saltar el resto de la línea por trozos
+            while True:
+                resto = f.readline(max_bytes)
+                if not resto or resto.endswith(b"\n"):
+                    break
+            defectuosas.append(f"Línea de más de {max_bytes} bytes")
+            yield "\n"
+            continue
+        try:
+            yield linea.decode("utf-8")
+        except UnicodeDecodeError:
+            defectuosas.append("Línea con UTF-8 inválido")
+            yield "\n"
+
+def leer_filas(ruta: Path, max_bytes_linea: int = MAX_BYTES_LINEA) -> Iterator[Dict[str, Any]]:
+    """Lee un CSV o JSONL fila a fila (nunca el archivo completo)
+
+    Una fila corrupta (JSON o CSV inválido, UTF-8 inválido, línea de más
+    de max_bytes_linea) sale como {"__invalida__": motivo} y el proceso
+    sigue con la siguiente.
+    """
+    ruta = Path(ruta)
+    defectuosas: List[str] = []
+
+    with open(ruta, "rb") as f:
+        lineas = _lineas_acotadas(f, max_bytes_linea, defectuosas)
+
+        if ruta.suffix.lower() == ".csv":
+            lector = csv.DictReader(lineas)
+            while True:
+                try:
+                    fila = next(lector)
+                except StopIteration:
+                    break
+                except csv.Error as e:
+                    fila = {"__invalida__": f"CSV inválido: {e}"}
+                while defectuosas:
+                    yield {"__invalida__": defectuosas.pop(0)}
+                yield fila
+            while defectuosas:
+                yield {"__invalida__": defectuosas.pop(0)}
+            return
+
+        for linea in lineas:
+            if defectuosas:
+                yield {"__invalida__": defectuosas.pop()}
+                continue
+            linea = linea.strip()
+            if not linea:
+                continue
+            try:
+                fila = json.loads(linea)
+            except (ValueError, RecursionError):  # RecursionError: "[[[[..." muy anidado
+                fila = None
+            # Una línea corrupta no debe detener el proceso completo
+            yield fila if isinstance(fila, dict) else {"__invalida__": "Línea JSON inválida"}
+
+def en_lotes(filas: Iterable[Dict[str, Any]], tamano: int) -> Iterator[List[Dict[str, Any]]]:
+    """Agrupa un iterable en listas de `tamano` elementos"""
+    iterador = iter(filas)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+# Un validador por proceso: se crea la primera vez que se necesita
+_validador_proceso: Optional[ValidadorSeguro] = None
+
+def validar_lote(lote: List[Dict[str, Any]], esquema: Dict[str, Dict[str, Any]],
+                 ) -> Tuple[List[Optional[Dict[str, Any]]], List[Tuple[int, str, str]]]:
+    """Valida un lote columna por columna
+
+    Devuelve una lista paralela al lote con la fila limpia (o None si tiene
+    errores) y la lista de errores como (índice en el lote, columna, mensaje).
+    """
+    global _validador_proceso
+    if _validador_proceso is None:
+        _validador_proceso = ValidadorSeguro()
+
+    limpias: List[Optional[Dict[str, Any]]] = [{} for _ in lote]
+    errores: List[Tuple[int, str, str]] = []
+
+    for i, fila in enumerate(lote):
+        if "__invalida__" in fila:
+            motivo = fila["__invalida__"]
+            errores.append((i, "__fila__", motivo if isinstance(motivo, str) else "Línea JSON inválida"))
+            limpias[i] = None
+
+    for columna, regla in esquema.items():
+        metodo = getattr(_validador_proceso, METODOS_VALIDACION[regla["validador"]])
+        extra = {opcion: regla[opcion] for opcion in ("max_length", "reservados") if opcion in regla}
+        requerido = regla.get("requerido", False)
+
+        for i, fila in enumerate(lote):
+            if limpias[i] is None and "__invalida__" in fila:
+                continue
+
+            valor = fila.get(columna)
+            if valor is None or valor == "":
+                if requerido:
+                    errores.append((i, columna, f"{columna.capitalize()} es requerido"))
+                    limpias[i] = None
+                continue
+
+            valido, resultado = metodo(valor, **extra)
+            if not valido:
+                errores.append((i, columna, resultado))
+                limpias[i] = None
+            elif limpias[i] is not None:
+                limpias[i][columna] = resultado
+
+    return limpias, errores
+
+def _validar_lote_numerado(args):
+    """Adaptador para el pool de procesos (recibe una tupla picklable)"""
+    inicio, lote, esquema = args
+    return inicio, validar_lote(lote, esquema)
+
+class ReporteErrores:
+    """Reporte de errores compacto y de tamaño acotado
+
+    Guarda contadores por (columna, mensaje) y solo unas pocas filas de
+    ejemplo por cada combinación, así ocupa lo mismo con 10 errores que
+    con 10 millones.
+    """
+
+    def __init__(self, max_muestras: int = MAX_MUESTRAS_ERROR):
+        self.max_muestras = max_muestras
+        self.filas_totales = 0
+        self.filas_validas = 0
+        self.por_columna: Counter = Counter()
+        self.por_error: Counter = Counter()
+        self.muestras: Dict[Tuple[str, str], List[int]] = {}
+
+    def registrar_lote(self, inicio: int, tamano: int, validas: int,
+                       errores: List[Tuple[int, str, str]]):
+        """Acumula el resultado de un lote que empieza en la fila `inicio`"""
+        self.filas_totales += tamano
+        self.filas_validas += validas
+
+        for indice, columna, mensaje in errores:
+            clave = (columna, mensaje)
+            self.por_columna[columna] += 1
+            self.por_error[clave] += 1
+            muestras = self.muestras.setdefault(clave, [])
+            if len(muestras) < self.max_muestras:
+                muestras.append(inicio + indice + 1)  # Filas numeradas desde 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte el reporte a un dict serializable como JSON"""
+        return {
+            "filas_totales": self.filas_totales,
+            "filas_validas": self.filas_validas,
+            "filas_invalidas": self.filas_totales - self.filas_validas,
+            "errores_por_columna": dict(self.por_columna),
+            "errores": [
+                {"columna": columna, "mensaje": mensaje, "total": total,
+                 "filas_ejemplo": self.muestras[(columna, mensaje)]}
+                for (columna, mensaje), total in self.por_error.most_common()
+            ],
+        }
+
+class ValidadorMasivo:
+    """Valida archivos grandes en streaming con ValidadorSeguro"""
+
+    def __init__(self, esquema: Optional[Dict[str, Dict[str, Any]]] = None,
+                 tamano_lote: int = TAMANO_LOTE, procesos: int = 0):
+        self.esquema = esquema or ESQUEMA_REGISTRO
+        self.tamano_lote = tamano_lote
+        self.procesos = procesos
+        self.reporte = ReporteErrores()
+
+        for columna, regla in self.esquema.items():
+            if regla.get("validador") not in METODOS_VALIDACION:
+                raise ValueError(f"Validador desconocido para '{columna}': {regla.get('validador')}")
+
+    def _lotes_numerados(self, filas: Iterable[Dict[str, Any]]):
+        inicio = 0
+        for lote in en_lotes(filas, self.tamano_lote):
+            yield inicio, lote, self.esquema
+            inicio += len(lote)
+
+    def _resultados(self, filas: Iterable[Dict[str, Any]]):
+        """Resultados por lote, en orden, en el proceso actual o en un pool"""
+        lotes = self._lotes_numerados(filas)
+
+        if self.procesos <= 1:
+            for tarea in lotes:
+                yield _validar_lote_numerado(tarea)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.procesos) as pool:
+            # Como mucho 2 lotes en vuelo por proceso: memoria constante
+            pendientes = []
+            for tarea in lotes:
+                pendientes.append(pool.submit(_validar_lote_numerado, tarea))
+                if len(pendientes) >= self.procesos * 2:
+                    yield pendientes.pop(0).result()
+            for futuro in pendientes:
+                yield futuro.result()
+
+    def procesar(self, filas: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Devuelve un flujo de filas limpias; los errores van a self.reporte"""
+        for inicio, (limpias, errores) in self._resultados(filas):
+            validas = [fila for fila in limpias if fila is not None]
+            self.reporte.registrar_lote(inicio, len(limpias), len(validas), errores)
+            yield from validas
+
+    def procesar_archivo(self, ruta: Path) -> Iterator[Dict[str, Any]]:
+        """Igual que procesar(), leyendo un archivo CSV o JSONL"""
+        return self.procesar(leer_filas(ruta))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validación masiva de altas (CSV/JSONL)")
+    parser.add_argument("entrada", type=Path, help="Archivo .csv o .jsonl")
+    parser.add_argument("--salida", type=Path, help="Archivo JSONL para las filas limpias (por defecto stdout)")
+    parser.add_argument("--reporte", type=Path, help="Archivo JSON para el reporte de errores")
+    parser.add_argument("--procesos", type=int, default=0, help="Procesos en paralelo (0 = sin pool)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por lote")
+    args = parser.parse_args(argv)
+
+    validador = ValidadorMasivo(tamano_lote=args.lote, procesos=args.procesos)
+    salida = open(args.salida, "w", encoding="utf-8") if args.salida else sys.stdout
+    try:
+        for fila in validador.procesar_archivo(args.entrada):
+            salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+    reporte = json.dumps(validador.reporte.to_dict(), ensure_ascii=False, indent=2)
+    if args.reporte:
+        args.reporte.write_text(reporte, encoding="utf-8")
+    else:
+        print(reporte, file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Configuración común de los tests: la raíz del proyecto en sys.path"""
+
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
@@ -0,0 +1,29 @@
+import pytest
+
+from modules import cargar_ejemplo
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+
+@pytest.mark.parametrize("ip, esperada", [
+    ("203.0.113.7", "203.0.113.0/24"),
+    ("::ffff:203.0.113.7", "203.0.113.0/24"),
+    ("2001:db8::1", "2001:db8::/64"),
+    ("a.b.c.d", None),
+    ("1.2.3", None),
+    ("", None),
+])
+def test_subred(ip, esperada):
+    assert registro_seguridad.subred(ip) == esperada
+
+def test_ipv4_mapeada_cuenta_en_su_subred_ipv4():
+    detector = registro_seguridad.AttackDetector(umbral_usuarios_subred=4)
+    alertas = []
+    for i, ip in enumerate(["203.0.113.1", "::ffff:203.0.113.2", "203.0.113.3", "::ffff:203.0.113.4"]):
+        alertas = detector.analyze_login_pattern(f"usuario{i}", ip, False, 1000.0 + i)
+    assert any("Subred 203.0.113.0/24" in alerta and "usuarios distintos" in alerta for alerta in alertas)
+
+def test_ip_invalida_no_cuenta_como_subred():
+    detector = registro_seguridad.AttackDetector(umbral_usuarios_subred=2)
+    for i in range(5):
+        alertas = detector.analyze_login_pattern(f"usuario{i}", "a.b.c.d", False, 1000.0 + i)
+        assert not any("Subred" in alerta for alerta in alertas)
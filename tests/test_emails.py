@@ -0,0 +1,40 @@
+import pytest
+
+from modules.emails import CanonicalizadorEmail, IndiceEmails
+
+# Un dominio propio que también ignora los puntos
+REGLAS = {"empresa.es": {"separador_etiqueta": "+", "quitar_puntos": True}}
+
+EMAILS = [f"usuario.{i}@empresa.es" for i in range(200)] + ["Ana.Garcia+promo@gmail.com"]
+
+@pytest.mark.parametrize("procesos", [0, 2])
+def test_construir_usa_el_canonicalizador_del_indice(procesos):
+    canonicalizador = CanonicalizadorEmail(reglas=REGLAS)
+    indice = IndiceEmails.construir(EMAILS, procesos=procesos, canonicalizador=canonicalizador)
+    assert len(indice) == 201
+    assert indice.ya_registrado("usuario7+x@empresa.es")
+    assert not indice.ya_registrado("anagarcia@gmail.com")  # REGLAS no incluye gmail.com
+
+def test_guardar_y_cargar_conserva_reglas_y_huellas(tmp_path):
+    indice = IndiceEmails.construir(EMAILS, canonicalizador=CanonicalizadorEmail(reglas=REGLAS))
+    indice.guardar(tmp_path / "indice.bin")
+
+    cargado = IndiceEmails.cargar(tmp_path / "indice.bin")
+    assert len(cargado) == len(indice)
+    assert cargado.canonicalizador.reglas == REGLAS
+    assert all(cargado.ya_registrado(email) for email in EMAILS)
+    assert cargado.ya_registrado("u.s.u.a.r.i.o.42@empresa.es")
+    assert not cargado.ya_registrado("otro@empresa.es")
+
+def test_cargar_rechaza_otros_archivos(tmp_path):
+    (tmp_path / "x.bin").write_bytes(b"no es un indice")
+    with pytest.raises(ValueError):
+        IndiceEmails.cargar(tmp_path / "x.bin")
+
+def test_cargar_rechaza_indices_sin_reglas(tmp_path):
+    indice = IndiceEmails.construir(EMAILS[:10])
+    indice.guardar(tmp_path / "indice.bin")
+    datos = (tmp_path / "indice.bin").read_bytes()
+    (tmp_path / "indice.bin").write_bytes(b"TSBIDX01" + datos[8:])
+    with pytest.raises(ValueError):
+        IndiceEmails.cargar(tmp_path / "indice.bin")
@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from modules import cargar_ejemplo
+from modules.instantaneas_detector import escribir_instantanea, leer_instantanea
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+
+def _copiar(estructura, nueva):
+    """Vuelca `estructura` y la carga en `nueva` (recién creada con los mismos parámetros)"""
+    escritor = registro_seguridad._EscritorEstado()
+    estructura.volcar_estado(escritor)
+    lector = registro_seguridad._LectorEstado(escritor.a_bytes())
+    nueva.cargar_estado(lector)
+    assert lector.terminado
+    return nueva
+
+def _eventos(n, semilla=1):
+    aleatorio = random.Random(semilla)
+    for i in range(n):
+        yield (f"usuario{aleatorio.randrange(30)}", f"10.{aleatorio.randrange(3)}.{aleatorio.randrange(4)}.{i % 9}",
+               aleatorio.random() < 0.2, 1000.0 + i * 0.5)
+
+def test_contador_ventana():
+    contador = registro_seguridad.ContadorVentana(60, 5)
+    for i in range(200):
+        contador.incrementar(f"ip{i % 7}", 1000.0 + i, 1 + i % 3)
+    copia = _copiar(contador, registro_seguridad.ContadorVentana(60, 5))
+    for i in range(7):
+        assert copia.contar(f"ip{i}", 1200.0) == contador.contar(f"ip{i}", 1200.0)
+        assert copia.incrementar(f"ip{i}", 1210.0) == contador.incrementar(f"ip{i}", 1210.0)
+
+def test_contador_aproximado_y_top_k():
+    sketch = registro_seguridad.ContadorVentanaAproximado(60, ancho=256, filas=3)
+    top = registro_seguridad.TopKFrecuentes(5)
+    for i in range(500):
+        clave = f"ip{(i * i) % 23}"
+        sketch.incrementar(clave, 1000.0 + i * 0.2)
+        top.agregar(clave)
+    copia = _copiar(sketch, registro_seguridad.ContadorVentanaAproximado(60, ancho=256, filas=3))
+    copia_top = _copiar(top, registro_seguridad.TopKFrecuentes(5))
+    for i in range(23):
+        assert copia.contar(f"ip{i}", 1100.0) == sketch.contar(f"ip{i}", 1100.0)
+    assert copia_top.mas_frecuentes(5) == top.mas_frecuentes(5)
+
+def test_cardinalidad_ventana():
+    cardinalidad = registro_seguridad.CardinalidadVentana(60, precision=8)
+    for i in range(3000):
+        cardinalidad.agregar(f"ip{i % 4}", f"usuario{i}", 1000.0 + i * 0.05)
+    copia = _copiar(cardinalidad, registro_seguridad.CardinalidadVentana(60, precision=8))
+    for i in range(4):
+        assert copia.agregar(f"ip{i}", "otro", 1160.0) == cardinalidad.agregar(f"ip{i}", "otro", 1160.0)
+
+def test_trie_prefijos():
+    umbrales = {4: {16: 50, 24: 10}, 6: {48: 50, 64: 10}}
+    trie = registro_seguridad.TriePrefijos(umbrales, 60, 5)
+    for i in range(300):
+        trie.registrar(f"10.{i % 2}.{i % 5}.{i % 250}", 1000.0 + i * 0.1)
+        trie.registrar(f"2001:db8:{i % 3}::{i:x}", 1000.0 + i * 0.1)
+    copia = _copiar(trie, registro_seguridad.TriePrefijos(umbrales, 60, 5))
+    for subred in ("10.0.0.0/16", "10.1.3.0/24", "2001:db8:1::/48", "2001:db8:2::/64"):
+        assert copia.contar(subred, 1030.0) == trie.contar(subred, 1030.0)
+    assert copia.registrar("10.1.3.7", 1031.0) == trie.registrar("10.1.3.7", 1031.0)
+
+@pytest.mark.parametrize("modo", ["exacto", "probabilistico"])
+def test_detector_continua_igual_tras_restaurar(tmp_path, modo):
+    opciones = {"modo": modo, "ancho_sketch": 1024} if modo == "probabilistico" else {"modo": modo}
+    detector = registro_seguridad.AttackDetector(**opciones)
+    eventos = list(_eventos(400))
+    for username, ip, success, ts in eventos[:200]:
+        detector.analyze_login_pattern(username, ip, success, ts)
+
+    escribir_instantanea(tmp_path / "detector.snap", detector.volcar_estado(), {"offset": 123})
+    metadatos, estado = leer_instantanea(tmp_path / "detector.snap")
+    assert metadatos == {"offset": 123}
+    restaurado = registro_seguridad.AttackDetector(**opciones)
+    restaurado.cargar_estado(estado)
+
+    for username, ip, success, ts in eventos[200:]:
+        assert (restaurado.analyze_login_pattern(username, ip, success, ts)
+                == detector.analyze_login_pattern(username, ip, success, ts))
+    assert restaurado.worst_offenders(5, 1200.0) == detector.worst_offenders(5, 1200.0)
+
+def test_instantanea_danada(tmp_path):
+    ruta = tmp_path / "detector.snap"
+    escribir_instantanea(ruta, registro_seguridad.AttackDetector().volcar_estado(), {})
+    datos = bytearray(ruta.read_bytes())
+    datos[-1] ^= 0xFF
+    ruta.write_bytes(bytes(datos))
+    with pytest.raises(ValueError):
+        leer_instantanea(ruta)
+
+def test_estado_con_otra_configuracion():
+    estado = registro_seguridad.AttackDetector(ventana=300).volcar_estado()
+    with pytest.raises(ValueError):
+        registro_seguridad.AttackDetector(ventana=600).cargar_estado(estado)
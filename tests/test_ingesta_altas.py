@@ -0,0 +1,17 @@
+from modules.ingesta_altas import ESQUEMA_REGISTRO, PipelineAltas, validar_altas
+
+def _fila(i, password):
+    return {"nombre": f"Usuario {i}", "email": f"usuario{i}@example.com", "password": password}
+
+def test_password_con_nul_es_error_de_fila():
+    lote = [_fila(0, "correcta1!"), _fila(1, "con\x00nul"), _fila(2, "x" * 73)]
+    _, tamano, registros, errores = validar_altas(0, lote, ESQUEMA_REGISTRO, "password")
+    assert tamano == 3
+    assert [limpia["email"] for limpia, _ in registros] == ["usuario0@example.com"]
+    assert sorted(i for i, campo, _ in errores if campo == "password") == [1, 2]
+
+def test_pipeline_sigue_tras_password_con_nul():
+    filas = [_fila(i, "con\x00nul" if i == 3 else f"clave{i}!") for i in range(10)]
+    pipeline = PipelineAltas(procesos_validacion=0, procesos_hash=0, tamano_lote=4, rondas_bcrypt=4)
+    pipeline.ejecutar(filas)
+    assert pipeline.insertados == 9
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+from modules.integridad_logs import (cargar_clave_privada, cargar_clave_publica, generar_claves,
+                                     prueba_inclusion, verificar_inclusion, verificar_log)
+from modules.integridad_logs import registro_seguridad
+
+@pytest.fixture
+def claves(tmp_path):
+    generar_claves(tmp_path / "log.key", tmp_path / "log.pub")
+    return cargar_clave_privada(tmp_path / "log.key"), cargar_clave_publica(tmp_path / "log.pub")
+
+def _logger(ruta, clave, **opciones):
+    return registro_seguridad.SecurityLogger(str(ruta), formato="jsonl", clave_integridad=clave, **opciones)
+
+def _errores(resultados):
+    return [error for resultado in resultados for error in resultado["errores"]]
+
+def test_log_intacto_y_manipulado(tmp_path, claves):
+    privada, publica = claves
+    ruta = tmp_path / "security.log"
+    with _logger(ruta, privada, max_bytes=0, lote_integridad=16) as registro:
+        for i in range(100):
+            registro.log_login_attempt(f"usuario{i % 7}", i % 3 != 0, f"10.0.0.{i % 50}")
+
+    resultados = verificar_log(ruta, publica)
+    assert not _errores(resultados)
+    assert sum(r["entradas"] for r in resultados) == 100
+
+    lineas = ruta.read_bytes().split(b"\n")
+    lineas[20] = lineas[20].replace(b"usuario", b"usuarix", 1)
+    ruta.write_bytes(b"\n".join(lineas))
+    errores = _errores(verificar_log(ruta, publica))
+    assert errores and errores[0][0] <= 21 <= errores[0][1]
+
+def test_borrar_una_linea_rompe_la_cadena(tmp_path, claves):
+    privada, publica = claves
+    ruta = tmp_path / "security.log"
+    with _logger(ruta, privada, max_bytes=0, lote_integridad=16) as registro:
+        for i in range(40):
+            registro.log_data_access(f"usuario{i}", "pii", "read")
+    lineas = ruta.read_bytes().split(b"\n")
+    del lineas[3]
+    ruta.write_bytes(b"\n".join(lineas))
+    assert _errores(verificar_log(ruta, publica))
+
+def test_rotacion_cuenta_el_checkpoint_y_la_cadena_sigue(tmp_path, claves):
+    privada, publica = claves
+    ruta = tmp_path / "security.log"
+    max_bytes = 4096
+    with _logger(ruta, privada, max_bytes=max_bytes, backup_count=50, lote_integridad=1000) as registro:
+        for i in range(200):
+            registro.log_login_attempt(f"usuario{i}", False, "203.0.113.9")
+
+    segmentos = registro_seguridad.listar_segmentos(ruta)
+    assert len(segmentos) > 3
+    assert all(len(registro_seguridad.leer_segmento(s)) <= max_bytes for s in segmentos)
+    resultados = verificar_log(ruta, publica)
+    assert not _errores(resultados)
+    assert sum(r["entradas"] for r in resultados) == 200
+
+def test_lote_vencido_se_sella_sin_nuevas_escrituras(tmp_path, claves):
+    privada, publica = claves
+    ruta = tmp_path / "security.log"
+    with _logger(ruta, privada, max_bytes=0, intervalo_integridad=0.1) as registro:
+        registro.log_config_change("admin", "max_intentos", "5", "3")
+        limite = time.monotonic() + 5
+        while b"INTEGRITY_CHECKPOINT" not in ruta.read_bytes() and time.monotonic() < limite:
+            time.sleep(0.05)
+        # Sellado por el hilo, antes de cerrar
+        resultado, = verificar_log(ruta, publica)
+        assert resultado["lotes"] == 1 and resultado["sin_sellar"] == 0
+
+def test_prueba_de_inclusion(tmp_path, claves):
+    privada, publica = claves
+    ruta = tmp_path / "security.log"
+    with _logger(ruta, privada, max_bytes=0, lote_integridad=8) as registro:
+        for i in range(20):
+            registro.log_data_access(f"usuario{i}", "pii", "read")
+    prueba = prueba_inclusion(ruta, 5)
+    assert verificar_inclusion(prueba, publica)
+    prueba["linea"] = prueba["linea"].replace("usuario", "usuarix")
+    assert not verificar_inclusion(prueba, publica)
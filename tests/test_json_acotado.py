@@ -0,0 +1,61 @@
+"""LectorJSONAcotado frente a json.loads y sus límites"""
+
+import io
+import json
+
+import pytest
+
+from modules.json_acotado import LectorJSONAcotado, leer_json_acotado
+from modules.validacion_masiva import ESQUEMA_REGISTRO
+
+DOCUMENTOS = [
+    '{}',
+    '[]',
+    '{"a": 1, "b": [true, false, null], "c": {"d": "texto"}}',
+    '{"n": -12.5e3, "m": 0, "k": 1E-2, "x": 123456789012345678901234567890}',
+    '{"escapes": "l\\u00ednea\\n\\t\\"comillas\\" \\\\ \\/", "emoji": "\\ud83d\\ude00"}',
+    '  [1, [2, [3, [4]]], {"a": []}]  ',
+    '"solo un texto"',
+    '{"unicode": "ñandú 日本"}',
+]
+
+@pytest.mark.parametrize("documento", DOCUMENTOS)
+def test_coincide_con_json_loads(documento):
+    assert leer_json_acotado(documento) == (True, json.loads(documento))
+
+@pytest.mark.parametrize("documento", DOCUMENTOS)
+def test_coincide_leyendo_de_byte_en_byte(documento):
+    lector = LectorJSONAcotado(tamano_trozo=1)
+    assert lector.leer(io.BytesIO(documento.encode("utf-8"))) == json.loads(documento)
+
+@pytest.mark.parametrize("documento", ['{"a": }', '{"a": 1,}', '[1 2]', '{"a": tru}', '{"a": 01}', '{"a": "sin cerrar'])
+def test_rechaza_json_invalido(documento):
+    with pytest.raises(ValueError):
+        json.loads(documento)
+    valido, mensaje = leer_json_acotado(documento)
+    assert not valido and isinstance(mensaje, str)
+
+def test_rechaza_cuerpo_demasiado_grande():
+    valido, mensaje = leer_json_acotado('{"a": "' + "x" * 100 + '"}', max_bytes=50)
+    assert not valido and "50 bytes" in mensaje
+
+def test_rechaza_anidamiento_profundo_sin_recursion():
+    valido, _ = leer_json_acotado("[" * 100000, max_bytes=10 ** 6)
+    assert not valido
+
+def test_rechaza_campo_largo():
+    valido, _ = leer_json_acotado('{"a": "' + "x" * 20 + '"}', max_longitud_campo=10)
+    assert not valido
+
+def test_entero_enorme_se_rechaza_sin_excepcion():
+    valido, mensaje = leer_json_acotado('{"a": 1' + "0" * 5000 + "}")
+    assert not valido and "dígitos" in mensaje
+
+def test_esquema_aplica_nombres_reservados():
+    valido, _ = leer_json_acotado('{"nombre": "Ana", "email": "ana@example.com", "edad": 30}',
+                                  esquema=ESQUEMA_REGISTRO)
+    assert valido
+    for nombre in ("admin", "Аdmin"):  # El segundo con A cirílica
+        valido, mensaje = leer_json_acotado(f'{{"nombre": "{nombre}", "email": "a@b.com", "edad": 30}}',
+                                            esquema=ESQUEMA_REGISTRO)
+        assert not valido and "reservado" in mensaje
@@ -0,0 +1,18 @@
+from modules import cargar_ejemplo
+
+registro_seguridad = cargar_ejemplo("04_security_logging")
+
+def _admitidos(agregador, evento, valores, n, ahora=1000.0):
+    return sum(agregador.admitir(evento, valores, ahora + i / (2 * n))[0] for i in range(n))
+
+def test_muestreo_descarta_lecturas_pero_no_exportaciones():
+    agregador = registro_seguridad.AgregadorRafagas(0, muestreo={"DATA_ACCESS": 10})
+    assert _admitidos(agregador, "DATA_ACCESS", ("ana", "pii", "READ"), 1000) < 1000
+    assert _admitidos(agregador, "DATA_ACCESS", ("ana", "pii", "EXPORT"), 1000, 1001.0) == 1000
+    assert agregador.estadisticas()["DATA_ACCESS"]["descartados"] > 0
+
+def test_muestreo_conserva_exitos_tras_fallos():
+    agregador = registro_seguridad.AgregadorRafagas(0, muestreo={"LOGIN_SUCCESS": 10})
+    agregador.admitir("LOGIN_FAILED", ("ana", "203.0.113.7"), 999.0)
+    assert _admitidos(agregador, "LOGIN_SUCCESS", ("ana", "203.0.113.7"), 100) == 100
+    assert _admitidos(agregador, "LOGIN_SUCCESS", ("luis", "10.0.0.1"), 1000, 1001.0) < 1000
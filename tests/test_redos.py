@@ -0,0 +1,61 @@
+import pytest
+
+from modules.redos import analizar_patron, analizar_validador, es_seguro, medir_peor_caso
+
+def _tipos(patron):
+    return {hallazgo["tipo"] for hallazgo in analizar_patron(patron)}
+
+@pytest.mark.parametrize("patron", [
+    "^(a+)+$",
+    "(a|a)*",
+    "^(a.|.b)+$",  # Alternancia dentro de un grupo
+    "(a|aa)+",     # sre_parse la factoriza como a(?:|a)
+    "^(ab|a.)+$",  # Factorizada como a(?:b|.)
+])
+def test_patrones_peligrosos(patron):
+    hallazgos = analizar_patron(patron)
+    assert any(hallazgo["riesgo"] == "ALTO" for hallazgo in hallazgos)
+
+@pytest.mark.parametrize("patron", [
+    "^[a-z]+$",
+    "(a|b)+",
+    "(ab|ac)+",
+    "(a|ab)+",
+    "^(foo|bar)+$",
+])
+def test_patrones_sin_riesgo_alto(patron):
+    assert all(hallazgo["riesgo"] != "ALTO" for hallazgo in analizar_patron(patron))
+
+def test_cuantificadores_solapados():
+    assert "cuantificadores_solapados" in _tipos(r"^\d+\d+$")
+
+def test_medicion_exponencial_supera_el_limite():
+    medicion = medir_peor_caso("^(a|aa)+$", longitud_max=64, limite_s=0.05)
+    assert medicion["exponente"] == float("inf")
+
+def test_patrones_del_validador_son_seguros():
+    resultados = analizar_validador(longitud_max=256, limite_s=0.5)
+    assert resultados and all(es_seguro(resultado) for resultado in resultados.values())
+
+def test_presupuesto_restaura_el_temporizador_previo():
+    import signal
+
+    from modules.redos import validacion
+
+    disparos = []
+
+    def manejador(signum, frame):
+        disparos.append(signum)
+
+    previo = signal.signal(signal.SIGALRM, manejador)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 5.0)
+        assert validacion.coincidir_con_presupuesto("^a+$", "aaa", 0.5)
+        with pytest.raises(validacion.PresupuestoRegexExcedido):
+            validacion.coincidir_con_presupuesto("^(a|aa)+$", "a" * 40 + "!", 0.02)
+        restante, _ = signal.getitimer(signal.ITIMER_REAL)
+        assert 4.0 < restante <= 5.0
+        assert signal.getsignal(signal.SIGALRM) is manejador and not disparos
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previo)
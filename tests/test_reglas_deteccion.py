@@ -0,0 +1,30 @@
+import pytest
+
+from config import DETECTION_CONFIG
+from modules.reglas_deteccion import MotorReglas, ReglaInvalida
+
+def _fallo(ip, usuario, ahora):
+    return {"event": "LOGIN_FAILED", "details": {"ip_address": ip, "username": usuario}}, ahora
+
+def test_reglas_de_login_usan_los_umbrales_de_config():
+    motor = MotorReglas(recarga=False)
+    reglas = {regla.nombre: regla for regla in motor.reglas}
+    assert reglas["fuerza_bruta_ip"].umbral == DETECTION_CONFIG["ip_failure_threshold"]
+    assert reglas["ataque_dirigido_usuario"].umbral == DETECTION_CONFIG["user_failure_threshold"]
+    assert reglas["credential_stuffing_ip"].umbral == DETECTION_CONFIG["ip_distinct_users_threshold"]
+    assert reglas["fuerza_bruta_ip"].ventana == DETECTION_CONFIG["window_seconds"]
+
+def test_fuerza_bruta_dispara_en_el_umbral():
+    motor = MotorReglas(recarga=False)
+    umbral = DETECTION_CONFIG["ip_failure_threshold"]
+    disparos = []
+    for i in range(umbral):
+        alertas = motor.procesar(*_fallo("203.0.113.7", f"victima{i % 2}", 1000.0 + i))
+        disparos.append(any(a["regla"] == "fuerza_bruta_ip" for a in alertas))
+    assert disparos == [False] * (umbral - 1) + [True]
+
+def test_clave_de_config_desconocida():
+    regla = {"nombre": "x", "evento": "LOGIN_FAILED", "agrupar_por": "ip_address",
+             "ventana": "no_existe", "umbral": 1}
+    with pytest.raises(ReglaInvalida):
+        MotorReglas([regla], recarga=False)
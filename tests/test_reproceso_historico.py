@@ -0,0 +1,32 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from modules.reproceso_historico import ReprocesoHistorico
+
+def _escribir(ruta, hace_dias, eventos):
+    inicio = datetime.now(timezone.utc) - timedelta(days=hace_dias)
+    with open(ruta, "w", encoding="utf-8") as f:
+        for i in range(eventos):
+            f.write(json.dumps({
+                "timestamp": (inicio + timedelta(seconds=i)).isoformat(), "level": "WARNING",
+                "event": "LOGIN_FAILED", "event_type": "login_attempt",
+                "details": {"username": f"victima{i % 2}", "ip_address": "203.0.113.7", "success": False},
+            }) + "\n")
+
+def test_avisa_si_la_ventana_supera_lo_conservado(tmp_path, capsys):
+    log = tmp_path / "security.log"
+    _escribir(log, 2, 10)
+
+    reproceso = ReprocesoHistorico(log, dias=30, procesos=1)
+    alertas = list(reproceso.alertas())
+    assert reproceso.aviso_cobertura and "30 días" in reproceso.aviso_cobertura
+    assert "⚠️" in capsys.readouterr().err
+    assert any(alerta["regla"] == "fuerza_bruta_ip" for alerta in alertas)
+
+def test_sin_aviso_si_la_ventana_cabe(tmp_path):
+    log = tmp_path / "security.log"
+    _escribir(log, 2, 10)
+    reproceso = ReprocesoHistorico(log, dias=1, procesos=1)
+    list(reproceso.alertas())
+    assert reproceso.aviso_cobertura is None
+    assert ReprocesoHistorico(log, dias=None, procesos=1).comprobar_cobertura() is None
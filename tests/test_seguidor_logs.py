@@ -0,0 +1,54 @@
+from modules.seguidor_logs import AlimentadorDetector, SeguidorLog, extraer_logins
+
+def _escribir(ruta, desde, hasta):
+    with open(ruta, "ab") as f:
+        f.writelines(f"linea {i}\n".encode() for i in range(desde, hasta))
+
+def _rotar(ruta, sello):
+    ruta.rename(ruta.with_name(f"{ruta.name}.{sello}"))
+
+def test_reinicio_tras_dos_rotaciones(tmp_path):
+    log = tmp_path / "security.log"
+    estado = tmp_path / "estado.json"
+    _escribir(log, 0, 5)
+    seguidor = SeguidorLog(log, estado=estado, desde_inicio=True)
+    assert seguidor.leer_nuevos() == [f"linea {i}".encode() for i in range(5)]
+    seguidor.guardar_estado(forzar=True)
+
+    # Parado: termina el segmento actual y rota dos veces
+    _escribir(log, 5, 8)
+    _rotar(log, "20240501T100000000000")
+    _escribir(log, 8, 12)
+    _rotar(log, "20240501T110000000000")
+    _escribir(log, 12, 15)
+
+    seguidor = SeguidorLog(log, estado=estado)
+    assert seguidor.leer_nuevos() == [f"linea {i}".encode() for i in range(5, 15)]
+
+def test_reinicio_sin_rotar(tmp_path):
+    log = tmp_path / "security.log"
+    estado = tmp_path / "estado.json"
+    _escribir(log, 0, 3)
+    seguidor = SeguidorLog(log, estado=estado, desde_inicio=True)
+    seguidor.leer_nuevos()
+    seguidor.guardar_estado(forzar=True)
+    _escribir(log, 3, 6)
+
+    seguidor = SeguidorLog(log, estado=estado)
+    assert seguidor.leer_nuevos() == [f"linea {i}".encode() for i in range(3, 6)]
+
+def test_resumen_de_rafaga_es_un_evento_con_peso():
+    linea = (b'{"timestamp": "2024-05-01T10:00:00+00:00", "level": "WARNING", "event": "LOGIN_FAILED", '
+             b'"event_type": "login_attempt", "details": {"username": "ana", "success": false, '
+             b'"ip_address": "203.0.113.7", "count": 1000000}}')
+    assert extraer_logins([linea]) == [("2024-05-01T10:00:00+00:00", "ana", "203.0.113.7", False, 1000000)]
+
+def test_alimentador_pesa_los_resumenes():
+    linea = (b'{"timestamp": "2024-05-01T10:00:00+00:00", "level": "WARNING", "event": "LOGIN_FAILED", '
+             b'"event_type": "login_attempt", "details": {"username": "ana", "success": false, '
+             b'"ip_address": "203.0.113.7", "count": 7}}')
+    alertas = []
+    alimentador = AlimentadorDetector(alertar=alertas.append)
+    alimentador([linea])
+    assert alimentador.eventos == 7
+    assert any("BRUTE FORCE" in alerta["alerta"] and " 7 intentos" in alerta["alerta"] for alerta in alertas)
@@ -0,0 +1,52 @@
+"""ValidadorMasivo: filas corruptas se reportan sin detener el proceso"""
+
+from modules.validacion_masiva import ValidadorMasivo, leer_filas
+
+def _procesar(ruta, **opciones):
+    validador = ValidadorMasivo(**opciones)
+    limpias = list(validador.procesar_archivo(ruta))
+    return limpias, validador.reporte.to_dict()
+
+def test_jsonl_con_lineas_corruptas(tmp_path):
+    ruta = tmp_path / "altas.jsonl"
+    ruta.write_bytes(
+        b'{"nombre": "Ana", "email": "ana@example.com"}\n'
+        + b"[" * 100000 + b"\n"                   # RecursionError en json.loads
+        + b"\xff\xfe basura\n"                    # UTF-8 inválido
+        + b'{"nombre": "' + b"x" * 5000 + b'"}\n'  # Más larga que el límite de línea
+        + b"no es json\n"
+        + b'{"nombre": "Bea", "email": "bea@example.com"}\n'
+    )
+    validador = ValidadorMasivo()
+    limpias = list(validador.procesar(leer_filas(ruta, max_bytes_linea=1000)))
+    reporte = validador.reporte.to_dict()
+
+    assert [fila["nombre"] for fila in limpias] == ["Ana", "Bea"]
+    assert reporte["filas_totales"] == 6
+    assert reporte["errores_por_columna"] == {"__fila__": 4}
+    mensajes = {error["mensaje"] for error in reporte["errores"]}
+    assert mensajes == {"Línea JSON inválida", "Línea con UTF-8 inválido", "Línea de más de 1000 bytes"}
+
+def test_csv_con_filas_corruptas(tmp_path):
+    ruta = tmp_path / "altas.csv"
+    ruta.write_bytes(
+        b"nombre,email\n"
+        b"Ana,ana@example.com\n"
+        b'"' + b"x" * 200000 + b'",z@example.com\n'  # Campo mayor que csv.field_size_limit()
+        b"Caf\xe9,cafe@example.com\n"                 # Latin-1, no UTF-8
+        b'Bea,"bea@example.com"\n'
+    )
+    limpias, reporte = _procesar(ruta)
+
+    assert [fila["nombre"] for fila in limpias] == ["Ana", "Bea"]
+    assert reporte["filas_totales"] == 4
+    assert reporte["errores_por_columna"] == {"__fila__": 2}
+
+def test_linea_enorme_sin_salto_no_se_carga_entera(tmp_path):
+    ruta = tmp_path / "altas.jsonl"
+    with open(ruta, "wb") as f:
+        f.write(b'{"nombre": "Ana", "email": "ana@example.com"}\n')
+        f.write(b"x" * (5 * 1024 * 1024))  # 5 MB sin salto de línea
+    filas = list(leer_filas(ruta, max_bytes_linea=64 * 1024))
+    assert filas[0]["nombre"] == "Ana"
+    assert filas[1] == {"__invalida__": "Línea de más de 65536 bytes"}
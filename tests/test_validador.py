@@ -0,0 +1,44 @@
+import pytest
+
+from modules import cargar_ejemplo
+
+validacion = cargar_ejemplo("02_input_validation")
+
+def test_limite_tras_normalizar_y_quitar_espacios():
+    validador = validacion.ValidadorSeguro()
+    # Muchos espacios alrededor: el texto útil cabe de sobra
+    assert validador.validar_campo_texto(" " * 100 + "Ana" + " " * 100, max_length=10) == (True, "Ana")
+    # Ancho completo: NFKC lo deja en 10 caracteres
+    assert validador.validar_campo_texto("Ａ" * 10, max_length=10) == (True, "A" * 10)
+    # ﷺ se expande a 18 caracteres al normalizar
+    valido, _ = validador.validar_campo_texto("ﷺ", max_length=10)
+    assert not valido
+    # α + tres marcas se compone en un solo carácter
+    assert validador.validar_campo_texto("ᾂ" * 10, max_length=10)[0]
+
+def test_nombres_reservados_por_esqueleto():
+    validador = validacion.ValidadorSeguro()
+    for nombre in ("admin", "Аdmin", "ａｄｍｉｎ", "rооt"):
+        valido, mensaje = validador.validar_campo_texto(nombre, reservados=True)
+        assert not valido and "reservado" in mensaje
+    assert validador.validar_campo_texto("Ana García", reservados=True) == (True, "Ana García")
+    assert validador.validar_campo_texto("admin")[0]  # Sin reservados=True no se comprueba
+
+def test_una_sola_normalizacion():
+    from modules.unicode_texto import normalizar
+
+    validador = validacion.ValidadorSeguro()
+    for texto in ("Ａｎａ", "García", "ﬁn", "plain"):
+        assert validador.normalizar_unicode(texto) == normalizar(texto)
+
+def test_sanitizacion_sql_en_una_pasada():
+    secuencial = validacion.ValidadorSeguro()
+    una_pasada = validacion.ValidadorSeguro(una_pasada=True)
+    assert not secuencial.motor_sql.una_pasada
+    assert una_pasada.motor_sql.una_pasada
+    for texto in ("'; DROP TABLE users; --", "a/*b*/c", "-;-", "O'Brien", "sin nada"):
+        assert una_pasada.sanitizar_sql(texto) == secuencial.sanitizar_sql(texto)
+
+def test_reglas_sql_vacias_no_usan_las_por_defecto():
+    with pytest.raises(ValueError):
+        validacion.ValidadorSeguro(reglas_sql=[])